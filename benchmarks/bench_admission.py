@@ -0,0 +1,133 @@
+"""Simulate a posting burst against an exhausted connection pool.
+
+Requests need one of ``--pool-size`` connections for ``--service-ms``.
+Without admission control they wait for a connection for up to
+``--pool-timeout`` seconds and then fail, as a 500. With the
+AdmissionController sized to the pool, they wait in a bounded queue for up
+to ``--admission-timeout`` seconds and are otherwise shed with a 503.
+
+Reports, for each mode, how many requests succeeded and failed and how long
+successes and failures took. Successes slower than ``--client-timeout`` are
+counted as ``200_late``: the gateway has given up on them and retries, so
+the work was wasted. No database is used, so the result only reflects the
+queueing policy.
+
+Usage:
+    python benchmarks/bench_admission.py --requests 20000 --pool-size 15
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from upayapi.admission import POSTING, AdmissionController
+from upayapi.exceptions import ServiceUnavailableError
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Get a percentile of a list of values.
+
+    Args:
+        values: Values.
+        fraction: Percentile as a fraction, for example 0.99.
+
+    Returns:
+        The percentile rounded to a millisecond, or None without values.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000, 1)
+
+
+async def run(args: argparse.Namespace, admission: bool) -> Dict[str, Any]:
+    """Run one burst.
+
+    Args:
+        args: Command line arguments.
+        admission: Whether requests go through admission control.
+
+    Returns:
+        Outcome counts and latency percentiles in milliseconds.
+    """
+    pool = asyncio.Semaphore(args.pool_size)
+    controller = AdmissionController(
+        limit=args.pool_size,
+        queue_size=args.queue_size,
+        timeout=args.admission_timeout,
+    )
+
+    async def handle() -> Tuple[str, float]:
+        started = time.perf_counter()
+        try:
+            if admission:
+                await controller.acquire(POSTING)
+            try:
+                await asyncio.wait_for(pool.acquire(), args.pool_timeout)
+            except asyncio.TimeoutError:
+                return "500", time.perf_counter() - started
+            try:
+                await asyncio.sleep(args.service_ms / 1000)
+            finally:
+                pool.release()
+                if admission:
+                    controller.release(POSTING)
+        except ServiceUnavailableError:
+            return "503", time.perf_counter() - started
+        latency = time.perf_counter() - started
+        return ("200" if latency <= args.client_timeout else "200_late"), latency
+
+    async def arrivals() -> List[Tuple[str, float]]:
+        tasks = []
+        interval = 1 / args.rate
+        for _ in range(args.requests):
+            tasks.append(asyncio.create_task(handle()))
+            await asyncio.sleep(interval)
+        return await asyncio.gather(*tasks)
+
+    started = time.perf_counter()
+    results = await arrivals()
+    elapsed = time.perf_counter() - started
+
+    latencies: Dict[str, List[float]] = {}
+    for outcome, latency in results:
+        latencies.setdefault(outcome, []).append(latency)
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "outcomes": {name: len(values) for name, values in sorted(latencies.items())},
+        "success_p50_ms": percentile(latencies.get("200", []), 0.5),
+        "success_p99_ms": percentile(latencies.get("200", []), 0.99),
+        "failure_mean_ms": round(
+            statistics.mean(latencies.get("500", []) + latencies.get("503", [])) * 1000,
+            1,
+        )
+        if "500" in latencies or "503" in latencies
+        else None,
+    }
+
+
+def main() -> None:
+    """Run the burst with and without admission control and print JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=1000, help="Arrivals per second")
+    parser.add_argument("--pool-size", type=int, default=15)
+    parser.add_argument("--service-ms", type=float, default=50)
+    parser.add_argument("--pool-timeout", type=float, default=30)
+    parser.add_argument("--client-timeout", type=float, default=10)
+    parser.add_argument("--queue-size", type=int, default=50)
+    parser.add_argument("--admission-timeout", type=float, default=5)
+    args = parser.parse_args()
+
+    results = {
+        "pool_only": asyncio.run(run(args, admission=False)),
+        "admission": asyncio.run(run(args, admission=True)),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
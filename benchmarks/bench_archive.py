@@ -0,0 +1,117 @@
+"""Benchmark archiving old transaction months to Parquet.
+
+Seeds a SQLite database with a number of months of transactions, then
+archives all but the most recent months and reports:
+
+* ``database_bytes``: size of the database before and after archiving (after
+  VACUUM), which the hot indexes grow with
+* ``archive_bytes``: total size of the zstd-compressed Parquet files
+* ``export_rows_per_second``: rows per second streamed by
+  TransactionRepository.stream_transactions over the full range, from the
+  database alone and from the merged archive and database
+
+Requires pyarrow (the ``archive`` extra).
+
+Usage:
+    python benchmarks/bench_archive.py --months 24 --rows-per-month 5000
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from upayapi.archive import ArchiveReader, archive_month
+from upayapi.database import Base
+from upayapi.models.transaction import Transaction
+from upayapi.partitions import add_months
+from upayapi.repositories.transaction import TransactionRepository
+
+
+def export_rate(db: Session, archive: Optional[ArchiveReader]) -> float:
+    """Stream every transaction and measure the throughput.
+
+    Args:
+        db: Database session.
+        archive: Archive reader, or None to read the database alone.
+
+    Returns:
+        Rows streamed per second.
+    """
+    started = time.perf_counter()
+    rows = 0
+    for batch in TransactionRepository(db, archive=archive).stream_transactions(
+        batch_size=1000
+    ):
+        rows += len(batch)
+    return round(rows / (time.perf_counter() - started))
+
+
+def main() -> None:
+    """Run the benchmark and print JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--rows-per-month", type=int, default=5000)
+    parser.add_argument("--keep-months", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "bench.db"
+        archive_dir = Path(directory) / "archive"
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=engine)
+
+        first = date(2024, 1, 1)
+        with engine.begin() as connection:
+            for m in range(args.months):
+                month = add_months(first, m)
+                connection.execute(
+                    Transaction.__table__.insert(),
+                    [
+                        {
+                            "tpg_trans_id": f"{m}-{i}",
+                            "session_identifier": f"session-{i}",
+                            "pmt_status": "SUCCESS" if i % 10 else "CANCELLED",
+                            "pmt_amt": Decimal("25.00") + i % 100,
+                            "pmt_date": month.replace(day=i % 28 + 1),
+                            "name_on_acct": "John Doe",
+                            "site_id": "default",
+                        }
+                        for i in range(args.rows_per_month)
+                    ],
+                )
+
+        results: Dict[str, Any] = {"rows": args.months * args.rows_per_month}
+        with Session(engine) as db:
+            results["export_rows_per_second"] = {"database": export_rate(db, None)}
+            database_bytes = {"before": path.stat().st_size}
+
+            started = time.perf_counter()
+            for m in range(args.months - args.keep_months):
+                archive_month(db, add_months(first, m), archive_dir)
+            results["archive_seconds"] = round(time.perf_counter() - started, 3)
+
+            reader = ArchiveReader(archive_dir)
+            results["export_rows_per_second"]["archive_and_database"] = export_rate(
+                db, reader
+            )
+
+        with engine.connect() as connection:
+            connection.execute(text("VACUUM"))
+        engine.dispose()
+        database_bytes["after"] = path.stat().st_size
+        results["database_bytes"] = database_bytes
+        results["archive_bytes"] = sum(p.stat().st_size for p in archive_dir.iterdir())
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Benchmark posting latency through the sync and async database paths.
+
+Sends concurrent postings to an in-process application and reports p50/p99
+latency for each mode:
+
+* ``blocking``: the service called directly from the event loop, as the
+  posting route did before the async path existed. Once concurrency exceeds
+  the pool size this mode stalls for ``pool_timeout``: the blocked event loop
+  cannot run the session cleanup that would return a connection.
+* ``sync``: the synchronous service run in the threadpool.
+* ``async``: the ``AsyncSession`` service.
+
+Usage:
+    python benchmarks/bench_async_posting.py --concurrency 200 --requests 2000
+    python benchmarks/bench_async_posting.py --database-url postgresql://...
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from typing import Dict, List
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Get a percentile from a list of samples.
+
+    Args:
+        samples: Latency samples in seconds.
+        fraction: Percentile as a fraction between 0 and 1.
+
+    Returns:
+        Percentile value in milliseconds.
+    """
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index] * 1000
+
+
+async def run_mode(app, mode: str, concurrency: int, requests: int) -> Dict[str, float]:
+    """Send postings to the application and collect latency statistics.
+
+    Args:
+        app: ASGI application.
+        mode: Processing mode ("blocking", "sync" or "async").
+        concurrency: Number of postings in flight at once.
+        requests: Total number of postings to send.
+
+    Returns:
+        Dictionary with throughput and latency percentiles.
+    """
+    import httpx
+
+    from upayapi.config import settings
+
+    settings.use_async_database = mode == "async"
+    path = "/bench/blocking" if mode == "blocking" else "/upay/posting"
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+
+        async def post() -> None:
+            async with semaphore:
+                data = {
+                    "posting_key": settings.posting_key,
+                    "tpg_trans_id": uuid.uuid4().hex,
+                    "session_identifier": "bench",
+                    "pmt_status": "success",
+                    "pmt_amt": "10.00",
+                    "pmt_date": "01/01/2025",
+                    "name_on_acct": "Bench Mark",
+                }
+                started = time.perf_counter()
+                response = await client.post(path, data=data)
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(post() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "postings_per_sec": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+    }
+
+
+def main() -> None:
+    """Run the benchmark for each mode and print the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--database-url", help="Database URL (default: temporary SQLite file)"
+    )
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        default=["blocking", "sync", "async"],
+        choices=["blocking", "sync", "async"],
+    )
+    args = parser.parse_args()
+
+    # Settings are read at import time, so configure the environment first
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        directory = tempfile.mkdtemp(prefix="upay-bench-")
+        os.environ["DATABASE_URL"] = f"sqlite:///{directory}/bench.db"
+    os.environ["POSTING_KEY"] = "bench_key"
+
+    from fastapi import Depends, Form
+
+    from upayapi.database import Base, get_engine
+    from upayapi.main import create_app
+    from upayapi.models.schemas import TransactionRequest
+    from upayapi.services.transaction import TransactionService
+
+    Base.metadata.create_all(bind=get_engine())
+    app = create_app()
+
+    @app.post("/bench/blocking")
+    async def blocking_posting(
+        posting_key: str = Form(),
+        tpg_trans_id: str = Form(),
+        session_identifier: str = Form(),
+        pmt_status: str = Form(),
+        pmt_amt: str = Form(),
+        pmt_date: str = Form(),
+        name_on_acct: str = Form(),
+        transaction_service: TransactionService = Depends(),
+    ):
+        return transaction_service.process_transaction(
+            TransactionRequest(
+                posting_key=posting_key,
+                tpg_trans_id=tpg_trans_id,
+                session_identifier=session_identifier,
+                pmt_status=pmt_status,
+                pmt_amt=pmt_amt,
+                pmt_date=pmt_date,
+                name_on_acct=name_on_acct,
+            )
+        )
+
+    results = {
+        mode: asyncio.run(run_mode(app, mode, args.concurrency, args.requests))
+        for mode in args.modes
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
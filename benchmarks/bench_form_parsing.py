@@ -0,0 +1,195 @@
+"""Benchmark the per-request CPU cost of parsing a uPay posting.
+
+Sends a posting body through two minimal FastAPI applications, called
+directly as ASGI applications so no network or database work is measured:
+
+* ``form_params``: the former handler, seven ``Form()`` parameters and a
+  TransactionRequest built in the handler
+* ``fast_path``: the get_transaction_request dependency
+
+Both handlers return a constant response. Also reports the cost of the
+body parsing step alone, python-multipart through Starlette versus
+parse_posting_body.
+
+Usage:
+    python benchmarks/bench_form_parsing.py --iterations 20000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Annotated, Any, Callable, Dict, List
+
+from fastapi import Depends, FastAPI, Form
+from starlette.requests import Request
+
+BODY = (
+    b"posting_key=bench_key&tpg_trans_id=123456789&session_identifier=abc123def456"
+    b"&pmt_status=success&pmt_amt=125.50&pmt_date=01%2F15%2F2025"
+    b"&name_on_acct=Jane+Q+Doe&sys_tracking_id=42&card_type=VISA&upay_site_id=7"
+)
+
+HEADERS = [
+    (b"content-type", b"application/x-www-form-urlencoded"),
+    (b"content-length", str(len(BODY)).encode()),
+]
+
+
+def form_params_app() -> FastAPI:
+    """Build an application with the former seven-parameter handler.
+
+    Returns:
+        FastAPI application.
+    """
+    from upayapi.models.schemas import TransactionRequest
+
+    app = FastAPI()
+
+    @app.post("/upay/posting")
+    async def upay_posting(
+        posting_key: Annotated[str, Form()],
+        tpg_trans_id: Annotated[str, Form()],
+        session_identifier: Annotated[str, Form()],
+        pmt_status: Annotated[str, Form()],
+        pmt_amt: Annotated[str, Form()],
+        pmt_date: Annotated[str, Form()],
+        name_on_acct: Annotated[str, Form()],
+    ) -> Dict[str, bool]:
+        TransactionRequest(
+            posting_key=posting_key,
+            tpg_trans_id=tpg_trans_id,
+            session_identifier=session_identifier,
+            pmt_status=pmt_status,
+            pmt_amt=pmt_amt,
+            pmt_date=pmt_date,
+            name_on_acct=name_on_acct,
+        )
+        return {"success": True}
+
+    return app
+
+
+def fast_path_app() -> FastAPI:
+    """Build an application with the get_transaction_request dependency.
+
+    Returns:
+        FastAPI application.
+    """
+    from upayapi.forms import get_transaction_request
+    from upayapi.models.schemas import TransactionRequest
+
+    app = FastAPI()
+
+    @app.post("/upay/posting")
+    async def upay_posting(
+        transaction_request: Annotated[
+            TransactionRequest, Depends(get_transaction_request)
+        ],
+    ) -> Dict[str, bool]:
+        return {"success": True}
+
+    return app
+
+
+async def time_requests(app: Any, iterations: int) -> float:
+    """Time posting requests through an ASGI application.
+
+    Args:
+        app: ASGI application.
+        iterations: Number of requests per run.
+
+    Returns:
+        Mean microseconds per request, best of three runs.
+    """
+    statuses: List[int] = []
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": BODY, "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": "1.1",
+                "method": "POST",
+                "scheme": "http",
+                "path": "/upay/posting",
+                "raw_path": b"/upay/posting",
+                "root_path": "",
+                "query_string": b"",
+                "headers": HEADERS,
+                "server": ("127.0.0.1", 8000),
+                "client": ("127.0.0.1", 50000),
+            }
+            await app(scope, receive, send)
+        best = min(best, time.perf_counter() - started)
+
+    assert set(statuses) == {200}, statuses
+    return best / iterations * 1e6
+
+
+async def time_parser(parse: Callable[[], Any], iterations: int) -> float:
+    """Time a body parsing coroutine.
+
+    Args:
+        parse: Function returning a coroutine that parses BODY.
+        iterations: Number of calls per run.
+
+    Returns:
+        Mean microseconds per call, best of three runs.
+    """
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await parse()
+        best = min(best, time.perf_counter() - started)
+    return best / iterations * 1e6
+
+
+def main() -> None:
+    """Run the benchmark and print JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    from upayapi.forms import parse_posting_body
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": BODY, "more_body": False}
+
+    async def starlette_form() -> Any:
+        return await Request(
+            {"type": "http", "method": "POST", "headers": HEADERS}, receive
+        ).form()
+
+    async def fast_body() -> Any:
+        return parse_posting_body(BODY)
+
+    results = {
+        "form_params_request_us": asyncio.run(
+            time_requests(form_params_app(), args.iterations)
+        ),
+        "fast_path_request_us": asyncio.run(
+            time_requests(fast_path_app(), args.iterations)
+        ),
+        "starlette_form_parse_us": asyncio.run(
+            time_parser(starlette_form, args.iterations)
+        ),
+        "parse_posting_body_us": asyncio.run(time_parser(fast_body, args.iterations)),
+    }
+    print(
+        json.dumps({name: round(value, 2) for name, value in results.items()}, indent=2)
+    )
+
+
+if __name__ == "__main__":
+    main()
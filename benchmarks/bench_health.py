@@ -0,0 +1,122 @@
+"""Benchmark the health endpoints.
+
+Calls the application directly as an ASGI application, on a file SQLite
+database, and reports microseconds per request and pool checkouts per
+request for:
+
+* ``health_uncached``: the former ``/health``, running
+  check_database_connection on every call
+* ``health``, ``health_ready`` and ``health_live``: the endpoints serving
+  the background prober's cached result
+
+Usage:
+    python benchmarks/bench_health.py --iterations 5000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy import event
+
+
+async def time_requests(app: Any, path: str, iterations: int) -> float:
+    """Time GET requests through an ASGI application.
+
+    Args:
+        app: ASGI application.
+        path: Request path.
+        iterations: Number of requests per run.
+
+    Returns:
+        Mean microseconds per request, best of three runs.
+    """
+    statuses: List[int] = []
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": "1.1",
+                "method": "GET",
+                "scheme": "http",
+                "path": path,
+                "raw_path": path.encode(),
+                "root_path": "",
+                "query_string": b"",
+                "headers": [],
+                "server": ("127.0.0.1", 8000),
+                "client": ("127.0.0.1", 50000),
+            }
+            await app(scope, receive, send)
+        best = min(best, time.perf_counter() - started)
+
+    assert set(statuses) == {200}, set(statuses)
+    return best / iterations * 1e6
+
+
+def main() -> None:
+    """Run the benchmark and print JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    # Settings are read at import time, so configure the environment first
+    os.environ["DATABASE_URL"] = f"sqlite:///{directory}/bench.db"
+    os.environ["ACCESS_LOG"] = "False"
+
+    from upayapi.database import check_database_connection, get_engine
+    from upayapi.main import create_app
+
+    app = create_app()
+
+    @app.get("/bench/health_uncached")
+    async def health_uncached() -> Dict[str, Any]:
+        db_status = check_database_connection()
+        return {
+            "status": db_status["status"],
+            "application": {"status": "healthy", "details": "Application is running"},
+            "database": db_status,
+        }
+
+    checkouts = 0
+
+    def count_checkout(*_: Any) -> None:
+        nonlocal checkouts
+        checkouts += 1
+
+    event.listen(get_engine(), "checkout", count_checkout)
+
+    results: Dict[str, Dict[str, float]] = {}
+    for name, path in (
+        ("health_uncached", "/bench/health_uncached"),
+        ("health", "/health"),
+        ("health_ready", "/health/ready"),
+        ("health_live", "/health/live"),
+    ):
+        checkouts = 0
+        per_request = asyncio.run(time_requests(app, path, args.iterations))
+        results[name] = {
+            "us_per_request": round(per_request, 1),
+            "checkouts_per_request": round(checkouts / (3 * args.iterations), 3),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Benchmark database round-trips per posting for each connection liveness mode.
+
+Processes postings one at a time through TransactionService on a temporary
+SQLite file and counts every statement sent to the database, including
+liveness pings, with SQLite's trace callback. Modes:
+
+* ``legacy``: the former configuration, a ``SELECT 1`` checkout listener
+  plus ``pool_pre_ping`` (the prod pool before liveness modes existed)
+* ``legacy_dev``: the former checkout listener alone (dev and SQLite)
+* ``none``, ``pre_ping``: the liveness modes of the same names
+* ``idle``: the idle mode with connections reused within the idle time
+* ``idle_expired``: the idle mode with every connection past the idle time,
+  its worst case
+
+Usage:
+    python benchmarks/bench_liveness.py --requests 2000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import uuid
+from typing import Dict, List
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+MODES = ["legacy", "legacy_dev", "none", "pre_ping", "idle", "idle_expired"]
+
+
+def run_mode(mode: str, directory: str, requests: int) -> Dict[str, float]:
+    """Process postings with one liveness mode and count statements.
+
+    Args:
+        mode: Benchmark mode, one of MODES.
+        directory: Directory for the SQLite database file.
+        requests: Number of postings to process.
+
+    Returns:
+        Dictionary with round-trip and latency statistics.
+    """
+    from upayapi.config import settings
+    from upayapi.database import Base
+    from upayapi.models.schemas import TransactionRequest
+    from upayapi.pool import configure_liveness, get_pool_args
+    from upayapi.services.transaction import TransactionService
+
+    url = f"sqlite:///{os.path.join(directory, f'{mode}.db')}"
+    liveness = {
+        "legacy": "pre_ping",
+        "legacy_dev": "none",
+        "idle_expired": "idle",
+    }.get(mode, mode)
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        **get_pool_args(url, liveness=liveness),
+    )
+    configure_liveness(engine, liveness, 0 if mode == "idle_expired" else 30)
+    Base.metadata.create_all(bind=engine)
+
+    if mode.startswith("legacy"):
+
+        @event.listens_for(engine, "checkout")
+        def checkout(dbapi_connection, connection_record, connection_proxy):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+
+    statements: List[str] = []
+
+    @event.listens_for(engine, "connect")
+    def trace(dbapi_connection, connection_record):
+        dbapi_connection.set_trace_callback(statements.append)
+
+    # Open the pooled connection before measuring, as a running server would
+    engine.dispose()
+    with engine.connect():
+        pass
+    statements.clear()
+
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    started = time.perf_counter()
+    for _ in range(requests):
+        request = TransactionRequest(
+            posting_key=settings.posting_key,
+            tpg_trans_id=uuid.uuid4().hex,
+            session_identifier="bench",
+            pmt_status="success",
+            pmt_amt="10.00",
+            pmt_date="01/01/2025",
+            name_on_acct="Bench Mark",
+        )
+        with session_factory() as db:
+            TransactionService(db).process_transaction(request)
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+
+    pings = sum(statement == "SELECT 1" for statement in statements)
+    return {
+        "statements_per_posting": round(len(statements) / requests, 2),
+        "pings_per_posting": round(pings / requests, 2),
+        "us_per_posting": round(elapsed / requests * 1e6, 1),
+    }
+
+
+def main() -> None:
+    """Run the benchmark for every liveness mode and print JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    # The idempotency cache and group commit would hide database work
+    os.environ["IDEMPOTENCY_CACHE_SIZE"] = "0"
+    os.environ["INGESTION_BATCHING"] = "False"
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = {mode: run_mode(mode, directory, args.requests) for mode in MODES}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Benchmark the cost of logging on the request path.
+
+Measures, in microseconds per call, the time the calling thread spends in
+``logger.error`` for a database error with a traceback, with:
+
+* ``stream``: the former setup, ``logging.basicConfig`` writing text lines
+  to a file from the calling thread
+* ``queue``: configure_logging, with sampling disabled so every record is
+  written
+* ``queue_sampled``: configure_logging with the default sampling, where
+  the repeated error is suppressed after the burst
+
+Usage:
+    python benchmarks/bench_logging.py --iterations 20000
+"""
+
+import argparse
+import json
+import logging
+import tempfile
+import time
+from typing import Callable, Dict
+
+from upayapi.log import configure_logging, shutdown_logging
+
+
+def per_call_us(function: Callable[[], None], iterations: int) -> float:
+    """Time a function.
+
+    Args:
+        function: Function to call.
+        iterations: Number of calls.
+
+    Returns:
+        Mean microseconds per call, best of three runs.
+    """
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        best = min(best, time.perf_counter() - started)
+    return best / iterations * 1e6
+
+
+def main() -> None:
+    """Run the benchmark for every logging setup and print JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    logger = logging.getLogger("upayapi.bench")
+    try:
+        raise RuntimeError("database is locked")
+    except RuntimeError as e:
+        error = e
+
+    def log_error() -> None:
+        logger.error("Database error: %s", error, exc_info=error)
+
+    root = logging.getLogger()
+    results: Dict[str, float] = {}
+    with tempfile.TemporaryFile("w") as output:
+        handler = logging.StreamHandler(output)
+        handler.setFormatter(
+            logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+        )
+        root.handlers[:] = [handler]
+        root.setLevel(logging.INFO)
+        results["stream_us"] = per_call_us(log_error, args.iterations)
+
+        # The queue is large enough that no record is dropped
+        configure_logging(
+            stream=output, queue_size=args.iterations * 3 + 1, sample_burst=0
+        )
+        results["queue_us"] = per_call_us(log_error, args.iterations)
+        shutdown_logging()
+
+        configure_logging(stream=output)
+        results["queue_sampled_us"] = per_call_us(log_error, args.iterations)
+        shutdown_logging()
+
+    print(
+        json.dumps({name: round(value, 2) for name, value in results.items()}, indent=2)
+    )
+
+
+if __name__ == "__main__":
+    main()
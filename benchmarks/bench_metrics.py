@@ -0,0 +1,140 @@
+"""Benchmark the per-request cost of metrics collection.
+
+Measures, in microseconds per operation:
+
+* ``middleware``: an HTTP request through ``RequestContextMiddleware``
+  recording metrics (access log off) around a minimal ASGI application,
+  minus the same request without it
+* ``posting_counter``: one ``record_posting`` call
+* ``statement``: a ``SELECT 1`` on an instrumented SQLite engine, minus the
+  same statement on an uninstrumented one
+
+Usage:
+    python benchmarks/bench_metrics.py --iterations 200000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Callable, Dict
+
+from sqlalchemy import create_engine, text
+
+
+def per_call_us(function: Callable[[], Any], iterations: int) -> float:
+    """Time a function.
+
+    Args:
+        function: Function to call.
+        iterations: Number of calls.
+
+    Returns:
+        Mean microseconds per call, best of three runs.
+    """
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        best = min(best, time.perf_counter() - started)
+    return best / iterations * 1e6
+
+
+def bench_middleware(iterations: int) -> Dict[str, float]:
+    """Time requests with and without the metrics middleware.
+
+    Args:
+        iterations: Number of requests per run.
+
+    Returns:
+        Microseconds per request with and without the middleware.
+    """
+    from upayapi.middleware import RequestContextMiddleware
+
+    class Route:
+        path = "/upay/posting"
+
+    async def app(scope, receive, send):
+        scope["route"] = Route
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    async def run(handler, count: int) -> float:
+        best = float("inf")
+        for _ in range(3):
+            started = time.perf_counter()
+            for _ in range(count):
+                await handler(
+                    {"type": "http", "method": "POST", "path": "/upay/posting"},
+                    receive,
+                    send,
+                )
+            best = min(best, time.perf_counter() - started)
+        return best / count * 1e6
+
+    bare = asyncio.run(run(app, iterations))
+    instrumented = asyncio.run(
+        run(RequestContextMiddleware(app, access_log=False), iterations)
+    )
+    return {
+        "request_without_metrics_us": round(bare, 3),
+        "request_with_metrics_us": round(instrumented, 3),
+        "middleware_overhead_us": round(instrumented - bare, 3),
+    }
+
+
+def bench_statement(iterations: int) -> Dict[str, float]:
+    """Time statements on instrumented and uninstrumented engines.
+
+    Args:
+        iterations: Number of statements per run.
+
+    Returns:
+        Microseconds per statement with and without instrumentation.
+    """
+    from upayapi.metrics import instrument_engine
+
+    bare_engine = create_engine("sqlite://")
+    instrumented_engine = create_engine("sqlite://")
+    instrument_engine(instrumented_engine, "bench")
+    statement = text("SELECT 1")
+
+    with bare_engine.connect() as bare, instrumented_engine.connect() as instrumented:
+        bare_us = per_call_us(lambda: bare.execute(statement), iterations)
+        instrumented_us = per_call_us(
+            lambda: instrumented.execute(statement), iterations
+        )
+
+    return {
+        "statement_without_metrics_us": round(bare_us, 3),
+        "statement_with_metrics_us": round(instrumented_us, 3),
+        "statement_overhead_us": round(instrumented_us - bare_us, 3),
+    }
+
+
+def main() -> None:
+    """Run the benchmark and print JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100000)
+    args = parser.parse_args()
+
+    from upayapi.metrics import record_posting
+
+    results: Dict[str, float] = {}
+    results.update(bench_middleware(args.iterations))
+    results["posting_counter_us"] = round(
+        per_call_us(lambda: record_posting("new"), args.iterations), 3
+    )
+    results.update(bench_statement(args.iterations // 10))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Benchmark the request middleware stack on /health and /upay/posting.
+
+Calls the application directly as an ASGI application, on an in-memory
+SQLite database, with:
+
+* ``before``: the former stack, a ``BaseHTTPMiddleware`` assigning a
+  ``uuid4`` request ID plus a separate pure ASGI metrics middleware
+* ``after``: RequestContextMiddleware, with the access log off
+* ``after_access_log``: RequestContextMiddleware writing access log
+  records to a handler that discards them
+
+Usage:
+    python benchmarks/bench_middleware.py --iterations 2000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Any, Callable, Dict, List
+
+POSTING_KEY = "bench_key"
+
+
+def posting_body(sequence: int) -> bytes:
+    """Build a posting body with a unique tpg_trans_id.
+
+    Args:
+        sequence: Sequence number of the posting.
+
+    Returns:
+        URL-encoded posting body.
+    """
+    return (
+        f"posting_key={POSTING_KEY}&tpg_trans_id=bench-{uuid.uuid4().hex}-{sequence}"
+        f"&session_identifier=abc123&pmt_status=success&pmt_amt=125.50"
+        f"&pmt_date=01%2F15%2F2025&name_on_acct=Jane+Doe"
+    ).encode()
+
+
+def build_app(variant: str) -> Any:
+    """Build the application with one middleware stack.
+
+    Args:
+        variant: ``before``, ``after`` or ``after_access_log``.
+
+    Returns:
+        FastAPI application.
+    """
+    from starlette.middleware import Middleware
+    from starlette.middleware.base import BaseHTTPMiddleware
+
+    from upayapi.config import settings
+    from upayapi.main import create_app
+    from upayapi.metrics import REQUEST_DURATION, UNMATCHED_ROUTE
+    from upayapi.middleware import RequestContextMiddleware
+
+    app = create_app()
+    if variant == "after_access_log":
+        return app
+    if variant == "after":
+        app.user_middleware = [
+            Middleware(RequestContextMiddleware, access_log=False, metrics=True)
+            if entry.cls is RequestContextMiddleware
+            else entry
+            for entry in app.user_middleware
+        ]
+        return app
+
+    async def add_request_id(request, call_next):
+        request_id = str(uuid.uuid4())
+        request.state.request_id = request_id
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+    class MetricsMiddleware:
+        def __init__(self, app: Any):
+            self.app = app
+
+        async def __call__(self, scope, receive, send) -> None:
+            if scope["type"] != "http":
+                await self.app(scope, receive, send)
+                return
+            started = time.perf_counter()
+            status_code = 500
+
+            async def send_wrapper(message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                REQUEST_DURATION.observe(
+                    time.perf_counter() - started,
+                    scope["method"],
+                    getattr(scope.get("route"), "path", UNMATCHED_ROUTE),
+                    str(status_code),
+                )
+
+    middleware = [
+        entry
+        for entry in app.user_middleware
+        if entry.cls is not RequestContextMiddleware
+    ]
+    # Outermost first: metrics, then the request ID middleware, then CORS
+    app.user_middleware = [
+        Middleware(MetricsMiddleware),
+        Middleware(BaseHTTPMiddleware, dispatch=add_request_id),
+        *middleware,
+    ]
+    assert settings.posting_key == POSTING_KEY
+    return app
+
+
+async def time_requests(
+    app: Any, method: str, path: str, body: Callable[[int], bytes], iterations: int
+) -> float:
+    """Time requests through an ASGI application.
+
+    Args:
+        app: ASGI application.
+        method: HTTP method.
+        path: Request path.
+        body: Function building the body of the nth request.
+        iterations: Number of requests per run.
+
+    Returns:
+        Mean microseconds per request, best of three runs.
+    """
+    statuses: List[int] = []
+    best = float("inf")
+    sequence = 0
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            sequence += 1
+            payload = body(sequence)
+
+            async def receive(payload: bytes = payload) -> Dict[str, Any]:
+                return {"type": "http.request", "body": payload, "more_body": False}
+
+            async def send(message: Dict[str, Any]) -> None:
+                if message["type"] == "http.response.start":
+                    statuses.append(message["status"])
+
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": "1.1",
+                "method": method,
+                "scheme": "http",
+                "path": path,
+                "raw_path": path.encode(),
+                "root_path": "",
+                "query_string": b"",
+                "headers": [
+                    (b"content-type", b"application/x-www-form-urlencoded"),
+                    (b"content-length", str(len(payload)).encode()),
+                ],
+                "server": ("127.0.0.1", 8000),
+                "client": ("127.0.0.1", 50000),
+            }
+            await app(scope, receive, send)
+        best = min(best, time.perf_counter() - started)
+
+    assert set(statuses) == {200}, set(statuses)
+    return best / iterations * 1e6
+
+
+def main() -> None:
+    """Run the benchmark for every middleware stack and print JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    # Settings are read at import time, so configure the environment first
+    os.environ["DATABASE_URL"] = "sqlite://"
+    os.environ["POSTING_KEY"] = POSTING_KEY
+    os.environ["IDEMPOTENCY_CACHE_SIZE"] = "0"
+
+    # create_app configures logging; access log records go nowhere
+    access_logger = logging.getLogger("upayapi.access")
+    access_logger.addHandler(logging.NullHandler())
+    access_logger.propagate = False
+
+    results: Dict[str, Dict[str, float]] = {}
+    for variant in ("before", "after", "after_access_log"):
+        app = build_app(variant)
+        results[variant] = {
+            "health_us": round(
+                asyncio.run(
+                    time_requests(app, "GET", "/health", lambda _: b"", args.iterations)
+                ),
+                1,
+            ),
+            "posting_us": round(
+                asyncio.run(
+                    time_requests(
+                        app, "POST", "/upay/posting", posting_body, args.iterations
+                    )
+                ),
+                1,
+            ),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
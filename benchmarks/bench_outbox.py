@@ -0,0 +1,157 @@
+"""Benchmark notifying a downstream system of new transactions.
+
+Against a local sink that takes ``--sink-delay-ms`` per request, reports:
+
+* ``posting_ms``: mean time to store one posting through
+  TransactionRepository.create_transaction_if_absent with no notification,
+  with an outbox event written in the same transaction, and with an inline
+  HTTP call to the sink before answering
+* ``dispatch_events_per_second``: events delivered per second by
+  OutboxDispatcher with increasing concurrency limits
+
+Requires httpx (the ``outbox`` extra).
+
+Usage:
+    python benchmarks/bench_outbox.py --postings 200 --sink-delay-ms 20
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from upayapi.config import settings
+from upayapi.database import Base
+from upayapi.outbox import OutboxDispatcher
+from upayapi.repositories.transaction import TransactionRepository
+
+
+def start_sink(delay: float) -> ThreadingHTTPServer:
+    """Start a local HTTP sink.
+
+    Args:
+        delay: Seconds each request takes.
+
+    Returns:
+        Running server.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            self.rfile.read(int(self.headers["Content-Length"]))
+            time.sleep(delay)
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    class Server(ThreadingHTTPServer):
+        request_queue_size = 128
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def posting(i: int, prefix: str) -> Dict[str, Any]:
+    """Get the column values of a test posting.
+
+    Args:
+        i: Number of the posting.
+        prefix: Prefix of its tpg_trans_id.
+
+    Returns:
+        Column values of the transaction.
+    """
+    return {
+        "tpg_trans_id": f"{prefix}-{i}",
+        "session_identifier": f"session-{i}",
+        "pmt_status": "success",
+        "pmt_amt": Decimal("25.00"),
+        "pmt_date": date(2025, 1, 1),
+        "name_on_acct": "John Doe",
+        "site_id": "default",
+    }
+
+
+def main() -> None:
+    """Run the benchmark and print JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--postings", type=int, default=200)
+    parser.add_argument("--sink-delay-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    server = start_sink(args.sink_delay_ms / 1000)
+    url = f"http://127.0.0.1:{server.server_address[1]}/events"
+    results: Dict[str, Any] = {"posting_ms": {}, "dispatch_events_per_second": {}}
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(
+            f"sqlite:///{Path(directory) / 'bench.db'}",
+            connect_args={"check_same_thread": False},
+        )
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+
+        with httpx.Client() as client:
+            for mode in ("none", "outbox", "inline_http"):
+                settings.outbox_url = url if mode == "outbox" else ""
+                started = time.perf_counter()
+                for i in range(args.postings):
+                    with session_factory() as db:
+                        TransactionRepository(db).create_transaction_if_absent(
+                            **posting(i, mode)
+                        )
+                    if mode == "inline_http":
+                        client.post(url, json={"tpg_trans_id": f"{mode}-{i}"})
+                elapsed = time.perf_counter() - started
+                results["posting_ms"][mode] = round(elapsed / args.postings * 1000, 3)
+
+        settings.outbox_url = url
+        for concurrency in (1, 10, 50):
+            with session_factory() as db:
+                TransactionRepository(db).create_transactions_if_absent(
+                    [
+                        posting(i, f"dispatch-{concurrency}")
+                        for i in range(args.postings)
+                    ]
+                )
+            dispatcher = OutboxDispatcher(
+                session_factory,
+                url,
+                batch_size=args.postings * 3,
+                concurrency=concurrency,
+            )
+
+            async def run() -> int:
+                async with httpx.AsyncClient(
+                    limits=httpx.Limits(max_connections=concurrency)
+                ) as client:
+                    return await dispatcher.dispatch(client)
+
+            started = time.perf_counter()
+            delivered = asyncio.run(run())
+            results["dispatch_events_per_second"][str(concurrency)] = round(
+                delivered / (time.perf_counter() - started)
+            )
+        engine.dispose()
+
+    server.shutdown()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Benchmark the throughput of rejected and accepted postings.
+
+Calls the application directly as an ASGI application, on a file SQLite
+database, and reports requests per second and pool checkouts per request
+for:
+
+* ``rejected_before``: postings with a wrong key on the former path, where
+  the key was checked by TransactionService after form validation and
+  session creation
+* ``rejected``: postings with a wrong key, rejected by verify_posting_key
+* ``accepted``: valid postings, each stored as a new transaction
+
+Usage:
+    python benchmarks/bench_posting_auth.py --iterations 2000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import uuid
+from typing import Annotated, Any, Callable, Dict, List
+
+from fastapi import Depends
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event
+
+POSTING_KEY = "bench_key"
+
+
+def posting_body(posting_key: str) -> Callable[[int], bytes]:
+    """Build a function creating posting bodies with unique tpg_trans_ids.
+
+    Args:
+        posting_key: Posting key sent in every body.
+
+    Returns:
+        Function building the body of the nth posting.
+    """
+    run = uuid.uuid4().hex
+
+    def body(sequence: int) -> bytes:
+        return (
+            f"posting_key={posting_key}&tpg_trans_id=bench-{run}-{sequence}"
+            f"&session_identifier=abc123&pmt_status=success&pmt_amt=125.50"
+            f"&pmt_date=01%2F15%2F2025&name_on_acct=Jane+Doe"
+        ).encode()
+
+    return body
+
+
+async def time_requests(
+    app: Any, path: str, body: Callable[[int], bytes], iterations: int, status: int
+) -> float:
+    """Time posting requests through an ASGI application.
+
+    Args:
+        app: ASGI application.
+        path: Request path.
+        body: Function building the body of the nth request.
+        iterations: Number of requests.
+        status: Expected response status.
+
+    Returns:
+        Requests per second.
+    """
+    statuses: List[int] = []
+    started = time.perf_counter()
+    for sequence in range(iterations):
+        payload = body(sequence)
+
+        async def receive(payload: bytes = payload) -> Dict[str, Any]:
+            return {"type": "http.request", "body": payload, "more_body": False}
+
+        async def send(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [
+                (b"content-type", b"application/x-www-form-urlencoded"),
+                (b"content-length", str(len(payload)).encode()),
+            ],
+            "server": ("127.0.0.1", 8000),
+            "client": ("127.0.0.1", 50000),
+        }
+        await app(scope, receive, send)
+    elapsed = time.perf_counter() - started
+
+    assert set(statuses) == {status}, set(statuses)
+    return iterations / elapsed
+
+
+def main() -> None:
+    """Run the benchmark and print JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    # Settings are read at import time, so configure the environment first
+    os.environ["DATABASE_URL"] = f"sqlite:///{directory}/bench.db"
+    os.environ["POSTING_KEY"] = POSTING_KEY
+    os.environ["ACCESS_LOG"] = "False"
+    os.environ["IDEMPOTENCY_CACHE_SIZE"] = "0"
+
+    import upayapi.models  # noqa: F401  (register models with Base.metadata)
+    from upayapi.admission import admit_posting
+    from upayapi.database import Base, get_engine
+    from upayapi.forms import get_transaction_request
+    from upayapi.main import create_app
+    from upayapi.models.schemas import TransactionRequest, TransactionResponse
+    from upayapi.services.dependencies import get_transaction_service
+    from upayapi.services.transaction import TransactionService
+
+    Base.metadata.create_all(bind=get_engine())
+    app = create_app()
+
+    @app.post("/bench/posting_before", dependencies=[Depends(admit_posting)])
+    async def posting_before(
+        transaction_request: Annotated[
+            TransactionRequest, Depends(get_transaction_request)
+        ],
+        transaction_service: Annotated[
+            TransactionService, Depends(get_transaction_service)
+        ],
+    ) -> TransactionResponse:
+        return await run_in_threadpool(
+            transaction_service.process_transaction, transaction_request
+        )
+
+    checkouts = 0
+
+    def count_checkout(*_: Any) -> None:
+        nonlocal checkouts
+        checkouts += 1
+
+    event.listen(get_engine(), "checkout", count_checkout)
+
+    results: Dict[str, Dict[str, float]] = {}
+    for name, path, key, status in (
+        ("rejected_before", "/bench/posting_before", "wrong_key", 401),
+        ("rejected", "/upay/posting", "wrong_key", 401),
+        ("accepted", "/upay/posting", POSTING_KEY, 200),
+    ):
+        checkouts = 0
+        throughput = asyncio.run(
+            time_requests(app, path, posting_body(key), args.iterations, status)
+        )
+        results[name] = {
+            "requests_per_second": round(throughput),
+            "checkouts_per_request": round(checkouts / args.iterations, 3),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
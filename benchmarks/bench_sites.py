@@ -0,0 +1,77 @@
+"""Benchmark matching posting keys to sites.
+
+Compares, for registries of increasing size, the microseconds needed to
+find the site of a posting key with:
+
+* ``linear_scan``: one hmac.compare_digest per configured site, the way a
+  list of per-site keys would be checked
+* ``registry``: SiteRegistry, one SHA-256 hash and one dictionary lookup
+
+Keys of the last site and unknown keys are timed, the worst case of a scan.
+
+Usage:
+    python benchmarks/bench_sites.py --iterations 100000
+"""
+
+import argparse
+import hmac
+import json
+import timeit
+from typing import Dict, List, Optional, Tuple
+
+from upayapi.sites import SiteRegistry, hash_posting_key
+
+
+def linear_scan(keys: List[Tuple[str, bytes]], posting_key: str) -> Optional[str]:
+    """Find the site of a posting key by comparing it with every site's key.
+
+    Args:
+        keys: Site ID and posting key pairs.
+        posting_key: Posting key sent with a posting.
+
+    Returns:
+        Site ID, or None if no site has this key.
+    """
+    encoded = posting_key.encode()
+    for site_id, key in keys:
+        if hmac.compare_digest(encoded, key):
+            return site_id
+    return None
+
+
+def main() -> None:
+    """Run the benchmark and print JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100000)
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, float]] = {}
+    for count in (1, 10, 50, 200):
+        keys = [(f"site-{i}", f"posting-key-{i:04d}-{'x' * 24}") for i in range(count)]
+        scan_keys = [(site_id, key.encode()) for site_id, key in keys]
+        registry = SiteRegistry()
+        registry.load((site_id, hash_posting_key(key)) for site_id, key in keys)
+
+        last_key = keys[-1][1]
+        unknown_key = "posting-key-none-" + "x" * 24
+        assert linear_scan(scan_keys, last_key) == registry.lookup(last_key)
+
+        def per_call(function, *call_args) -> float:
+            seconds = min(
+                timeit.repeat(
+                    lambda: function(*call_args), number=args.iterations, repeat=3
+                )
+            )
+            return round(seconds / args.iterations * 1e6, 3)
+
+        results[f"{count}_sites"] = {
+            "linear_scan_us": per_call(linear_scan, scan_keys, last_key),
+            "linear_scan_unknown_us": per_call(linear_scan, scan_keys, unknown_key),
+            "registry_us": per_call(registry.lookup, last_key),
+            "registry_unknown_us": per_call(registry.lookup, unknown_key),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Benchmark concurrent postings on SQLite with and without the tuned profile.
+
+Runs postings and transaction page reads from a pool of threads against a
+temporary SQLite file and reports throughput and the number of failed
+operations (typically "database is locked") for:
+
+* ``default``: the former configuration, a plain engine with the
+  rollback journal and the driver's deferred transactions
+* ``tuned``: WAL and tuning pragmas, a single-writer lane and a reader pool
+
+Usage:
+    python benchmarks/bench_sqlite.py --concurrency 100 --requests 2000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from decimal import Decimal
+from typing import Dict
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+
+def run_mode(
+    mode: str, directory: str, concurrency: int, requests: int, read_ratio: float
+) -> Dict[str, float]:
+    """Run concurrent postings and reads with one configuration.
+
+    Args:
+        mode: ``default`` or ``tuned``.
+        directory: Directory for the SQLite database file.
+        concurrency: Number of operations run at once.
+        requests: Number of postings.
+        read_ratio: Number of page reads per posting.
+
+    Returns:
+        Dictionary with throughput and error statistics.
+    """
+    from upayapi.database import Base, create_database_engines
+    from upayapi.repositories.transaction import TransactionRepository
+
+    url = f"sqlite:///{os.path.join(directory, f'{mode}.db')}"
+    if mode == "tuned":
+        write_engine, read_engine = create_database_engines(url)
+    else:
+        write_engine = read_engine = create_engine(
+            url, connect_args={"check_same_thread": False}
+        )
+    Base.metadata.create_all(bind=write_engine)
+    write_sessions = sessionmaker(autocommit=False, autoflush=False, bind=write_engine)
+    read_sessions = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+    def post() -> None:
+        with write_sessions() as db:
+            TransactionRepository(db).create_transaction_if_absent(
+                tpg_trans_id=uuid.uuid4().hex,
+                session_identifier="bench",
+                pmt_status="success",
+                pmt_amt=Decimal("10.00"),
+                pmt_date=date(2025, 1, 1),
+                name_on_acct="Bench Mark",
+            )
+
+    def read() -> None:
+        with read_sessions() as db:
+            TransactionRepository(db).get_transactions(limit=50)
+
+    operations = [post] * requests + [read] * int(requests * read_ratio)
+    operations.sort(key=lambda _: uuid.uuid4().int)
+    errors: Dict[str, int] = {}
+
+    def run(operation) -> None:
+        try:
+            operation()
+        except Exception as e:
+            message = str(e).splitlines()[0][:80]
+            errors[message] = errors.get(message, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(run, operations))
+    elapsed = time.perf_counter() - started
+
+    with read_sessions() as db:
+        stored = TransactionRepository(db).count()
+    write_engine.dispose()
+    read_engine.dispose()
+
+    return {
+        "postings": requests,
+        "stored": stored,
+        "failed": sum(errors.values()),
+        "errors": errors,
+        "operations_per_sec": round(len(operations) / elapsed, 1),
+    }
+
+
+def main() -> None:
+    """Run the benchmark for both configurations and print JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--read-ratio", type=float, default=0.25)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = {
+            mode: run_mode(
+                mode, directory, args.concurrency, args.requests, args.read_ratio
+            )
+            for mode in ("default", "tuned")
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
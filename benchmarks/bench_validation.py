@@ -0,0 +1,117 @@
+"""Benchmark the CPU cost of validating a uPay posting.
+
+Measures, in microseconds per posting:
+
+* ``string_fields``: the former TransactionRequest, whose validators parse
+  the amount and date and discard them, followed by the second parse the
+  service did to get typed values
+* ``typed_fields``: TransactionRequest producing Decimal and date values
+* the date parsing step alone: ``datetime.strptime`` versus
+  parse_payment_date, with and without its memo cache
+
+Usage:
+    python benchmarks/bench_validation.py --iterations 200000
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict
+
+from pydantic import BaseModel, field_validator
+
+from upayapi.models.schemas import PaymentStatus
+
+FIELDS = {
+    "posting_key": "bench_key",
+    "tpg_trans_id": "123456789",
+    "session_identifier": "abc123def456",
+    "pmt_status": "success",
+    "pmt_amt": "125.50",
+    "pmt_date": "01/15/2025",
+    "name_on_acct": "Jane Q Doe",
+}
+
+
+class StringTransactionRequest(BaseModel):
+    """The former TransactionRequest, with string amount and date fields."""
+
+    posting_key: str
+    tpg_trans_id: str
+    session_identifier: str
+    pmt_status: PaymentStatus
+    pmt_amt: str
+    pmt_date: str
+    name_on_acct: str
+
+    @field_validator("pmt_amt", mode="before")
+    def validate_payment_amount(cls, v: str) -> str:
+        amount = Decimal(v)
+        if amount <= 0 or amount > Decimal("99999.99"):
+            raise ValueError("Invalid payment amount")
+        return v
+
+    @field_validator("pmt_date", mode="before")
+    def validate_payment_date(cls, v: str) -> str:
+        datetime.strptime(v, "%m/%d/%Y").date()
+        return v
+
+
+def per_call_us(function: Callable[[], Any], iterations: int) -> float:
+    """Time a function.
+
+    Args:
+        function: Function to call.
+        iterations: Number of calls.
+
+    Returns:
+        Mean microseconds per call, best of three runs.
+    """
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        best = min(best, time.perf_counter() - started)
+    return best / iterations * 1e6
+
+
+def main() -> None:
+    """Run the benchmark and print JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200000)
+    args = parser.parse_args()
+
+    from upayapi.models.schemas import TransactionRequest, parse_payment_date
+
+    def string_fields() -> None:
+        request = StringTransactionRequest.model_validate(FIELDS)
+        Decimal(request.pmt_amt)
+        datetime.strptime(request.pmt_date, "%m/%d/%Y").date()
+
+    def uncached_parse() -> None:
+        parse_payment_date.__wrapped__(FIELDS["pmt_date"])
+
+    results: Dict[str, float] = {
+        "string_fields_us": per_call_us(string_fields, args.iterations),
+        "typed_fields_us": per_call_us(
+            lambda: TransactionRequest.model_validate(FIELDS), args.iterations
+        ),
+        "strptime_us": per_call_us(
+            lambda: datetime.strptime(FIELDS["pmt_date"], "%m/%d/%Y").date(),
+            args.iterations,
+        ),
+        "parse_payment_date_uncached_us": per_call_us(uncached_parse, args.iterations),
+        "parse_payment_date_cached_us": per_call_us(
+            lambda: parse_payment_date(FIELDS["pmt_date"]), args.iterations
+        ),
+    }
+    print(
+        json.dumps({name: round(value, 3) for name, value in results.items()}, indent=2)
+    )
+
+
+if __name__ == "__main__":
+    main()
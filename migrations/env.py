@@ -7,6 +7,7 @@ from sqlalchemy import pool
 
 from alembic import context
 
+import upayapi.models  # noqa: F401  (registers the models on Base.metadata)
 from upayapi.config import settings
 from upayapi.database import Base
 
@@ -14,13 +15,18 @@ from upayapi.database import Base
 # access to the values within the .ini file in use.
 config = context.config
 
-# Interpret the config file for Python logging.
-# This line sets up loggers basically.
-if config.config_file_name is not None:
+# Interpret the config file for Python logging, unless the caller (such as
+# upay-serve) has configured logging itself.
+if config.config_file_name is not None and config.attributes.get(
+    "configure_logger", True
+):
     fileConfig(config.config_file_name)
 
-# Set the database URL in the Alembic config
-config.set_main_option("sqlalchemy.url", settings.database_url)
+# Set the database URL in the Alembic config, preferring one passed by the
+# caller
+config.set_main_option(
+    "sqlalchemy.url", config.attributes.get("database_url", settings.database_url)
+)
 
 # add your model's MetaData object here
 # for 'autogenerate' support
@@ -32,6 +38,20 @@ target_metadata = Base.metadata
 # ... etc.
 
 
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    """Skip indexes that only exist on another database dialect.
+
+    Indexes created for a single dialect carry its name in
+    ``info["dialect"]``, so autogenerate doesn't report them as missing
+    everywhere else.
+
+    Returns:
+        False for indexes of another dialect, True otherwise.
+    """
+    dialect = object.info.get("dialect") if type_ == "index" else None
+    return dialect is None or dialect == context.get_context().dialect.name
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -48,6 +68,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -70,7 +91,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
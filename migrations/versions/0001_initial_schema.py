@@ -0,0 +1,73 @@
+"""Initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Shared by both tables, so it is created once explicitly on PostgreSQL
+payment_status = postgresql.ENUM(
+    "SUCCESS", "CANCELLED", name="paymentstatus", create_type=False
+)
+
+
+def upgrade() -> None:
+    payment_status.create(op.get_bind(), checkfirst=True)
+
+    op.create_table(
+        "transactions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("tpg_trans_id", sa.String(), nullable=False),
+        sa.Column("session_identifier", sa.String(), nullable=False),
+        sa.Column("pmt_status", payment_status, nullable=False),
+        sa.Column("pmt_amt", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("pmt_date", sa.Date(), nullable=False),
+        sa.Column("name_on_acct", sa.String(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_transactions_id", "transactions", ["id"])
+    op.create_index(
+        "ix_transactions_tpg_trans_id", "transactions", ["tpg_trans_id"], unique=True
+    )
+    op.create_index(
+        "ix_transactions_session_identifier", "transactions", ["session_identifier"]
+    )
+
+    op.create_table(
+        "transaction_daily_rollup",
+        sa.Column("pmt_date", sa.Date(), nullable=False),
+        sa.Column("pmt_status", payment_status, nullable=False),
+        sa.Column("txn_count", sa.Integer(), nullable=False),
+        sa.Column("total_amt", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column("min_amt", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("max_amt", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=True
+        ),
+        sa.PrimaryKeyConstraint("pmt_date", "pmt_status"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("transaction_daily_rollup")
+    op.drop_index("ix_transactions_session_identifier", table_name="transactions")
+    op.drop_index("ix_transactions_tpg_trans_id", table_name="transactions")
+    op.drop_index("ix_transactions_id", table_name="transactions")
+    op.drop_table("transactions")
+    payment_status.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,62 @@
+"""Add indexes for transaction listing, export and reconciliation
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Name and columns of the indexes created on every database
+INDEXES = [
+    ("ix_transactions_pmt_date_id", ["pmt_date", "id"]),
+    ("ix_transactions_pmt_status_pmt_date_id", ["pmt_status", "pmt_date", "id"]),
+    ("ix_transactions_created_at_id", ["created_at", "id"]),
+]
+
+# Partial covering index for successful payments, PostgreSQL only
+SUCCESS_INDEX = "ix_transactions_success_pmt_date"
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        for name, columns in INDEXES:
+            op.create_index(name, "transactions", columns)
+        return
+
+    # Build the indexes without blocking postings to a live table
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(
+                name,
+                "transactions",
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        op.create_index(
+            SUCCESS_INDEX,
+            "transactions",
+            ["pmt_date", "id"],
+            postgresql_include=["pmt_amt"],
+            postgresql_where=sa.text("pmt_status = 'SUCCESS'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index(SUCCESS_INDEX, table_name="transactions")
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name="transactions")
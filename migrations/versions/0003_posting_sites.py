@@ -0,0 +1,61 @@
+"""Add posting sites and the site of each transaction
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SITE_INDEX = "ix_transactions_site_id_pmt_date"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sites",
+        sa.Column("site_id", sa.String(length=64), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("posting_key_sha256", sa.String(length=64), nullable=False),
+        sa.Column("active", sa.Boolean(), server_default=sa.true(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True
+        ),
+        sa.PrimaryKeyConstraint("site_id"),
+        sa.UniqueConstraint("posting_key_sha256"),
+    )
+
+    # A nullable column without a default is added without rewriting the table
+    op.add_column(
+        "transactions", sa.Column("site_id", sa.String(length=64), nullable=True)
+    )
+
+    if op.get_bind().dialect.name != "postgresql":
+        op.create_index(SITE_INDEX, "transactions", ["site_id", "pmt_date"])
+        return
+
+    # Build the index without blocking postings to a live table
+    with op.get_context().autocommit_block():
+        op.create_index(
+            SITE_INDEX,
+            "transactions",
+            ["site_id", "pmt_date"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index(SITE_INDEX, table_name="transactions")
+    with op.batch_alter_table("transactions") as batch_op:
+        batch_op.drop_column("site_id")
+    op.drop_table("sites")
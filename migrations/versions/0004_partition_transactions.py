@@ -0,0 +1,147 @@
+"""Partition transactions by month of pmt_date on PostgreSQL
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 10:30:00.000000
+
+The table is rebuilt as a table partitioned by range of pmt_date, with one
+partition per month from the oldest transaction to three months ahead and a
+default partition for other dates. Rows are copied, so run it in a
+maintenance window on a large table. Primary and unique keys of a
+partitioned table must contain the partition key, so they become
+(id, pmt_date) and (tpg_trans_id, pmt_date). Other databases keep the
+unpartitioned table.
+
+"""
+
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partitions created after the current month
+MONTHS_AHEAD = 3
+
+COLUMNS = (
+    "id, tpg_trans_id, session_identifier, pmt_status, pmt_amt, pmt_date, "
+    "name_on_acct, created_at, site_id"
+)
+
+COLUMN_DEFINITIONS = """
+    id integer NOT NULL DEFAULT nextval('transactions_id_seq'::regclass),
+    tpg_trans_id varchar NOT NULL,
+    session_identifier varchar NOT NULL,
+    pmt_status paymentstatus NOT NULL,
+    pmt_amt numeric(10, 2) NOT NULL,
+    pmt_date date NOT NULL,
+    name_on_acct varchar NOT NULL,
+    created_at timestamp without time zone DEFAULT now(),
+    site_id varchar(64)
+"""
+
+# Indexes on both the unpartitioned and the partitioned table
+INDEXES = [
+    ("ix_transactions_session_identifier", "session_identifier"),
+    ("ix_transactions_pmt_date_id", "pmt_date, id"),
+    ("ix_transactions_pmt_status_pmt_date_id", "pmt_status, pmt_date, id"),
+    ("ix_transactions_created_at_id", "created_at, id"),
+    ("ix_transactions_site_id_pmt_date", "site_id, pmt_date"),
+]
+SUCCESS_INDEX = "ix_transactions_success_pmt_date"
+
+# Indexes of the unpartitioned table only
+PLAIN_INDEXES = ["ix_transactions_id", "ix_transactions_tpg_trans_id"]
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def create_indexes() -> None:
+    for name, columns in INDEXES:
+        op.execute(f"CREATE INDEX {name} ON transactions ({columns})")
+    op.execute(
+        f"CREATE INDEX {SUCCESS_INDEX} ON transactions (pmt_date, id) "
+        f"INCLUDE (pmt_amt) WHERE pmt_status = 'SUCCESS'"
+    )
+
+
+def drop_indexes(names: Sequence[str]) -> None:
+    for name in names:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("ALTER TABLE transactions RENAME TO transactions_unpartitioned")
+    op.execute(
+        "ALTER TABLE transactions_unpartitioned "
+        "RENAME CONSTRAINT transactions_pkey TO transactions_unpartitioned_pkey"
+    )
+    drop_indexes([name for name, _ in INDEXES] + [SUCCESS_INDEX] + PLAIN_INDEXES)
+
+    op.execute(
+        f"CREATE TABLE transactions ({COLUMN_DEFINITIONS},"
+        f" PRIMARY KEY (id, pmt_date),"
+        f" CONSTRAINT uq_transactions_tpg_trans_id_pmt_date UNIQUE (tpg_trans_id, pmt_date)"
+        f") PARTITION BY RANGE (pmt_date)"
+    )
+    # Keep the sequence when the old table is dropped
+    op.execute("ALTER SEQUENCE transactions_id_seq OWNED BY transactions.id")
+
+    current = date.today().replace(day=1)
+    oldest = bind.execute(
+        sa.text("SELECT min(pmt_date) FROM transactions_unpartitioned")
+    ).scalar()
+    month = oldest.replace(day=1) if oldest is not None else current
+    while month <= add_months(current, MONTHS_AHEAD):
+        op.execute(
+            f"CREATE TABLE transactions_y{month.year:04d}m{month.month:02d} "
+            f"PARTITION OF transactions "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        )
+        month = add_months(month, 1)
+    op.execute("CREATE TABLE transactions_default PARTITION OF transactions DEFAULT")
+
+    op.execute(
+        f"INSERT INTO transactions ({COLUMNS}) SELECT {COLUMNS} FROM transactions_unpartitioned"
+    )
+    op.execute("DROP TABLE transactions_unpartitioned")
+    create_indexes()
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    # Archived months are not restored
+    op.execute("ALTER TABLE transactions RENAME TO transactions_partitioned")
+    op.execute(
+        "ALTER TABLE transactions_partitioned "
+        "RENAME CONSTRAINT transactions_pkey TO transactions_partitioned_pkey"
+    )
+    drop_indexes([name for name, _ in INDEXES] + [SUCCESS_INDEX])
+
+    op.execute(f"CREATE TABLE transactions ({COLUMN_DEFINITIONS}, PRIMARY KEY (id))")
+    op.execute("ALTER SEQUENCE transactions_id_seq OWNED BY transactions.id")
+    op.execute(
+        f"INSERT INTO transactions ({COLUMNS}) SELECT {COLUMNS} FROM transactions_partitioned"
+    )
+    op.execute("DROP TABLE transactions_partitioned")
+
+    op.execute("CREATE INDEX ix_transactions_id ON transactions (id)")
+    op.execute(
+        "CREATE UNIQUE INDEX ix_transactions_tpg_trans_id ON transactions (tpg_trans_id)"
+    )
+    create_indexes()
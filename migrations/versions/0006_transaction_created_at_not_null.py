@@ -0,0 +1,45 @@
+"""Make the creation time of transactions required
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # created_at is a keyset pagination sort key, so it must never be NULL
+    op.execute(
+        sa.text(
+            "UPDATE transactions SET created_at = CURRENT_TIMESTAMP "
+            "WHERE created_at IS NULL"
+        )
+    )
+    with op.batch_alter_table("transactions") as batch_op:
+        batch_op.alter_column(
+            "created_at",
+            existing_type=sa.DateTime(),
+            existing_server_default=sa.func.now(),
+            nullable=False,
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("transactions") as batch_op:
+        batch_op.alter_column(
+            "created_at",
+            existing_type=sa.DateTime(),
+            existing_server_default=sa.func.now(),
+            nullable=True,
+        )
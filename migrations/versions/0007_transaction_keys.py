@@ -0,0 +1,70 @@
+"""Keep tpg_trans_id unique across transaction partitions
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 13:00:00.000000
+
+Unique keys of the partitioned transactions table must contain pmt_date,
+so the same tpg_trans_id could be stored once per month. Postings now claim
+their tpg_trans_id in the unpartitioned transaction_keys table first, which
+also allocates the transaction ID. Keys are filled from the stored
+transactions; if a tpg_trans_id was already stored twice, its first
+transaction keeps the key. Elsewhere the unique index on tpg_trans_id is
+replaced by the (tpg_trans_id, pmt_date) constraint the model declares.
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UNIQUE_CONSTRAINT = "uq_transactions_tpg_trans_id_pmt_date"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "transaction_keys",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("tpg_trans_id", sa.String(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("tpg_trans_id"),
+    )
+    op.execute(
+        "INSERT INTO transaction_keys (id, tpg_trans_id, created_at) "
+        "SELECT min(id), tpg_trans_id, coalesce(min(created_at), CURRENT_TIMESTAMP) "
+        "FROM transactions GROUP BY tpg_trans_id"
+    )
+
+    if op.get_bind().dialect.name == "postgresql":
+        # Continue after every ID ever allocated, including archived ones
+        op.execute(
+            "SELECT setval(pg_get_serial_sequence('transaction_keys', 'id'), "
+            "nextval('transactions_id_seq'), false)"
+        )
+        return
+
+    with op.batch_alter_table("transactions") as batch_op:
+        batch_op.drop_index("ix_transactions_tpg_trans_id")
+        batch_op.create_unique_constraint(
+            UNIQUE_CONSTRAINT, ["tpg_trans_id", "pmt_date"]
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        with op.batch_alter_table("transactions") as batch_op:
+            batch_op.drop_constraint(UNIQUE_CONSTRAINT, type_="unique")
+            batch_op.create_index(
+                "ix_transactions_tpg_trans_id", ["tpg_trans_id"], unique=True
+            )
+    op.drop_table("transaction_keys")
@@ -0,0 +1,190 @@
+"""Tests for the admission controller."""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from upayapi import admission
+from upayapi.admission import (
+    POSTING,
+    REPORTING,
+    AdmissionController,
+    create_admission_controller,
+)
+from upayapi.config import settings
+from upayapi.database import create_database_engines, dispose_engines
+from upayapi.exceptions import ServiceUnavailableError
+from upayapi.main import create_app
+from upayapi.metrics import ADMISSION_REJECTED
+
+
+def test_queue_and_limit():
+    """Test that excess requests queue and are shed when the queue is full."""
+
+    async def scenario():
+        controller = AdmissionController(
+            limit=1, queue_size=1, timeout=1.0, retry_after=7
+        )
+        await controller.acquire(POSTING)
+        waiting = asyncio.create_task(controller.acquire(POSTING))
+        await asyncio.sleep(0)
+        assert controller.stats()[("posting", "queued")] == 1
+
+        with pytest.raises(ServiceUnavailableError) as error:
+            await controller.acquire(POSTING)
+        assert error.value.status_code == 503
+        assert error.value.headers == {"Retry-After": "7"}
+
+        controller.release(POSTING)
+        await waiting
+        assert controller.active == [1, 0]
+        controller.release(POSTING)
+        assert controller.stats()[("posting", "active")] == 0
+
+    before = ADMISSION_REJECTED.value("posting", "queue_full")
+    asyncio.run(scenario())
+    assert ADMISSION_REJECTED.value("posting", "queue_full") - before == 1
+
+
+def test_timeout():
+    """Test that a request waiting longer than the timeout is shed."""
+
+    async def scenario():
+        controller = AdmissionController(limit=1, queue_size=10, timeout=0.05)
+        await controller.acquire(POSTING)
+        with pytest.raises(ServiceUnavailableError):
+            await controller.acquire(POSTING)
+        assert controller.stats()[("posting", "queued")] == 0
+
+        # The slot is handed to the next request once released
+        controller.release(POSTING)
+        await controller.acquire(POSTING)
+        assert controller.active == [1, 0]
+
+    asyncio.run(scenario())
+
+
+def test_postings_before_reporting():
+    """Test that queued postings are admitted before earlier reporting requests."""
+
+    async def scenario():
+        controller = AdmissionController(limit=1, queue_size=10, timeout=1.0)
+        order = []
+
+        async def request(priority, name):
+            async with controller.admit(priority):
+                order.append(name)
+                await asyncio.sleep(0)
+
+        async with controller.admit(POSTING):
+            tasks = [
+                asyncio.create_task(request(REPORTING, "report")),
+                asyncio.create_task(request(POSTING, "posting")),
+            ]
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(scenario()) == ["posting", "report"]
+
+
+def test_posting_displaces_reporting():
+    """Test that a posting takes the place of a reporting request in a full queue."""
+
+    async def scenario():
+        controller = AdmissionController(limit=1, queue_size=1, timeout=1.0)
+        await controller.acquire(POSTING)
+        report = asyncio.create_task(controller.acquire(REPORTING))
+        await asyncio.sleep(0)
+        posting = asyncio.create_task(controller.acquire(POSTING))
+        await asyncio.sleep(0)
+
+        with pytest.raises(ServiceUnavailableError):
+            await report
+        controller.release(POSTING)
+        await posting
+        assert controller.active == [1, 0]
+
+    asyncio.run(scenario())
+
+
+def test_reporting_limit():
+    """Test that reporting requests leave slots free for postings."""
+
+    async def scenario():
+        controller = AdmissionController(limit=2, queue_size=10, timeout=0.05)
+        assert controller.priority_limits == (2, 1)
+        await controller.acquire(REPORTING)
+        with pytest.raises(ServiceUnavailableError):
+            await controller.acquire(REPORTING)
+        await controller.acquire(POSTING)
+        assert controller.active == [1, 1]
+
+    asyncio.run(scenario())
+
+
+def test_reporting_not_blocked_by_queued_postings():
+    """Test that reporting requests use their free slots while postings queue."""
+
+    async def scenario():
+        controller = AdmissionController(
+            limit=3, queue_size=10, timeout=1.0, reporting_limit=2, posting_limit=1
+        )
+        await controller.acquire(POSTING)
+        posting = asyncio.create_task(controller.acquire(POSTING))
+        await asyncio.sleep(0)
+
+        await asyncio.wait_for(controller.acquire(REPORTING), 0.1)
+        await controller.acquire(REPORTING)
+        report = asyncio.create_task(controller.acquire(REPORTING))
+        await asyncio.sleep(0)
+        assert controller.stats()[("reporting", "queued")] == 1
+
+        # A released reporting slot goes to the queued reporting request
+        controller.release(REPORTING)
+        await asyncio.wait_for(report, 0.1)
+        assert not posting.done()
+
+        controller.release(POSTING)
+        await posting
+        assert controller.active == [1, 2]
+
+    asyncio.run(scenario())
+
+
+def test_controller_sized_to_engines(tmp_path, monkeypatch):
+    """Test that postings are limited to the write pool of the engines."""
+    monkeypatch.setattr(settings, "admission_max_concurrency", None)
+    monkeypatch.setattr(settings, "admission_reporting_max_concurrency", None)
+    monkeypatch.setattr(settings, "sqlite_single_writer", True)
+    write_engine, read_engine = create_database_engines(
+        f"sqlite:///{tmp_path / 'upay.db'}"
+    )
+    try:
+        # One write connection and a pool of 5 + 10 read connections
+        controller = create_admission_controller(write_engine, read_engine)
+        assert controller.limit == 16
+        assert controller.priority_limits == (1, 15)
+
+        # A shared pool is split between postings and reporting
+        controller = create_admission_controller(read_engine, read_engine)
+        assert controller.limit == 15
+        assert controller.priority_limits == (15, 7)
+    finally:
+        write_engine.dispose()
+        read_engine.dispose()
+
+
+def test_lifespan_creates_controller(tmp_path, monkeypatch):
+    """Test that the application lifespan creates and removes the controller."""
+    monkeypatch.setattr(settings, "database_url", f"sqlite:///{tmp_path / 'upay.db'}")
+    monkeypatch.setattr(settings, "sqlite_single_writer", True)
+    monkeypatch.setattr(settings, "admission_max_concurrency", None)
+    dispose_engines()
+
+    with TestClient(create_app()):
+        assert admission.admission_controller is not None
+        assert admission.admission_controller.priority_limits[POSTING] == 1
+
+    assert admission.admission_controller is None
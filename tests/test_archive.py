@@ -0,0 +1,444 @@
+"""Tests for transaction partitions and the Parquet archive."""
+
+import json
+import os
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from upayapi.database import Base
+from upayapi.models.schemas import PaymentStatus
+from upayapi.models.transaction import Transaction
+from upayapi.partitions import add_months, month_start, partition_name
+from upayapi.repositories.rollup import RollupRepository
+from upayapi.repositories.transaction import EXPORT_COLUMNS, TransactionRepository
+
+pytest.importorskip("pyarrow")
+
+from upayapi import archive as archive_module  # noqa: E402
+from upayapi.archive import (  # noqa: E402
+    ArchiveReader,
+    archive_month,
+    archive_path,
+    interrupted_archives,
+    months_to_archive,
+    temporary_path,
+)
+from upayapi.cli.archive import main  # noqa: E402
+
+# Payment dates of the seeded transactions, in ID order
+SEED_DATES = [
+    date(2025, 1, 20),
+    date(2025, 1, 5),
+    date(2025, 2, 10),
+    date(2025, 3, 1),
+    date(2025, 1, 5),
+    date(2025, 2, 28),
+]
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    """Create a SQLite database with transactions over three months.
+
+    Every other transaction is cancelled.
+
+    Yields:
+        Database URL.
+    """
+    url = f"sqlite:///{tmp_path / 'archive.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        TransactionRepository(db).import_transactions(
+            [
+                {
+                    "tpg_trans_id": f"t{i}",
+                    "session_identifier": "session123",
+                    "pmt_status": "success" if i % 2 == 0 else "cancelled",
+                    "pmt_amt": Decimal("10.00") + i,
+                    "pmt_date": pmt_date,
+                    "name_on_acct": "John Doe",
+                    "site_id": "default",
+                }
+                for i, pmt_date in enumerate(SEED_DATES)
+            ]
+        )
+    engine.dispose()
+    yield url
+
+
+@pytest.fixture
+def session_factory(database_url):
+    """Create a session factory for the seeded database.
+
+    Yields:
+        Session factory.
+    """
+    engine = create_engine(database_url)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+def exported_ids(repository, **filters):
+    """Get the tpg_trans_ids of an export, in order.
+
+    Args:
+        repository: Transaction repository.
+        **filters: Filters passed to stream_transactions.
+
+    Returns:
+        tpg_trans_ids of the streamed rows.
+    """
+    index = [column.key for column in EXPORT_COLUMNS].index("tpg_trans_id")
+    batches = repository.stream_transactions(batch_size=2, **filters)
+    return [row[index] for batch in batches for row in batch]
+
+
+def test_months():
+    """Test the month arithmetic and partition names."""
+    assert month_start(date(2025, 3, 31)) == date(2025, 3, 1)
+    assert add_months(date(2025, 11, 1), 2) == date(2026, 1, 1)
+    assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert partition_name(date(2025, 1, 1)) == "transactions_y2025m01"
+
+
+def test_archive_month(session_factory, tmp_path):
+    """Test that archiving moves a month from the database to Parquet."""
+    archive_dir = tmp_path / "archive"
+    with session_factory() as db:
+        months = months_to_archive(db, today=date(2025, 3, 15), retention_months=1)
+        assert months == [date(2025, 1, 1)]
+
+        assert archive_month(db, date(2025, 1, 1), archive_dir) == 3
+        stored = db.execute(select(func.count()).select_from(Transaction)).scalar()
+        assert stored == 3
+        assert months_to_archive(db, today=date(2025, 3, 15), retention_months=1) == []
+
+        # Nothing new to archive leaves the file as it is
+        assert archive_month(db, date(2025, 1, 1), archive_dir) == 0
+
+    assert archive_path(archive_dir, date(2025, 1, 1)).exists()
+    assert not list(archive_dir.glob("*.tmp"))
+
+    reader = ArchiveReader(archive_dir)
+    assert reader.months() == [date(2025, 1, 1)]
+    assert reader.months(start_date=date(2025, 2, 1)) == []
+    rows = [
+        row
+        for batch in reader.read(["tpg_trans_id", "pmt_status", "pmt_amt"])
+        for row in batch
+    ]
+    assert rows == [
+        ("t1", PaymentStatus.CANCELLED, Decimal("11.00")),
+        ("t4", PaymentStatus.SUCCESS, Decimal("14.00")),
+        ("t0", PaymentStatus.SUCCESS, Decimal("10.00")),
+    ]
+
+
+def test_archive_keeps_rows_posted_meanwhile(session_factory, tmp_path, monkeypatch):
+    """Test that postings committed while a month is archived are kept."""
+    write_archive = archive_module.write_archive
+
+    def write_then_post(batches, path, existing=None):
+        rows = write_archive(batches, path, existing)
+        with session_factory() as other:
+            TransactionRepository(other).create_transaction_if_absent(
+                tpg_trans_id="t6",
+                session_identifier="session123",
+                pmt_status="success",
+                pmt_amt=Decimal("16.00"),
+                pmt_date=date(2025, 1, 10),
+                name_on_acct="John Doe",
+            )
+        return rows
+
+    monkeypatch.setattr(archive_module, "write_archive", write_then_post)
+    with session_factory() as db:
+        assert archive_month(db, date(2025, 1, 1), tmp_path) == 3
+        remaining = db.execute(
+            select(Transaction.tpg_trans_id).where(
+                Transaction.pmt_date < date(2025, 2, 1)
+            )
+        ).scalars()
+        assert list(remaining) == ["t6"]
+
+        monkeypatch.setattr(archive_module, "write_archive", write_archive)
+        assert archive_month(db, date(2025, 1, 1), tmp_path) == 1
+        assert exported_ids(
+            TransactionRepository(db, archive=ArchiveReader(tmp_path)),
+            end_date=date(2025, 1, 31),
+        ) == ["t1", "t4", "t6", "t0"]
+
+
+def test_archive_empty_month(session_factory, tmp_path):
+    """Test that a month without transactions leaves no file."""
+    with session_factory() as db:
+        assert archive_month(db, date(2024, 12, 1), tmp_path) == 0
+    assert not list(tmp_path.glob("transactions-*"))
+
+
+def test_stream_merges_archive(session_factory, tmp_path):
+    """Test that exports merge archived and stored months in order."""
+    with session_factory() as db:
+        expected = exported_ids(TransactionRepository(db))
+        assert expected == ["t1", "t4", "t0", "t2", "t5", "t3"]
+
+        archive_month(db, date(2025, 1, 1), tmp_path)
+        archive_month(db, date(2025, 2, 1), tmp_path)
+        repository = TransactionRepository(db, archive=ArchiveReader(tmp_path))
+
+        assert exported_ids(repository) == expected
+        assert exported_ids(repository, pmt_status="success") == ["t4", "t0", "t2"]
+        assert exported_ids(
+            repository, start_date=date(2025, 1, 6), end_date=date(2025, 2, 28)
+        ) == ["t0", "t2", "t5"]
+        assert exported_ids(repository, start_date=date(2025, 3, 1)) == ["t3"]
+
+        # Without the reader, only the stored month is exported
+        assert exported_ids(TransactionRepository(db)) == ["t3"]
+
+
+def test_archived_retry_is_duplicate(session_factory, tmp_path):
+    """Test that a retry of an archived transaction is not stored again."""
+    with session_factory() as db:
+        archive_month(db, date(2025, 1, 1), tmp_path)
+        repository = TransactionRepository(db)
+        retry = repository.create_transaction_if_absent(
+            tpg_trans_id="t1",
+            session_identifier="session123",
+            pmt_status="cancelled",
+            pmt_amt=Decimal("11.00"),
+            pmt_date=date(2025, 1, 5),
+            name_on_acct="John Doe",
+        )
+        assert not retry.created
+        assert retry.id == 2
+
+        new = repository.create_transaction_if_absent(
+            tpg_trans_id="t6",
+            session_identifier="session123",
+            pmt_status="success",
+            pmt_amt=Decimal("16.00"),
+            pmt_date=date(2025, 3, 2),
+            name_on_acct="John Doe",
+        )
+        assert new.created
+        assert new.id == len(SEED_DATES) + 1
+        assert db.execute(select(func.count()).select_from(Transaction)).scalar() == 4
+
+
+def test_rollup_rebuild_reads_archive(session_factory, tmp_path):
+    """Test that a full rollup rebuild keeps the totals of archived months."""
+
+    def daily(repository):
+        return [
+            (row.pmt_date, row.pmt_status, row.txn_count, row.total_amt)
+            for row in repository.get_daily()
+        ]
+
+    with session_factory() as db:
+        repository = RollupRepository(db, archive=ArchiveReader(tmp_path))
+        expected = daily(repository)
+        archive_month(db, date(2025, 1, 1), tmp_path)
+        archive_month(db, date(2025, 2, 1), tmp_path)
+
+        assert repository.rebuild() == len(expected)
+        assert daily(repository) == expected
+        assert repository.rebuild(start_date=date(2025, 1, 10)) == len(expected) - 2
+        assert daily(repository) == expected
+
+        # A posting dated in an archived month adds to the archived totals
+        TransactionRepository(db).create_transaction_if_absent(
+            tpg_trans_id="t6",
+            session_identifier="session123",
+            pmt_status="cancelled",
+            pmt_amt=Decimal("16.00"),
+            pmt_date=date(2025, 1, 5),
+            name_on_acct="John Doe",
+        )
+        expected = daily(repository)
+        assert repository.rebuild() == len(expected)
+        assert daily(repository) == expected
+        assert expected[0] == (
+            date(2025, 1, 5),
+            PaymentStatus.CANCELLED,
+            2,
+            Decimal("27.00"),
+        )
+
+
+def test_archive_cli(database_url, tmp_path, capsys):
+    """Test the upay-archive command."""
+    archive_dir = tmp_path / "archive"
+    args = ["--database-url", database_url, "--archive-dir", str(archive_dir)]
+
+    assert main(args + ["--retention-months", "0", "--dry-run"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["archived"] == {"2025-01": None, "2025-02": None, "2025-03": None}
+    assert not archive_dir.exists()
+
+    assert main(args + ["--retention-months", "0"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report == {
+        "created_partitions": [],
+        "recovered": [],
+        "archived": {"2025-01": 3, "2025-02": 2, "2025-03": 1},
+    }
+    assert ArchiveReader(archive_dir).months() == [
+        date(2025, 1, 1),
+        date(2025, 2, 1),
+        date(2025, 3, 1),
+    ]
+
+
+def test_archive_cli_merges_late_postings(
+    session_factory, database_url, tmp_path, capsys
+):
+    """Test that late postings to an archived month are merged into its file."""
+    with session_factory() as db:
+        archive_month(db, date(2025, 1, 1), tmp_path)
+        TransactionRepository(db).create_transaction_if_absent(
+            tpg_trans_id="t6",
+            session_identifier="session123",
+            pmt_status="success",
+            pmt_amt=Decimal("16.00"),
+            pmt_date=date(2025, 1, 10),
+            name_on_acct="John Doe",
+        )
+        assert months_to_archive(db, today=date(2025, 3, 15), retention_months=1) == [
+            date(2025, 1, 1)
+        ]
+
+    args = ["--database-url", database_url, "--archive-dir", str(tmp_path)]
+    assert main(args + ["--retention-months", "0"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["archived"] == {"2025-01": 1, "2025-02": 2, "2025-03": 1}
+    assert not list(tmp_path.glob("*.tmp"))
+
+    with session_factory() as db:
+        repository = TransactionRepository(db, archive=ArchiveReader(tmp_path))
+        assert exported_ids(repository) == ["t1", "t4", "t6", "t0", "t2", "t5", "t3"]
+
+
+def test_archive_cli_recovers_interrupted_runs(
+    session_factory, database_url, tmp_path, capsys
+):
+    """Test that upay-archive finishes a run that died before the rename."""
+    with session_factory() as db:
+        archive_month(db, date(2025, 1, 1), tmp_path)
+        assert interrupted_archives(db, tmp_path) == []
+    january = archive_path(tmp_path, date(2025, 1, 1))
+    os.replace(january, temporary_path(tmp_path, date(2025, 1, 1)))
+    # A run that died before its commit left the month in the database
+    temporary_path(tmp_path, date(2025, 2, 1)).write_bytes(b"")
+
+    with session_factory() as db:
+        assert interrupted_archives(db, tmp_path) == [date(2025, 1, 1)]
+    assert ArchiveReader(tmp_path).months() == []
+
+    args = ["--database-url", database_url, "--archive-dir", str(tmp_path)]
+    assert main(args + ["--retention-months", "0", "--dry-run"]) == 0
+    assert json.loads(capsys.readouterr().out)["recovered"] == ["2025-01"]
+    assert not january.exists()
+
+    assert main(args + ["--retention-months", "0"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["recovered"] == ["2025-01"]
+    assert report["archived"] == {"2025-02": 2, "2025-03": 1}
+    with session_factory() as db:
+        repository = TransactionRepository(db, archive=ArchiveReader(tmp_path))
+        assert exported_ids(repository) == ["t1", "t4", "t0", "t2", "t5", "t3"]
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_partitions_postgres(tmp_path):
+    """Test migration 0004, partition maintenance and archival on PostgreSQL."""
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+
+    from alembic import command
+    from alembic.config import Config
+
+    from upayapi.partitions import ensure_partitions, is_partitioned, list_partitions
+
+    engine = create_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE IF EXISTS alembic_version")
+        connection.exec_driver_sql("DROP TYPE IF EXISTS paymentstatus")
+    config = Config(
+        "alembic.ini", attributes={"database_url": url, "configure_logger": False}
+    )
+    command.upgrade(config, "head")
+
+    try:
+        with engine.begin() as connection:
+            assert is_partitioned(connection)
+            created = ensure_partitions(
+                connection, today=date(2025, 1, 15), months_ahead=1
+            )
+            assert created == ["transactions_y2025m01", "transactions_y2025m02"]
+            assert (
+                ensure_partitions(connection, today=date(2025, 1, 15), months_ahead=1)
+                == []
+            )
+
+        session = sessionmaker(bind=engine)
+        with session() as db:
+            repository = TransactionRepository(db)
+            for i, pmt_date in enumerate([date(2025, 1, 5), date(2025, 2, 5)]):
+                result = repository.create_transaction_if_absent(
+                    tpg_trans_id=f"pg{i}",
+                    session_identifier="session123",
+                    pmt_status="success",
+                    pmt_amt=Decimal("10.00"),
+                    pmt_date=pmt_date,
+                    name_on_acct="John Doe",
+                )
+                assert result.created
+            # A retry is a duplicate even with a date in another partition
+            for pmt_date in [date(2025, 1, 5), date(2025, 2, 5)]:
+                duplicate = repository.create_transaction_if_absent(
+                    tpg_trans_id="pg0",
+                    session_identifier="session123",
+                    pmt_status="success",
+                    pmt_amt=Decimal("10.00"),
+                    pmt_date=pmt_date,
+                    name_on_acct="John Doe",
+                )
+                assert not duplicate.created
+            assert (
+                repository.import_transactions(
+                    [
+                        {
+                            "tpg_trans_id": "pg0",
+                            "session_identifier": "session123",
+                            "pmt_status": "success",
+                            "pmt_amt": Decimal("10.00"),
+                            "pmt_date": date(2025, 2, 6),
+                            "name_on_acct": "John Doe",
+                        }
+                    ]
+                )
+                == 0
+            )
+            assert (
+                db.execute(
+                    select(func.count()).where(Transaction.tpg_trans_id == "pg0")
+                ).scalar()
+                == 1
+            )
+
+            assert archive_month(db, date(2025, 1, 1), tmp_path) == 1
+            assert date(2025, 1, 1) not in list_partitions(db.connection())
+            assert exported_ids(
+                TransactionRepository(db, archive=ArchiveReader(tmp_path))
+            ) == ["pg0", "pg1"]
+    finally:
+        command.downgrade(config, "base")
+        engine.dispose()
@@ -0,0 +1,122 @@
+"""Tests for the async database path."""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from upayapi.async_database import get_async_database_url, get_optional_async_db
+from upayapi.cache import idempotency_cache
+from upayapi.config import settings
+from upayapi.database import Base
+from upayapi.main import app
+from upayapi.models.outbox import OutboxEvent
+
+pytest.importorskip("aiosqlite")
+
+
+@pytest.fixture(scope="function")
+def async_client(tmp_path, monkeypatch):
+    """Create a test client that processes postings through the async path.
+
+    Yields:
+        Test client.
+    """
+    database_path = tmp_path / "async.db"
+    sync_engine = create_engine(f"sqlite:///{database_path}")
+    Base.metadata.create_all(bind=sync_engine)
+
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{database_path}", poolclass=NullPool
+    )
+    AsyncTestingSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+    async def override_get_optional_async_db():
+        async with AsyncTestingSessionLocal() as db:
+            yield db
+
+    monkeypatch.setattr(settings, "use_async_database", True)
+    monkeypatch.setattr(settings, "posting_key", "test_key")
+    app.dependency_overrides[get_optional_async_db] = override_get_optional_async_db
+    try:
+        yield TestClient(app)
+    finally:
+        del app.dependency_overrides[get_optional_async_db]
+        sync_engine.dispose()
+        idempotency_cache.clear()
+
+
+def test_get_async_database_url():
+    """Test that synchronous URLs are mapped to async drivers."""
+    assert (
+        get_async_database_url("sqlite:///./upay.db") == "sqlite+aiosqlite:///./upay.db"
+    )
+    assert (
+        get_async_database_url("postgresql+psycopg2://u:p@db/upay")
+        == "postgresql+asyncpg://u:p@db/upay"
+    )
+    assert (
+        get_async_database_url("postgresql+asyncpg://u:p@db/upay")
+        == "postgresql+asyncpg://u:p@db/upay"
+    )
+    with pytest.raises(ValueError):
+        get_async_database_url("mysql://u:p@db/upay")
+
+
+def test_async_upay_posting(async_client):
+    """Test the upay posting endpoint through the async database path."""
+    data = {
+        "posting_key": "test_key",
+        "tpg_trans_id": "async-1",
+        "session_identifier": "session123",
+        "pmt_status": "success",
+        "pmt_amt": "100.00",
+        "pmt_date": "01/01/2025",
+        "name_on_acct": "John Doe",
+    }
+
+    response = async_client.post("/upay/posting", data=data)
+    assert response.status_code == 200
+    assert response.json()["message"] == "Transaction processed successfully"
+    transaction_id = response.json()["transaction_id"]
+
+    # Test duplicate transaction
+    response = async_client.post("/upay/posting", data=data)
+    assert response.status_code == 200
+    assert response.json()["message"] == "Transaction already processed"
+    assert response.json()["transaction_id"] == transaction_id
+
+    # Test invalid posting key
+    response = async_client.post(
+        "/upay/posting", data={**data, "posting_key": "invalid_key"}
+    )
+    assert response.status_code == 401
+
+
+def test_async_posting_writes_outbox(async_client, tmp_path, monkeypatch):
+    """Test that the async path writes the outbox event with the transaction."""
+    monkeypatch.setattr(settings, "outbox_url", "http://sink.invalid/events")
+    response = async_client.post(
+        "/upay/posting",
+        data={
+            "posting_key": "test_key",
+            "tpg_trans_id": "async-outbox-1",
+            "session_identifier": "session123",
+            "pmt_status": "success",
+            "pmt_amt": "100.00",
+            "pmt_date": "01/01/2025",
+            "name_on_acct": "John Doe",
+        },
+    )
+    assert response.status_code == 200
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'async.db'}")
+    with Session(engine) as db:
+        (event,) = db.scalars(select(OutboxEvent))
+    engine.dispose()
+    assert event.transaction_id == response.json()["transaction_id"]
+    assert event.payload["tpg_trans_id"] == "async-outbox-1"
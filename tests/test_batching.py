@@ -0,0 +1,151 @@
+"""Tests for group-commit ingestion."""
+
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from upayapi.batching import IngestionBatcher
+from upayapi.config import settings
+from upayapi.database import Base
+from upayapi.exceptions import DatabaseError
+from upayapi.models.schemas import TransactionRequest
+from upayapi.repositories.transaction import TransactionRepository
+from upayapi.services import async_transaction as async_service_module
+
+
+@pytest.fixture(scope="function")
+def session_factory(tmp_path):
+    """Create a session factory for a file-backed SQLite test database.
+
+    Yields:
+        Session factory.
+    """
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'batching.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+def transaction_fields(tpg_trans_id: str) -> dict:
+    """Get column values for a test transaction.
+
+    Args:
+        tpg_trans_id: Transaction reference number.
+
+    Returns:
+        Column values for the batcher.
+    """
+    return {
+        "tpg_trans_id": tpg_trans_id,
+        "session_identifier": "session123",
+        "pmt_status": "success",
+        "pmt_amt": Decimal("100.00"),
+        "pmt_date": date(2025, 1, 1),
+        "name_on_acct": "John Doe",
+    }
+
+
+def test_batcher_groups_concurrent_postings(session_factory):
+    """Test that concurrent postings are committed in shared batches."""
+    batcher = IngestionBatcher(session_factory, max_batch_size=50, max_wait=0.05)
+    batcher.start()
+    try:
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            futures = list(
+                executor.map(
+                    lambda i: batcher.submit(transaction_fields(f"txn-{i}")), range(40)
+                )
+            )
+            results = [future.result(timeout=5) for future in futures]
+    finally:
+        batcher.stop()
+
+    assert all(result.created for result in results)
+    assert len({result.id for result in results}) == 40
+    assert batcher.rows == 40
+    assert batcher.batches < 40
+
+    with session_factory() as db:
+        assert TransactionRepository(db).count() == 40
+
+
+def test_batcher_duplicates(session_factory):
+    """Test duplicates within a batch and against stored transactions."""
+    batcher = IngestionBatcher(session_factory, max_batch_size=10, max_wait=0.05)
+    batcher.start()
+    try:
+        first = batcher.submit(transaction_fields("12345"))
+        second = batcher.submit(transaction_fields("12345"))
+        first_result, second_result = first.result(timeout=5), second.result(timeout=5)
+        third_result = batcher.submit(transaction_fields("12345")).result(timeout=5)
+    finally:
+        batcher.stop()
+
+    assert first_result.created is True
+    assert second_result.created is False
+    assert third_result.created is False
+    assert first_result.id == second_result.id == third_result.id
+
+
+def test_batcher_stop_flushes_pending(session_factory):
+    """Test that stopping the batcher commits queued postings."""
+    batcher = IngestionBatcher(session_factory, max_batch_size=100, max_wait=10)
+    batcher.start()
+    future = batcher.submit(transaction_fields("12345"))
+    batcher.stop(timeout=5)
+
+    assert future.result(timeout=0).created is True
+    with pytest.raises(RuntimeError):
+        batcher.submit(transaction_fields("67890"))
+
+
+def test_batcher_stop_resolves_racing_submissions(session_factory):
+    """Test that postings submitted while stopping are never left waiting."""
+    batcher = IngestionBatcher(session_factory, max_batch_size=10, max_wait=0.01)
+    batcher.start()
+    futures = []
+
+    def submit(i):
+        try:
+            futures.append(batcher.submit(transaction_fields(f"txn-{i}")))
+        except RuntimeError:
+            pass
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for i in range(200):
+            executor.submit(submit, i)
+            if i == 100:
+                executor.submit(batcher.stop, 5)
+
+    for future in futures:
+        assert future.done()
+
+
+def test_async_service_times_out_on_stuck_batcher(monkeypatch):
+    """Test that an async posting stops waiting for a stuck batcher."""
+
+    class StuckBatcher:
+        def submit(self, values):
+            return Future()
+
+    monkeypatch.setattr(settings, "ingestion_batching", True)
+    monkeypatch.setattr(settings, "ingestion_batch_timeout_seconds", 0.05)
+    monkeypatch.setattr(
+        async_service_module, "get_ingestion_batcher", lambda: StuckBatcher()
+    )
+    service = async_service_module.AsyncTransactionService(db=None)
+    request = TransactionRequest(
+        posting_key="test_key",
+        **{**transaction_fields("stuck"), "pmt_date": "01/01/2025"},
+    )
+
+    with pytest.raises(DatabaseError):
+        asyncio.run(service.process_transaction(request, site_id="default"))
@@ -0,0 +1,63 @@
+"""Tests for the in-process caches."""
+
+from upayapi.cache import IdempotencyCache
+
+
+class FakeClock:
+    """Manually advanced clock for TTL tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_idempotency_cache_hit_and_miss():
+    """Test cache hits, misses and counters."""
+    cache = IdempotencyCache(maxsize=10, ttl=60)
+
+    assert cache.get("12345") is None
+    cache.set("12345", 1)
+    assert cache.get("12345") == 1
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["size"] == 1
+
+
+def test_idempotency_cache_lru_eviction():
+    """Test that the least recently used entry is evicted first."""
+    cache = IdempotencyCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_idempotency_cache_ttl():
+    """Test that entries expire after the TTL."""
+    clock = FakeClock()
+    cache = IdempotencyCache(maxsize=10, ttl=30, clock=clock)
+    cache.set("12345", 1)
+
+    clock.now = 29
+    assert cache.get("12345") == 1
+    clock.now = 30
+    assert cache.get("12345") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_idempotency_cache_disabled():
+    """Test that a cache size of 0 disables the cache."""
+    cache = IdempotencyCache(maxsize=0, ttl=60)
+    cache.set("12345", 1)
+
+    assert cache.get("12345") is None
+    assert cache.stats()["size"] == 0
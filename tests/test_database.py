@@ -0,0 +1,104 @@
+"""Tests for the database engines."""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from upayapi import database
+from upayapi.config import settings
+from upayapi.database import Base, create_database_engines, dispose_engines
+from upayapi.main import create_app
+from upayapi.repositories.rollup import RollupRepository
+from upayapi.repositories.transaction import TransactionRepository
+
+
+@pytest.fixture
+def engines(tmp_path, monkeypatch):
+    """Create single-writer engines for a file-backed SQLite database.
+
+    Yields:
+        Write engine and read engine.
+    """
+    monkeypatch.setattr(settings, "sqlite_tuning", True)
+    monkeypatch.setattr(settings, "sqlite_single_writer", True)
+    write_engine, read_engine = create_database_engines(
+        f"sqlite:///{tmp_path / 'upay.db'}"
+    )
+    Base.metadata.create_all(bind=write_engine)
+    yield write_engine, read_engine
+    write_engine.dispose()
+    read_engine.dispose()
+
+
+def test_sqlite_pragmas(engines):
+    """Test that SQLite connections are tuned and readers cannot write."""
+    write_engine, read_engine = engines
+    assert write_engine is not read_engine
+    assert write_engine.pool.size() == 1
+
+    with write_engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+        assert (
+            connection.exec_driver_sql("PRAGMA busy_timeout").scalar()
+            == settings.sqlite_busy_timeout_ms
+        )
+
+    with read_engine.connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.execute(text("DELETE FROM transactions"))
+
+
+def test_sqlite_concurrent_postings(engines):
+    """Test that concurrent postings and reads never hit a locked database."""
+    write_engine, read_engine = engines
+    write_sessions = sessionmaker(autocommit=False, autoflush=False, bind=write_engine)
+    read_sessions = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+    def post(i):
+        with write_sessions() as db:
+            return TransactionRepository(db).create_transaction_if_absent(
+                tpg_trans_id=f"txn-{i % 80}",
+                session_identifier="session123",
+                pmt_status="success",
+                pmt_amt=Decimal("10.00"),
+                pmt_date=date(2025, 1, 1),
+                name_on_acct="John Doe",
+            )
+
+    def read(_):
+        with read_sessions() as db:
+            return TransactionRepository(db).get_transactions(limit=10)
+
+    with ThreadPoolExecutor(max_workers=100) as executor:
+        postings = [executor.submit(post, i) for i in range(100)]
+        reads = [executor.submit(read, i) for i in range(50)]
+        results = [future.result() for future in postings]
+        for future in reads:
+            future.result()
+
+    assert sum(result.created for result in results) == 80
+    with read_sessions() as db:
+        assert TransactionRepository(db).count() == 80
+        assert RollupRepository(db).get_daily()[0].txn_count == 80
+
+
+def test_lifespan_creates_and_prewarms_engines(tmp_path, monkeypatch):
+    """Test that engines are created and filled at startup and disposed at shutdown."""
+    monkeypatch.setattr(settings, "database_url", f"sqlite:///{tmp_path / 'upay.db'}")
+    monkeypatch.setattr(settings, "sqlite_single_writer", False)
+    dispose_engines()
+
+    with TestClient(create_app()) as client:
+        engine = database.get_engine()
+        assert engine.url.database == str(tmp_path / "upay.db")
+        assert engine.pool.checkedin() == engine.pool.size() == 5
+        assert client.get("/health").json()["status"] == "healthy"
+
+    assert database._engine is None
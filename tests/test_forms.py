@@ -0,0 +1,18 @@
+"""Tests for the posting form parser."""
+
+from upayapi.forms import parse_posting_body
+
+
+def test_parse_posting_body():
+    """Test decoding, unknown fields and repeated fields."""
+    body = (
+        b"posting_key=k&tpg_trans_id=1&tpg_trans_id=2&name_on_acct=Jos%C3%A9+N%C3%BA%C3%B1ez"
+        b"&card_type=VISA&&flag&pmt%5Famt=10.00&pmt_date=01%2F02%2F2025"
+    )
+    assert parse_posting_body(body) == {
+        "posting_key": "k",
+        "tpg_trans_id": "2",
+        "name_on_acct": "José Núñez",
+        "pmt_amt": "10.00",
+        "pmt_date": "01/02/2025",
+    }
@@ -0,0 +1,43 @@
+"""Tests for the background health prober."""
+
+import asyncio
+
+from sqlalchemy import create_engine
+
+from upayapi.health import HealthProber, get_pool_status
+
+
+def test_pool_status(tmp_path):
+    """Test that pool usage and saturation are reported."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", pool_size=2, max_overflow=2
+    )
+    with engine.connect():
+        assert get_pool_status(engine) == {
+            "size": 2,
+            "checked_out": 1,
+            "overflow": 0,
+            "saturation": 0.25,
+        }
+    engine.dispose()
+
+    assert get_pool_status(create_engine("sqlite://")) == {}
+
+
+def test_background_probing():
+    """Test that the prober refreshes its result until stopped."""
+    prober = HealthProber(interval=0.01)
+    probes = []
+    prober.probe = lambda: probes.append(1)
+
+    async def scenario():
+        prober.start()
+        await asyncio.sleep(0.1)
+        await prober.stop()
+        count = len(probes)
+        await asyncio.sleep(0.05)
+        return count
+
+    count = asyncio.run(scenario())
+    assert count >= 2
+    assert len(probes) == count
@@ -0,0 +1,120 @@
+"""Tests for the bulk import command."""
+
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from upayapi.cli.importer import import_file, main
+from upayapi.database import Base
+from upayapi.repositories.transaction import TransactionRepository
+
+
+@pytest.fixture(scope="function")
+def session_factory(tmp_path):
+    """Create a session factory for a file-backed SQLite test database.
+
+    Yields:
+        Session factory.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'import.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+CSV_HEADER = (
+    "tpg_trans_id,session_identifier,pmt_status,pmt_amt,pmt_date,name_on_acct\n"
+)
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_import_csv(tmp_path, session_factory, workers):
+    """Test importing a CSV file with duplicates and invalid rows."""
+    path = tmp_path / "postings.csv"
+    path.write_text(
+        CSV_HEADER
+        + "1,s1,success,100.00,01/01/2025,John Doe\n"
+        + "2,s2,cancelled,5.50,01/02/2025,Jane Doe\n"
+        + "1,s1,success,100.00,01/01/2025,John Doe\n"
+        + "3,s3,success,-1,01/03/2025,Bad Amount\n"
+        + "4,s4,success,10.00,2025-01-04,Bad Date\n"
+    )
+
+    stats = import_file(path, session_factory, chunk_size=2, workers=workers)
+
+    assert stats["rows"] == 5
+    assert stats["inserted"] == 2
+    assert stats["duplicates"] == 1
+    assert stats["rejected"] == 2
+
+    rejected = [json.loads(line) for line in open(stats["rejects_file"])]
+    assert [rejection["line"] for rejection in rejected] == [5, 6]
+    assert "pmt_amt" in rejected[0]["errors"][0]
+
+    with session_factory() as db:
+        assert TransactionRepository(db).count() == 2
+
+
+def test_import_ndjson_skips_existing(tmp_path, session_factory):
+    """Test that an NDJSON import skips transactions already stored."""
+    path = tmp_path / "replay.ndjson"
+    rows = [
+        {
+            "tpg_trans_id": "1",
+            "session_identifier": "s1",
+            "pmt_status": "success",
+            "pmt_amt": 100,
+            "pmt_date": "01/01/2025",
+            "name_on_acct": "John Doe",
+        },
+        {
+            "tpg_trans_id": "2",
+            "session_identifier": "s2",
+            "pmt_status": "success",
+            "pmt_amt": "20.00",
+            "pmt_date": "01/01/2025",
+            "name_on_acct": "Jane Doe",
+        },
+    ]
+    path.write_text("\n".join(json.dumps(row) for row in rows) + "\nnot json\n")
+
+    first = import_file(path, session_factory, site_id="parking")
+    second = import_file(path, session_factory)
+
+    assert first["inserted"] == 2
+    assert first["rejected"] == 1
+    assert second["inserted"] == 0
+    assert second["duplicates"] == 2
+
+    with session_factory() as db:
+        assert TransactionRepository(db).get_by_tpg_trans_id("1").site_id == "parking"
+
+
+def test_import_csv_rejects_extra_fields(tmp_path, session_factory):
+    """Test that CSV rows with more fields than the header are rejected."""
+    path = tmp_path / "postings.csv"
+    path.write_text(
+        CSV_HEADER
+        + "1,s1,success,100.00,01/01/2025,John Doe\n"
+        + "2,s2,success,5.50,01/02/2025,Doe,Jane\n"
+    )
+
+    stats = import_file(path, session_factory, workers=0)
+
+    assert stats["inserted"] == 1
+    assert stats["rejected"] == 1
+    rejected = [json.loads(line) for line in open(stats["rejects_file"])]
+    assert rejected[0]["line"] == 3
+    assert rejected[0]["errors"] == ["Expected 6 fields, got 7"]
+    assert rejected[0]["row"] == "2,s2,success,5.50,01/02/2025,Doe,Jane"
+
+
+def test_main_reports_database_errors(tmp_path):
+    """Test that a database error fails the command instead of raising."""
+    path = tmp_path / "postings.csv"
+    path.write_text(CSV_HEADER + "1,s1,success,100.00,01/01/2025,John Doe\n")
+
+    database_url = f"sqlite:///{tmp_path / 'empty.db'}"
+    assert main([str(path), "--workers", "0", "--database-url", database_url]) == 1
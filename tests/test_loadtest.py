@@ -0,0 +1,101 @@
+"""Tests for the load test command."""
+
+import asyncio
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from upayapi.cache import idempotency_cache
+from upayapi.cli.loadtest import PostingFactory, run_load
+from upayapi.config import settings
+from upayapi.database import Base, get_db
+from upayapi.main import app
+
+
+@pytest.fixture(scope="function")
+def test_app(tmp_path, monkeypatch):
+    """Point the application at a file-backed SQLite database.
+
+    Concurrent postings need a connection each, so the shared in-memory
+    database of the endpoint tests cannot be used.
+
+    Yields:
+        ASGI application.
+    """
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'loadtest.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(bind=engine)
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(settings, "posting_key", "test_key")
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield app
+    finally:
+        if previous is None:
+            del app.dependency_overrides[get_db]
+        else:
+            app.dependency_overrides[get_db] = previous
+        idempotency_cache.clear()
+        engine.dispose()
+
+
+def test_posting_factory_ratios():
+    """Test that postings are generated in the requested proportions."""
+    factory = PostingFactory(
+        "test_key", duplicate_ratio=0.2, invalid_key_ratio=0.1, seed=1
+    )
+    kinds = [factory.next()[0] for _ in range(5000)]
+
+    assert 0.15 < kinds.count("duplicate") / len(kinds) < 0.25
+    assert 0.07 < kinds.count("invalid_key") / len(kinds) < 0.13
+
+    kind, body = factory.next()
+    fields = parse_qs(body.decode())
+    assert set(fields) == {
+        "posting_key",
+        "tpg_trans_id",
+        "session_identifier",
+        "pmt_status",
+        "pmt_amt",
+        "pmt_date",
+        "name_on_acct",
+    }
+
+
+def test_run_load(test_app):
+    """Test a two-stage run against the application."""
+    factory = PostingFactory(
+        "test_key", duplicate_ratio=0.2, invalid_key_ratio=0.1, seed=1
+    )
+    report = asyncio.run(
+        run_load(
+            "http://testserver",
+            factory,
+            stages=[1, 4],
+            stage_duration=0.3,
+            transport=httpx.ASGITransport(app=test_app),
+        )
+    )
+
+    assert [stage["concurrency"] for stage in report["stages"]] == [1, 4]
+    total = report["total"]
+    assert total["requests"] > 0
+    assert total["outcomes"]["created"] > 0
+    assert total["outcomes"]["rejected"] > 0
+    assert "unexpected" not in total["outcomes"]
+    assert set(total["latency_ms"]) == {"p50", "p95", "p99", "p999", "max", "mean"}
+    assert total["latency_ms"]["p50"] <= total["latency_ms"]["p999"]
@@ -0,0 +1,131 @@
+"""Tests for the structured logging pipeline."""
+
+import io
+import json
+import logging
+import queue
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from upayapi import log
+from upayapi.log import DroppingQueueHandler, configure_logging, shutdown_logging
+from upayapi.metrics import LOG_RECORDS_DROPPED, LOG_RECORDS_SUPPRESSED
+from upayapi.middleware import RequestContextMiddleware
+
+
+@pytest.fixture
+def log_stream():
+    """Route logging to an in-memory stream for one test.
+
+    Yields:
+        Function configuring logging with the given options. It returns a
+        function that stops the listener and returns the JSON lines written.
+    """
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    listener = log._listener
+    if listener is not None:
+        listener.stop()
+        log._listener = None
+
+    def configure(**options):
+        stream = io.StringIO()
+        configure_logging(stream=stream, **options)
+
+        def lines():
+            shutdown_logging()
+            return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+        return lines
+
+    yield configure
+
+    shutdown_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+    if listener is not None:
+        listener.start()
+        log._listener = listener
+
+
+def test_json_lines_carry_request_context(log_stream):
+    """Test that records logged in a request carry its ID, route and duration."""
+    lines = log_stream(level="INFO")
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int):
+        logging.getLogger("upayapi.test").warning(
+            "Item %s looked up", item_id, extra={"site": "main"}
+        )
+        return {"item_id": item_id}
+
+    response = TestClient(app).get("/items/7")
+    request_id = response.headers["X-Request-ID"]
+
+    entries = lines()
+    entry = next(e for e in entries if e["logger"] == "upayapi.test")
+    assert entry["message"] == "Item 7 looked up"
+    assert entry["level"] == "WARNING"
+    assert entry["request_id"] == request_id
+    assert entry["route"] == "/items/{item_id}"
+    assert entry["duration_ms"] >= 0
+    assert entry["site"] == "main"
+
+    access = next(e for e in entries if e["logger"] == "upayapi.access")
+    assert access["request_id"] == request_id
+    assert access["route"] == "/items/{item_id}"
+    assert '"GET /items/7" 200' in access["message"]
+
+
+def test_sampling_suppresses_repeated_errors(log_stream):
+    """Test that identical errors beyond the burst are suppressed and counted."""
+    lines = log_stream(sample_burst=2, sample_window=0.2)
+    logger = logging.getLogger("upayapi.test")
+    suppressed_before = LOG_RECORDS_SUPPRESSED.value()
+
+    for attempt in range(5):
+        logger.error("Database error: %s", f"attempt {attempt}")
+    logger.error("Another error")
+    logger.info("Not sampled")
+    logger.info("Not sampled")
+    logger.info("Not sampled")
+    time.sleep(0.25)
+    logger.error("Database error: %s", "recovered")
+
+    messages = [(e["message"], e.get("suppressed")) for e in lines()]
+    assert messages == [
+        ("Database error: attempt 0", None),
+        ("Database error: attempt 1", None),
+        ("Another error", None),
+        ("Not sampled", None),
+        ("Not sampled", None),
+        ("Not sampled", None),
+        ("Database error: recovered", 3),
+    ]
+    assert LOG_RECORDS_SUPPRESSED.value() - suppressed_before == 3
+
+
+def test_full_queue_drops_records():
+    """Test that records are dropped and counted instead of blocking."""
+    records = queue.Queue(maxsize=2)
+    logger = logging.getLogger("upayapi.test.dropping")
+    logger.propagate = False
+    handler = DroppingQueueHandler(records)
+    logger.addHandler(handler)
+    dropped_before = LOG_RECORDS_DROPPED.value()
+
+    try:
+        for number in range(5):
+            logger.warning("Record %d", number)
+    finally:
+        logger.removeHandler(handler)
+        logger.propagate = True
+
+    assert records.qsize() == 2
+    assert records.get_nowait().getMessage() == "Record 0"
+    assert LOG_RECORDS_DROPPED.value() - dropped_before == 3
@@ -0,0 +1,59 @@
+"""Tests for the metrics collection."""
+
+import threading
+
+from sqlalchemy import create_engine, text
+
+from upayapi.metrics import Counter, Histogram, instrument_engine, DB_STATEMENT_DURATION
+
+
+def test_histogram_render():
+    """Test that a histogram renders cumulative buckets, sum and count."""
+    histogram = Histogram(
+        "test_seconds", "Test histogram.", ["route"], buckets=[0.1, 1.0]
+    )
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.1, "/a")
+    histogram.observe(5.0, "/a")
+
+    assert histogram.render() == [
+        "# HELP test_seconds Test histogram.",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{route="/a",le="0.1"} 2',
+        'test_seconds_bucket{route="/a",le="1"} 2',
+        'test_seconds_bucket{route="/a",le="+Inf"} 3',
+        'test_seconds_sum{route="/a"} 5.15',
+        'test_seconds_count{route="/a"} 3',
+    ]
+
+
+def test_counter_threads():
+    """Test that per-thread shards are summed when read."""
+    counter = Counter("test_total", "Test counter.", ["outcome"])
+
+    def work():
+        for _ in range(1000):
+            counter.inc("new")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.value("new") == 8000
+    assert counter.render()[-1] == 'test_total{outcome="new"} 8000'
+
+
+def test_instrument_engine(tmp_path):
+    """Test that statement timings survive an engine dispose."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'metrics.db'}")
+    instrument_engine(engine, "test")
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    engine.dispose()
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    assert DB_STATEMENT_DURATION.count("test", "SELECT") == 2
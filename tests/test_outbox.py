@@ -0,0 +1,407 @@
+"""Tests for the transaction outbox and its dispatcher."""
+
+import asyncio
+import json
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from upayapi.cli.outbox import main
+from upayapi.config import settings
+from upayapi.database import Base, dispose_engines
+from upayapi.main import create_app
+from upayapi.models.outbox import OutboxEvent, OutboxStatus
+from upayapi.outbox import OutboxDispatcher
+from upayapi.repositories.outbox import OutboxRepository, utcnow
+from upayapi.repositories.transaction import TransactionRepository
+
+httpx = pytest.importorskip("httpx")
+
+
+class StubSink:
+    """Local HTTP server standing in for the downstream system.
+
+    Attributes:
+        statuses: Status codes of the next responses; 200 once exhausted.
+        delay: Seconds each request takes.
+        requests: Bodies and headers of the requests received.
+        in_flight: Number of requests being handled.
+        max_in_flight: Largest number of requests handled at once.
+        url: URL of the server.
+    """
+
+    def __init__(self, statuses=(), delay=0.0):
+        """Start the server on a free local port.
+
+        Args:
+            statuses: Status codes of the first responses.
+            delay: Seconds each request takes.
+        """
+        self.statuses = list(statuses)
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                with sink._lock:
+                    sink.in_flight += 1
+                    sink.max_in_flight = max(sink.max_in_flight, sink.in_flight)
+                    status = sink.statuses.pop(0) if sink.statuses else 200
+                time.sleep(sink.delay)
+                with sink._lock:
+                    sink.in_flight -= 1
+                    sink.requests.append((json.loads(body), dict(self.headers)))
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/events"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stop the server."""
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def sink():
+    """Start a stub sink answering 200.
+
+    Yields:
+        Stub sink.
+    """
+    server = StubSink()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    """Create a session factory for a file-backed SQLite database with the outbox on.
+
+    Yields:
+        Session factory.
+    """
+    monkeypatch.setattr(settings, "outbox_url", "http://sink.invalid/events")
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'outbox.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+def transaction_fields(tpg_trans_id):
+    """Get repository arguments for a test transaction.
+
+    Args:
+        tpg_trans_id: Transaction reference number.
+
+    Returns:
+        Column values of the transaction.
+    """
+    return {
+        "tpg_trans_id": tpg_trans_id,
+        "session_identifier": "session123",
+        "pmt_status": "success",
+        "pmt_amt": Decimal("100.00"),
+        "pmt_date": date(2025, 1, 1),
+        "name_on_acct": "John Doe",
+        "site_id": "default",
+    }
+
+
+def add_events(session_factory, count):
+    """Store transactions, and so their outbox events.
+
+    Args:
+        session_factory: Session factory.
+        count: Number of transactions.
+    """
+    with session_factory() as db:
+        TransactionRepository(db).create_transactions_if_absent(
+            [transaction_fields(f"event-{i}") for i in range(count)]
+        )
+
+
+def events(session_factory):
+    """Get every outbox event.
+
+    Args:
+        session_factory: Session factory.
+
+    Returns:
+        Outbox events ordered by ID.
+    """
+    with session_factory() as db:
+        return list(db.scalars(select(OutboxEvent).order_by(OutboxEvent.id)))
+
+
+def dispatch(dispatcher):
+    """Run one dispatch with a fresh HTTP client.
+
+    Args:
+        dispatcher: Outbox dispatcher.
+
+    Returns:
+        Number of events claimed.
+    """
+
+    async def run():
+        async with httpx.AsyncClient(timeout=5) as client:
+            return await dispatcher.dispatch(client)
+
+    return asyncio.run(run())
+
+
+def test_outbox_written_with_transactions(session_factory, monkeypatch):
+    """Test that new transactions, and only those, get an outbox event."""
+    with session_factory() as db:
+        repository = TransactionRepository(db)
+        first = repository.create_transaction_if_absent(**transaction_fields("12345"))
+        repository.create_transaction_if_absent(**transaction_fields("12345"))
+        assert (
+            repository.import_transactions(
+                [transaction_fields("12345"), transaction_fields("67890")]
+            )
+            == 1
+        )
+
+        monkeypatch.setattr(settings, "outbox_url", "")
+        repository.create_transaction_if_absent(**transaction_fields("disabled"))
+
+    stored = events(session_factory)
+    assert [event.payload["tpg_trans_id"] for event in stored] == ["12345", "67890"]
+    assert stored[0].transaction_id == first.id
+    assert stored[0].status == OutboxStatus.PENDING
+    assert stored[0].payload == {
+        "event": "transaction.created",
+        "transaction_id": first.id,
+        "tpg_trans_id": "12345",
+        "session_identifier": "session123",
+        "pmt_status": "success",
+        "pmt_amt": "100.00",
+        "pmt_date": "2025-01-01",
+        "name_on_acct": "John Doe",
+        "site_id": "default",
+    }
+
+
+def test_claim_and_record(session_factory):
+    """Test leases, retries, dead letters, requeueing and purging."""
+    add_events(session_factory, 3)
+    now = utcnow()
+    with session_factory() as db:
+        repository = OutboxRepository(db)
+        claimed = repository.claim(2, lease_seconds=60, now=now)
+        assert [row.attempts for row in claimed] == [1, 1]
+
+        # Leased events are hidden until the lease expires
+        assert [row.id for row in repository.claim(10, 60, now=now)] == [3]
+        assert repository.claim(10, 60, now=now) == []
+        later = now + timedelta(seconds=61)
+        assert [row.attempts for row in repository.claim(10, 60, now=later)] == [
+            2,
+            2,
+            2,
+        ]
+
+        retry_at = later + timedelta(seconds=5)
+        repository.record_attempts(
+            [1], [(2, retry_at, "HTTP 500"), (3, None, "HTTP 500")], now=later
+        )
+        assert repository.count_by_status() == {"pending": 1, "delivered": 1, "dead": 1}
+
+        assert repository.requeue_dead(now=later) == 1
+        assert [row.id for row in repository.claim(10, 60, now=later)] == [3]
+        assert repository.delete_delivered(later) == 0
+        assert repository.delete_delivered(later + timedelta(seconds=1)) == 1
+
+    stored = events(session_factory)
+    assert [(event.id, event.attempts, event.last_error) for event in stored] == [
+        (2, 2, "HTTP 500"),
+        (3, 1, "HTTP 500"),
+    ]
+
+
+def test_dispatcher_retries_and_delivers(session_factory, sink):
+    """Test that failed deliveries are retried, then recorded as delivered."""
+    add_events(session_factory, 2)
+    sink.statuses = [503]
+    dispatcher = OutboxDispatcher(
+        session_factory, sink.url, concurrency=1, backoff=0, max_attempts=3
+    )
+
+    assert dispatch(dispatcher) == 2
+    stored = events(session_factory)
+    assert [event.status for event in stored] == [
+        OutboxStatus.PENDING,
+        OutboxStatus.DELIVERED,
+    ]
+    assert stored[0].last_error == "HTTP 503"
+
+    assert dispatch(dispatcher) == 1
+    assert dispatch(dispatcher) == 0
+    stored = events(session_factory)
+    assert all(event.status == OutboxStatus.DELIVERED for event in stored)
+    assert stored[0].attempts == 2
+
+    payload, headers = sink.requests[-1]
+    assert payload["tpg_trans_id"] == "event-0"
+    assert headers["Idempotency-Key"] == str(stored[0].id)
+
+
+def test_dispatcher_dead_letters(session_factory, sink):
+    """Test that events failing max_attempts times are dead-lettered."""
+    add_events(session_factory, 1)
+    sink.statuses = [500, 500, 500]
+    dispatcher = OutboxDispatcher(session_factory, sink.url, backoff=0, max_attempts=2)
+
+    dispatch(dispatcher)
+    dispatch(dispatcher)
+    assert dispatch(dispatcher) == 0
+    (event,) = events(session_factory)
+    assert event.status == OutboxStatus.DEAD
+    assert event.attempts == 2
+
+    # Unreachable sinks count as failures too
+    with session_factory() as db:
+        OutboxRepository(db).requeue_dead()
+    dispatcher.url = "http://127.0.0.1:1/events"
+    dispatch(dispatcher)
+    (event,) = events(session_factory)
+    assert event.last_error.startswith("ConnectError")
+
+
+def test_dispatcher_concurrency(session_factory):
+    """Test that deliveries in flight stay within the concurrency limit."""
+    add_events(session_factory, 6)
+    sink = StubSink(delay=0.05)
+    try:
+        dispatcher = OutboxDispatcher(session_factory, sink.url, concurrency=2)
+        assert dispatch(dispatcher) == 6
+    finally:
+        sink.close()
+    assert sink.max_in_flight == 2
+    assert all(
+        event.status == OutboxStatus.DELIVERED for event in events(session_factory)
+    )
+
+
+def test_dispatcher_records_any_delivery_error(session_factory):
+    """Test that errors outside httpx.HTTPError are recorded as failures."""
+    add_events(session_factory, 2)
+    dispatcher = OutboxDispatcher(
+        session_factory, "http://sink.invalid/\x00", backoff=0, max_attempts=1
+    )
+
+    assert dispatch(dispatcher) == 2
+    stored = events(session_factory)
+    assert [event.status for event in stored] == [OutboxStatus.DEAD] * 2
+    assert all(event.last_error.startswith("InvalidURL") for event in stored)
+
+
+def test_dispatcher_claims_within_lease(session_factory, sink):
+    """Test that a batch is capped to the deliveries that fit in the lease."""
+    add_events(session_factory, 6)
+    dispatcher = OutboxDispatcher(
+        session_factory, sink.url, concurrency=2, timeout=10, lease=30
+    )
+    assert dispatcher.claim_size == 4
+
+    assert dispatch(dispatcher) == 4
+    assert dispatch(dispatcher) == 2
+    assert OutboxDispatcher(None, "", batch_size=100).claim_size == 50
+    assert OutboxDispatcher(None, "", timeout=120, lease=60).claim_size == 10
+
+
+def test_retry_delay():
+    """Test the exponential backoff with jitter."""
+    dispatcher = OutboxDispatcher(None, "", backoff=1, backoff_max=10)
+    assert 0.5 <= dispatcher.retry_delay(1) <= 1
+    assert 4 <= dispatcher.retry_delay(4) <= 8
+    assert 5 <= dispatcher.retry_delay(20) <= 10
+
+
+def test_posting_delivered_in_background(tmp_path, monkeypatch):
+    """Test that the application delivers outbox events after answering postings."""
+    sink = StubSink(delay=0.5)
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    monkeypatch.setattr(settings, "database_url", url)
+    monkeypatch.setattr(settings, "posting_key", "test_key")
+    monkeypatch.setattr(settings, "outbox_url", sink.url)
+    monkeypatch.setattr(settings, "outbox_poll_interval_seconds", 0.05)
+    dispose_engines()
+
+    try:
+        with TestClient(create_app()) as client:
+            started = time.perf_counter()
+            response = client.post(
+                "/upay/posting",
+                data={
+                    "posting_key": "test_key",
+                    "tpg_trans_id": "background-1",
+                    "session_identifier": "session123",
+                    "pmt_status": "success",
+                    "pmt_amt": "100.00",
+                    "pmt_date": "01/01/2025",
+                    "name_on_acct": "John Doe",
+                },
+            )
+            assert response.status_code == 200
+            # The sink takes 0.5s per request; the posting does not wait for it
+            assert time.perf_counter() - started < 0.5
+
+            deadline = time.monotonic() + 5
+            while not sink.requests and time.monotonic() < deadline:
+                time.sleep(0.05)
+    finally:
+        sink.close()
+
+    assert [payload["tpg_trans_id"] for payload, _ in sink.requests] == ["background-1"]
+    assert main(["--database-url", url]) == 0
+
+
+def test_outbox_cli(session_factory, tmp_path, capsys):
+    """Test the upay-outbox command."""
+    add_events(session_factory, 2)
+    with session_factory() as db:
+        repository = OutboxRepository(db)
+        claimed = repository.claim(10, 60)
+        repository.record_attempts([claimed[0].id], [(claimed[1].id, None, "HTTP 500")])
+    url = f"sqlite:///{tmp_path / 'outbox.db'}"
+
+    assert main(["--database-url", url]) == 0
+    assert json.loads(capsys.readouterr().out) == {
+        "events": {"pending": 0, "delivered": 1, "dead": 1}
+    }
+
+    assert (
+        main(["--database-url", url, "--requeue", "--purge-delivered-days", "0"]) == 0
+    )
+    assert json.loads(capsys.readouterr().out) == {
+        "requeued": 1,
+        "purged": 1,
+        "events": {"pending": 1, "delivered": 0, "dead": 0},
+    }
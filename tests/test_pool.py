@@ -0,0 +1,92 @@
+"""Tests for the connection pool profiles and liveness checks."""
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import StaticPool
+
+from upayapi.config import settings
+from upayapi.pool import configure_liveness, get_pool_args, get_pool_profile
+
+
+@pytest.fixture
+def traced_engine(tmp_path):
+    """Create file-backed SQLite engines that record every statement.
+
+    Yields:
+        Function creating an engine for a liveness mode and idle time. It
+        returns the engine and the statements it executed, including pings.
+    """
+    statements = []
+    engines = []
+
+    def create(liveness: str, idle_seconds: float):
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}",
+            **get_pool_args(f"sqlite:///{tmp_path / 'pool.db'}", liveness=liveness),
+        )
+        configure_liveness(engine, liveness, idle_seconds)
+
+        @event.listens_for(engine, "connect")
+        def trace(dbapi_connection, connection_record):
+            dbapi_connection.set_trace_callback(statements.append)
+
+        engines.append(engine)
+        return engine, statements
+
+    yield create
+    for engine in engines:
+        engine.dispose()
+
+
+def test_get_pool_profile():
+    """Test that the pool profile follows the database and environment."""
+    assert get_pool_profile("sqlite://") == "sqlite_memory"
+    assert get_pool_profile("sqlite:///:memory:") == "sqlite_memory"
+    assert get_pool_profile("sqlite:///./upay.db") == "sqlite"
+    assert get_pool_profile("postgresql://localhost/upay", "dev") == "dev"
+    assert get_pool_profile("postgresql://localhost/upay", "prod") == "prod"
+
+
+def test_get_pool_args(monkeypatch):
+    """Test the pool arguments of each profile and liveness mode."""
+    assert get_pool_args("sqlite://")["poolclass"] is StaticPool
+    assert get_pool_args("sqlite:///./upay.db")["pool_pre_ping"] is False
+
+    monkeypatch.setattr(settings, "connection_pool_size", 20)
+    prod = get_pool_args("postgresql://localhost/upay", "prod")
+    assert prod["pool_size"] == 20
+    assert prod["pool_pre_ping"] is False
+    assert get_pool_args("postgresql://localhost/upay", "dev")["pool_pre_ping"] is True
+
+    monkeypatch.setattr(settings, "db_liveness", "pre_ping")
+    assert get_pool_args("postgresql://localhost/upay", "prod")["pool_pre_ping"] is True
+
+    with pytest.raises(ValueError):
+        get_pool_args("sqlite://", liveness="always")
+
+
+@pytest.mark.parametrize(
+    "liveness,idle_seconds,pings",
+    [("none", 0, 0), ("pre_ping", 0, 2), ("idle", 3600, 0), ("idle", 0, 2)],
+)
+def test_liveness_pings(traced_engine, liveness, idle_seconds, pings):
+    """Test how many checkouts of a pooled connection are pinged."""
+    engine, statements = traced_engine(liveness, idle_seconds)
+    for _ in range(3):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 2"))
+
+    assert statements.count("SELECT 2") == 3
+    assert statements.count("SELECT 1") == pings
+
+
+def test_idle_liveness_replaces_dead_connection(traced_engine):
+    """Test that a dead idle connection is replaced on checkout."""
+    engine, _ = traced_engine("idle", 0)
+    with engine.connect() as connection:
+        dead = connection.connection.dbapi_connection
+    dead.close()
+
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT 2")).scalar_one() == 2
+        assert connection.connection.dbapi_connection is not dead
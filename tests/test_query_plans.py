@@ -0,0 +1,333 @@
+"""Query plan regression tests for the transaction repositories.
+
+Each case runs a repository method against a seeded table, captures the SQL
+it emits and checks the database's plan for every SELECT: rows must be found
+through an index and returned in index order, without a full table scan or a
+sort step.
+
+The tests run on SQLite. Set TEST_POSTGRES_URL to a scratch PostgreSQL
+database to check the same queries with PostgreSQL's planner as well.
+"""
+
+import json
+import os
+import re
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Callable, List, Tuple
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from upayapi.database import Base
+from upayapi.repositories.rollup import RollupRepository
+from upayapi.repositories.transaction import TransactionRepository
+
+# Number of transactions seeded before checking plans
+SEED_ROWS = 20000
+
+# First payment date of the seeded transactions
+FIRST_DATE = date(2025, 1, 1)
+
+
+def seed(session_factory: Callable[[], Session]) -> None:
+    """Seed transactions spread over a year of payment dates.
+
+    Args:
+        session_factory: Factory for database sessions.
+    """
+    with session_factory() as db:
+        repository = TransactionRepository(db)
+        for start in range(0, SEED_ROWS, 5000):
+            repository.import_transactions(
+                [
+                    {
+                        "tpg_trans_id": f"seed-{i}",
+                        "session_identifier": f"session-{i}",
+                        "pmt_status": "cancelled" if i % 10 == 0 else "success",
+                        "pmt_amt": Decimal(i % 500 + 1),
+                        "pmt_date": FIRST_DATE + timedelta(days=i % 365),
+                        "name_on_acct": "John Doe",
+                    }
+                    for i in range(start, start + 5000)
+                ]
+            )
+
+
+def cursor_after(db: Session, **kwargs: Any) -> str:
+    """Get the cursor of the second page of a transaction listing.
+
+    Args:
+        db: Database session.
+        **kwargs: Arguments for get_transactions.
+
+    Returns:
+        Cursor of the second page.
+    """
+    return TransactionRepository(db).get_transactions(limit=50, **kwargs)["next_cursor"]
+
+
+# Repository calls whose queries must be served by an index. Sorting by
+# pmt_amt is deliberately absent: it is an ad hoc reporting option and an
+# index for it would slow every posting.
+CASES: List[Tuple[str, Callable[[Session], Any]]] = [
+    (
+        "list default",
+        lambda db: TransactionRepository(db).get_transactions(limit=50),
+    ),
+    (
+        "list next page",
+        lambda db: TransactionRepository(db).get_transactions(
+            limit=50, cursor=cursor_after(db)
+        ),
+    ),
+    (
+        "list by status",
+        lambda db: TransactionRepository(db).get_transactions(
+            limit=50, pmt_status="cancelled"
+        ),
+    ),
+    (
+        "list by status and date range, next page",
+        lambda db: TransactionRepository(db).get_transactions(
+            limit=50,
+            pmt_status="success",
+            start_date=date(2025, 3, 1),
+            end_date=date(2025, 3, 31),
+            cursor=cursor_after(
+                db,
+                pmt_status="success",
+                start_date=date(2025, 3, 1),
+                end_date=date(2025, 3, 31),
+            ),
+        ),
+    ),
+    (
+        "list by date range ascending",
+        lambda db: TransactionRepository(db).get_transactions(
+            limit=50,
+            sort_order="asc",
+            start_date=date(2025, 6, 1),
+            end_date=date(2025, 6, 30),
+        ),
+    ),
+    (
+        "list by creation time",
+        lambda db: TransactionRepository(db).get_transactions(
+            limit=50,
+            sort_by="created_at",
+            cursor=cursor_after(db, sort_by="created_at"),
+        ),
+    ),
+    (
+        "list by id",
+        lambda db: TransactionRepository(db).get_transactions(
+            limit=50,
+            sort_by="id",
+            sort_order="asc",
+            cursor=cursor_after(db, sort_by="id", sort_order="asc"),
+        ),
+    ),
+    (
+        "count by status and date range",
+        lambda db: TransactionRepository(db).get_transactions(
+            limit=1,
+            pmt_status="success",
+            start_date=date(2025, 3, 1),
+            end_date=date(2025, 3, 31),
+            include_total=True,
+        ),
+    ),
+    (
+        "export date range",
+        lambda db: list(
+            TransactionRepository(db).stream_transactions(
+                start_date=date(2025, 3, 1), end_date=date(2025, 3, 31)
+            )
+        ),
+    ),
+    (
+        "export by status",
+        lambda db: list(
+            TransactionRepository(db).stream_transactions(pmt_status="cancelled")
+        ),
+    ),
+    (
+        "lookup by tpg_trans_id",
+        lambda db: TransactionRepository(db).get_by_tpg_trans_id("seed-42"),
+    ),
+    (
+        "duplicate posting",
+        lambda db: TransactionRepository(db).create_transactions_if_absent(
+            [
+                {
+                    "tpg_trans_id": "seed-42",
+                    "session_identifier": "session-42",
+                    "pmt_status": "success",
+                    "pmt_amt": Decimal("43.00"),
+                    "pmt_date": FIRST_DATE + timedelta(days=42),
+                    "name_on_acct": "John Doe",
+                }
+            ]
+        ),
+    ),
+    (
+        "daily report",
+        lambda db: RollupRepository(db).get_daily(
+            start_date=date(2025, 3, 1), end_date=date(2025, 3, 31)
+        ),
+    ),
+]
+
+
+def capture_selects(
+    session_factory: Callable[[], Session], call: Callable[[Session], Any]
+) -> List[Tuple[str, Any]]:
+    """Run a repository call and capture the SELECT statements it executes.
+
+    Args:
+        session_factory: Factory for database sessions.
+        call: Repository call to run.
+
+    Returns:
+        SQL and parameters of each SELECT statement.
+    """
+    statements: List[Tuple[str, Any]] = []
+    engine = session_factory.kw["bind"]
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        with session_factory() as db:
+            call(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return statements
+
+
+def sqlite_plan_problems(connection, statement: str, parameters: Any) -> List[str]:
+    """Find full scans and sort steps in a SQLite query plan.
+
+    Args:
+        connection: Database connection.
+        statement: SQL of the query.
+        parameters: Parameters of the query.
+
+    Returns:
+        Offending plan lines.
+    """
+    plan = [
+        row[3]
+        for row in connection.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statement}", parameters
+        )
+    ]
+    # A bare SCAN walks the table's rowid B-tree, which is only acceptable
+    # for unfiltered queries that read it in primary key order
+    filtered = re.search(r"\bWHERE\b", statement, re.IGNORECASE) is not None
+    return [
+        line
+        for line in plan
+        if (filtered and re.fullmatch(r"SCAN \w+", line)) or "TEMP B-TREE" in line
+    ]
+
+
+def postgres_plan_problems(connection, statement: str, parameters: Any) -> List[str]:
+    """Find sequential scans and sort steps in a PostgreSQL query plan.
+
+    Args:
+        connection: Database connection.
+        statement: SQL of the query.
+        parameters: Parameters of the query.
+
+    Returns:
+        Offending plan node types.
+    """
+    plan = connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {statement}", parameters
+    ).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    problems: List[str] = []
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if node["Node Type"] in ("Seq Scan", "Sort", "Incremental Sort"):
+            problems.append(f"{node['Node Type']} on {node.get('Relation Name', '?')}")
+        nodes.extend(node.get("Plans", []))
+    return problems
+
+
+@pytest.fixture(scope="module")
+def sqlite_sessions(tmp_path_factory):
+    """Create a seeded, analyzed SQLite database.
+
+    Yields:
+        Session factory.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    seed(session_factory)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("ANALYZE")
+    yield session_factory
+    engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def postgres_sessions():
+    """Create seeded, analyzed tables in the TEST_POSTGRES_URL database.
+
+    Yields:
+        Session factory.
+    """
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+
+    engine = create_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    seed(session_factory)
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE transactions"))
+        connection.execute(text("ANALYZE transaction_daily_rollup"))
+    yield session_factory
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+@pytest.mark.parametrize("name,call", CASES, ids=[name for name, _ in CASES])
+def test_sqlite_query_plans(sqlite_sessions, name, call):
+    """Test that repository queries use an index without sorting on SQLite."""
+    statements = capture_selects(sqlite_sessions, call)
+    assert statements
+
+    with sqlite_sessions.kw["bind"].connect() as connection:
+        for statement, parameters in statements:
+            assert sqlite_plan_problems(connection, statement, parameters) == [], (
+                statement
+            )
+
+
+@pytest.mark.parametrize("name,call", CASES, ids=[name for name, _ in CASES])
+def test_postgres_query_plans(postgres_sessions, name, call):
+    """Test that repository queries use an index without sorting on PostgreSQL."""
+    statements = capture_selects(postgres_sessions, call)
+    assert statements
+
+    with postgres_sessions.kw["bind"].connect() as connection:
+        # Sequential scans are only chosen when no index can serve the
+        # query, rather than because the seeded table is small
+        connection.execute(text("SET enable_seqscan = off"))
+        for statement, parameters in statements:
+            assert postgres_plan_problems(connection, statement, parameters) == [], (
+                statement
+            )
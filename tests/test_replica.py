@@ -0,0 +1,184 @@
+"""Tests for read replica routing."""
+
+import time
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from upayapi import database
+from upayapi.config import settings
+from upayapi.database import Base, dispose_engines
+from upayapi.main import create_app
+from upayapi.models.transaction import Transaction
+from upayapi.replica import (
+    ReplicaRouter,
+    RoutingSession,
+    configure_replica,
+    replica_router,
+)
+from upayapi.repositories.transaction import TransactionRepository
+
+
+def add_transaction(engine, tpg_trans_id):
+    """Store a transaction directly in one database.
+
+    Args:
+        engine: Engine of the database.
+        tpg_trans_id: Transaction reference number.
+    """
+    with Session(engine) as db:
+        TransactionRepository(db).create_transaction(
+            tpg_trans_id=tpg_trans_id,
+            session_identifier="session123",
+            pmt_status="success",
+            pmt_amt=Decimal("10.00"),
+            pmt_date=date(2025, 1, 1),
+            name_on_acct="John Doe",
+        )
+
+
+@pytest.fixture
+def databases(tmp_path):
+    """Create a primary and a replica SQLite database with different rows.
+
+    Yields:
+        URLs of the primary and the replica.
+    """
+    urls = []
+    for name in ("primary", "replica"):
+        url = f"sqlite:///{tmp_path / name}.db"
+        engine = create_engine(url)
+        Base.metadata.create_all(bind=engine)
+        add_transaction(engine, f"{name}-1")
+        engine.dispose()
+        urls.append(url)
+    yield urls
+
+
+def stored_ids(db):
+    """Get the tpg_trans_ids a session reads.
+
+    Args:
+        db: Database session.
+
+    Returns:
+        Sorted tpg_trans_ids.
+    """
+    return sorted(t.tpg_trans_id for t in TransactionRepository(db).get_all())
+
+
+def test_routing_session(databases):
+    """Test that reads follow the router and writes go to the primary."""
+    primary, replica = (create_engine(url) for url in databases)
+    router = ReplicaRouter(max_lag=5, retry_after=60)
+    session = RoutingSession(
+        replica=replica, primary=primary, primary_read=primary, router=router
+    )
+
+    with session:
+        assert stored_ids(session) == ["replica-1"]
+        session.add(
+            Transaction(
+                tpg_trans_id="new-1",
+                session_identifier="session123",
+                pmt_status="SUCCESS",
+                pmt_amt=Decimal("10.00"),
+                pmt_date=date(2025, 1, 1),
+                name_on_acct="John Doe",
+            )
+        )
+        session.commit()
+        assert stored_ids(session) == ["replica-1"]
+
+    # Too much lag reads from the primary
+    router.lag = 10
+    with session:
+        assert stored_ids(session) == ["new-1", "primary-1"]
+
+    # So does a recent replica error
+    router.lag = 0
+    router.record_failure("down")
+    with session:
+        assert stored_ids(session) == ["new-1", "primary-1"]
+
+    # Until retry_after has passed
+    router.failed_at = time.monotonic() - 61
+    with session:
+        assert stored_ids(session) == ["replica-1"]
+
+    primary.dispose()
+    replica.dispose()
+
+
+def test_replica_errors_route_to_primary(tmp_path):
+    """Test that checks and connection errors mark the replica unavailable."""
+    router = ReplicaRouter(max_lag=5, retry_after=60)
+    engine = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    configure_replica(engine, router)
+
+    with pytest.raises(OperationalError):
+        engine.connect()
+    assert not router.available()
+
+    router.failed_at = None
+    assert router.check(engine)["status"] == "unhealthy"
+    assert not router.available()
+
+    # A successful check makes the replica available again
+    healthy = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    assert router.check(healthy) == {
+        "status": "healthy",
+        "lag_seconds": 0.0,
+        "routing": "replica",
+    }
+    assert router.available()
+    healthy.dispose()
+
+
+def test_reporting_reads_replica(databases, monkeypatch):
+    """Test that reporting requests read the replica and postings the primary."""
+    primary_url, replica_url = databases
+    monkeypatch.setattr(settings, "database_url", primary_url)
+    monkeypatch.setattr(settings, "replica_database_url", replica_url)
+    monkeypatch.setattr(settings, "sqlite_single_writer", False)
+    monkeypatch.setattr(settings, "posting_key", "test_key")
+    monkeypatch.setattr(settings, "reporting_key", "report_key")
+    monkeypatch.setattr(replica_router, "lag", None)
+    monkeypatch.setattr(replica_router, "failed_at", None)
+    dispose_engines()
+
+    def listed(client):
+        response = client.get(
+            "/upay/transactions", headers={"X-Reporting-Key": "report_key"}
+        )
+        return sorted(item["tpg_trans_id"] for item in response.json()["items"])
+
+    with TestClient(create_app()) as client:
+        report = client.get("/health").json()
+        assert report["replica"]["routing"] == "replica"
+        assert "replica" in report["pool"]
+
+        response = client.post(
+            "/upay/posting",
+            data={
+                "posting_key": "test_key",
+                "tpg_trans_id": "posted-1",
+                "session_identifier": "session123",
+                "pmt_status": "success",
+                "pmt_amt": "100.00",
+                "pmt_date": "01/01/2025",
+                "name_on_acct": "John Doe",
+            },
+        )
+        assert response.status_code == 200
+        assert listed(client) == ["replica-1"]
+
+        replica_router.record_failure("down")
+        assert listed(client) == ["posted-1", "primary-1"]
+
+    assert database._replica_engine is None
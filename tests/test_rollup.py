@@ -0,0 +1,175 @@
+"""Tests for the daily transaction rollup."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from upayapi.database import Base
+from upayapi.models.schemas import PaymentStatus
+from upayapi.repositories import rollup as rollup_module
+from upayapi.repositories import transaction as transaction_module
+from upayapi.repositories.rollup import RollupRepository
+from upayapi.repositories.transaction import TransactionRepository
+
+
+@pytest.fixture(scope="function")
+def session_factory(tmp_path):
+    """Create a session factory for a file-backed SQLite test database.
+
+    Yields:
+        Session factory.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'rollup.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+def transaction_fields(
+    tpg_trans_id: str, pmt_amt: str, day: int = 1, pmt_status: str = "success"
+) -> dict:
+    """Get repository arguments for a test transaction.
+
+    Args:
+        tpg_trans_id: Transaction reference number.
+        pmt_amt: Transaction amount.
+        day: Day of January 2025 the payment was made.
+        pmt_status: Transaction status.
+
+    Returns:
+        Keyword arguments for create_transaction_if_absent.
+    """
+    return {
+        "tpg_trans_id": tpg_trans_id,
+        "session_identifier": "session123",
+        "pmt_status": pmt_status,
+        "pmt_amt": Decimal(pmt_amt),
+        "pmt_date": date(2025, 1, day),
+        "name_on_acct": "John Doe",
+    }
+
+
+def rollup_totals(db) -> dict:
+    """Get the rollup rows keyed by payment date and status.
+
+    Args:
+        db: Database session.
+
+    Returns:
+        Dictionary mapping (pmt_date, pmt_status) to (count, total, min, max).
+    """
+    return {
+        (row.pmt_date, row.pmt_status): (
+            row.txn_count,
+            row.total_amt,
+            row.min_amt,
+            row.max_amt,
+        )
+        for row in RollupRepository(db).get_daily()
+    }
+
+
+def populate(db) -> None:
+    """Store test transactions through every insert path.
+
+    Args:
+        db: Database session.
+    """
+    repository = TransactionRepository(db)
+    repository.create_transaction(**transaction_fields("1", "10.00"))
+    repository.create_transaction_if_absent(**transaction_fields("2", "2.50"))
+    repository.create_transaction_if_absent(**transaction_fields("2", "2.50"))
+    repository.create_transactions_if_absent(
+        [
+            transaction_fields("3", "40.00"),
+            transaction_fields("4", "5.00", pmt_status="cancelled"),
+            transaction_fields("3", "40.00"),
+        ]
+    )
+    repository.import_transactions(
+        [transaction_fields("1", "10.00"), transaction_fields("5", "7.25", day=2)]
+    )
+
+
+EXPECTED = {
+    (date(2025, 1, 1), PaymentStatus.SUCCESS): (
+        3,
+        Decimal("52.50"),
+        Decimal("2.50"),
+        Decimal("40.00"),
+    ),
+    (date(2025, 1, 1), PaymentStatus.CANCELLED): (
+        1,
+        Decimal("5.00"),
+        Decimal("5.00"),
+        Decimal("5.00"),
+    ),
+    (date(2025, 1, 2), PaymentStatus.SUCCESS): (
+        1,
+        Decimal("7.25"),
+        Decimal("7.25"),
+        Decimal("7.25"),
+    ),
+}
+
+
+def test_rollup_deltas_streamed():
+    """Test that deltas are aggregated from a stream of rows."""
+    rows = (
+        transaction_fields(str(i), amount, day=1 + i % 2)
+        for i, amount in enumerate(["5.00", "7.50", "1.25", "9.00", "3.00"])
+    )
+    assert rollup_module.rollup_deltas(rows) == [
+        {
+            "pmt_date": date(2025, 1, 1),
+            "pmt_status": PaymentStatus.SUCCESS,
+            "txn_count": 3,
+            "total_amt": Decimal("9.25"),
+            "min_amt": Decimal("1.25"),
+            "max_amt": Decimal("5.00"),
+        },
+        {
+            "pmt_date": date(2025, 1, 2),
+            "pmt_status": PaymentStatus.SUCCESS,
+            "txn_count": 2,
+            "total_amt": Decimal("16.50"),
+            "min_amt": Decimal("7.50"),
+            "max_amt": Decimal("9.00"),
+        },
+    ]
+
+
+def test_rollup_updated_on_insert(session_factory):
+    """Test that every insert path updates the rollup exactly once per transaction."""
+    with session_factory() as db:
+        populate(db)
+        assert rollup_totals(db) == EXPECTED
+
+
+def test_rollup_updated_without_upsert(session_factory, monkeypatch):
+    """Test the update-then-insert fallback for dialects without ON CONFLICT."""
+    monkeypatch.setattr(rollup_module, "rollup_upsert_statement", lambda dialect: None)
+    monkeypatch.setattr(
+        transaction_module, "claim_keys_statement", lambda dialect: None
+    )
+    with session_factory() as db:
+        populate(db)
+        assert rollup_totals(db) == EXPECTED
+
+
+def test_rollup_rebuild(session_factory):
+    """Test that a rebuild recomputes the rollup from the transactions table."""
+    with session_factory() as db:
+        populate(db)
+        db.query(rollup_module.TransactionDailyRollup).delete()
+        db.commit()
+        assert rollup_totals(db) == {}
+
+        assert RollupRepository(db).rebuild(end_date=date(2025, 1, 1)) == 2
+        assert len(rollup_totals(db)) == 2
+
+        assert RollupRepository(db).rebuild() == 3
+        assert rollup_totals(db) == EXPECTED
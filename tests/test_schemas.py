@@ -0,0 +1,59 @@
+"""Tests for the request schemas."""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from pydantic import ValidationError
+
+from upayapi.models.schemas import TransactionRequest, parse_payment_date
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "01/15/2025",
+        "1/5/2025",
+        "12/31/1999",
+        "02/29/2024",
+        "02/29/2025",
+        "13/01/2025",
+        "01/15/25",
+        "001/15/2025",
+        "01-15-2025",
+        "01/15/2025 ",
+        "+1/15/2025",
+        "０1/15/2025",
+        "",
+    ],
+)
+def test_parse_payment_date_matches_strptime(value):
+    """Test that the date parser accepts exactly what strptime accepts."""
+    try:
+        expected = datetime.strptime(value, "%m/%d/%Y").date()
+    except ValueError:
+        with pytest.raises(ValueError):
+            parse_payment_date(value)
+    else:
+        assert parse_payment_date(value) == expected
+
+
+def test_transaction_request_typed_fields():
+    """Test that the amount and date are parsed into typed values."""
+    fields = {
+        "posting_key": "key",
+        "tpg_trans_id": "12345",
+        "session_identifier": "session123",
+        "pmt_status": "success",
+        "pmt_amt": "100.50",
+        "pmt_date": "01/15/2025",
+        "name_on_acct": "John Doe",
+    }
+    request = TransactionRequest.model_validate(fields)
+    assert request.pmt_amt == Decimal("100.50")
+    assert request.pmt_date == date(2025, 1, 15)
+
+    with pytest.raises(ValidationError, match="payment date"):
+        TransactionRequest.model_validate({**fields, "pmt_date": "2025-01-15"})
+    with pytest.raises(ValidationError, match="payment amount"):
+        TransactionRequest.model_validate({**fields, "pmt_amt": "100000"})
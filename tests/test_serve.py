@@ -0,0 +1,31 @@
+"""Tests for the production server command."""
+
+from upayapi.cli import serve
+from upayapi.config import settings
+
+
+def test_check_schema(tmp_path):
+    """Test that a new database is behind head until it is upgraded."""
+    database_url = f"sqlite:///{tmp_path / 'upay.db'}"
+
+    current, heads = serve.check_schema(database_url)
+    assert current == set()
+    assert heads
+
+    assert serve.check_schema(database_url, upgrade=True) == (heads, heads)
+    assert serve.check_schema(database_url) == (heads, heads)
+
+
+def test_refuses_to_start_behind_head(tmp_path, monkeypatch):
+    """Test that the server does not start workers on an outdated schema."""
+    monkeypatch.setattr(settings, "database_url", f"sqlite:///{tmp_path / 'upay.db'}")
+    started = []
+    monkeypatch.setattr(
+        serve.uvicorn, "run", lambda *args, **kwargs: started.append(kwargs)
+    )
+
+    assert serve.main(["--workers", "2"]) == 1
+    assert started == []
+
+    assert serve.main(["--workers", "2", "--upgrade"]) == 0
+    assert started[0]["workers"] == 2
@@ -0,0 +1,97 @@
+"""Tests for the site registry."""
+
+import hashlib
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from upayapi import sites
+from upayapi.config import settings
+from upayapi.database import Base
+from upayapi.models.site import Site
+from upayapi.sites import (
+    SiteRegistry,
+    hash_posting_key,
+    load_site_registry,
+    parse_key_digest,
+    resolve_site,
+)
+
+
+def test_parse_key_digest():
+    """Test that configured keys may be given as keys or SHA-256 digests."""
+    digest = hashlib.sha256(b"parking_key").digest()
+    assert parse_key_digest("parking_key") == digest
+    assert parse_key_digest(f"sha256:{digest.hex()}") == digest
+
+    with pytest.raises(ValueError):
+        parse_key_digest("sha256:abc")
+    with pytest.raises(ValueError):
+        parse_key_digest("")
+
+
+def test_registry_lookup():
+    """Test that posting keys are mapped to their sites."""
+    registry = SiteRegistry()
+    registry.load(
+        [
+            ("parking", hash_posting_key("parking_key")),
+            ("parking", hash_posting_key("parking_key_2")),
+            ("housing", hash_posting_key("housing_key")),
+        ]
+    )
+    assert len(registry) == 3
+    assert registry.lookup("parking_key") == "parking"
+    assert registry.lookup("parking_key_2") == "parking"
+    assert registry.lookup("housing_key") == "housing"
+    assert registry.lookup("parking_keyX") is None
+
+    # Two sites with one key would make postings ambiguous
+    with pytest.raises(ValueError):
+        registry.load(
+            [
+                ("parking", hash_posting_key("shared")),
+                ("housing", hash_posting_key("shared")),
+            ]
+        )
+    assert registry.lookup("parking_key") == "parking"
+
+
+def test_load_site_registry(monkeypatch):
+    """Test that configured sites and active stored sites are registered."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as db:
+        db.add_all(
+            [
+                Site(
+                    site_id="housing",
+                    posting_key_sha256=hash_posting_key("housing_key").hex(),
+                ),
+                Site(
+                    site_id="closed",
+                    posting_key_sha256=hash_posting_key("closed_key").hex(),
+                    active=False,
+                ),
+            ]
+        )
+        db.commit()
+
+    registry = SiteRegistry()
+    monkeypatch.setattr(sites, "site_registry", registry)
+    monkeypatch.setattr(settings, "posting_sites", {"parking": "parking_key"})
+    monkeypatch.setattr(settings, "posting_key", "legacy_key")
+
+    assert load_site_registry(session_factory) == 2
+    assert resolve_site("parking_key") == "parking"
+    assert resolve_site("housing_key") == "housing"
+    assert resolve_site("closed_key") is None
+    assert resolve_site("legacy_key") == settings.default_site_id
+
+    # Configured sites still load when the sites table is missing
+    Base.metadata.drop_all(bind=engine)
+    assert load_site_registry(session_factory) == 1
+    assert resolve_site("parking_key") == "parking"
+    engine.dispose()
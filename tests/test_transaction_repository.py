@@ -0,0 +1,200 @@
+"""Tests for the transaction repository."""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from upayapi.database import Base
+from upayapi.repositories import transaction as transaction_module
+from upayapi.repositories.transaction import TransactionRepository
+
+
+@pytest.fixture(scope="function")
+def session_factory(tmp_path):
+    """Create a session factory for a file-backed SQLite test database.
+
+    Yields:
+        Session factory.
+    """
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'repository.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+def transaction_fields(tpg_trans_id: str) -> dict:
+    """Get repository arguments for a test transaction.
+
+    Args:
+        tpg_trans_id: Transaction reference number.
+
+    Returns:
+        Keyword arguments for create_transaction_if_absent.
+    """
+    return {
+        "tpg_trans_id": tpg_trans_id,
+        "session_identifier": "session123",
+        "pmt_status": "success",
+        "pmt_amt": Decimal("100.00"),
+        "pmt_date": date(2025, 1, 1),
+        "name_on_acct": "John Doe",
+    }
+
+
+def test_create_transaction_if_absent(session_factory):
+    """Test that a duplicate insert returns the existing transaction."""
+    with session_factory() as db:
+        repository = TransactionRepository(db)
+        first = repository.create_transaction_if_absent(**transaction_fields("12345"))
+        second = repository.create_transaction_if_absent(**transaction_fields("12345"))
+
+        assert first.created is True
+        assert first.created_at is not None
+        assert second.created is False
+        assert second.id == first.id
+        assert repository.count() == 1
+
+
+def test_create_transaction_if_absent_fallback(session_factory, monkeypatch):
+    """Test the savepoint fallback for dialects without ON CONFLICT support."""
+    monkeypatch.setattr(
+        transaction_module, "claim_keys_statement", lambda dialect: None
+    )
+    with session_factory() as db:
+        repository = TransactionRepository(db)
+        first = repository.create_transaction_if_absent(**transaction_fields("12345"))
+        second = repository.create_transaction_if_absent(**transaction_fields("12345"))
+
+        assert first.created is True
+        assert second.created is False
+        assert second.id == first.id
+
+
+@pytest.mark.parametrize("on_conflict", [True, False])
+def test_create_transaction_if_absent_other_date(
+    session_factory, monkeypatch, on_conflict
+):
+    """Test that a retry with another payment date is still a duplicate."""
+    if not on_conflict:
+        monkeypatch.setattr(
+            transaction_module, "claim_keys_statement", lambda dialect: None
+        )
+    with session_factory() as db:
+        repository = TransactionRepository(db)
+        first = repository.create_transaction_if_absent(**transaction_fields("12345"))
+        retry = {**transaction_fields("12345"), "pmt_date": date(2025, 2, 1)}
+        second = repository.create_transaction_if_absent(**retry)
+
+        assert second.created is False
+        assert second.id == first.id
+        assert repository.import_transactions([retry]) == 0
+        assert repository.count() == 1
+
+
+def test_create_transaction_if_absent_concurrent(session_factory):
+    """Test that concurrent retries of one posting store a single transaction."""
+
+    def post(_):
+        with session_factory() as db:
+            return TransactionRepository(db).create_transaction_if_absent(
+                **transaction_fields("retry")
+            )
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(post, range(16)))
+
+    assert sum(result.created for result in results) == 1
+    assert len({result.id for result in results}) == 1
+
+
+def test_get_transactions_keyset_pages(session_factory):
+    """Test that cursor pages cover every transaction exactly once."""
+    with session_factory() as db:
+        repository = TransactionRepository(db)
+        repository.import_transactions(
+            [
+                {**transaction_fields(f"txn-{i}"), "pmt_date": date(2025, 1, 1 + i % 3)}
+                for i in range(10)
+            ]
+        )
+
+        seen = []
+        cursor = None
+        while True:
+            page = repository.get_transactions(
+                limit=4, cursor=cursor, include_total=False
+            )
+            seen.extend(page["items"])
+            cursor = page["next_cursor"]
+            assert page["total"] is None
+            if cursor is None:
+                assert page["has_more"] is False
+                break
+
+        assert len(seen) == 10
+        assert len({item.id for item in seen}) == 10
+        keys = [(item.pmt_date, item.id) for item in seen]
+        assert keys == sorted(keys, reverse=True)
+
+
+def test_get_transactions_invalid_cursor(session_factory):
+    """Test that a malformed cursor is rejected."""
+    with session_factory() as db:
+        with pytest.raises(ValueError):
+            TransactionRepository(db).get_transactions(limit=10, cursor="not-a-cursor")
+
+
+def test_get_transactions_cursor_sort_mismatch(session_factory):
+    """Test that a cursor is rejected for another sort field or order."""
+    with session_factory() as db:
+        repository = TransactionRepository(db)
+        repository.import_transactions(
+            [transaction_fields(f"txn-{i}") for i in range(3)]
+        )
+        cursor = repository.get_transactions(limit=1)["next_cursor"]
+
+        with pytest.raises(ValueError):
+            repository.get_transactions(limit=1, cursor=cursor, sort_by="created_at")
+        with pytest.raises(ValueError):
+            repository.get_transactions(limit=1, cursor=cursor, sort_order="asc")
+
+
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+def test_get_transactions_keyset_pages_null_sort_keys(session_factory, sort_order):
+    """Test that cursor pages over a nullable column keep NULL rows."""
+    with session_factory() as db:
+        repository = TransactionRepository(db)
+        repository.import_transactions(
+            [
+                {
+                    **transaction_fields(f"txn-{i}"),
+                    "site_id": None if i % 2 else f"site-{i % 3}",
+                }
+                for i in range(10)
+            ]
+        )
+
+        seen = []
+        cursor = None
+        while True:
+            page = repository.get_transactions(
+                limit=3, cursor=cursor, sort_by="site_id", sort_order=sort_order
+            )
+            seen.extend(page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert len({item.id for item in seen}) == 10
+        # NULL sort keys come before every site in ascending order
+        keys = [
+            (item.site_id is not None, item.site_id or "", item.id) for item in seen
+        ]
+        assert keys == sorted(keys, reverse=sort_order == "desc")
@@ -1,13 +1,24 @@
 """Tests for the uPay API endpoints."""
 
+import csv
+import io
+import json
+import time
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from upayapi.database import Base, get_db
+from upayapi import admission, sites
+from upayapi.admission import POSTING, AdmissionController
+from upayapi.cache import idempotency_cache
+from upayapi.database import Base, get_db, get_read_db
+from upayapi.health import health_prober
 from upayapi.main import app
+from upayapi.metrics import POSTINGS
+from upayapi.sites import SiteRegistry, hash_posting_key
 from upayapi.config import settings
 
 
@@ -36,6 +47,7 @@ def override_get_db():
 
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
 
 # Create test client
 client = TestClient(app)
@@ -53,6 +65,7 @@ def test_db():
     yield
     # Drop tables
     Base.metadata.drop_all(bind=engine)
+    idempotency_cache.clear()
 
 
 def test_root():
@@ -73,12 +86,99 @@ def test_health():
     assert "database" in response_data
 
 
+def test_health_probes(monkeypatch):
+    """Test that the liveness and readiness endpoints serve cached state."""
+    response = client.get("/health/live")
+    assert response.status_code == 200
+    assert response.json() == {"status": "alive"}
+
+    # Not ready before the first probe
+    monkeypatch.setattr(health_prober, "report", None)
+    monkeypatch.setattr(health_prober, "body", b"")
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json() == {"status": "starting"}
+
+    # /health probes when there is no recent result
+    assert client.get("/health").status_code == 200
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    report = response.json()
+    assert report["status"] == "healthy"
+    assert report["database"]["latency_ms"] >= 0
+    assert report["pool"]["write"]["size"] >= 1
+
+    # Recent results are served without probing again
+    monkeypatch.setattr(health_prober, "probe", lambda: pytest.fail("probed"))
+    assert client.get("/health").json() == report
+
+    # Stale results are not ready
+    monkeypatch.setattr(
+        health_prober, "checked_at", time.monotonic() - health_prober.stale_after - 1
+    )
+    assert client.get("/health/ready").status_code == 503
+
+
+def test_request_context_headers():
+    """Test that responses carry a unique request ID and server timing."""
+    first = client.get("/")
+    second = client.get("/")
+    assert first.headers["X-Request-ID"] != second.headers["X-Request-ID"]
+    assert first.headers["Server-Timing"].startswith("app;dur=")
+
+    response = client.post("/upay/posting")
+    assert response.json()["request_id"] == response.headers["X-Request-ID"]
+
+
 def test_upay_posting_missing_params():
     """Test the upay posting endpoint with missing parameters."""
     response = client.post("/upay/posting")
     assert response.status_code == 422  # Unprocessable Entity
 
 
+def test_upay_posting_missing_field_errors():
+    """Test that each missing or empty posting field is reported."""
+    response = client.post(
+        "/upay/posting",
+        data={"posting_key": "test_key", "tpg_trans_id": "12345", "name_on_acct": ""},
+    )
+    assert response.status_code == 422
+    errors = response.json()["detail"]["params"]["errors"]
+    assert [error["loc"][1] for error in errors] == [
+        "session_identifier",
+        "pmt_status",
+        "pmt_amt",
+        "pmt_date",
+        "name_on_acct",
+    ]
+
+
+def test_upay_posting_extra_fields_and_multipart(test_db, monkeypatch):
+    """Test that unknown uPay fields are ignored and multipart bodies accepted."""
+    monkeypatch.setattr(settings, "posting_key", "test_key")
+    data = {
+        "posting_key": "test_key",
+        "session_identifier": "session123",
+        "pmt_status": "success",
+        "pmt_amt": "100.00",
+        "pmt_date": "01/01/2025",
+        "name_on_acct": "José Núñez & Co",
+        "sys_tracking_id": "abc",
+        "card_type": "VISA",
+    }
+
+    response = client.post("/upay/posting", data={**data, "tpg_trans_id": "form"})
+    assert response.status_code == 200
+
+    response = client.post(
+        "/upay/posting",
+        data={**data, "tpg_trans_id": "multipart"},
+        files={"attachment": ("note.txt", b"ignored")},
+    )
+    assert response.status_code == 200
+    assert response.json()["success"] is True
+
+
 def test_upay_posting_invalid_key(test_db, monkeypatch):
     """Test the upay posting endpoint with an invalid posting key."""
     # Set a known posting key for testing
@@ -101,6 +201,72 @@ def test_upay_posting_invalid_key(test_db, monkeypatch):
     assert "Invalid posting key" in response.json()["detail"]
 
 
+def test_upay_posting_invalid_key_rejected_first(monkeypatch):
+    """Test that invalid keys are rejected before validation or a session."""
+    monkeypatch.setattr(settings, "posting_key", "test_key")
+
+    def no_session():
+        pytest.fail("database session opened for a rejected posting")
+        yield
+
+    monkeypatch.setitem(app.dependency_overrides, get_db, no_session)
+    before = POSTINGS.value("auth_fail")
+    response = client.post(
+        "/upay/posting",
+        data={
+            "posting_key": "test_keyX",
+            "tpg_trans_id": "12345",
+            "session_identifier": "session123",
+            "pmt_status": "unknown",
+            "pmt_amt": "not a number",
+            "pmt_date": "yesterday",
+            "name_on_acct": "John Doe",
+        },
+    )
+    assert response.status_code == 401
+    assert POSTINGS.value("auth_fail") - before == 1
+
+
+def test_upay_posting_sites(test_db, monkeypatch):
+    """Test that postings are stamped with the site of their posting key."""
+    registry = SiteRegistry()
+    registry.load(
+        [
+            ("parking", hash_posting_key("parking_key")),
+            ("housing", hash_posting_key("housing_key")),
+        ]
+    )
+    monkeypatch.setattr(sites, "site_registry", registry)
+    monkeypatch.setattr(settings, "posting_key", "test_key")
+    monkeypatch.setattr(settings, "reporting_key", "report_key")
+
+    for i, posting_key in enumerate(["parking_key", "housing_key", "test_key"]):
+        response = client.post(
+            "/upay/posting",
+            data={
+                "posting_key": posting_key,
+                "tpg_trans_id": f"site-{i}",
+                "session_identifier": "session123",
+                "pmt_status": "success",
+                "pmt_amt": "100.00",
+                "pmt_date": "01/01/2025",
+                "name_on_acct": "John Doe",
+            },
+        )
+        assert response.status_code == 200
+
+    response = client.get(
+        "/upay/transactions",
+        params={"sort_by": "id", "sort_order": "asc"},
+        headers={"X-Reporting-Key": "report_key"},
+    )
+    assert [item["site_id"] for item in response.json()["items"]] == [
+        "parking",
+        "housing",
+        settings.default_site_id,
+    ]
+
+
 def test_upay_posting_success(test_db, monkeypatch):
     """Test the upay posting endpoint with valid parameters."""
     # Set a known posting key for testing
@@ -139,3 +305,228 @@ def test_upay_posting_success(test_db, monkeypatch):
     assert response.status_code == 200
     assert response.json()["success"] is True
     assert "Transaction already processed" in response.json()["message"]
+
+
+def test_list_transactions(test_db, monkeypatch):
+    """Test paging through transactions with a cursor."""
+    monkeypatch.setattr(settings, "posting_key", "test_key")
+    monkeypatch.setattr(settings, "reporting_key", "report_key")
+    for i in range(5):
+        client.post(
+            "/upay/posting",
+            data={
+                "posting_key": "test_key",
+                "tpg_trans_id": f"list-{i}",
+                "session_identifier": "session123",
+                "pmt_status": "success",
+                "pmt_amt": "100.00",
+                "pmt_date": f"01/0{i + 1}/2025",
+                "name_on_acct": "John Doe",
+            },
+        )
+
+    headers = {"X-Reporting-Key": "report_key"}
+    response = client.get(
+        "/upay/transactions",
+        params={"limit": 3, "include_total": True},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    first_page = response.json()
+    assert first_page["total"] == 5
+    assert first_page["has_more"] is True
+    assert [item["tpg_trans_id"] for item in first_page["items"]] == [
+        "list-4",
+        "list-3",
+        "list-2",
+    ]
+
+    response = client.get(
+        "/upay/transactions",
+        params={"limit": 3, "cursor": first_page["next_cursor"]},
+        headers=headers,
+    )
+    second_page = response.json()
+    assert [item["tpg_trans_id"] for item in second_page["items"]] == [
+        "list-1",
+        "list-0",
+    ]
+    assert second_page["next_cursor"] is None
+    assert second_page["total"] is None
+
+    response = client.get(
+        "/upay/transactions", params={"cursor": "invalid"}, headers=headers
+    )
+    assert response.status_code == 422
+
+
+def test_list_transactions_requires_reporting_key(monkeypatch):
+    """Test that the reporting endpoints reject missing or invalid keys."""
+    monkeypatch.setattr(settings, "reporting_key", "report_key")
+    assert client.get("/upay/transactions").status_code == 401
+    response = client.get("/upay/transactions", headers={"X-Reporting-Key": "wrong"})
+    assert response.status_code == 401
+
+    monkeypatch.setattr(settings, "reporting_key", "")
+    response = client.get("/upay/transactions", headers={"X-Reporting-Key": ""})
+    assert response.status_code == 401
+
+
+def test_export_transactions(test_db, monkeypatch):
+    """Test streaming transactions as NDJSON, CSV and gzipped NDJSON."""
+    monkeypatch.setattr(settings, "posting_key", "test_key")
+    monkeypatch.setattr(settings, "reporting_key", "report_key")
+    for i, pmt_status in enumerate(["success", "cancelled", "success"]):
+        client.post(
+            "/upay/posting",
+            data={
+                "posting_key": "test_key",
+                "tpg_trans_id": f"export-{i}",
+                "session_identifier": "session123",
+                "pmt_status": pmt_status,
+                "pmt_amt": "100.00",
+                "pmt_date": f"01/0{i + 1}/2025",
+                "name_on_acct": "John Doe",
+            },
+        )
+
+    headers = {"X-Reporting-Key": "report_key"}
+    response = client.get(
+        "/upay/transactions/export",
+        params={"pmt_status": "success"},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["tpg_trans_id"] for row in rows] == ["export-0", "export-2"]
+    assert rows[0]["pmt_status"] == "success"
+    assert rows[0]["pmt_amt"] == "100.00"
+    assert rows[0]["pmt_date"] == "2025-01-01"
+
+    response = client.get(
+        "/upay/transactions/export",
+        params={"format": "csv", "start_date": "2025-01-02"},
+        headers=headers,
+    )
+    assert response.headers["content-type"].startswith("text/csv")
+    records = list(csv.DictReader(io.StringIO(response.text)))
+    assert [record["tpg_trans_id"] for record in records] == ["export-1", "export-2"]
+
+    # httpx transparently decodes the gzip Content-Encoding
+    response = client.get(
+        "/upay/transactions/export", params={"gzip": True}, headers=headers
+    )
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.text.splitlines()) == 3
+
+    assert client.get("/upay/transactions/export").status_code == 401
+
+
+def test_daily_report(test_db, monkeypatch):
+    """Test that postings are totalled per day in the daily report."""
+    monkeypatch.setattr(settings, "posting_key", "test_key")
+    monkeypatch.setattr(settings, "reporting_key", "report_key")
+    for i, pmt_amt in enumerate(["10.00", "2.50", "2.50"]):
+        client.post(
+            "/upay/posting",
+            data={
+                "posting_key": "test_key",
+                "tpg_trans_id": f"report-{min(i, 1)}",
+                "session_identifier": "session123",
+                "pmt_status": "success",
+                "pmt_amt": pmt_amt,
+                "pmt_date": "01/01/2025",
+                "name_on_acct": "John Doe",
+            },
+        )
+
+    response = client.get(
+        "/upay/reports/daily",
+        params={"start_date": "2025-01-01", "end_date": "2025-01-31"},
+        headers={"X-Reporting-Key": "report_key"},
+    )
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "pmt_date": "2025-01-01",
+            "pmt_status": "success",
+            "txn_count": 2,
+            "total_amt": "12.50",
+            "min_amt": "2.50",
+            "max_amt": "10.00",
+        }
+    ]
+    assert client.get("/upay/reports/daily").status_code == 401
+
+
+def test_metrics(test_db, monkeypatch):
+    """Test that postings and requests are counted in the metrics."""
+    monkeypatch.setattr(settings, "posting_key", "test_key")
+    data = {
+        "posting_key": "test_key",
+        "tpg_trans_id": "metrics-1",
+        "session_identifier": "session123",
+        "pmt_status": "success",
+        "pmt_amt": "100.00",
+        "pmt_date": "01/01/2025",
+        "name_on_acct": "John Doe",
+    }
+    before = (
+        POSTINGS.value("new"),
+        POSTINGS.value("duplicate"),
+        POSTINGS.value("auth_fail"),
+    )
+    first = client.post("/upay/posting", data=data)
+    client.post("/upay/posting", data=data)
+    client.post("/upay/posting", data={**data, "posting_key": "wrong"})
+    # The outcome is classified internally, not sent to TouchNet
+    assert "created" not in first.json()
+    after = (
+        POSTINGS.value("new"),
+        POSTINGS.value("duplicate"),
+        POSTINGS.value("auth_fail"),
+    )
+    assert [b - a for a, b in zip(before, after)] == [1, 1, 1]
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        'upay_http_request_duration_seconds_count{method="POST",route="/upay/posting",status="200"}'
+        in response.text
+    )
+    assert 'upay_postings_total{outcome="new"}' in response.text
+
+
+def test_posting_shed_when_overloaded(test_db, monkeypatch):
+    """Test that postings beyond the admission limit get a 503 with Retry-After."""
+    monkeypatch.setattr(settings, "posting_key", "test_key")
+    controller = AdmissionController(limit=1, queue_size=0, timeout=1.0, retry_after=3)
+    monkeypatch.setattr(admission, "admission_controller", controller)
+    data = {
+        "posting_key": "test_key",
+        "tpg_trans_id": "shed-1",
+        "session_identifier": "session123",
+        "pmt_status": "success",
+        "pmt_amt": "100.00",
+        "pmt_date": "01/01/2025",
+        "name_on_acct": "John Doe",
+    }
+
+    # Every slot is taken
+    controller.active[POSTING] = 1
+    response = client.post("/upay/posting", data=data)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+    assert response.json()["detail"] == "Service temporarily overloaded"
+
+    # Invalid keys are rejected before admission control
+    response = client.post("/upay/posting", data={**data, "posting_key": "wrong"})
+    assert response.status_code == 401
+
+    # Slots are given back once the request is handled
+    controller.active[POSTING] = 0
+    response = client.post("/upay/posting", data=data)
+    assert response.status_code == 200
+    assert controller.active == [0, 0]
@@ -0,0 +1,374 @@
+"""Admission control for the uPay API.
+
+Requests that need a database connection are admitted through an
+AdmissionController before they run. At most ``limit`` requests run at
+once, sized to the connection pools the worker created, so admitted
+requests never queue in a pool for its full ``pool_timeout``. Excess
+requests wait in a bounded queue, postings ahead of reporting requests, and
+are shed with a 503 response and a ``Retry-After`` header when the queue is
+full or they have waited longer than the admission timeout. TouchNet
+retries failed postings, so a fast 503 costs less than a posting that times
+out after the gateway gave up on it.
+
+Postings may only hold as many slots as the write pool has connections,
+reporting requests only part of the slots, and a posting arriving at a full
+queue takes the place of the newest queued reporting request. Each priority
+queues on its own, so a reporting request is admitted while its slots are
+free even if postings wait for theirs.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from upayapi.config import settings
+from upayapi.exceptions import ServiceUnavailableError
+from upayapi.metrics import ADMISSION_REJECTED, ADMISSION_REQUESTS
+
+# Configure logger
+logger = logging.getLogger("upayapi.admission")
+
+# Request priorities, most important first
+POSTING = 0
+REPORTING = 1
+PRIORITY_NAMES = ("posting", "reporting")
+
+# Queued request: priority and the future granting its slot
+Waiter = Tuple[int, "asyncio.Future[None]"]
+
+
+class AdmissionController:
+    """Priority concurrency limiter with a bounded wait queue and deadline.
+
+    The controller is used from the event loop only, so it needs no locks.
+
+    Attributes:
+        limit: Maximum number of requests admitted at once.
+        priority_limits: Maximum number of requests admitted at once per
+            priority.
+        queue_size: Maximum number of waiting requests.
+        timeout: Maximum number of seconds a request waits for admission.
+        retry_after: Retry-After value, in seconds, of shed requests.
+        active: Number of admitted requests per priority.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        queue_size: int,
+        timeout: float,
+        retry_after: int = 1,
+        reporting_limit: Optional[int] = None,
+        posting_limit: Optional[int] = None,
+    ):
+        """Initialize the controller.
+
+        Args:
+            limit: Maximum number of requests admitted at once.
+            queue_size: Maximum number of waiting requests.
+            timeout: Maximum number of seconds a request waits for admission.
+            retry_after: Retry-After value, in seconds, of shed requests.
+            reporting_limit: Maximum number of reporting requests admitted at
+                once. If None, half of the limit.
+            posting_limit: Maximum number of postings admitted at once. If
+                None, the limit.
+
+        Raises:
+            ValueError: If the limit is not positive.
+        """
+        if limit < 1:
+            raise ValueError("Admission limit must be at least 1")
+        self.limit = limit
+        self.priority_limits = (
+            min(limit, posting_limit or limit),
+            min(limit, reporting_limit or max(1, limit // 2)),
+        )
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.active = [0, 0]
+        # Queued requests of each priority, in arrival order
+        self._waiters: List[Deque[Waiter]] = [deque() for _ in PRIORITY_NAMES]
+
+    def _can_run(self, priority: int) -> bool:
+        """Check whether a request of a priority can be admitted now.
+
+        Args:
+            priority: Request priority.
+
+        Returns:
+            True if both the total and the priority's limit have room.
+        """
+        return (
+            sum(self.active) < self.limit
+            and self.active[priority] < self.priority_limits[priority]
+        )
+
+    def _reject(self, priority: int, reason: str) -> ServiceUnavailableError:
+        """Count a shed request and build its error.
+
+        Args:
+            priority: Request priority.
+            reason: Why the request was shed.
+
+        Returns:
+            Error to raise for the request.
+        """
+        ADMISSION_REJECTED.inc(PRIORITY_NAMES[priority], reason)
+        return ServiceUnavailableError(retry_after=self.retry_after)
+
+    def _queued(self) -> int:
+        """Count the waiting requests.
+
+        Returns:
+            Number of queued requests of every priority.
+        """
+        return sum(len(waiters) for waiters in self._waiters)
+
+    def _remove(self, waiter: Waiter) -> None:
+        """Remove a waiter from the queue.
+
+        Args:
+            waiter: Queued request.
+        """
+        self._waiters[waiter[0]].remove(waiter)
+
+    def _wake(self) -> None:
+        """Admit queued requests, highest priority first, while slots are free.
+
+        A priority whose own limit is reached does not hold back the
+        requests of another priority.
+        """
+        for priority, waiters in enumerate(self._waiters):
+            while waiters and self._can_run(priority):
+                _, future = waiters.popleft()
+                self.active[priority] += 1
+                future.set_result(None)
+
+    async def acquire(self, priority: int) -> None:
+        """Wait for an admission slot.
+
+        Args:
+            priority: Request priority, POSTING or REPORTING.
+
+        Raises:
+            ServiceUnavailableError: If the queue is full or the request
+                waited longer than the timeout.
+        """
+        # Requests queued at the same priority go first
+        if self._can_run(priority) and not self._waiters[priority]:
+            self.active[priority] += 1
+            return
+
+        if self._queued() >= self.queue_size:
+            lower = [waiters for waiters in self._waiters[priority + 1 :] if waiters]
+            if not lower:
+                raise self._reject(priority, "queue_full")
+            # Make room by shedding the newest request of the lowest priority
+            newest_priority, newest = lower[-1].pop()
+            newest.set_exception(self._reject(newest_priority, "displaced"))
+
+        future: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        waiter = (priority, future)
+        self._waiters[priority].append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            if future.done() and future.exception() is None:
+                # Admitted just as the deadline passed
+                return
+            if not future.done():
+                self._remove(waiter)
+                future.cancel()
+            raise self._reject(priority, "timeout") from None
+        except asyncio.CancelledError:
+            # The client went away while waiting
+            if not future.done():
+                self._remove(waiter)
+                future.cancel()
+            elif future.exception() is None:
+                self.release(priority)
+            raise
+
+    def release(self, priority: int) -> None:
+        """Give back an admission slot and admit the next queued request.
+
+        Args:
+            priority: Priority the slot was acquired with.
+        """
+        self.active[priority] -= 1
+        self._wake()
+
+    @asynccontextmanager
+    async def admit(self, priority: int) -> AsyncIterator[None]:
+        """Hold an admission slot for the duration of a block.
+
+        Args:
+            priority: Request priority, POSTING or REPORTING.
+
+        Yields:
+            None once the request is admitted.
+
+        Raises:
+            ServiceUnavailableError: If the request is shed.
+        """
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    def stats(self) -> Dict[Tuple[str, str], float]:
+        """Get the number of admitted and queued requests.
+
+        Returns:
+            Request counts keyed by priority name and state.
+        """
+        values: Dict[Tuple[str, str], float] = {}
+        for priority, name in enumerate(PRIORITY_NAMES):
+            values[(name, "active")] = self.active[priority]
+            values[(name, "queued")] = len(self._waiters[priority])
+        return values
+
+
+def get_pool_capacity(engine: Engine) -> int:
+    """Get the number of connections the pool of an engine can hand out.
+
+    Args:
+        engine: Database engine.
+
+    Returns:
+        Pool size plus overflow. Pools without a size, such as the shared
+        connection of an in-memory SQLite database, use the configured
+        ``connection_pool_size`` and ``connection_pool_max_overflow``.
+    """
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return settings.connection_pool_size + settings.connection_pool_max_overflow
+    return pool.size() + max(pool._max_overflow, 0)
+
+
+def create_admission_controller(
+    write_engine: Engine,
+    read_engine: Engine,
+    replica_engine: Optional[Engine] = None,
+) -> Optional[AdmissionController]:
+    """Create the admission controller for a worker's engines.
+
+    Postings are limited to the capacity of the write engine's pool. When
+    reporting reads use a pool of their own, on a SQLite single-writer
+    database or a read replica, reporting requests are limited to that
+    pool's capacity and the two limits add up to the overall limit.
+
+    Args:
+        write_engine: Engine postings are written through.
+        read_engine: Engine of reporting reads on the primary database.
+        replica_engine: Engine of the read replica, if any.
+
+    Returns:
+        Admission controller, or None if admission control is disabled.
+    """
+    if not settings.admission_control:
+        return None
+
+    reporting_engine = replica_engine or read_engine
+    posting_capacity = get_pool_capacity(write_engine)
+    if reporting_engine is write_engine:
+        limit = posting_capacity
+        reporting_capacity = None
+    else:
+        reporting_capacity = get_pool_capacity(reporting_engine)
+        limit = posting_capacity + reporting_capacity
+
+    controller = AdmissionController(
+        limit=settings.admission_max_concurrency or limit,
+        queue_size=settings.admission_queue_size,
+        timeout=settings.admission_timeout_seconds,
+        retry_after=settings.admission_retry_after_seconds,
+        reporting_limit=settings.admission_reporting_max_concurrency
+        or reporting_capacity,
+        posting_limit=posting_capacity,
+    )
+    logger.info(
+        "Admission control: %d concurrent requests (%d posting, %d reporting), "
+        "queue %d",
+        controller.limit,
+        controller.priority_limits[POSTING],
+        controller.priority_limits[REPORTING],
+        controller.queue_size,
+    )
+    return controller
+
+
+# Created in the application lifespan, from the engines of the worker
+admission_controller: Optional[AdmissionController] = None
+ADMISSION_REQUESTS.add_callback(
+    lambda: admission_controller.stats() if admission_controller is not None else {}
+)
+
+
+def init_admission_controller(
+    write_engine: Engine,
+    read_engine: Engine,
+    replica_engine: Optional[Engine] = None,
+) -> Optional[AdmissionController]:
+    """Create the worker's admission controller.
+
+    Args:
+        write_engine: Engine postings are written through.
+        read_engine: Engine of reporting reads on the primary database.
+        replica_engine: Engine of the read replica, if any.
+
+    Returns:
+        Admission controller, or None if admission control is disabled.
+    """
+    global admission_controller
+
+    admission_controller = create_admission_controller(
+        write_engine, read_engine, replica_engine
+    )
+    return admission_controller
+
+
+def shutdown_admission_controller() -> None:
+    """Stop admitting through the worker's admission controller."""
+    global admission_controller
+
+    admission_controller = None
+
+
+async def admit_posting() -> AsyncIterator[None]:
+    """Hold a posting admission slot while a request is handled.
+
+    Yields:
+        None once the request is admitted.
+
+    Raises:
+        ServiceUnavailableError: If the request is shed.
+    """
+    if admission_controller is None:
+        yield
+        return
+    async with admission_controller.admit(POSTING):
+        yield
+
+
+async def admit_reporting() -> AsyncIterator[None]:
+    """Hold a reporting admission slot while a request is handled.
+
+    Yields:
+        None once the request is admitted.
+
+    Raises:
+        ServiceUnavailableError: If the request is shed.
+    """
+    if admission_controller is None:
+        yield
+        return
+    async with admission_controller.admit(REPORTING):
+        yield
@@ -0,0 +1,484 @@
+"""Archival of old transaction months to Parquet files.
+
+Months older than the retention window are written to one zstd-compressed
+Parquet file per month in ``settings.archive_dir``, then removed from the
+database: on a partitioned PostgreSQL table by dropping the month's
+partition, elsewhere by deleting its rows. The daily rollup is left as it
+is, so daily reports still cover archived months, and so is
+``transaction_keys``, so retries of archived transactions are still
+recognized as duplicates.
+
+ArchiveReader reads archived rows back, with the export filters pushed down
+to the Parquet files, and TransactionRepository.stream_transactions merges
+them with the rows still in the database.
+
+Writing and reading archives requires pyarrow (the ``archive`` extra).
+"""
+
+import logging
+import os
+import re
+from datetime import date
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from upayapi.config import settings
+from upayapi.models.schemas import PaymentStatus
+from upayapi.models.transaction import Transaction
+from upayapi.partitions import (
+    add_months,
+    drop_partition,
+    is_partitioned,
+    list_partitions,
+    lock_partition,
+    month_start,
+)
+
+# Configure logger
+logger = logging.getLogger("upayapi.archive")
+
+# Archive file names, one per month, and those of interrupted archive runs
+ARCHIVE_FILE_NAME = re.compile(r"^transactions-(\d{4})-(\d{2})\.parquet$")
+TEMPORARY_FILE_NAME = re.compile(r"^transactions-(\d{4})-(\d{2})\.parquet\.tmp$")
+
+
+def _import_pyarrow() -> Tuple[Any, Any, Any]:
+    """Import pyarrow.
+
+    Returns:
+        The pyarrow, pyarrow.dataset and pyarrow.parquet modules.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "Archiving transactions requires pyarrow: pip install 'upayapi[archive]'"
+        ) from e
+    return pyarrow, pyarrow.dataset, pyarrow.parquet
+
+
+def archive_schema(pa: Any) -> Any:
+    """Build the Parquet schema of archived transactions.
+
+    Args:
+        pa: The pyarrow module.
+
+    Returns:
+        Arrow schema with one field per EXPORT_COLUMNS entry.
+    """
+    return pa.schema(
+        [
+            ("id", pa.int64()),
+            ("tpg_trans_id", pa.string()),
+            ("session_identifier", pa.string()),
+            ("pmt_status", pa.string()),
+            ("pmt_amt", pa.decimal128(10, 2)),
+            ("pmt_date", pa.date32()),
+            ("name_on_acct", pa.string()),
+            ("site_id", pa.string()),
+            ("created_at", pa.timestamp("us")),
+        ]
+    )
+
+
+def archive_path(archive_dir: Path, month: date) -> Path:
+    """Get the archive file of a month.
+
+    Args:
+        archive_dir: Archive directory.
+        month: First day of the month.
+
+    Returns:
+        Path of the month's Parquet file.
+    """
+    return archive_dir / f"transactions-{month.year:04d}-{month.month:02d}.parquet"
+
+
+def temporary_path(archive_dir: Path, month: date) -> Path:
+    """Get the file a month is written to before it is archived.
+
+    Args:
+        archive_dir: Archive directory.
+        month: First day of the month.
+
+    Returns:
+        Path of the month's temporary Parquet file.
+    """
+    path = archive_path(archive_dir, month)
+    return path.with_name(path.name + ".tmp")
+
+
+def is_stored(db: Session, month: date) -> bool:
+    """Check whether a month is still in the database.
+
+    Args:
+        db: Database session.
+        month: First day of the month.
+
+    Returns:
+        True if the month has stored transactions or, on PostgreSQL, a
+        partition.
+    """
+    connection = db.connection()
+    if is_partitioned(connection) and month in list_partitions(connection):
+        return True
+    stored = select(Transaction.id).where(
+        Transaction.pmt_date >= month, Transaction.pmt_date < add_months(month, 1)
+    )
+    return bool(db.execute(select(stored.exists())).scalar())
+
+
+def archive_table(pa: Any, schema: Any, batch: Sequence[Sequence[Any]]) -> Any:
+    """Convert a batch of transaction rows to an Arrow table.
+
+    Args:
+        pa: The pyarrow module.
+        schema: Archive schema.
+        batch: Rows with values in EXPORT_COLUMNS order.
+
+    Returns:
+        Arrow table of the rows.
+    """
+    status_index = schema.get_field_index("pmt_status")
+    columns = [list(column) for column in zip(*batch)]
+    columns[status_index] = [
+        status.value if isinstance(status, PaymentStatus) else status
+        for status in columns[status_index]
+    ]
+    return pa.Table.from_pydict(dict(zip(schema.names, columns)), schema=schema)
+
+
+def write_archive(
+    batches: Iterable[Sequence[Sequence[Any]]],
+    path: Path,
+    existing: Optional[Path] = None,
+) -> int:
+    """Write batches of transaction rows to a Parquet file.
+
+    Each batch becomes one row group. With an existing archive file, as for
+    rows posted to a month after it was archived, its rows are merged with
+    the batches, in payment date and ID order.
+
+    Args:
+        batches: Rows with values in EXPORT_COLUMNS order.
+        path: File to write.
+        existing: Archive file whose rows are written too.
+
+    Returns:
+        Number of rows written from the batches.
+    """
+    pa, _, pq = _import_pyarrow()
+    schema = archive_schema(pa)
+
+    rows = 0
+    if existing is not None:
+        tables = [pq.read_table(existing, schema=schema)]
+        for batch in batches:
+            tables.append(archive_table(pa, schema, batch))
+            rows += len(batch)
+        merged = pa.concat_tables(tables).sort_by(
+            [("pmt_date", "ascending"), ("id", "ascending")]
+        )
+        pq.write_table(merged, path, compression="zstd")
+        return rows
+
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for batch in batches:
+            writer.write_table(archive_table(pa, schema, batch))
+            rows += len(batch)
+    return rows
+
+
+def collect_ids(
+    batches: Iterable[Sequence[Any]], ids: List[int]
+) -> Iterator[Sequence[Any]]:
+    """Pass batches of transaction rows through, noting their IDs.
+
+    Args:
+        batches: Batches of rows with an ``id`` attribute.
+        ids: List the IDs are appended to.
+
+    Yields:
+        The batches, unchanged.
+    """
+    for batch in batches:
+        ids.extend(row.id for row in batch)
+        yield batch
+
+
+def months_to_archive(
+    db: Session, today: Optional[date] = None, retention_months: Optional[int] = None
+) -> List[date]:
+    """List the months older than the retention window.
+
+    Args:
+        db: Database session.
+        today: Current date. If None, today's date.
+        retention_months: Number of months before the current one to keep.
+            If None, ``settings.archive_retention_months``.
+
+    Returns:
+        First day of each month before the retention window that has stored
+        transactions or, on PostgreSQL, a partition, in order.
+    """
+    if retention_months is None:
+        retention_months = settings.archive_retention_months
+    cutoff = add_months(month_start(today or date.today()), -retention_months)
+
+    months = set()
+    connection = db.connection()
+    if is_partitioned(connection):
+        months.update(month for month in list_partitions(connection) if month < cutoff)
+
+    oldest = db.execute(select(func.min(Transaction.pmt_date))).scalar()
+    month = month_start(oldest) if oldest is not None else cutoff
+    while month < cutoff:
+        stored = select(Transaction.id).where(
+            Transaction.pmt_date >= month, Transaction.pmt_date < add_months(month, 1)
+        )
+        if db.execute(select(stored.exists())).scalar():
+            months.add(month)
+        month = add_months(month, 1)
+    return sorted(months)
+
+
+def interrupted_archives(db: Session, archive_dir: Path) -> List[date]:
+    """List the months whose archive run died before renaming its file.
+
+    Such a month was removed from the database, but its rows are only in
+    its ``.tmp`` file, which ArchiveReader does not read.
+
+    Args:
+        db: Database session.
+        archive_dir: Archive directory.
+
+    Returns:
+        First day of each month with a temporary file and nothing left in
+        the database, in order. The temporary file also holds the rows of
+        the month's earlier archive file, if any, so it replaces that file.
+    """
+    if not archive_dir.is_dir():
+        return []
+    months = []
+    for path in archive_dir.iterdir():
+        match = TEMPORARY_FILE_NAME.match(path.name)
+        if not match:
+            continue
+        month = date(int(match.group(1)), int(match.group(2)), 1)
+        if is_stored(db, month):
+            continue
+        months.append(month)
+    return sorted(months)
+
+
+def finish_archive(archive_dir: Path, month: date) -> None:
+    """Rename the temporary file of an interrupted archive run.
+
+    Args:
+        archive_dir: Archive directory.
+        month: First day of a month listed by interrupted_archives.
+    """
+    os.replace(temporary_path(archive_dir, month), archive_path(archive_dir, month))
+    logger.warning("Recovered the archive of %s", month.strftime("%Y-%m"))
+
+
+def archive_month(
+    db: Session, month: date, archive_dir: Path, batch_size: int = 10000
+) -> int:
+    """Move a month of transactions from the database to a Parquet file.
+
+    The file is written under a temporary name, the rows are removed and
+    committed, and only then is the file renamed, so readers never see a
+    month both in the database and in the archive. If the process dies
+    between the commit and the rename, the ``.tmp`` file holds the month
+    until interrupted_archives and finish_archive recover it.
+
+    A month that is already archived can get new rows from late postings.
+    They are merged into its archive file, which is rewritten.
+
+    Postings to the month committed while it is archived are never removed
+    unarchived: on PostgreSQL the month's partition is locked against
+    writes before it is read, and otherwise only the rows written to the
+    file are deleted, so later ones are left for the next run.
+
+    Args:
+        db: Database session.
+        month: First day of the month.
+        archive_dir: Archive directory.
+        batch_size: Number of rows fetched and written per row group.
+
+    Returns:
+        Number of transactions archived.
+
+    Raises:
+        SQLAlchemyError: If the rows cannot be read or removed.
+    """
+    # Imported here, as the transaction repository imports ArchiveReader
+    from upayapi.repositories.transaction import EXPORT_COLUMNS
+
+    path = archive_path(archive_dir, month)
+    existing = path if path.exists() else None
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    temporary = temporary_path(archive_dir, month)
+
+    in_month = (
+        Transaction.pmt_date >= month,
+        Transaction.pmt_date < add_months(month, 1),
+    )
+    query = (
+        select(*EXPORT_COLUMNS)
+        .where(*in_month)
+        .order_by(Transaction.pmt_date.asc(), Transaction.id.asc())
+        .execution_options(stream_results=True, yield_per=batch_size)
+    )
+    try:
+        connection = db.connection()
+        partitioned = is_partitioned(connection) and month in list_partitions(
+            connection
+        )
+        if partitioned:
+            lock_partition(connection, month)
+
+        ids: List[int] = []
+        rows = write_archive(
+            collect_ids(db.execute(query).partitions(), ids), temporary, existing
+        )
+
+        if partitioned:
+            drop_partition(connection, month)
+        else:
+            # Rows of the month in the default partition, or in an
+            # unpartitioned table
+            for start in range(0, len(ids), batch_size):
+                db.execute(
+                    delete(Transaction).where(
+                        Transaction.id.in_(ids[start : start + batch_size]),
+                        *in_month,
+                    )
+                )
+        db.commit()
+    except Exception:
+        db.rollback()
+        temporary.unlink(missing_ok=True)
+        raise
+
+    if rows:
+        os.replace(temporary, path)
+    else:
+        temporary.unlink()
+    logger.info("Archived %d transactions of %s", rows, month.strftime("%Y-%m"))
+    return rows
+
+
+class ArchiveReader:
+    """Reader of archived transaction months.
+
+    Attributes:
+        archive_dir: Archive directory.
+    """
+
+    def __init__(self, archive_dir: Path):
+        """Initialize the reader.
+
+        Args:
+            archive_dir: Archive directory.
+        """
+        self.archive_dir = archive_dir
+
+    def months(
+        self, start_date: Optional[date] = None, end_date: Optional[date] = None
+    ) -> List[date]:
+        """List the archived months overlapping a date range.
+
+        Args:
+            start_date: First payment date of the range.
+            end_date: Last payment date of the range.
+
+        Returns:
+            First day of each archived month, in order.
+        """
+        if not self.archive_dir.is_dir():
+            return []
+        months = []
+        for path in self.archive_dir.iterdir():
+            match = ARCHIVE_FILE_NAME.match(path.name)
+            if not match:
+                continue
+            month = date(int(match.group(1)), int(match.group(2)), 1)
+            if start_date and add_months(month, 1) <= start_date:
+                continue
+            if end_date and month > end_date:
+                continue
+            months.append(month)
+        return sorted(months)
+
+    def read(
+        self,
+        columns: Sequence[str],
+        pmt_status: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        batch_size: int = 1000,
+    ) -> Iterator[List[Tuple[Any, ...]]]:
+        """Read archived transactions in batches.
+
+        Args:
+            columns: Names of the columns to read, in output order.
+            pmt_status: Filter by payment status.
+            start_date: Filter by payment date (start).
+            end_date: Filter by payment date (end).
+            batch_size: Maximum number of rows per batch.
+
+        Yields:
+            Lists of row tuples, ordered by payment date and ID. Payment
+            statuses are PaymentStatus members, as read from the database.
+        """
+        _, ds, _ = _import_pyarrow()
+        conditions = []
+        if pmt_status:
+            conditions.append(ds.field("pmt_status") == pmt_status)
+        if start_date:
+            conditions.append(ds.field("pmt_date") >= start_date)
+        if end_date:
+            conditions.append(ds.field("pmt_date") <= end_date)
+        condition = None
+        for item in conditions:
+            condition = item if condition is None else condition & item
+
+        status_index = (
+            list(columns).index("pmt_status") if "pmt_status" in columns else None
+        )
+        for month in self.months(start_date, end_date):
+            dataset = ds.dataset(
+                archive_path(self.archive_dir, month), format="parquet"
+            )
+            for batch in dataset.to_batches(
+                columns=list(columns), filter=condition, batch_size=batch_size
+            ):
+                if not batch.num_rows:
+                    continue
+                values = [column.to_pylist() for column in batch.columns]
+                if status_index is not None:
+                    values[status_index] = [
+                        PaymentStatus(status) for status in values[status_index]
+                    ]
+                yield list(zip(*values))
+
+
+def get_archive_reader() -> Optional[ArchiveReader]:
+    """Get the reader of ``settings.archive_dir``.
+
+    Returns:
+        Archive reader, or None if no archive directory is configured.
+    """
+    if not settings.archive_dir:
+        return None
+    return ArchiveReader(Path(settings.archive_dir))
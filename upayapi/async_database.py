@@ -0,0 +1,211 @@
+"""Async database configuration for the uPay API.
+
+This module mirrors :mod:`upayapi.database` with an ``AsyncEngine`` and
+``AsyncSession`` factory. The async drivers (``asyncpg`` for PostgreSQL and
+``aiosqlite`` for SQLite) are optional dependencies, so the engine is only
+created the first time it is requested.
+"""
+
+import logging
+from typing import Any, AsyncGenerator, Dict, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from upayapi.config import settings
+from upayapi.metrics import instrument_engine
+from upayapi.pool import (
+    configure_liveness,
+    configure_sqlite,
+    get_liveness_mode,
+    get_pool_args,
+    get_pool_profile,
+)
+
+# Configure logger
+logger = logging.getLogger("upayapi.async_database")
+
+# Async driver to use for each supported synchronous URL scheme
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+
+
+def get_async_database_url(database_url: Optional[str] = None) -> str:
+    """Get the async driver URL for a database connection string.
+
+    Args:
+        database_url: Synchronous database connection string. If None, uses
+            ``settings.async_database_url`` or ``settings.database_url``.
+
+    Returns:
+        Database connection string using an async driver.
+
+    Raises:
+        ValueError: If there's no known async driver for the database.
+    """
+    if database_url is None:
+        if settings.async_database_url:
+            return settings.async_database_url
+        database_url = settings.database_url
+
+    scheme, separator, rest = database_url.partition("://")
+    if not separator:
+        raise ValueError(f"Invalid database URL: {database_url}")
+
+    dialect, _, driver = scheme.partition("+")
+    if driver in ("aiosqlite", "asyncpg"):
+        return database_url
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver available for '{scheme}' databases")
+
+    return f"{ASYNC_DRIVERS[dialect]}://{rest}"
+
+
+def get_async_engine_args(database_url: str) -> Dict[str, Any]:
+    """Get async SQLAlchemy engine arguments based on database type.
+
+    Args:
+        database_url: Async database connection string.
+
+    Returns:
+        Dictionary of engine arguments.
+    """
+    engine_args: Dict[str, Any] = {
+        "echo": settings.debug,
+    }
+
+    # Async engines use AsyncAdaptedQueuePool by default, so the pool profile
+    # applies unchanged
+    engine_args.update(get_pool_args(database_url))
+
+    return engine_args
+
+
+def get_async_engine() -> AsyncEngine:
+    """Get the async SQLAlchemy engine, creating it on first use.
+
+    Returns:
+        Async database engine.
+
+    Raises:
+        Exception: If the engine cannot be created, e.g. the async driver is
+            not installed.
+    """
+    global _async_engine
+
+    if _async_engine is None:
+        database_url = get_async_database_url()
+        try:
+            _async_engine = create_async_engine(
+                database_url, **get_async_engine_args(database_url)
+            )
+            logger.info("Async database engine created for %s", database_url)
+        except Exception as e:
+            logger.error("Failed to create async database engine: %s", e)
+            raise
+
+        configure_liveness(_async_engine.sync_engine, get_liveness_mode(database_url))
+        if settings.sqlite_tuning and get_pool_profile(database_url) == "sqlite":
+            configure_sqlite(_async_engine.sync_engine)
+        if settings.metrics_enabled:
+            instrument_engine(_async_engine.sync_engine, "async")
+
+    return _async_engine
+
+
+def get_async_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Get the async session factory, creating it on first use.
+
+    Returns:
+        Async session factory bound to the async engine.
+    """
+    global _async_session_factory
+
+    if _async_session_factory is None:
+        _async_session_factory = async_sessionmaker(
+            bind=get_async_engine(),
+            autoflush=False,
+            expire_on_commit=False,
+        )
+
+    return _async_session_factory
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Get async database session.
+
+    Yields:
+        Async database session.
+
+    Raises:
+        Exception: If there's an error with the database connection.
+    """
+    async with get_async_session_factory()() as db:
+        try:
+            yield db
+        except exc.SQLAlchemyError as e:
+            await db.rollback()
+            logger.error("Database error: %s", e)
+            raise
+
+
+async def get_optional_async_db() -> AsyncGenerator[Optional[AsyncSession], None]:
+    """Get an async database session when the async database path is enabled.
+
+    Yields:
+        Async database session, or None if ``settings.use_async_database``
+        is disabled.
+    """
+    if not settings.use_async_database:
+        yield None
+        return
+
+    async with get_async_session_factory()() as db:
+        try:
+            yield db
+        except exc.SQLAlchemyError as e:
+            await db.rollback()
+            logger.error("Database error: %s", e)
+            raise
+
+
+async def prewarm_async_pool(connections: Optional[int] = None) -> int:
+    """Open async pool connections ahead of the first requests.
+
+    Args:
+        connections: Number of connections to open. If None, the pool size,
+            or one connection for pools without a size.
+
+    Returns:
+        Number of connections opened.
+    """
+    engine = get_async_engine()
+    if connections is None:
+        size = getattr(engine.pool, "size", None)
+        connections = size() if callable(size) else 1
+
+    opened = [await engine.connect() for _ in range(connections)]
+    for connection in opened:
+        await connection.close()
+    return len(opened)
+
+
+async def dispose_async_engine() -> None:
+    """Dispose of the async engine and its connection pool, if created."""
+    global _async_engine, _async_session_factory
+
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
@@ -0,0 +1,221 @@
+"""Group-commit ingestion for uPay postings.
+
+With batching enabled, postings are not committed one by one. A background
+writer thread collects the validated rows of concurrent postings and stores
+them with one multi-row insert and one commit, flushing when the batch is
+full or the oldest row has waited long enough. Each posting only gets its
+result after its batch has been committed, so durability is unchanged.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from upayapi.config import settings
+from upayapi.database import get_session_factory
+from upayapi.repositories.transaction import (
+    TransactionInsertResult,
+    TransactionRepository,
+)
+
+# Configure logger
+logger = logging.getLogger("upayapi.batching")
+
+# Sentinel queued to stop the writer thread
+_STOP = object()
+
+PendingRow = Tuple[Dict[str, Any], "Future[TransactionInsertResult]"]
+
+
+class IngestionBatcher:
+    """Background writer that commits postings in batches.
+
+    Attributes:
+        session_factory: Factory for the writer thread's database sessions.
+        max_batch_size: Maximum number of rows flushed in one transaction.
+        max_wait: Maximum number of seconds the first row of a batch waits
+            for more rows before the batch is flushed.
+        batches: Number of batches committed.
+        rows: Number of rows committed.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        max_batch_size: int = 100,
+        max_wait: float = 0.005,
+    ):
+        """Initialize the batcher.
+
+        Args:
+            session_factory: Factory for the writer thread's database sessions.
+            max_batch_size: Maximum number of rows flushed in one transaction.
+            max_wait: Maximum number of seconds the first row of a batch
+                waits for more rows.
+        """
+        self.session_factory = session_factory
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batches = 0
+        self.rows = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """Whether the writer thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the writer thread if it isn't running."""
+        with self._lock:
+            if self.running:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="upay-ingestion-batcher", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Flush queued rows and stop the writer thread.
+
+        Args:
+            timeout: Maximum number of seconds to wait for the thread.
+        """
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+            if thread is not None:
+                # Queued under the lock, so no row can be submitted after it
+                self._queue.put(_STOP)
+        if thread is not None:
+            thread.join(timeout)
+
+    def submit(self, values: Dict[str, Any]) -> "Future[TransactionInsertResult]":
+        """Queue a transaction row for the next batch.
+
+        Args:
+            values: Column values for the transaction, as accepted by
+                TransactionRepository.create_transaction.
+
+        Returns:
+            Future resolved with the insert result once the row's batch has
+            been committed.
+
+        Raises:
+            RuntimeError: If the batcher is not running.
+        """
+        future: "Future[TransactionInsertResult]" = Future()
+        with self._lock:
+            if not self.running:
+                raise RuntimeError("Ingestion batcher is not running")
+            self._queue.put((values, future))
+        return future
+
+    def _run(self) -> None:
+        """Collect queued rows into batches and flush them until stopped."""
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            batch: List[PendingRow] = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._flush(batch)
+
+        # Fail rows that raced with stop() instead of leaving them waiting
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                item[1].set_exception(RuntimeError("Ingestion batcher stopped"))
+
+    def _flush(self, batch: List[PendingRow]) -> None:
+        """Store a batch in one transaction and resolve its futures.
+
+        If the batch fails, each row is retried on its own so that one bad
+        row only fails its own posting.
+
+        Args:
+            batch: Queued rows with their futures.
+        """
+        try:
+            with self.session_factory() as db:
+                results = TransactionRepository(db).create_transactions_if_absent(
+                    [values for values, _ in batch]
+                )
+        except SQLAlchemyError as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            logger.warning(
+                "Batch of %d postings failed, retrying individually: %s", len(batch), e
+            )
+            for pending in batch:
+                self._flush([pending])
+            return
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.rows += len(batch)
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+
+_ingestion_batcher: Optional[IngestionBatcher] = None
+_ingestion_batcher_lock = threading.Lock()
+
+
+def get_ingestion_batcher() -> IngestionBatcher:
+    """Get the shared ingestion batcher, starting it on first use.
+
+    Returns:
+        Running ingestion batcher writing through the write engine.
+    """
+    global _ingestion_batcher
+
+    with _ingestion_batcher_lock:
+        if _ingestion_batcher is None:
+            _ingestion_batcher = IngestionBatcher(
+                get_session_factory(),
+                max_batch_size=settings.ingestion_batch_size,
+                max_wait=settings.ingestion_batch_max_wait_ms / 1000,
+            )
+        _ingestion_batcher.start()
+        return _ingestion_batcher
+
+
+def shutdown_ingestion_batcher() -> None:
+    """Flush and stop the shared ingestion batcher, if started."""
+    global _ingestion_batcher
+
+    with _ingestion_batcher_lock:
+        if _ingestion_batcher is not None:
+            _ingestion_batcher.stop()
+            _ingestion_batcher = None
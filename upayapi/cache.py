@@ -0,0 +1,121 @@
+"""In-process caches for the uPay API."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from upayapi.config import settings
+
+
+class IdempotencyCache:
+    """Bounded LRU cache with a TTL mapping tpg_trans_id to transaction ID.
+
+    TouchNet re-posts a transaction when it does not get a timely answer.
+    Remembering recently processed tpg_trans_ids lets those retries be
+    answered without a database round-trip.
+
+    Attributes:
+        maxsize: Maximum number of entries. A size of 0 disables the cache.
+        ttl: Number of seconds an entry stays valid.
+        hits: Number of lookups answered from the cache.
+        misses: Number of lookups not found or expired.
+        evictions: Number of entries evicted to stay within maxsize.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries. A size of 0 disables the cache.
+            ttl: Number of seconds an entry stays valid.
+            clock: Monotonic clock returning seconds.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._clock = clock
+        self._entries: OrderedDict[str, Tuple[int, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, tpg_trans_id: str) -> Optional[int]:
+        """Get the transaction ID cached for a tpg_trans_id.
+
+        Args:
+            tpg_trans_id: Transaction reference number assigned by Payment Gateway.
+
+        Returns:
+            The transaction ID if cached and not expired, None otherwise.
+        """
+        if self.maxsize <= 0:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(tpg_trans_id)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            transaction_id, expires_at = entry
+            if expires_at <= self._clock():
+                del self._entries[tpg_trans_id]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(tpg_trans_id)
+            self.hits += 1
+            return transaction_id
+
+    def set(self, tpg_trans_id: str, transaction_id: int) -> None:
+        """Cache the transaction ID for a tpg_trans_id.
+
+        Args:
+            tpg_trans_id: Transaction reference number assigned by Payment Gateway.
+            transaction_id: ID of the stored transaction.
+        """
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._entries[tpg_trans_id] = (transaction_id, self._clock() + self.ttl)
+            self._entries.move_to_end(tpg_trans_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Get the cache counters.
+
+        Returns:
+            Dictionary with hit, miss and eviction counts and the current size.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+
+# Create the idempotency cache shared by the transaction services
+idempotency_cache = IdempotencyCache(
+    maxsize=settings.idempotency_cache_size,
+    ttl=settings.idempotency_cache_ttl,
+)
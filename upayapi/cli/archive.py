@@ -0,0 +1,135 @@
+"""Maintenance of transaction partitions and archives.
+
+Creates the PostgreSQL partitions of the coming months, finishes archive
+runs that died after removing their month from the database, then moves
+every month older than the retention window to a Parquet file in the
+archive directory and removes it from the database. Run it daily, for
+example from cron. Requires pyarrow (the ``archive`` extra).
+
+Usage:
+    upay-archive
+    upay-archive --retention-months 12 --archive-dir /var/lib/upay/archive
+    upay-archive --dry-run
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from upayapi.archive import (
+    archive_month,
+    finish_archive,
+    interrupted_archives,
+    months_to_archive,
+)
+from upayapi.config import settings
+from upayapi.partitions import ensure_partitions, is_partitioned
+
+# Configure logger
+logger = logging.getLogger("upayapi.cli.archive")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the archive command.
+
+    Args:
+        argv: Command-line arguments. If None, uses sys.argv.
+
+    Returns:
+        Process exit code.
+    """
+    parser = argparse.ArgumentParser(
+        prog="upay-archive",
+        description="Create upcoming transaction partitions and archive old months.",
+    )
+    parser.add_argument(
+        "--archive-dir",
+        type=Path,
+        default=Path(settings.archive_dir) if settings.archive_dir else None,
+        help="Directory of the Parquet archive (default: ARCHIVE_DIR setting)",
+    )
+    parser.add_argument(
+        "--retention-months",
+        type=int,
+        default=settings.archive_retention_months,
+        help="Months before the current one kept in the database",
+    )
+    parser.add_argument(
+        "--months-ahead",
+        type=int,
+        default=settings.partition_months_ahead,
+        help="Months of partitions created ahead of time on PostgreSQL",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="List the months to archive without archiving",
+    )
+    parser.add_argument(
+        "--database-url",
+        help="Database connection string (default: DATABASE_URL setting)",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    if args.archive_dir is None:
+        parser.error("--archive-dir is required when ARCHIVE_DIR is not set")
+    if args.retention_months < 0:
+        parser.error("--retention-months must not be negative")
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        logger.error("upay-archive requires pyarrow: pip install 'upayapi[archive]'")
+        return 1
+
+    if args.database_url:
+        engine = create_engine(args.database_url)
+    else:
+        from upayapi.database import get_engine
+
+        engine = get_engine()
+
+    report: Dict[str, Any] = {"created_partitions": [], "recovered": [], "archived": {}}
+    try:
+        with engine.begin() as connection:
+            if is_partitioned(connection) and not args.dry_run:
+                report["created_partitions"] = ensure_partitions(
+                    connection, months_ahead=args.months_ahead
+                )
+
+        with Session(engine) as db:
+            for month in interrupted_archives(db, args.archive_dir):
+                if not args.dry_run:
+                    finish_archive(args.archive_dir, month)
+                report["recovered"].append(month.strftime("%Y-%m"))
+
+            months = months_to_archive(db, retention_months=args.retention_months)
+            for month in months:
+                key = month.strftime("%Y-%m")
+                if args.dry_run:
+                    report["archived"][key] = None
+                    continue
+                report["archived"][key] = archive_month(db, month, args.archive_dir)
+    except (SQLAlchemyError, OSError) as e:
+        logger.error("Archive failed: %s", e)
+        print(json.dumps(report))
+        return 1
+
+    print(json.dumps(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,392 @@
+"""Bulk import of TouchNet settlement and replay files.
+
+Streams CSV or NDJSON files of uPay postings into the transactions table
+without going through the posting endpoint. Rows are read lazily and
+validated with :class:`~upayapi.models.schemas.TransactionRequest` in chunks,
+optionally across a process pool, so memory use stays flat regardless of
+file size. Rows whose tpg_trans_id is already stored are skipped, and rows
+that fail validation are written to a side file.
+
+Usage:
+    upay-import postings.csv
+    upay-import replay.ndjson --chunk-size 5000 --workers 8
+    upay-import parking.csv --site-id parking
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from pydantic import ValidationError as PydanticValidationError
+from sqlalchemy import create_engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, sessionmaker
+
+from upayapi.models.schemas import TransactionRequest
+from upayapi.repositories.transaction import TransactionRepository
+
+# Configure logger
+logger = logging.getLogger("upayapi.cli.importer")
+
+# Raw rows keyed by their line number in the input file
+RawChunk = List[Tuple[int, Dict[str, Any]]]
+
+# Validated rows and rejected rows for a chunk
+ValidatedChunk = Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]
+
+
+def detect_format(path: Path) -> str:
+    """Detect the input format from a file name.
+
+    Args:
+        path: Input file path.
+
+    Returns:
+        "csv" or "ndjson".
+
+    Raises:
+        ValueError: If the format cannot be detected.
+    """
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        return "csv"
+    if suffix in (".ndjson", ".jsonl"):
+        return "ndjson"
+    raise ValueError(f"Cannot detect the format of {path}; use --format")
+
+
+def read_rows(
+    stream: IO[str], file_format: str
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Read raw rows from an input stream.
+
+    Args:
+        stream: Open text stream.
+        file_format: "csv" or "ndjson".
+
+    Yields:
+        Line number and raw field values for each row. CSV rows with more
+        fields than the header and NDJSON lines that are not valid JSON
+        objects are yielded with a "_error" field.
+    """
+    if file_format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            # DictReader collects fields beyond the header under a None key
+            extra = row.pop(None, None)
+            if extra is not None:
+                fields = [*row.values(), *extra]
+                yield (
+                    reader.line_num,
+                    {
+                        "_error": f"Expected {len(row)} fields, got {len(fields)}",
+                        "_line": ",".join(value or "" for value in fields),
+                    },
+                )
+                continue
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError("expected a JSON object")
+        except ValueError as e:
+            yield (
+                line_number,
+                {"_error": f"Invalid JSON: {str(e)}", "_line": line.rstrip()},
+            )
+            continue
+        yield line_number, row
+
+
+def chunked(
+    rows: Iterator[Tuple[int, Dict[str, Any]]], chunk_size: int
+) -> Iterator[RawChunk]:
+    """Group rows into chunks.
+
+    Args:
+        rows: Line numbers and raw rows.
+        chunk_size: Maximum number of rows per chunk.
+
+    Yields:
+        Lists of at most chunk_size rows.
+    """
+    chunk: RawChunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def validate_chunk(chunk: RawChunk) -> ValidatedChunk:
+    """Validate a chunk of raw rows with TransactionRequest.
+
+    Runs in worker processes, so it only depends on its arguments.
+
+    Args:
+        chunk: Line numbers and raw rows.
+
+    Returns:
+        Column values for each valid row and a description of each rejected
+        row.
+    """
+    valid: List[Dict[str, Any]] = []
+    rejected: List[Dict[str, Any]] = []
+    for line_number, row in chunk:
+        if "_error" in row:
+            rejected.append(
+                {"line": line_number, "row": row["_line"], "errors": [row["_error"]]}
+            )
+            continue
+
+        # Imported files carry no posting key, and JSON numbers are accepted
+        # for the string fields TouchNet posts
+        fields = {
+            key: value if value is None or isinstance(value, str) else str(value)
+            for key, value in row.items()
+        }
+        fields.setdefault("posting_key", "")
+        try:
+            request = TransactionRequest.model_validate(fields)
+        except PydanticValidationError as e:
+            rejected.append(
+                {
+                    "line": line_number,
+                    "row": row,
+                    "errors": [
+                        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                        for error in e.errors()
+                    ],
+                }
+            )
+            continue
+
+        valid.append(
+            {
+                "tpg_trans_id": request.tpg_trans_id,
+                "session_identifier": request.session_identifier,
+                "pmt_status": request.pmt_status.value,
+                "pmt_amt": request.pmt_amt,
+                "pmt_date": request.pmt_date,
+                "name_on_acct": request.name_on_acct,
+            }
+        )
+    return valid, rejected
+
+
+def validate_chunks(
+    chunks: Iterator[RawChunk], workers: int
+) -> Iterator[ValidatedChunk]:
+    """Validate chunks in order, in a process pool when workers > 1.
+
+    At most two chunks per worker are in flight at once, which keeps memory
+    use independent of the input size.
+
+    Args:
+        chunks: Chunks of raw rows.
+        workers: Number of worker processes. 0 or 1 validates in-process.
+
+    Yields:
+        Validated chunks in input order.
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield validate_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: Deque[Future] = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(validate_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def import_file(
+    path: Path,
+    session_factory: Callable[[], Session],
+    file_format: Optional[str] = None,
+    rejects_path: Optional[Path] = None,
+    chunk_size: int = 1000,
+    workers: int = 0,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    site_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Import a CSV or NDJSON file of uPay postings.
+
+    Args:
+        path: Input file path.
+        session_factory: Factory for database sessions.
+        file_format: "csv" or "ndjson". If None, detected from the file name.
+        rejects_path: Side file for rejected rows. Defaults to the input
+            path with a ".rejected.ndjson" suffix.
+        chunk_size: Number of rows validated and inserted together.
+        workers: Number of validation processes. 0 or 1 validates in-process.
+        progress: Callback receiving the running statistics after each chunk.
+        site_id: uPay site stored with the imported transactions.
+
+    Returns:
+        Import statistics.
+    """
+    file_format = file_format or detect_format(path)
+    rejects_path = rejects_path or path.with_name(f"{path.name}.rejected.ndjson")
+    stats: Dict[str, Any] = {
+        "rows": 0,
+        "inserted": 0,
+        "duplicates": 0,
+        "rejected": 0,
+        "rejects_file": str(rejects_path),
+    }
+    started = time.perf_counter()
+
+    with (
+        path.open(newline="", encoding="utf-8") as stream,
+        rejects_path.open("w", encoding="utf-8") as rejects,
+        session_factory() as db,
+    ):
+        repository = TransactionRepository(db)
+        chunks = chunked(read_rows(stream, file_format), chunk_size)
+        for valid, rejected in validate_chunks(chunks, workers):
+            for values in valid:
+                values["site_id"] = site_id
+            inserted = repository.import_transactions(valid)
+            for rejection in rejected:
+                rejects.write(json.dumps(rejection, default=str) + "\n")
+
+            stats["rows"] += len(valid) + len(rejected)
+            stats["inserted"] += inserted
+            stats["duplicates"] += len(valid) - inserted
+            stats["rejected"] += len(rejected)
+            if progress:
+                progress(stats)
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 3)
+    stats["rows_per_sec"] = round(stats["rows"] / elapsed, 1) if elapsed else 0.0
+    return stats
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the bulk import command.
+
+    Args:
+        argv: Command-line arguments. If None, uses sys.argv.
+
+    Returns:
+        Process exit code.
+    """
+    parser = argparse.ArgumentParser(
+        prog="upay-import",
+        description="Import CSV/NDJSON files of uPay postings into the database.",
+    )
+    parser.add_argument("path", type=Path, help="CSV or NDJSON file to import")
+    parser.add_argument(
+        "--format",
+        choices=["csv", "ndjson"],
+        help="Input format (default: from file name)",
+    )
+    parser.add_argument(
+        "--rejects",
+        type=Path,
+        help="Side file for rejected rows (default: <path>.rejected.ndjson)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1000,
+        help="Rows validated and inserted together",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Validation processes (default: CPU count, 1 disables the pool)",
+    )
+    parser.add_argument("--site-id", help="uPay site of the imported transactions")
+    parser.add_argument(
+        "--database-url",
+        help="Database connection string (default: DATABASE_URL setting)",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    engine = None
+    if args.database_url:
+        engine = create_engine(args.database_url)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    else:
+        from upayapi.database import get_session_factory
+
+        session_factory = get_session_factory()
+
+    last_report = time.monotonic()
+
+    def report(stats: Dict[str, Any]) -> None:
+        nonlocal last_report
+        if time.monotonic() - last_report < 5:
+            return
+        last_report = time.monotonic()
+        logger.info(
+            "%d rows read, %d inserted, %d duplicates, %d rejected",
+            stats["rows"],
+            stats["inserted"],
+            stats["duplicates"],
+            stats["rejected"],
+        )
+
+    try:
+        stats = import_file(
+            args.path,
+            session_factory,
+            file_format=args.format,
+            rejects_path=args.rejects,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            progress=report,
+            site_id=args.site_id,
+        )
+    except (OSError, ValueError, SQLAlchemyError) as e:
+        logger.error("Import failed: %s", e)
+        return 1
+    finally:
+        if engine is not None:
+            engine.dispose()
+
+    print(json.dumps(stats, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,472 @@
+"""Load generator for the uPay posting endpoint.
+
+Drives ``POST /upay/posting`` with realistic TouchNet form bodies from a
+closed loop of concurrent clients, optionally ramping the concurrency in
+stages, and reports throughput and latency percentiles as JSON. A share of
+the postings can reuse an earlier tpg_trans_id (a TouchNet retry) or carry
+an invalid posting key.
+
+Run it against a local server, for example ``uvicorn upayapi.main:app``
+backed by SQLite or PostgreSQL. The generator runs in one process; if its
+``client_cpu_percent`` approaches 100, the client rather than the server is
+the bottleneck and the numbers understate the server.
+
+Usage:
+    upay-loadtest --concurrency 10,50,100 --stage-duration 30
+    upay-loadtest --url http://127.0.0.1:8000 --duplicate-ratio 0.05 --output run.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode
+
+# Configure logger
+logger = logging.getLogger("upayapi.cli.loadtest")
+
+# Path of the posting endpoint
+POSTING_PATH = "/upay/posting"
+
+# Number of recent tpg_trans_ids that duplicate postings are drawn from
+DUPLICATE_WINDOW = 10000
+
+# Names used for name_on_acct
+FIRST_NAMES = ["Alex", "Jordan", "Sam", "Taylor", "Morgan", "Casey", "Riley", "Jamie"]
+LAST_NAMES = ["Smith", "Johnson", "Lee", "Garcia", "Brown", "Nguyen", "Patel", "Miller"]
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Get a percentile from a sorted list of samples.
+
+    Args:
+        samples: Latency samples in seconds, sorted ascending.
+        fraction: Percentile as a fraction between 0 and 1.
+
+    Returns:
+        Percentile value in milliseconds, or 0.0 if there are no samples.
+    """
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, int(round(fraction * (len(samples) - 1))))
+    return round(samples[index] * 1000, 3)
+
+
+class PostingFactory:
+    """Generator of form-encoded posting bodies.
+
+    Attributes:
+        posting_key: Valid posting key.
+        duplicate_ratio: Fraction of postings that repeat a recent tpg_trans_id.
+        invalid_key_ratio: Fraction of postings with an invalid posting key.
+        run_id: Prefix making tpg_trans_ids unique to this run.
+    """
+
+    def __init__(
+        self,
+        posting_key: str,
+        duplicate_ratio: float = 0.0,
+        invalid_key_ratio: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """Initialize the factory.
+
+        Args:
+            posting_key: Valid posting key.
+            duplicate_ratio: Fraction of postings that repeat a recent tpg_trans_id.
+            invalid_key_ratio: Fraction of postings with an invalid posting key.
+            seed: Random seed, for reproducible runs.
+        """
+        self.posting_key = posting_key
+        self.duplicate_ratio = duplicate_ratio
+        self.invalid_key_ratio = invalid_key_ratio
+        self.run_id = uuid.uuid4().hex[:8]
+        self._random = random.Random(seed)
+        self._sequence = 0
+        self._recent: List[bytes] = []
+        self._pmt_date = date.today().strftime("%m/%d/%Y")
+
+    def next(self) -> Tuple[str, bytes]:
+        """Get the next posting.
+
+        Returns:
+            Kind of posting ("new", "duplicate" or "invalid_key") and its
+            form-encoded body.
+        """
+        roll = self._random.random()
+        if roll < self.invalid_key_ratio:
+            return "invalid_key", self._body(self._new_id(), "invalid-" + self.run_id)
+        if roll < self.invalid_key_ratio + self.duplicate_ratio and self._recent:
+            return "duplicate", self._random.choice(self._recent)
+
+        body = self._body(self._new_id(), self.posting_key)
+        if len(self._recent) < DUPLICATE_WINDOW:
+            self._recent.append(body)
+        else:
+            self._recent[self._sequence % DUPLICATE_WINDOW] = body
+        return "new", body
+
+    def _new_id(self) -> str:
+        """Get a tpg_trans_id that has not been used in this run.
+
+        Returns:
+            Transaction reference number.
+        """
+        self._sequence += 1
+        return f"{self.run_id}-{self._sequence}"
+
+    def _body(self, tpg_trans_id: str, posting_key: str) -> bytes:
+        """Build a form-encoded posting body.
+
+        Args:
+            tpg_trans_id: Transaction reference number.
+            posting_key: Posting key to send.
+
+        Returns:
+            URL-encoded form body.
+        """
+        return urlencode(
+            {
+                "posting_key": posting_key,
+                "tpg_trans_id": tpg_trans_id,
+                "session_identifier": uuid.UUID(int=self._random.getrandbits(128)).hex,
+                "pmt_status": "cancelled"
+                if self._random.random() < 0.05
+                else "success",
+                "pmt_amt": f"{self._random.randint(100, 250000) / 100:.2f}",
+                "pmt_date": self._pmt_date,
+                "name_on_acct": (
+                    f"{self._random.choice(FIRST_NAMES)} {self._random.choice(LAST_NAMES)}"
+                ),
+            }
+        ).encode()
+
+
+class StageResult:
+    """Measurements collected during one load stage.
+
+    Attributes:
+        concurrency: Number of postings in flight at once.
+        latencies: Latency of each completed request in seconds.
+        statuses: Count of responses per HTTP status code.
+        outcomes: Count of responses per outcome.
+        elapsed: Duration of the stage in seconds.
+        cpu: Client CPU time used during the stage in seconds.
+    """
+
+    def __init__(self, concurrency: int):
+        """Initialize an empty result.
+
+        Args:
+            concurrency: Number of postings in flight at once.
+        """
+        self.concurrency = concurrency
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+        self.outcomes: Counter = Counter()
+        self.elapsed = 0.0
+        self.cpu = 0.0
+
+    def record(
+        self, kind: str, status_code: Optional[int], content: bytes, latency: float
+    ) -> None:
+        """Record one request.
+
+        Args:
+            kind: Kind of posting sent.
+            status_code: HTTP status code, or None if the request failed.
+            content: Response body.
+            latency: Request latency in seconds.
+        """
+        if status_code is None:
+            self.outcomes["transport_error"] += 1
+            return
+
+        self.latencies.append(latency)
+        self.statuses[str(status_code)] += 1
+        if kind == "invalid_key":
+            outcome = "rejected" if status_code == 401 else "unexpected"
+        elif status_code != 200:
+            outcome = "unexpected"
+        elif b"already processed" in content:
+            outcome = "duplicate"
+        else:
+            outcome = "created"
+        self.outcomes[outcome] += 1
+
+    def merge(self, other: "StageResult") -> None:
+        """Add the measurements of another stage to this one.
+
+        Args:
+            other: Stage result to add.
+        """
+        self.latencies.extend(other.latencies)
+        self.statuses.update(other.statuses)
+        self.outcomes.update(other.outcomes)
+        self.elapsed += other.elapsed
+        self.cpu += other.cpu
+
+    def summary(self) -> Dict[str, Any]:
+        """Summarize the stage.
+
+        Returns:
+            Throughput, latency percentiles and response counts.
+        """
+        latencies = sorted(self.latencies)
+        return {
+            "concurrency": self.concurrency,
+            "requests": len(latencies),
+            "seconds": round(self.elapsed, 3),
+            "throughput_rps": round(len(latencies) / self.elapsed, 1)
+            if self.elapsed
+            else 0.0,
+            "latency_ms": {
+                "p50": percentile(latencies, 0.50),
+                "p95": percentile(latencies, 0.95),
+                "p99": percentile(latencies, 0.99),
+                "p999": percentile(latencies, 0.999),
+                "max": percentile(latencies, 1.0),
+                "mean": round(sum(latencies) / len(latencies) * 1000, 3)
+                if latencies
+                else 0.0,
+            },
+            "statuses": dict(sorted(self.statuses.items())),
+            "outcomes": dict(sorted(self.outcomes.items())),
+            "client_cpu_percent": (
+                round(self.cpu / self.elapsed * 100, 1) if self.elapsed else 0.0
+            ),
+        }
+
+
+async def run_stage(
+    client: Any,
+    factory: PostingFactory,
+    concurrency: int,
+    duration: float,
+) -> StageResult:
+    """Send postings from a closed loop of clients for a fixed duration.
+
+    Args:
+        client: httpx.AsyncClient pointed at the server.
+        factory: Generator of posting bodies.
+        concurrency: Number of postings in flight at once.
+        duration: Duration of the stage in seconds.
+
+    Returns:
+        Measurements of the stage.
+    """
+    import httpx
+
+    result = StageResult(concurrency)
+    headers = {"Content-Type": "application/x-www-form-urlencoded"}
+    deadline = time.perf_counter() + duration
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            kind, body = factory.next()
+            started = time.perf_counter()
+            try:
+                response = await client.post(
+                    POSTING_PATH, content=body, headers=headers
+                )
+            except httpx.HTTPError:
+                result.record(kind, None, b"", 0.0)
+                continue
+            result.record(
+                kind,
+                response.status_code,
+                response.content,
+                time.perf_counter() - started,
+            )
+
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed = time.perf_counter() - started
+    result.cpu = time.process_time() - cpu_started
+    return result
+
+
+async def run_load(
+    url: str,
+    factory: PostingFactory,
+    stages: Sequence[int],
+    stage_duration: float,
+    warmup: float = 0.0,
+    timeout: float = 30.0,
+    transport: Any = None,
+) -> Dict[str, Any]:
+    """Run a load test with a concurrency ramp.
+
+    Args:
+        url: Base URL of the server.
+        factory: Generator of posting bodies.
+        stages: Concurrency of each stage, in order.
+        stage_duration: Duration of each stage in seconds.
+        warmup: Seconds of unrecorded load at the first stage's concurrency.
+        timeout: Request timeout in seconds.
+        transport: httpx transport to use instead of the network, for tests.
+
+    Returns:
+        Report with the configuration, each stage and the totals.
+    """
+    import httpx
+
+    limits = httpx.Limits(
+        max_connections=max(stages), max_keepalive_connections=max(stages)
+    )
+    async with httpx.AsyncClient(
+        base_url=url, timeout=timeout, limits=limits, transport=transport
+    ) as client:
+        if warmup > 0:
+            await run_stage(client, factory, stages[0], warmup)
+
+        results = []
+        for concurrency in stages:
+            result = await run_stage(client, factory, concurrency, stage_duration)
+            summary = result.summary()
+            logger.info(
+                "concurrency %d: %s req/s, p99 %s ms",
+                concurrency,
+                summary["throughput_rps"],
+                summary["latency_ms"]["p99"],
+            )
+            results.append(result)
+
+    total = StageResult(max(stages))
+    for result in results:
+        total.merge(result)
+    total_summary = total.summary()
+    del total_summary["concurrency"]
+
+    return {
+        "url": url,
+        "config": {
+            "stages": list(stages),
+            "stage_duration": stage_duration,
+            "warmup": warmup,
+            "duplicate_ratio": factory.duplicate_ratio,
+            "invalid_key_ratio": factory.invalid_key_ratio,
+            "run_id": factory.run_id,
+        },
+        "stages": [result.summary() for result in results],
+        "total": total_summary,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the load test command.
+
+    Args:
+        argv: Command-line arguments. If None, uses sys.argv.
+
+    Returns:
+        Process exit code.
+    """
+    parser = argparse.ArgumentParser(
+        prog="upay-loadtest",
+        description="Drive /upay/posting with concurrent postings and report latency as JSON.",
+    )
+    parser.add_argument(
+        "--url", default="http://127.0.0.1:8000", help="Base URL of the server"
+    )
+    parser.add_argument(
+        "--posting-key", help="Valid posting key (default: POSTING_KEY setting)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        default="10",
+        help="Comma-separated concurrency of each stage, e.g. 10,50,100",
+    )
+    parser.add_argument(
+        "--stage-duration", type=float, default=10.0, help="Seconds per stage"
+    )
+    parser.add_argument(
+        "--warmup",
+        type=float,
+        default=2.0,
+        help="Unrecorded seconds before the first stage",
+    )
+    parser.add_argument(
+        "--duplicate-ratio",
+        type=float,
+        default=0.0,
+        help="Fraction of postings repeating a recent tpg_trans_id",
+    )
+    parser.add_argument(
+        "--invalid-key-ratio",
+        type=float,
+        default=0.0,
+        help="Fraction of postings with an invalid posting key",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=30.0, help="Request timeout in seconds"
+    )
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible bodies")
+    parser.add_argument(
+        "--output", help="Write the JSON report to this file instead of stdout"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    try:
+        import httpx  # noqa: F401
+    except ImportError:
+        logger.error("upay-loadtest requires httpx: pip install 'upayapi[loadtest]'")
+        return 1
+
+    try:
+        stages = [int(value) for value in args.concurrency.split(",")]
+    except ValueError:
+        parser.error("--concurrency must be a comma-separated list of integers")
+    if not stages or min(stages) < 1:
+        parser.error("--concurrency values must be positive")
+    if args.duplicate_ratio + args.invalid_key_ratio > 1:
+        parser.error(
+            "--duplicate-ratio and --invalid-key-ratio must add up to at most 1"
+        )
+
+    if args.posting_key is None:
+        from upayapi.config import settings
+
+        args.posting_key = settings.posting_key
+
+    factory = PostingFactory(
+        args.posting_key,
+        duplicate_ratio=args.duplicate_ratio,
+        invalid_key_ratio=args.invalid_key_ratio,
+        seed=args.seed,
+    )
+    report = asyncio.run(
+        run_load(
+            args.url,
+            factory,
+            stages,
+            args.stage_duration,
+            warmup=args.warmup,
+            timeout=args.timeout,
+        )
+    )
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
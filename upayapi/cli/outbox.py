@@ -0,0 +1,93 @@
+"""Inspection and maintenance of the transaction outbox.
+
+Prints the number of outbox events in each delivery state. Optionally sends
+dead-lettered events back to the queue, once the downstream system is
+fixed, and deletes events delivered more than a number of days ago.
+
+Usage:
+    upay-outbox
+    upay-outbox --requeue
+    upay-outbox --purge-delivered-days 7
+"""
+
+import argparse
+import json
+import logging
+import sys
+from datetime import timedelta
+from typing import Any, Dict, Optional, Sequence
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from upayapi.repositories.outbox import OutboxRepository, utcnow
+
+# Configure logger
+logger = logging.getLogger("upayapi.cli.outbox")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the outbox command.
+
+    Args:
+        argv: Command-line arguments. If None, uses sys.argv.
+
+    Returns:
+        Process exit code.
+    """
+    parser = argparse.ArgumentParser(
+        prog="upay-outbox",
+        description="Show outbox delivery states, requeue dead letters and purge old events.",
+    )
+    parser.add_argument(
+        "--requeue",
+        action="store_true",
+        help="Send dead-lettered events back to the queue",
+    )
+    parser.add_argument(
+        "--purge-delivered-days",
+        type=int,
+        help="Delete events delivered more than this many days ago",
+    )
+    parser.add_argument(
+        "--database-url",
+        help="Database connection string (default: DATABASE_URL setting)",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    if args.purge_delivered_days is not None and args.purge_delivered_days < 0:
+        parser.error("--purge-delivered-days must not be negative")
+
+    if args.database_url:
+        engine = create_engine(args.database_url)
+    else:
+        from upayapi.database import get_engine
+
+        engine = get_engine()
+
+    report: Dict[str, Any] = {}
+    try:
+        with Session(engine) as db:
+            repository = OutboxRepository(db)
+            if args.requeue:
+                report["requeued"] = repository.requeue_dead()
+            if args.purge_delivered_days is not None:
+                before = utcnow() - timedelta(days=args.purge_delivered_days)
+                report["purged"] = repository.delete_delivered(before)
+            report["events"] = repository.count_by_status()
+    except SQLAlchemyError as e:
+        logger.error("Outbox command failed: %s", e)
+        return 1
+
+    print(json.dumps(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
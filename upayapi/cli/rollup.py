@@ -0,0 +1,98 @@
+"""Rebuild of the daily transaction rollup.
+
+Recomputes ``transaction_daily_rollup`` rows from the transactions table,
+for backfilling the rollup after it is introduced or repairing it after
+transactions were changed outside the API. Archived months are aggregated
+from the Parquet archive, which requires pyarrow (the ``archive`` extra).
+
+Usage:
+    upay-rebuild-rollup
+    upay-rebuild-rollup --start-date 2025-01-01 --end-date 2025-01-31
+    upay-rebuild-rollup --archive-dir /var/lib/upay/archive
+"""
+
+import argparse
+import json
+import logging
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Optional, Sequence
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
+
+from upayapi.archive import ArchiveReader
+from upayapi.config import settings
+from upayapi.repositories.rollup import RollupRepository
+
+# Configure logger
+logger = logging.getLogger("upayapi.cli.rollup")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the rollup rebuild command.
+
+    Args:
+        argv: Command-line arguments. If None, uses sys.argv.
+
+    Returns:
+        Process exit code.
+    """
+    parser = argparse.ArgumentParser(
+        prog="upay-rebuild-rollup",
+        description="Rebuild the daily transaction rollup from the transactions and the archive.",
+    )
+    parser.add_argument(
+        "--start-date",
+        type=date.fromisoformat,
+        help="First payment date to rebuild (YYYY-MM-DD)",
+    )
+    parser.add_argument(
+        "--end-date",
+        type=date.fromisoformat,
+        help="Last payment date to rebuild (YYYY-MM-DD)",
+    )
+    parser.add_argument(
+        "--archive-dir",
+        type=Path,
+        default=Path(settings.archive_dir) if settings.archive_dir else None,
+        help="Directory of the Parquet archive (default: ARCHIVE_DIR setting)",
+    )
+    parser.add_argument(
+        "--database-url",
+        help="Database connection string (default: DATABASE_URL setting)",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    if args.database_url:
+        session_factory = sessionmaker(
+            autocommit=False, autoflush=False, bind=create_engine(args.database_url)
+        )
+    else:
+        from upayapi.database import get_session_factory
+
+        session_factory = get_session_factory()
+
+    archive = ArchiveReader(args.archive_dir) if args.archive_dir else None
+    try:
+        with session_factory() as db:
+            rows = RollupRepository(db, archive=archive).rebuild(
+                args.start_date, args.end_date
+            )
+    except (ImportError, SQLAlchemyError) as e:
+        logger.error("Rollup rebuild failed: %s", e)
+        return 1
+
+    print(json.dumps({"rollup_rows": rows}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
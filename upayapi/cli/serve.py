@@ -0,0 +1,152 @@
+"""Production server for the uPay API.
+
+Checks once, in the master process, that the database schema is at the
+Alembic head revision, then runs uvicorn with several worker processes
+sharing one listening socket. Nothing touches the database at import time:
+each worker creates its engines and fills its connection pools in the
+application lifespan, before it accepts requests.
+
+Usage:
+    upay-serve --workers 4
+    upay-serve --host 0.0.0.0 --port 8000 --workers 8 --upgrade
+"""
+
+import argparse
+import logging
+import os
+import sys
+from typing import Optional, Sequence, Set, Tuple
+
+import uvicorn
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from upayapi.config import settings
+from upayapi.log import configure_logging
+
+# Configure logger
+logger = logging.getLogger("upayapi.cli.serve")
+
+
+def check_schema(
+    database_url: str, alembic_config: str = "alembic.ini", upgrade: bool = False
+) -> Tuple[Set[str], Set[str]]:
+    """Compare a database's schema revision with the Alembic head.
+
+    Args:
+        database_url: Database connection string.
+        alembic_config: Path of the Alembic configuration file.
+        upgrade: Whether to upgrade the database to head if it is behind.
+
+    Returns:
+        The database's revisions, after any upgrade, and the head revisions.
+    """
+    config = Config(
+        alembic_config,
+        attributes={"database_url": database_url, "configure_logger": False},
+    )
+    heads = set(ScriptDirectory.from_config(config).get_heads())
+
+    engine = create_engine(database_url, poolclass=NullPool)
+    try:
+        with engine.connect() as connection:
+            current = set(MigrationContext.configure(connection).get_current_heads())
+    finally:
+        engine.dispose()
+
+    if current != heads and upgrade:
+        logger.info("Upgrading database from %s to %s", sorted(current), sorted(heads))
+        command.upgrade(config, "head")
+        current = heads
+    return current, heads
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the production server.
+
+    Args:
+        argv: Command-line arguments. If None, uses sys.argv.
+
+    Returns:
+        Process exit code.
+    """
+    parser = argparse.ArgumentParser(
+        prog="upay-serve",
+        description="Run the uPay API with several uvicorn worker processes.",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address")
+    parser.add_argument("--port", type=int, default=8000, help="Bind port")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--alembic-config", default="alembic.ini", help="Alembic configuration file"
+    )
+    parser.add_argument(
+        "--upgrade",
+        action="store_true",
+        help="Upgrade the database to the head revision instead of refusing to start",
+    )
+    parser.add_argument(
+        "--skip-schema-check",
+        action="store_true",
+        help="Start without checking the schema",
+    )
+    parser.add_argument(
+        "--graceful-timeout",
+        type=int,
+        default=30,
+        help="Seconds workers get to finish requests on shutdown",
+    )
+    args = parser.parse_args(argv)
+
+    configure_logging(
+        level=settings.log_level or ("DEBUG" if settings.debug else "INFO"),
+        log_format=settings.log_format,
+        queue_size=settings.log_queue_size,
+        sample_burst=settings.log_sample_burst,
+        sample_window=settings.log_sample_window_seconds,
+    )
+
+    if not args.skip_schema_check:
+        try:
+            current, heads = check_schema(
+                settings.database_url, args.alembic_config, args.upgrade
+            )
+        except Exception as e:
+            logger.error("Schema check failed: %s", e)
+            return 1
+        if current != heads:
+            logger.error(
+                "Database is at revision %s, not at head %s. Run `alembic upgrade "
+                "head` (after `alembic stamp 0001` for a database created before "
+                "the migrations existed) or start with --upgrade.",
+                sorted(current) or "none",
+                sorted(heads),
+            )
+            return 1
+        logger.info("Database schema is at head %s", sorted(heads))
+
+    # Logging is configured by the application in each worker, and
+    # RequestContextMiddleware writes the access log
+    uvicorn.run(
+        "upayapi.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_config=None,
+        access_log=False,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,6 @@
 """Configuration settings for the uPay API."""
 
-from typing import List, Literal, Optional
+from typing import Dict, List, Literal, Optional
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -13,10 +13,103 @@ class Settings(BaseSettings):
         debug: Debug mode flag.
         environment: Current environment (dev, test, prod).
         database_url: Database connection string.
+        replica_database_url: Connection string of a read replica for the
+            reporting endpoints. If empty, they read from the primary.
+        replica_max_lag_seconds: Largest replication lag at which reads go
+            to the replica rather than the primary.
+        replica_retry_seconds: Number of seconds reads go to the primary
+            after a replica connection error, unless a health probe finds
+            the replica available sooner.
         posting_key: Authentication key for validating uPay requests.
+            Postings with this key are stored under default_site_id.
+        posting_sites: Posting keys of further uPay sites, by site ID. A
+            value is either the key or ``sha256:`` followed by the hex
+            SHA-256 digest of the key. Sites in the sites table are added
+            when a worker starts.
+        default_site_id: Site ID of postings authenticated with posting_key.
+        reporting_key: API key for the reporting endpoints. If empty, the
+            reporting endpoints reject every request.
         allowed_origins: List of allowed origins for CORS in production.
         connection_pool_size: Size of the database connection pool.
         connection_pool_max_overflow: Maximum overflow of the connection pool.
+        db_pool_profile: Pool profile (sqlite_memory, sqlite, dev, test,
+            prod). If unset, it is chosen from database_url and environment.
+        db_liveness: How pooled connections are checked before use (none,
+            pre_ping, idle). If unset, the pool profile's mode is used.
+        db_pool_prewarm: Open the pool's connections when a worker starts,
+            before it accepts requests.
+        db_liveness_idle_seconds: Number of seconds a connection may sit in
+            the pool before it is pinged in the idle liveness mode.
+        sqlite_tuning: Apply WAL journaling and the SQLite pragmas below to
+            file SQLite databases.
+        sqlite_single_writer: Send writes to file SQLite databases through
+            one serialized connection and reads through a reader pool.
+        sqlite_busy_timeout_ms: Number of milliseconds a SQLite connection
+            waits for a lock before failing.
+        sqlite_mmap_size: Number of bytes of a SQLite database to memory-map.
+        sqlite_cache_size_kib: SQLite page cache size per connection in KiB.
+        use_async_database: Process postings through the async database path.
+        async_database_url: Async database connection string. If empty, it is
+            derived from database_url.
+        idempotency_cache_size: Maximum number of tpg_trans_ids remembered
+            in-process. 0 disables the cache.
+        idempotency_cache_ttl: Number of seconds a remembered tpg_trans_id
+            stays valid.
+        ingestion_batching: Commit postings in batches (group commit) instead
+            of one transaction per posting.
+        ingestion_batch_size: Maximum number of postings committed together.
+        ingestion_batch_max_wait_ms: Maximum number of milliseconds a posting
+            waits for its batch to fill before it is flushed.
+        ingestion_batch_timeout_seconds: Maximum number of seconds a posting
+            waits for its batch to be committed.
+        partition_months_ahead: Number of months after the current one
+            whose transaction partitions are created ahead of time on
+            PostgreSQL.
+        archive_dir: Directory of the Parquet files of archived months. If
+            empty, exports only read the database.
+        archive_retention_months: Number of months, before the current one,
+            kept in the database by upay-archive.
+        outbox_url: URL each new transaction is posted to by the outbox
+            dispatcher. If empty, no outbox events are written.
+        outbox_batch_size: Maximum number of outbox events claimed at once.
+            Capped so a batch of timed out deliveries fits in the lease.
+        outbox_concurrency: Maximum number of deliveries in flight per worker.
+        outbox_max_attempts: Number of failed deliveries after which an
+            event is dead-lettered.
+        outbox_backoff_seconds: Delay before the first retry, doubled after
+            each further failure.
+        outbox_backoff_max_seconds: Longest delay between retries.
+        outbox_timeout_seconds: Timeout of each delivery request.
+        outbox_poll_interval_seconds: Number of seconds between claims when
+            no events are due.
+        outbox_lease_seconds: Number of seconds a claimed event is hidden
+            from other dispatchers before it is retried.
+        metrics_enabled: Collect metrics and expose them at /metrics.
+        health_probe_interval_seconds: Number of seconds between background
+            database health probes. Health endpoints serve the last result.
+        admission_control: Limit concurrent posting and reporting requests
+            and shed excess load with 503 responses.
+        admission_max_concurrency: Maximum number of requests admitted at
+            once. If None, the capacity of the database connection pools.
+        admission_reporting_max_concurrency: Maximum number of reporting
+            requests admitted at once. If None, the capacity of the reporting
+            pool, or half of admission_max_concurrency if reporting shares
+            the write pool.
+        admission_queue_size: Maximum number of requests waiting for
+            admission.
+        admission_timeout_seconds: Maximum number of seconds a request waits
+            for admission before it is shed.
+        admission_retry_after_seconds: Retry-After value of shed requests.
+        access_log: Write one access log line per request to the
+            upayapi.access logger.
+        log_level: Root log level. If None, DEBUG in debug mode and INFO
+            otherwise.
+        log_format: Log line format, json or text.
+        log_queue_size: Maximum number of log records waiting to be written;
+            records are dropped when the queue is full.
+        log_sample_burst: Number of identical warnings or errors logged per
+            sampling window. 0 disables sampling.
+        log_sample_window_seconds: Length of the log sampling window.
     """
 
     app_name: str = "uPay API"
@@ -25,9 +118,32 @@ class Settings(BaseSettings):
     database_url: str = Field(
         default="sqlite:///./upay.db", description="Database connection string"
     )
+    replica_database_url: str = Field(
+        default="",
+        description="Read replica connection string for reporting (primary if empty)",
+    )
+    replica_max_lag_seconds: float = Field(
+        default=30.0, description="Largest replication lag at which the replica is read"
+    )
+    replica_retry_seconds: float = Field(
+        default=30.0,
+        description="Seconds reads go to the primary after a replica connection error",
+    )
     posting_key: str = Field(
         default="", description="Authentication key for validating uPay requests"
     )
+    posting_sites: Dict[str, str] = Field(
+        default={},
+        description="Posting keys (or sha256:<hex digest> of them) by site ID",
+    )
+    default_site_id: str = Field(
+        default="default",
+        description="Site ID of postings authenticated with posting_key",
+    )
+    reporting_key: str = Field(
+        default="",
+        description="API key for the reporting endpoints (disabled if empty)",
+    )
     allowed_origins: List[str] = Field(
         default=["http://localhost:8000"],
         description="List of allowed origins for CORS in production",
@@ -38,6 +154,156 @@ class Settings(BaseSettings):
     connection_pool_max_overflow: int = Field(
         default=10, description="Maximum overflow of the connection pool"
     )
+    db_pool_profile: Optional[
+        Literal["sqlite_memory", "sqlite", "dev", "test", "prod"]
+    ] = Field(
+        default=None,
+        description="Pool profile (chosen from database_url and environment if unset)",
+    )
+    db_liveness: Optional[Literal["none", "pre_ping", "idle"]] = Field(
+        default=None,
+        description="Connection liveness mode (the pool profile's mode if unset)",
+    )
+    db_pool_prewarm: bool = Field(
+        default=True,
+        description="Open pool connections before a worker accepts requests",
+    )
+    db_liveness_idle_seconds: float = Field(
+        default=30.0,
+        description="Seconds a pooled connection may idle before it is pinged",
+    )
+    sqlite_tuning: bool = Field(
+        default=True,
+        description="Apply WAL journaling and tuning pragmas to file SQLite databases",
+    )
+    sqlite_single_writer: bool = Field(
+        default=True,
+        description="Serialize SQLite writes on one connection and read from a pool",
+    )
+    sqlite_busy_timeout_ms: int = Field(
+        default=5000, description="Milliseconds a SQLite connection waits for a lock"
+    )
+    sqlite_mmap_size: int = Field(
+        default=268435456, description="Bytes of a SQLite database to memory-map"
+    )
+    sqlite_cache_size_kib: int = Field(
+        default=65536, description="SQLite page cache size per connection in KiB"
+    )
+    use_async_database: bool = Field(
+        default=False,
+        description="Process postings through the async database path",
+    )
+    async_database_url: str = Field(
+        default="",
+        description="Async database connection string (derived from database_url if empty)",
+    )
+    idempotency_cache_size: int = Field(
+        default=10000,
+        description="Maximum number of tpg_trans_ids remembered in-process (0 disables)",
+    )
+    idempotency_cache_ttl: float = Field(
+        default=3600.0,
+        description="Number of seconds a remembered tpg_trans_id stays valid",
+    )
+    ingestion_batching: bool = Field(
+        default=False,
+        description="Commit postings in batches instead of one transaction each",
+    )
+    ingestion_batch_size: int = Field(
+        default=100, description="Maximum number of postings committed together"
+    )
+    ingestion_batch_max_wait_ms: float = Field(
+        default=5.0,
+        description="Maximum milliseconds a posting waits for its batch to fill",
+    )
+    ingestion_batch_timeout_seconds: float = Field(
+        default=30.0,
+        description="Maximum seconds a posting waits for its batch to be committed",
+    )
+    partition_months_ahead: int = Field(
+        default=3, description="Months of transaction partitions created ahead of time"
+    )
+    archive_dir: str = Field(
+        default="",
+        description="Directory of archived transaction months (none if empty)",
+    )
+    archive_retention_months: int = Field(
+        default=24, description="Months kept in the database before archiving"
+    )
+    outbox_url: str = Field(
+        default="",
+        description="URL new transactions are posted to (no outbox if empty)",
+    )
+    outbox_batch_size: int = Field(
+        default=100, description="Maximum outbox events claimed at once"
+    )
+    outbox_concurrency: int = Field(
+        default=10, description="Maximum outbox deliveries in flight per worker"
+    )
+    outbox_max_attempts: int = Field(
+        default=10,
+        description="Failed deliveries before an outbox event is dead-lettered",
+    )
+    outbox_backoff_seconds: float = Field(
+        default=1.0, description="Delay before the first outbox retry"
+    )
+    outbox_backoff_max_seconds: float = Field(
+        default=600.0, description="Longest delay between outbox retries"
+    )
+    outbox_timeout_seconds: float = Field(
+        default=10.0, description="Timeout of each outbox delivery"
+    )
+    outbox_poll_interval_seconds: float = Field(
+        default=1.0, description="Seconds between outbox claims when none are due"
+    )
+    outbox_lease_seconds: float = Field(
+        default=60.0, description="Seconds a claimed outbox event is hidden from others"
+    )
+    metrics_enabled: bool = Field(
+        default=True, description="Collect metrics and expose them at /metrics"
+    )
+    health_probe_interval_seconds: float = Field(
+        default=5.0, description="Seconds between background database health probes"
+    )
+    admission_control: bool = Field(
+        default=True, description="Limit concurrent requests and shed excess load"
+    )
+    admission_max_concurrency: Optional[int] = Field(
+        default=None,
+        description="Requests admitted at once; the connection pools' capacity if unset",
+    )
+    admission_reporting_max_concurrency: Optional[int] = Field(
+        default=None,
+        description="Reporting requests admitted at once; half the limit if unset",
+    )
+    admission_queue_size: int = Field(
+        default=50, description="Maximum number of requests waiting for admission"
+    )
+    admission_timeout_seconds: float = Field(
+        default=5.0, description="Maximum seconds a request waits for admission"
+    )
+    admission_retry_after_seconds: int = Field(
+        default=5, description="Retry-After value of shed requests"
+    )
+    access_log: bool = Field(
+        default=True, description="Write one access log line per request"
+    )
+    log_level: Optional[str] = Field(
+        default=None, description="Root log level; DEBUG or INFO by debug mode if unset"
+    )
+    log_format: Literal["json", "text"] = Field(
+        default="json", description="Log line format"
+    )
+    log_queue_size: int = Field(
+        default=10000, description="Maximum number of log records waiting to be written"
+    )
+    log_sample_burst: int = Field(
+        default=10,
+        description="Identical warnings or errors logged per sampling window (0 disables)",
+    )
+    log_sample_window_seconds: float = Field(
+        default=60.0, description="Length of the log sampling window in seconds"
+    )
 
     model_config = SettingsConfigDict(
         env_file=".env", env_file_encoding="utf-8", case_sensitive=False
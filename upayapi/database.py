@@ -1,91 +1,294 @@
 """Database configuration for the uPay API."""
 
 import logging
+import threading
 from contextlib import contextmanager
-from typing import Any, Dict, Generator
+from typing import Any, Dict, Generator, Optional, Tuple
 
 from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import declarative_base, sessionmaker, Session
-from sqlalchemy.pool import QueuePool
 
 from upayapi.config import settings
+from upayapi.metrics import instrument_engine
+from upayapi.pool import (
+    configure_liveness,
+    configure_sqlite,
+    get_liveness_mode,
+    get_pool_args,
+    get_pool_profile,
+)
+from upayapi.replica import RoutingSession, configure_replica, replica_router
 
 # Configure logger
 logger = logging.getLogger("upayapi.database")
 
 
-def get_engine_args() -> Dict[str, Any]:
+def get_engine_args(
+    database_url: Optional[str] = None, profile: Optional[str] = None
+) -> Dict[str, Any]:
     """Get SQLAlchemy engine arguments based on database type.
 
+    Args:
+        database_url: Database connection string. If None, uses
+            ``settings.database_url``.
+        profile: Pool profile. If None, it is chosen from the database URL.
+
     Returns:
         Dictionary of engine arguments.
     """
+    database_url = database_url or settings.database_url
+
     # Default engine arguments
     engine_args = {
         "echo": settings.debug,
     }
 
-    # Add connection pooling configuration for non-SQLite databases in production
-    if (
-        not settings.database_url.startswith("sqlite")
-        and settings.environment == "prod"
-    ):
-        engine_args.update(
-            {
-                "poolclass": QueuePool,
-                "pool_size": settings.connection_pool_size,
-                "max_overflow": settings.connection_pool_max_overflow,
-                "pool_timeout": 30,  # 30 seconds
-                "pool_recycle": 1800,  # 30 minutes
-                "pool_pre_ping": True,
-            }
-        )
+    # Add the connection pool configuration of the database's pool profile
+    engine_args.update(get_pool_args(database_url, profile=profile))
 
     # Add connect_args based on database type
-    if settings.database_url.startswith("sqlite"):
+    if database_url.startswith("sqlite"):
         engine_args["connect_args"] = {"check_same_thread": False}
 
     return engine_args
 
 
-# Create SQLAlchemy engine with appropriate configuration
-try:
-    engine_args = get_engine_args()
-    engine = create_engine(settings.database_url, **engine_args)
-    logger.info(f"Database engine created for {settings.database_url}")
-except Exception as e:
-    logger.error(f"Failed to create database engine: {str(e)}")
-    raise
+def create_database_engines(database_url: str) -> Tuple[Engine, Engine]:
+    """Create the write and read engines for a database.
 
+    Both are the same engine, except for file SQLite databases with
+    ``settings.sqlite_single_writer`` enabled: writes then go through an
+    engine with a single connection that takes the write lock at the start
+    of every transaction, and reads through a pool of query-only
+    connections, which WAL journaling lets run alongside the writer.
+
+    Args:
+        database_url: Database connection string.
+
+    Returns:
+        Write engine and read engine.
+    """
+    liveness = get_liveness_mode(database_url)
+    tuned = settings.sqlite_tuning and get_pool_profile(database_url) == "sqlite"
+
+    if not (tuned and settings.sqlite_single_writer):
+        engine = create_engine(database_url, **get_engine_args(database_url))
+        configure_liveness(engine, liveness)
+        if tuned:
+            configure_sqlite(engine)
+        return engine, engine
+
+    write_engine = create_engine(
+        database_url, **get_engine_args(database_url, profile="sqlite_writer")
+    )
+    configure_liveness(write_engine, liveness)
+    configure_sqlite(write_engine, begin_immediate=True)
+
+    read_engine = create_engine(database_url, **get_engine_args(database_url))
+    configure_liveness(read_engine, liveness)
+    configure_sqlite(read_engine, query_only=True)
+    return write_engine, read_engine
+
+
+def create_replica_engine(database_url: str) -> Engine:
+    """Create the engine of a read replica.
+
+    Connection errors on the engine send reads to the primary through
+    replica_router.
+
+    Args:
+        database_url: Replica connection string.
+
+    Returns:
+        Replica engine.
+    """
+    engine = create_engine(database_url, **get_engine_args(database_url))
+    configure_liveness(engine, get_liveness_mode(database_url))
+    if settings.sqlite_tuning and get_pool_profile(database_url) == "sqlite":
+        configure_sqlite(engine, query_only=True)
+    configure_replica(engine, replica_router)
+    return engine
+
+
+_engine: Optional[Engine] = None
+_read_engine: Optional[Engine] = None
+_replica_engine: Optional[Engine] = None
+_session_factory: Optional[sessionmaker[Session]] = None
+_read_session_factory: Optional[sessionmaker[Session]] = None
+# Serializes engine creation between the threads of the first requests
+_init_lock = threading.Lock()
+
+
+def init_engines() -> Tuple[Engine, Engine]:
+    """Create the write and read engines and their session factories.
+
+    Engines are not created at import time, so a process that forks workers
+    never hands pooled connections to its children. Each worker creates its
+    engines in the application lifespan, or on first use.
+
+    Returns:
+        Write engine and read engine.
+
+    Raises:
+        Exception: If the engines cannot be created.
+    """
+    if _engine is not None and _read_engine is not None:
+        return _engine, _read_engine
+
+    with _init_lock:
+        if _engine is not None and _read_engine is not None:
+            return _engine, _read_engine
+        return _create_engines()
 
-# Add event listeners for connection pool
-@event.listens_for(engine, "connect")
-def connect(dbapi_connection, connection_record):
-    """Log when a connection is created."""
-    logger.debug("Database connection established")
 
+def _create_engines() -> Tuple[Engine, Engine]:
+    """Create the engines and session factories, holding the init lock.
 
-@event.listens_for(engine, "checkout")
-def checkout(dbapi_connection, connection_record, connection_proxy):
-    """Verify that the connection is still alive on checkout."""
+    Returns:
+        Write engine and read engine.
+    """
+    global _engine, _read_engine, _replica_engine
+    global _session_factory, _read_session_factory
+
+    replica_engine = None
     try:
-        # For PostgreSQL
-        if hasattr(dbapi_connection, "ping"):
-            dbapi_connection.ping(reconnect=True)
-        # For SQLite and others
-        else:
-            cursor = dbapi_connection.cursor()
-            cursor.execute("SELECT 1")
-            cursor.close()
-    except Exception:
-        # Disconnect the invalid connection
-        connection_record.invalidate()
-        logger.warning("Invalid connection detected and invalidated")
+        engine, read_engine = create_database_engines(settings.database_url)
+        logger.info("Database engine created for %s", settings.database_url)
+        if settings.replica_database_url:
+            replica_engine = create_replica_engine(settings.replica_database_url)
+            logger.info("Replica engine created for %s", settings.replica_database_url)
+    except Exception as e:
+        logger.error("Failed to create database engine: %s", e)
         raise
 
+    if settings.metrics_enabled:
+        instrument_engine(engine, "sync")
+        if read_engine is not engine:
+            instrument_engine(read_engine, "sync_read")
+        if replica_engine is not None:
+            instrument_engine(replica_engine, "replica")
+
+    event.listen(engine, "connect", _log_connect)
+    if read_engine is not engine:
+        event.listen(read_engine, "connect", _log_connect)
+
+    _session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    if replica_engine is None:
+        _read_session_factory = sessionmaker(
+            autocommit=False, autoflush=False, bind=read_engine
+        )
+    else:
+        _read_session_factory = sessionmaker(
+            class_=RoutingSession,
+            autocommit=False,
+            autoflush=False,
+            replica=replica_engine,
+            primary=engine,
+            primary_read=read_engine,
+            router=replica_router,
+        )
+    # Set last: other threads take the engines as the sign that all is ready
+    _replica_engine = replica_engine
+    _engine, _read_engine = engine, read_engine
+    return engine, read_engine
+
+
+def _log_connect(dbapi_connection, connection_record) -> None:
+    """Log when a connection is created."""
+    logger.debug("Database connection established")
+
+
+def get_engine() -> Engine:
+    """Get the write engine, creating it on first use.
+
+    Returns:
+        Database engine for writes.
+    """
+    return init_engines()[0]
+
+
+def get_read_engine() -> Engine:
+    """Get the read engine, creating it on first use.
+
+    Returns:
+        Database engine for read-only requests. The same as the write engine
+        unless SQLite runs with a single writer.
+    """
+    return init_engines()[1]
+
+
+def get_replica_engine() -> Optional[Engine]:
+    """Get the read replica engine, creating the engines on first use.
+
+    Returns:
+        Replica engine, or None if no replica is configured.
+    """
+    init_engines()
+    return _replica_engine
+
+
+def get_session_factory() -> sessionmaker[Session]:
+    """Get the session factory for writes, creating the engines on first use.
+
+    Returns:
+        Session factory bound to the write engine.
+    """
+    if _session_factory is None:
+        init_engines()
+    return _session_factory
+
+
+def get_read_session_factory() -> sessionmaker[Session]:
+    """Get the session factory for reads, creating the engines on first use.
+
+    Returns:
+        Session factory bound to the read engine, or creating RoutingSessions
+        if a replica is configured.
+    """
+    if _read_session_factory is None:
+        init_engines()
+    return _read_session_factory
+
+
+def prewarm_pool(engine: Engine, connections: Optional[int] = None) -> int:
+    """Open pool connections ahead of the first requests.
+
+    Connections are checked out together, so the pool has to open each of
+    them, and then returned to the pool.
+
+    Args:
+        engine: Engine whose pool to fill.
+        connections: Number of connections to open. If None, the pool size,
+            or one connection for pools without a size.
+
+    Returns:
+        Number of connections opened.
+    """
+    if connections is None:
+        size = getattr(engine.pool, "size", None)
+        connections = size() if callable(size) else 1
+
+    opened = [engine.connect() for _ in range(connections)]
+    for connection in opened:
+        connection.close()
+    return len(opened)
+
+
+def dispose_engines() -> None:
+    """Dispose of the engines and their connection pools, if created."""
+    global _engine, _read_engine, _replica_engine
+    global _session_factory, _read_session_factory
+
+    if _replica_engine is not None:
+        _replica_engine.dispose()
+    if _read_engine is not None and _read_engine is not _engine:
+        _read_engine.dispose()
+    if _engine is not None:
+        _engine.dispose()
+    _engine = _read_engine = _replica_engine = None
+    _session_factory = _read_session_factory = None
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Create base class for models
 Base = declarative_base()
@@ -100,12 +303,36 @@ def get_db() -> Generator[Session, None, None]:
     Raises:
         Exception: If there's an error with the database connection.
     """
-    db = SessionLocal()
+    db = get_session_factory()()
+    try:
+        yield db
+    except exc.SQLAlchemyError as e:
+        db.rollback()
+        logger.error("Database error: %s", e)
+        raise
+    finally:
+        db.close()
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    """Get database session for read-only requests.
+
+    Reporting endpoints use this instead of get_db, so on SQLite with a
+    single writer their queries never wait for the write connection, and
+    with a replica configured they read from the replica.
+
+    Yields:
+        Database session.
+
+    Raises:
+        Exception: If there's an error with the database connection.
+    """
+    db = get_read_session_factory()()
     try:
         yield db
     except exc.SQLAlchemyError as e:
         db.rollback()
-        logger.error(f"Database error: {str(e)}")
+        logger.error("Database error: %s", e)
         raise
     finally:
         db.close()
@@ -121,13 +348,13 @@ def db_transaction() -> Generator[Session, None, None]:
     Raises:
         Exception: If there's an error with the database transaction.
     """
-    db = SessionLocal()
+    db = get_session_factory()()
     try:
         yield db
         db.commit()
     except Exception as e:
         db.rollback()
-        logger.error(f"Transaction error: {str(e)}")
+        logger.error("Transaction error: %s", e)
         raise
     finally:
         db.close()
@@ -152,7 +379,7 @@ def check_database_connection() -> Dict[str, Any]:
             "details": "Database connection is healthy",
         }
     except Exception as e:
-        logger.error(f"Database health check failed: {str(e)}")
+        logger.error("Database health check failed: %s", e)
         return {
             "status": "unhealthy",
             "database": settings.database_url.split("://")[0],
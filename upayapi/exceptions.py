@@ -6,7 +6,6 @@ error response format.
 """
 
 import logging
-import uuid
 from typing import Any, Dict, Optional, Type, Union
 
 from fastapi import FastAPI, Request, status
@@ -15,6 +14,9 @@ from fastapi.exceptions import RequestValidationError
 from pydantic import BaseModel, Field
 from sqlalchemy.exc import SQLAlchemyError
 
+from upayapi.metrics import record_posting
+from upayapi.middleware import new_request_id
+
 # Configure logger
 logger = logging.getLogger("upayapi.exceptions")
 
@@ -43,7 +45,7 @@ class ErrorResponse(BaseModel):
     """
 
     detail: Union[str, ErrorDetail]
-    request_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    request_id: str = Field(default_factory=new_request_id)
     status_code: int
 
 
@@ -54,21 +56,25 @@ class APIException(Exception):
     Attributes:
         detail: Error details.
         status_code: HTTP status code.
+        headers: Extra response headers.
     """
 
     def __init__(
         self,
         detail: Union[str, ErrorDetail],
         status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR,
+        headers: Optional[Dict[str, str]] = None,
     ):
         """Initialize the exception.
 
         Args:
             detail: Error details.
             status_code: HTTP status code.
+            headers: Extra response headers.
         """
         self.detail = detail
         self.status_code = status_code
+        self.headers = headers
         super().__init__(str(detail))
 
 
@@ -133,29 +139,47 @@ class DuplicateError(APIException):
         super().__init__(detail, status.HTTP_409_CONFLICT)
 
 
-def register_exception_handlers(app: FastAPI) -> None:
-    """Register exception handlers for the application.
+class ServiceUnavailableError(APIException):
+    """Exception raised when a request is shed because the service is overloaded."""
+
+    def __init__(
+        self,
+        detail: Union[str, ErrorDetail] = "Service temporarily overloaded",
+        retry_after: int = 1,
+    ):
+        """Initialize the exception.
+
+        Args:
+            detail: Error details.
+            retry_after: Number of seconds the client should wait before
+                retrying, sent in the Retry-After header.
+        """
+        super().__init__(
+            detail,
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+def get_request_id(request: Request) -> str:
+    """Get the ID RequestContextMiddleware assigned to a request.
 
     Args:
-        app: The FastAPI application.
+        request: The incoming request.
+
+    Returns:
+        Request ID, or a new one if the request bypassed the middleware.
     """
+    request_id = getattr(request.state, "request_id", None)
+    return request_id if request_id is not None else new_request_id()
 
-    @app.middleware("http")
-    async def add_request_id(request: Request, call_next):
-        """Add a request ID to the request state for traceability.
 
-        Args:
-            request: The incoming request.
-            call_next: The next middleware or route handler.
+def register_exception_handlers(app: FastAPI) -> None:
+    """Register exception handlers for the application.
 
-        Returns:
-            The response from the next middleware or route handler.
-        """
-        request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
-        response = await call_next(request)
-        response.headers["X-Request-ID"] = request_id
-        return response
+    Args:
+        app: The FastAPI application.
+    """
 
     @app.exception_handler(APIException)
     async def api_exception_handler(request: Request, exc: APIException):
@@ -168,21 +192,26 @@ def register_exception_handlers(app: FastAPI) -> None:
         Returns:
             JSON response with error details.
         """
+        request_id = get_request_id(request)
         logger.error(
-            f"API Exception: {exc.detail}",
-            extra={"request_id": getattr(request.state, "request_id", "unknown")},
+            "API Exception: %s",
+            exc.detail,
+            extra={"request_id": request_id},
         )
         return JSONResponse(
             status_code=exc.status_code,
             content=ErrorResponse(
                 detail=exc.detail,
-                request_id=getattr(request.state, "request_id", str(uuid.uuid4())),
+                request_id=request_id,
                 status_code=exc.status_code,
             ).model_dump(),
+            headers=exc.headers,
         )
 
     @app.exception_handler(RequestValidationError)
-    async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    async def validation_exception_handler(
+        request: Request, exc: RequestValidationError
+    ):
         """Handle request validation errors.
 
         Args:
@@ -192,10 +221,15 @@ def register_exception_handlers(app: FastAPI) -> None:
         Returns:
             JSON response with validation error details.
         """
+        request_id = get_request_id(request)
         logger.error(
-            f"Validation Error: {exc.errors()}",
-            extra={"request_id": getattr(request.state, "request_id", "unknown")},
+            "Validation Error: %s",
+            exc.errors(),
+            extra={"request_id": request_id},
         )
+        # Postings with missing fields are rejected before the route runs
+        if getattr(request.scope.get("route"), "name", None) == "upay_posting":
+            record_posting("validation_fail")
         return JSONResponse(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             content=ErrorResponse(
@@ -204,7 +238,7 @@ def register_exception_handlers(app: FastAPI) -> None:
                     code="validation_error",
                     params={"errors": exc.errors()},
                 ),
-                request_id=getattr(request.state, "request_id", str(uuid.uuid4())),
+                request_id=request_id,
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             ).model_dump(),
         )
@@ -220,9 +254,11 @@ def register_exception_handlers(app: FastAPI) -> None:
         Returns:
             JSON response with database error details.
         """
+        request_id = get_request_id(request)
         logger.error(
-            f"Database Error: {str(exc)}",
-            extra={"request_id": getattr(request.state, "request_id", "unknown")},
+            "Database Error: %s",
+            exc,
+            extra={"request_id": request_id},
         )
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -231,7 +267,7 @@ def register_exception_handlers(app: FastAPI) -> None:
                     message="Database operation failed",
                     code="database_error",
                 ),
-                request_id=getattr(request.state, "request_id", str(uuid.uuid4())),
+                request_id=request_id,
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             ).model_dump(),
         )
@@ -247,9 +283,11 @@ def register_exception_handlers(app: FastAPI) -> None:
         Returns:
             JSON response with error details.
         """
+        request_id = get_request_id(request)
         logger.error(
-            f"Unhandled Exception: {str(exc)}",
-            extra={"request_id": getattr(request.state, "request_id", "unknown")},
+            "Unhandled Exception: %s",
+            exc,
+            extra={"request_id": request_id},
             exc_info=True,
         )
         return JSONResponse(
@@ -259,7 +297,7 @@ def register_exception_handlers(app: FastAPI) -> None:
                     message="An internal server error occurred",
                     code="internal_server_error",
                 ),
-                request_id=getattr(request.state, "request_id", str(uuid.uuid4())),
+                request_id=request_id,
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             ).model_dump(),
-        )
\ No newline at end of file
+        )
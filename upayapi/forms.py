@@ -0,0 +1,188 @@
+"""Fast-path parsing of uPay posting forms.
+
+uPay posts ``application/x-www-form-urlencoded`` bodies. Declaring each
+field as a ``Form()`` parameter makes FastAPI parse the body with
+python-multipart's callback parser, validate every field on its own and hand
+the values to the route, which then builds and validates a
+TransactionRequest. The dependencies in this module read the raw body once
+and pick out the posting fields. verify_posting_key rejects postings with
+missing fields or a posting key of no known site before any other work is
+done, and get_transaction_request validates the fields into a TransactionRequest in
+one step. Multipart bodies fall back to Starlette's form parser.
+"""
+
+from typing import Any, Dict, List, Optional
+from urllib.parse import unquote_plus
+
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError as PydanticValidationError
+
+from upayapi.exceptions import AuthenticationError, ValidationError
+from upayapi.metrics import record_posting
+from upayapi.models.schemas import TransactionRequest
+from upayapi.sites import resolve_site
+
+# Form fields of a uPay posting, in TransactionRequest order
+POSTING_FIELDS = tuple(TransactionRequest.model_fields)
+
+# OpenAPI request body of the posting endpoint, which no longer declares its
+# fields as Form() parameters
+POSTING_OPENAPI: Dict[str, Any] = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/x-www-form-urlencoded": {
+                "schema": {
+                    "type": "object",
+                    "required": list(POSTING_FIELDS),
+                    "properties": {name: {"type": "string"} for name in POSTING_FIELDS},
+                }
+            }
+        },
+    }
+}
+
+
+def parse_posting_body(body: bytes) -> Dict[str, str]:
+    """Extract the posting fields from a URL-encoded form body.
+
+    Fields other than the posting fields, such as the optional fields uPay
+    adds for some sites, are skipped without being decoded. Like Starlette's
+    form parser, raw bytes are read as Latin-1, percent escapes as UTF-8, and
+    the last of repeated fields wins.
+
+    Args:
+        body: Raw request body.
+
+    Returns:
+        Values of the posting fields present in the body.
+    """
+    fields: Dict[str, str] = {}
+    for pair in body.decode("latin-1").split("&"):
+        name, _, value = pair.partition("=")
+        if name not in POSTING_FIELDS:
+            if "%" not in name and "+" not in name:
+                continue
+            name = unquote_plus(name)
+            if name not in POSTING_FIELDS:
+                continue
+        if "%" in value or "+" in value:
+            value = unquote_plus(value)
+        fields[name] = value
+    return fields
+
+
+def missing_field_errors(fields: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Build validation errors for missing or empty posting fields.
+
+    Errors have the shape FastAPI reports for missing ``Form()`` fields, so
+    clients see the same response as before.
+
+    Args:
+        fields: Values of the posting fields present in the body.
+
+    Returns:
+        One error per missing field.
+    """
+    return [
+        {
+            "type": "missing",
+            "loc": ("body", name),
+            "msg": "Field required",
+            "input": None,
+        }
+        for name in POSTING_FIELDS
+        if not fields.get(name)
+    ]
+
+
+async def get_posting_fields(request: Request) -> Dict[str, str]:
+    """Read the posting fields of a request body.
+
+    The fields are parsed once per request and kept in ``request.state``.
+
+    Args:
+        request: The incoming request.
+
+    Returns:
+        Values of the posting fields present in the body.
+    """
+    fields: Optional[Dict[str, str]] = getattr(request.state, "posting_fields", None)
+    if fields is not None:
+        return fields
+
+    content_type: Optional[str] = request.headers.get("content-type")
+    if content_type is None or content_type.startswith(
+        "application/x-www-form-urlencoded"
+    ):
+        fields = parse_posting_body(await request.body())
+    elif content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        fields = {
+            name: value
+            for name in POSTING_FIELDS
+            if isinstance(value := form.get(name), str)
+        }
+    else:
+        fields = {}
+
+    request.state.posting_fields = fields
+    return fields
+
+
+async def verify_posting_key(request: Request) -> str:
+    """Reject a posting with missing fields or an unknown posting key.
+
+    Runs before admission control, field validation and the database
+    session, so rejected postings cost one body parse and never touch the
+    connection pool. The key is matched to its site through the site
+    registry.
+
+    Args:
+        request: The incoming request.
+
+    Returns:
+        ID of the site whose posting key was sent.
+
+    Raises:
+        RequestValidationError: If posting fields are missing.
+        AuthenticationError: If the posting key is invalid.
+    """
+    fields = await get_posting_fields(request)
+    errors = missing_field_errors(fields)
+    if errors:
+        # Counted as validation_fail by the RequestValidationError handler
+        raise RequestValidationError(errors)
+
+    site_id = resolve_site(fields["posting_key"])
+    if site_id is None:
+        record_posting("auth_fail")
+        raise AuthenticationError(detail="Invalid posting key")
+    return site_id
+
+
+async def get_transaction_request(request: Request) -> TransactionRequest:
+    """Parse and validate the body of a uPay posting.
+
+    Args:
+        request: The incoming request.
+
+    Returns:
+        Validated transaction request.
+
+    Raises:
+        RequestValidationError: If posting fields are missing.
+        ValidationError: If posting fields are invalid.
+    """
+    fields = await get_posting_fields(request)
+    errors = missing_field_errors(fields)
+    if errors:
+        # Counted as validation_fail by the RequestValidationError handler
+        raise RequestValidationError(errors)
+
+    try:
+        return TransactionRequest.model_validate(fields)
+    except PydanticValidationError as e:
+        record_posting("validation_fail")
+        raise ValidationError(detail=f"Error validating transaction data: {str(e)}")
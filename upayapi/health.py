@@ -0,0 +1,173 @@
+"""Cached health checks for the uPay API.
+
+HealthProber checks the database in the background, every
+``health_probe_interval_seconds``, and keeps the result, the probe latency,
+the connection pool usage and the read replica's lag in memory, already
+rendered as JSON. Health endpoints only read that state, so load balancer and
+Kubernetes probes never check out pool connections and are answered in
+microseconds:
+
+* ``/health/live``: the process is serving requests. No I/O at all.
+* ``/health/ready``: the last probe succeeded and is recent. 503 otherwise.
+* ``/health``: the full cached health report.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.engine import Engine
+
+from upayapi.config import settings
+
+# Configure logger
+logger = logging.getLogger("upayapi.health")
+
+
+def get_pool_status(engine: Engine) -> Dict[str, Any]:
+    """Get the usage of an engine's connection pool.
+
+    Args:
+        engine: Database engine.
+
+    Returns:
+        Pool size, connections checked out, overflow connections and
+        saturation (checked out connections over size plus overflow).
+        Empty for pools without a fixed size.
+    """
+    pool = engine.pool
+    size = getattr(pool, "size", None)
+    if not callable(size):
+        return {}
+    capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+    checked_out = pool.checkedout()
+    return {
+        "size": pool.size(),
+        "checked_out": checked_out,
+        "overflow": max(pool.overflow(), 0),
+        "saturation": round(checked_out / capacity, 3) if capacity else 1.0,
+    }
+
+
+class HealthProber:
+    """Background database health prober with an in-memory result.
+
+    Attributes:
+        interval: Number of seconds between probes.
+        stale_after: Age in seconds after which a probe result no longer
+            counts as ready.
+        report: Last health report, or None before the first probe.
+        body: Last health report rendered as JSON.
+        checked_at: Monotonic time of the last probe.
+    """
+
+    def __init__(self, interval: float, stale_after: Optional[float] = None):
+        """Initialize the prober.
+
+        Args:
+            interval: Number of seconds between probes.
+            stale_after: Age in seconds after which a probe result no longer
+                counts as ready. If None, three intervals.
+        """
+        self.interval = interval
+        self.stale_after = stale_after if stale_after is not None else 3 * interval
+        self.report: Optional[Dict[str, Any]] = None
+        self.body = b""
+        self.checked_at = 0.0
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def probe(self) -> Dict[str, Any]:
+        """Check the database and store the health report.
+
+        Blocks on the database, so call it from a worker thread.
+
+        Returns:
+            Health report.
+        """
+        from upayapi.database import (
+            check_database_connection,
+            get_engine,
+            get_read_engine,
+            get_replica_engine,
+        )
+        from upayapi.replica import replica_router
+
+        started = time.perf_counter()
+        database = check_database_connection()
+        database["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+        pools: Dict[str, Any] = {}
+        if database["status"] == "healthy":
+            pools["write"] = get_pool_status(get_engine())
+            if get_read_engine() is not get_engine():
+                pools["read"] = get_pool_status(get_read_engine())
+
+        report = {
+            "status": database["status"],
+            "application": {"status": "healthy", "details": "Application is running"},
+            "database": database,
+            "pool": pools,
+        }
+
+        # Reads fall back to the primary, so the replica does not affect
+        # readiness
+        replica_engine = get_replica_engine()
+        if replica_engine is not None:
+            report["replica"] = replica_router.check(replica_engine)
+            pools["replica"] = get_pool_status(replica_engine)
+
+        report["checked_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.body = json.dumps(report).encode()
+        self.report = report
+        self.checked_at = time.monotonic()
+        return report
+
+    def is_fresh(self) -> bool:
+        """Check whether the last probe result is recent.
+
+        Returns:
+            True if a probe ran within ``stale_after`` seconds.
+        """
+        return (
+            self.report is not None
+            and time.monotonic() - self.checked_at <= self.stale_after
+        )
+
+    def is_ready(self) -> bool:
+        """Check whether the worker can serve requests.
+
+        Returns:
+            True if the last probe is recent and found the database healthy.
+        """
+        return self.is_fresh() and self.report["status"] == "healthy"
+
+    async def _run(self) -> None:
+        """Probe the database every interval until cancelled."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await run_in_threadpool(self.probe)
+            except Exception:
+                logger.exception("Health probe failed")
+
+    def start(self) -> None:
+        """Start probing in the background, if not already running."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop probing."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+health_prober = HealthProber(settings.health_probe_interval_seconds)
@@ -0,0 +1,269 @@
+"""Non-blocking structured logging for the uPay API.
+
+configure_logging replaces the root logger's handlers with a QueueHandler.
+Request threads and the event loop only put records on a bounded queue; a
+QueueListener thread formats them, as JSON lines by default, and writes
+them out. Messages use lazy ``%``-style arguments, which are only merged in
+the listener thread.
+
+Every record carries the ``request_id``, ``route`` and ``duration_ms`` of
+the request it was logged in, read from a context variable that
+RequestContextMiddleware sets. Repeated identical warnings and errors (same
+logger and message template) are sampled: at most ``log_sample_burst`` are
+logged per window, and the next one logged reports how many were
+suppressed. When the queue is full, records are dropped rather than
+blocking the caller. Dropped and suppressed records are counted in the
+metrics.
+"""
+
+import atexit
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, Tuple
+
+from upayapi.metrics import LOG_RECORDS_DROPPED, LOG_RECORDS_SUPPRESSED
+
+# Request being handled by the current task or thread: its ID, ASGI scope
+# and start time
+request_context: ContextVar[Optional[Tuple[str, Dict[str, Any], float]]] = ContextVar(
+    "request_context", default=None
+)
+
+# Attributes every LogRecord has, which the JSON formatter does not repeat
+_RECORD_ATTRIBUTES = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", None, None)).keys()
+) | {"message", "asctime", "request_id", "route", "duration_ms", "suppressed"}
+
+# Text format used when log_format is "text"
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+
+_listener: Optional[QueueListener] = None
+
+
+class RequestContextFilter(logging.Filter):
+    """Add the current request's ID, route and elapsed time to records.
+
+    Runs as a handler filter in the thread that logs the record, before it
+    is queued, where the request context variable is visible. Values passed through ``extra`` take precedence.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Add request attributes to a record.
+
+        Args:
+            record: Log record.
+
+        Returns:
+            Always True.
+        """
+        context = request_context.get()
+        if context is None:
+            record.__dict__.setdefault("request_id", None)
+            record.__dict__.setdefault("route", None)
+            record.__dict__.setdefault("duration_ms", None)
+            return True
+
+        request_id, scope, started = context
+        record.__dict__.setdefault("request_id", request_id)
+        if "route" not in record.__dict__:
+            route = scope.get("route")
+            record.route = getattr(route, "path", None)
+        if "duration_ms" not in record.__dict__:
+            record.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Limit repeated identical warnings and errors.
+
+    Records are identical when they share the logger name, level and
+    message template, so a database outage logging the same error for every
+    request is reduced to a burst per window.
+
+    Attributes:
+        burst: Number of identical records logged per window.
+        window: Window length in seconds.
+    """
+
+    def __init__(self, burst: int, window: float):
+        """Initialize the filter.
+
+        Args:
+            burst: Number of identical records logged per window. 0 disables
+                sampling.
+            window: Window length in seconds.
+        """
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self._lock = threading.Lock()
+        # Key -> [window start, records logged in window, records suppressed]
+        self._counts: Dict[Tuple[str, int, str], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Decide whether a record is logged.
+
+        Args:
+            record: Log record.
+
+        Returns:
+            False if the record is suppressed.
+        """
+        if self.burst <= 0 or record.levelno < logging.WARNING:
+            return True
+
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            state = self._counts.get(key)
+            if state is None or now - state[0] >= self.window:
+                if state is None and len(self._counts) >= 1000:
+                    # Bound memory when messages are not templates
+                    self._counts.clear()
+                suppressed = state[2] if state is not None else 0
+                self._counts[key] = [now, 1, 0]
+            elif state[1] < self.burst:
+                state[1] += 1
+                suppressed = 0
+            else:
+                state[2] += 1
+                LOG_RECORDS_SUPPRESSED.inc()
+                return False
+
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Queue handler that drops records instead of blocking when full.
+
+    Records are queued as they are; their messages are formatted by the
+    listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Prepare a record for queuing.
+
+        Args:
+            record: Log record.
+
+        Returns:
+            The record, unformatted.
+        """
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Queue a record, dropping it if the queue is full.
+
+        Args:
+            record: Log record.
+        """
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Format a record.
+
+        Args:
+            record: Log record.
+
+        Returns:
+            JSON line with the time, level, logger, message, request
+            attributes and any ``extra`` fields.
+        """
+        entry: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "route": getattr(record, "route", None),
+            "duration_ms": getattr(record, "duration_ms", None),
+        }
+        if getattr(record, "suppressed", None):
+            entry["suppressed"] = record.suppressed
+        for name, value in record.__dict__.items():
+            if name not in _RECORD_ATTRIBUTES:
+                entry[name] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(
+    level: str = "INFO",
+    log_format: str = "json",
+    queue_size: int = 10000,
+    sample_burst: int = 10,
+    sample_window: float = 60.0,
+    stream: Any = None,
+) -> QueueListener:
+    """Route all logging through a bounded queue and a listener thread.
+
+    Replaces the root logger's handlers, so calling it again reconfigures
+    logging. Queued records are written out when the interpreter exits.
+
+    Args:
+        level: Root log level name.
+        log_format: ``json`` or ``text``.
+        queue_size: Maximum number of records waiting to be written.
+        sample_burst: Number of identical warnings or errors logged per
+            window. 0 disables sampling.
+        sample_window: Sampling window in seconds.
+        stream: Stream to write to. If None, uses standard error.
+
+    Returns:
+        Started queue listener.
+    """
+    global _listener
+    shutdown_logging()
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    if log_format == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    records: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=queue_size)
+    handler = DroppingQueueHandler(records)
+    handler.addFilter(RequestContextFilter())
+    handler.addFilter(SamplingFilter(sample_burst, sample_window))
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+
+    _listener = QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Write out queued records and stop the listener thread, if started."""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+# Write out records still queued when the process exits
+atexit.register(shutdown_logging)
@@ -1,21 +1,102 @@
 """Main application module for the uPay API."""
 
 import logging
-from typing import Literal, Optional
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Literal, Optional
 
 from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-
+from fastapi.responses import PlainTextResponse, Response
+
+from upayapi.admission import init_admission_controller, shutdown_admission_controller
+from upayapi.async_database import (
+    dispose_async_engine,
+    get_async_engine,
+    prewarm_async_pool,
+)
+from upayapi.batching import shutdown_ingestion_batcher
 from upayapi.config import settings
-from upayapi.database import engine, Base
+from upayapi.database import (
+    dispose_engines,
+    get_replica_engine,
+    init_engines,
+    prewarm_pool,
+)
 from upayapi.exceptions import register_exception_handlers
+from upayapi.health import health_prober
+from upayapi.log import configure_logging
+from upayapi.metrics import render as render_metrics
+from upayapi.middleware import RequestContextMiddleware
+from upayapi.outbox import get_outbox_dispatcher, shutdown_outbox_dispatcher
+from upayapi.partitions import maintain_partitions
 from upayapi.routes import upay
-
-# Import models to ensure they are registered with Base.metadata
+from upayapi.sites import load_site_registry
 
 # Configure logger
 logger = logging.getLogger("upayapi")
 
+# Bodies of the health endpoints that do not depend on a probe
+LIVE_BODY = b'{"status":"alive"}'
+NOT_READY_BODY = b'{"status":"starting"}'
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Run application startup and shutdown tasks.
+
+    Engines are created here, in the worker process, rather than at import
+    time, their pools are filled, admission control is sized to them,
+    upcoming transaction partitions are created and the site registry is
+    loaded before the worker starts accepting requests. With an outbox URL,
+    the worker also delivers outbox events in the background.
+
+    Args:
+        app: The FastAPI application.
+
+    Yields:
+        None while the application is serving requests.
+    """
+    engine, read_engine = await run_in_threadpool(init_engines)
+    if settings.db_pool_prewarm:
+        for pool_engine in dict.fromkeys((engine, read_engine)):
+            opened = await run_in_threadpool(prewarm_pool, pool_engine)
+            logger.info("Opened %d database connections", opened)
+        if settings.use_async_database:
+            opened = await prewarm_async_pool()
+            logger.info("Opened %d async database connections", opened)
+
+    # Postings are limited to the pool they are written through
+    posting_engine = (
+        get_async_engine().sync_engine if settings.use_async_database else engine
+    )
+    init_admission_controller(posting_engine, read_engine, get_replica_engine())
+
+    # Partitions of the coming months, on a partitioned PostgreSQL table
+    await run_in_threadpool(maintain_partitions, engine)
+
+    registered = await run_in_threadpool(load_site_registry)
+    logger.info("Registered %d site posting keys", registered)
+
+    # Health endpoints serve the prober's last result from memory
+    await run_in_threadpool(health_prober.probe)
+    health_prober.start()
+
+    # Notify the downstream system of new transactions in the background
+    if settings.outbox_url:
+        get_outbox_dispatcher().start()
+
+    yield
+
+    await health_prober.stop()
+    await shutdown_outbox_dispatcher()
+    shutdown_admission_controller()
+
+    # Commit postings still waiting in the ingestion batcher
+    await run_in_threadpool(shutdown_ingestion_batcher)
+    await dispose_async_engine()
+    await run_in_threadpool(dispose_engines)
+
 
 def create_app(env: Optional[Literal["dev", "test", "prod"]] = None) -> FastAPI:
     """Create and configure the FastAPI application.
@@ -27,19 +108,20 @@ def create_app(env: Optional[Literal["dev", "test", "prod"]] = None) -> FastAPI:
         Configured FastAPI application.
     """
     # Configure logging
-    logging.basicConfig(
-        level=logging.DEBUG if settings.debug else logging.INFO,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    configure_logging(
+        level=settings.log_level or ("DEBUG" if settings.debug else "INFO"),
+        log_format=settings.log_format,
+        queue_size=settings.log_queue_size,
+        sample_burst=settings.log_sample_burst,
+        sample_window=settings.log_sample_window_seconds,
     )
 
-    # Create tables
-    Base.metadata.create_all(bind=engine)
-
     # Create FastAPI application
     app = FastAPI(
         title=settings.app_name,
         description="API for processing uPay Posting URL parameters",
         version="0.1.0",
+        lifespan=lifespan,
     )
 
     # Configure the app based on environment
@@ -68,6 +150,13 @@ def create_app(env: Optional[Literal["dev", "test", "prod"]] = None) -> FastAPI:
     # Register exception handlers
     register_exception_handlers(app)
 
+    # Assign request IDs and record latency outside every other middleware
+    app.add_middleware(
+        RequestContextMiddleware,
+        access_log=settings.access_log,
+        metrics=settings.metrics_enabled,
+    )
+
     # Register routes
     register_routes(app)
 
@@ -105,29 +194,56 @@ def register_base_endpoints(app: FastAPI) -> None:
         """
         return {"message": "Welcome to the uPay API"}
 
+    if settings.metrics_enabled:
+
+        @app.get("/metrics", response_class=PlainTextResponse)
+        def metrics():
+            """Metrics endpoint.
+
+            Returns:
+                Metrics in the Prometheus text exposition format.
+            """
+            return PlainTextResponse(
+                render_metrics(), media_type="text/plain; version=0.0.4"
+            )
+
     @app.get("/health")
-    async def health():
+    async def health() -> Response:
         """Health check endpoint.
 
         Returns:
-            Health status including database connection status.
+            Last health report of the background prober, including the
+            database status, probe latency and pool usage. The database is
+            only probed here if the report is missing or stale.
         """
-        from upayapi.database import check_database_connection
+        if not health_prober.is_fresh():
+            await run_in_threadpool(health_prober.probe)
+        return Response(health_prober.body, media_type="application/json")
 
-        # Check application status
-        app_status = {"status": "healthy", "details": "Application is running"}
+    @app.get("/health/live")
+    async def health_live() -> Response:
+        """Liveness endpoint.
 
-        # Check database connection
-        db_status = check_database_connection()
+        Returns:
+            Constant response, without any I/O.
+        """
+        return Response(LIVE_BODY, media_type="application/json")
 
-        # Determine overall status
-        overall_status = "healthy" if db_status["status"] == "healthy" else "unhealthy"
+    @app.get("/health/ready")
+    async def health_ready() -> Response:
+        """Readiness endpoint.
 
-        return {
-            "status": overall_status,
-            "application": app_status,
-            "database": db_status,
-        }
+        Returns:
+            Last health report, with status 200 if the last probe is recent
+            and found the database healthy, otherwise 503.
+        """
+        if health_prober.is_ready():
+            return Response(health_prober.body, media_type="application/json")
+        return Response(
+            health_prober.body or NOT_READY_BODY,
+            status_code=503,
+            media_type="application/json",
+        )
 
 
 # Create the application instance
@@ -0,0 +1,544 @@
+"""Prometheus metrics for the uPay API.
+
+Metrics are collected in process and exposed in the Prometheus text format
+by the ``/metrics`` endpoint. The hot path never takes a lock: every thread
+updates its own shard of each metric, and shards are only summed when the
+metrics are scraped. Observing a request costs a few microseconds. Request
+latency is recorded by :class:`upayapi.middleware.RequestContextMiddleware`.
+
+Collected metrics:
+
+* request latency per method, route template and status code
+* posting outcomes (new, duplicate, auth_fail, validation_fail, error)
+* database statement latency per statement type
+* connection pool checkout wait time, and pool size and usage gauges
+* admitted, queued and shed requests of the admission controller
+* idempotency cache hits, misses and evictions
+* log records dropped by a full logging queue or suppressed by sampling
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Latency buckets in seconds, from 0.5ms to 10s
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Route label of requests that matched no route, to bound label cardinality
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Statement types labelled individually; anything else is "OTHER"
+STATEMENT_TYPES = frozenset(
+    ["SELECT", "INSERT", "UPDATE", "DELETE", "COPY", "BEGIN", "COMMIT"]
+)
+
+# Label values of a metric sample
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the Prometheus text format.
+
+    Args:
+        value: Label value.
+
+    Returns:
+        Escaped label value.
+    """
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Format label names and values for the Prometheus text format.
+
+    Args:
+        names: Label names.
+        values: Label values.
+
+    Returns:
+        Label set in braces, or an empty string if there are no labels.
+    """
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value for the Prometheus text format.
+
+    Args:
+        value: Sample value.
+
+    Returns:
+        Formatted value.
+    """
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _ShardedMetric(ABC):
+    """Base class for metrics with a shard of values per thread.
+
+    Attributes:
+        name: Metric name.
+        documentation: Help text.
+        labelnames: Names of the metric's labels.
+    """
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """Initialize the metric.
+
+        Args:
+            name: Metric name.
+            documentation: Help text.
+            labelnames: Names of the metric's labels.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[Dict[Labels, List[float]]] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> Dict[Labels, List[float]]:
+        """Get the calling thread's shard, creating it on first use.
+
+        Returns:
+            Values of this thread keyed by label values.
+        """
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard: Dict[Labels, List[float]] = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def _merged(self) -> Dict[Labels, List[float]]:
+        """Sum the values of all shards.
+
+        Returns:
+            Values keyed by label values.
+        """
+        with self._shards_lock:
+            shards = list(self._shards)
+
+        merged: Dict[Labels, List[float]] = {}
+        for shard in shards:
+            for labels, values in list(shard.items()):
+                total = merged.get(labels)
+                if total is None:
+                    merged[labels] = list(values)
+                else:
+                    for index, value in enumerate(values):
+                        total[index] += value
+        return merged
+
+    def reset(self) -> None:
+        """Reset all values to zero."""
+        with self._shards_lock:
+            for shard in self._shards:
+                shard.clear()
+
+    @abstractmethod
+    def samples(self) -> Iterator[Tuple[str, Labels, Sequence[str], float]]:
+        """Get the samples of the metric.
+
+        Yields:
+            Sample name suffix, label values, extra label names and value.
+        """
+
+    def render(self) -> List[str]:
+        """Render the metric in the Prometheus text format.
+
+        Returns:
+            Lines of the metric family.
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for suffix, labels, extra_names, value in self.samples():
+            lines.append(
+                f"{self.name}{suffix}"
+                f"{_format_labels(self.labelnames + tuple(extra_names), labels)} "
+                f"{_format_value(value)}"
+            )
+        return lines
+
+
+class Counter(_ShardedMetric):
+    """Monotonically increasing counter."""
+
+    type_name = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """Increment the counter.
+
+        Args:
+            *labels: Label values, in labelnames order.
+            amount: Amount to add.
+        """
+        shard = self._shard()
+        values = shard.get(labels)
+        if values is None:
+            shard[labels] = [amount]
+        else:
+            values[0] += amount
+
+    def value(self, *labels: str) -> float:
+        """Get the current value of the counter.
+
+        Args:
+            *labels: Label values, in labelnames order.
+
+        Returns:
+            Sum of the counter across all threads.
+        """
+        return self._merged().get(labels, [0])[0]
+
+    def samples(self) -> Iterator[Tuple[str, Labels, Sequence[str], float]]:
+        """Get the samples of the counter.
+
+        Yields:
+            Sample name suffix, label values, extra label names and value.
+        """
+        for labels, values in sorted(self._merged().items()):
+            yield "", labels, (), values[0]
+
+
+class Histogram(_ShardedMetric):
+    """Histogram of observed values.
+
+    Attributes:
+        buckets: Upper bounds of the buckets, ascending.
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        """Initialize the histogram.
+
+        Args:
+            name: Metric name.
+            documentation: Help text.
+            labelnames: Names of the metric's labels.
+            buckets: Upper bounds of the buckets, ascending.
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record an observation.
+
+        Values are counted in their own bucket only; counts are made
+        cumulative when the histogram is rendered.
+
+        Args:
+            value: Observed value.
+            *labels: Label values, in labelnames order.
+        """
+        shard = self._shard()
+        values = shard.get(labels)
+        if values is None:
+            # One slot per bucket, one for +Inf, then the sum
+            values = shard[labels] = [0] * (len(self.buckets) + 2)
+        values[bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    def count(self, *labels: str) -> int:
+        """Get the number of observations.
+
+        Args:
+            *labels: Label values, in labelnames order.
+
+        Returns:
+            Number of observations across all threads.
+        """
+        values = self._merged().get(labels)
+        return int(sum(values[:-1])) if values else 0
+
+    def samples(self) -> Iterator[Tuple[str, Labels, Sequence[str], float]]:
+        """Get the samples of the histogram.
+
+        Yields:
+            Sample name suffix, label values, extra label names and value.
+        """
+        bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+        for labels, values in sorted(self._merged().items()):
+            cumulative = 0
+            for bound, count in zip(bounds, values[:-1]):
+                cumulative += count
+                yield "_bucket", labels + (bound,), ("le",), cumulative
+            yield "_sum", labels, (), values[-1]
+            yield "_count", labels, (), cumulative
+
+
+class Gauge(_ShardedMetric):
+    """Gauge whose samples are read from a callback when scraped."""
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[Callable[[], Dict[Labels, float]]] = None,
+    ):
+        """Initialize the gauge.
+
+        Args:
+            name: Metric name.
+            documentation: Help text.
+            labelnames: Names of the metric's labels.
+            callback: Function returning the current values keyed by label
+                values.
+        """
+        super().__init__(name, documentation, labelnames)
+        self._callbacks: List[Callable[[], Dict[Labels, float]]] = []
+        if callback is not None:
+            self._callbacks.append(callback)
+
+    def add_callback(self, callback: Callable[[], Dict[Labels, float]]) -> None:
+        """Add a source of gauge values.
+
+        Args:
+            callback: Function returning values keyed by label values.
+        """
+        self._callbacks.append(callback)
+
+    def samples(self) -> Iterator[Tuple[str, Labels, Sequence[str], float]]:
+        """Get the samples of the gauge.
+
+        Yields:
+            Sample name suffix, label values, extra label names and value.
+        """
+        values: Dict[Labels, float] = {}
+        for callback in self._callbacks:
+            values.update(callback())
+        for labels, value in sorted(values.items()):
+            yield "", labels, (), value
+
+
+# Metric definitions
+REQUEST_DURATION = Histogram(
+    "upay_http_request_duration_seconds",
+    "HTTP request latency in seconds.",
+    ["method", "route", "status"],
+)
+POSTINGS = Counter(
+    "upay_postings_total",
+    "uPay postings by outcome (new, duplicate, auth_fail, validation_fail, error).",
+    ["outcome"],
+)
+DB_STATEMENT_DURATION = Histogram(
+    "upay_db_statement_duration_seconds",
+    "Database statement latency in seconds.",
+    ["engine", "statement"],
+)
+DB_ERRORS = Counter(
+    "upay_db_errors_total",
+    "Database statements that raised an error.",
+    ["engine"],
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "upay_db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool in seconds.",
+    ["engine"],
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "upay_db_pool_connections",
+    "Connections of the pool by state (size, checked_out, checked_in, overflow).",
+    ["engine", "state"],
+)
+ADMISSION_REQUESTS = Gauge(
+    "upay_admission_requests",
+    "Requests holding or waiting for an admission slot by priority and state.",
+    ["priority", "state"],
+)
+ADMISSION_REJECTED = Counter(
+    "upay_admission_rejected_total",
+    "Requests shed by admission control by priority and reason "
+    "(queue_full, timeout, displaced).",
+    ["priority", "reason"],
+)
+LOG_RECORDS_DROPPED = Counter(
+    "upay_log_records_dropped_total",
+    "Log records dropped because the logging queue was full.",
+)
+LOG_RECORDS_SUPPRESSED = Counter(
+    "upay_log_records_suppressed_total",
+    "Repeated identical warnings and errors suppressed by log sampling.",
+)
+OUTBOX_DELIVERIES = Counter(
+    "upay_outbox_deliveries_total",
+    "Outbox delivery attempts by outcome (delivered, retry, dead).",
+    ["outcome"],
+)
+IDEMPOTENCY_CACHE = Gauge(
+    "upay_idempotency_cache",
+    "Idempotency cache statistics (hits, misses, evictions, size, maxsize).",
+    ["stat"],
+)
+
+REGISTRY: List[_ShardedMetric] = [
+    REQUEST_DURATION,
+    POSTINGS,
+    DB_STATEMENT_DURATION,
+    DB_ERRORS,
+    DB_POOL_CHECKOUT_WAIT,
+    DB_POOL_CONNECTIONS,
+    ADMISSION_REQUESTS,
+    ADMISSION_REJECTED,
+    LOG_RECORDS_DROPPED,
+    LOG_RECORDS_SUPPRESSED,
+    OUTBOX_DELIVERIES,
+    IDEMPOTENCY_CACHE,
+]
+
+
+def _idempotency_cache_stats() -> Dict[Labels, float]:
+    """Read the idempotency cache statistics.
+
+    Returns:
+        Statistic values keyed by statistic name.
+    """
+    from upayapi.cache import idempotency_cache
+
+    return {(name,): value for name, value in idempotency_cache.stats().items()}
+
+
+IDEMPOTENCY_CACHE.add_callback(_idempotency_cache_stats)
+
+
+def render() -> str:
+    """Render all metrics in the Prometheus text format.
+
+    Returns:
+        Text exposition of the registry.
+    """
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def record_posting(outcome: str) -> None:
+    """Count a posting outcome.
+
+    Args:
+        outcome: "new", "duplicate", "auth_fail", "validation_fail" or "error".
+    """
+    POSTINGS.inc(outcome)
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Collect statement timings and pool metrics for an engine.
+
+    Statement latency is measured around the dialect's ``do_execute``
+    methods, which run the DBAPI cursor call. Wrapping them costs far less
+    than ``before_cursor_execute``/``after_cursor_execute`` listeners, whose
+    mere presence moves every statement onto SQLAlchemy's slower event path.
+    Checkout wait time is measured around the pool's ``_do_get``, which is
+    where a checkout blocks when the pool is exhausted.
+
+    Args:
+        engine: Engine to instrument. For an ``AsyncEngine`` pass its
+            ``sync_engine``.
+        name: Value of the ``engine`` label.
+    """
+
+    dialect = engine.dialect
+
+    def time_statements(method_name: str) -> None:
+        execute = getattr(dialect, method_name)
+
+        def timed_execute(cursor, statement, *args):
+            started = time.perf_counter()
+            try:
+                return execute(cursor, statement, *args)
+            finally:
+                statement_type = statement.lstrip()[:6].upper()
+                if statement_type not in STATEMENT_TYPES:
+                    statement_type = "OTHER"
+                DB_STATEMENT_DURATION.observe(
+                    time.perf_counter() - started, name, statement_type
+                )
+
+        setattr(dialect, method_name, timed_execute)
+
+    for method_name in ("do_execute", "do_executemany", "do_execute_no_params"):
+        time_statements(method_name)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        DB_ERRORS.inc(name)
+
+    def time_checkouts(pool: Any) -> None:
+        do_get = pool._do_get
+
+        def timed_do_get():
+            started = time.perf_counter()
+            try:
+                return do_get()
+            finally:
+                DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started, name)
+
+        pool._do_get = timed_do_get
+
+    time_checkouts(engine.pool)
+
+    @event.listens_for(engine, "engine_disposed")
+    def engine_disposed(engine):
+        # dispose() replaces the pool with a fresh one
+        time_checkouts(engine.pool)
+
+    def pool_connections() -> Dict[Labels, float]:
+        # Pools without a fixed size (NullPool, StaticPool) have no gauges
+        values: Dict[Labels, float] = {}
+        for state, method in (
+            ("size", "size"),
+            ("checked_out", "checkedout"),
+            ("checked_in", "checkedin"),
+            ("overflow", "overflow"),
+        ):
+            reader = getattr(engine.pool, method, None)
+            if reader is not None:
+                values[(name, state)] = reader()
+        return values
+
+    DB_POOL_CONNECTIONS.add_callback(pool_connections)
@@ -0,0 +1,141 @@
+"""Request context middleware for the uPay API.
+
+RequestContextMiddleware is a plain ASGI middleware that gives every HTTP
+request an ID, adds ``X-Request-ID`` and ``Server-Timing`` response headers,
+records request latency metrics and writes one access log line per request.
+It also sets the request context that log records read their request ID,
+route and duration from.
+Doing all of this in one pure ASGI layer avoids the extra task and memory
+streams Starlette's ``BaseHTTPMiddleware`` (``@app.middleware("http")``)
+creates for every request.
+"""
+
+import itertools
+import logging
+import os
+import secrets
+import time
+from typing import Any, Dict, Iterator
+
+from upayapi.log import request_context
+from upayapi.metrics import REQUEST_DURATION, UNMATCHED_ROUTE
+
+# Access log, one line per request
+access_logger = logging.getLogger("upayapi.access")
+
+_request_ids: Iterator[int] = itertools.count(1)
+_request_id_prefix = ""
+
+
+def _reset_request_ids() -> None:
+    """Start a new request ID sequence for this process.
+
+    The prefix combines the process ID with random bits, so IDs stay unique
+    across workers and restarts.
+    """
+    global _request_ids, _request_id_prefix
+    _request_ids = itertools.count(1)
+    _request_id_prefix = f"{os.getpid():x}-{secrets.token_hex(3)}"
+
+
+_reset_request_ids()
+# Workers forked from a preloaded application must not share the sequence
+os.register_at_fork(after_in_child=_reset_request_ids)
+
+
+def new_request_id() -> str:
+    """Generate a request ID.
+
+    Returns:
+        ID made of the worker prefix and a per-process counter, for example
+        ``1f3a-9c04e2-2b``.
+    """
+    return f"{_request_id_prefix}-{next(_request_ids):x}"
+
+
+class RequestContextMiddleware:
+    """ASGI middleware adding request IDs, timing headers, metrics and access logs.
+
+    The request ID is stored in ``request.state.request_id``. Requests are
+    labelled in metrics with the route template rather than the raw path,
+    so the number of label values stays bounded.
+
+    Attributes:
+        app: The wrapped ASGI application.
+        access_log: Whether to write an access log line per request.
+        metrics: Whether to record request latency metrics.
+    """
+
+    def __init__(self, app: Any, access_log: bool = True, metrics: bool = True):
+        """Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI application.
+            access_log: Whether to write an access log line per request.
+            metrics: Whether to record request latency metrics.
+        """
+        self.app = app
+        self.access_log = access_log
+        self.metrics = metrics
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        """Handle an ASGI connection.
+
+        Args:
+            scope: Connection scope.
+            receive: Receive channel.
+            send: Send channel.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        request_id = new_request_id()
+        scope.setdefault("state", {})["request_id"] = request_id
+        status_code = 500
+        response_bytes = 0
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status_code, response_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"x-request-id", request_id.encode("ascii")),
+                    (b"server-timing", f"app;dur={elapsed_ms:.1f}".encode("ascii")),
+                ]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        context = request_context.set((request_id, scope, started))
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_context.reset(context)
+            elapsed = time.perf_counter() - started
+            if self.metrics:
+                REQUEST_DURATION.observe(
+                    elapsed,
+                    scope["method"],
+                    getattr(scope.get("route"), "path", UNMATCHED_ROUTE),
+                    str(status_code),
+                )
+            if self.access_log and access_logger.isEnabledFor(logging.INFO):
+                client = scope.get("client")
+                access_logger.info(
+                    '%s "%s %s" %d %d %.1fms',
+                    client[0] if client else "-",
+                    scope["method"],
+                    scope["path"],
+                    status_code,
+                    response_bytes,
+                    elapsed * 1000,
+                    extra={
+                        "request_id": request_id,
+                        "route": getattr(scope.get("route"), "path", None),
+                        "duration_ms": round(elapsed * 1000, 1),
+                    },
+                )
@@ -1,5 +1,14 @@
 """Database models for the uPay API."""
 
-from upayapi.models.transaction import Transaction
+from upayapi.models.outbox import OutboxEvent
+from upayapi.models.rollup import TransactionDailyRollup
+from upayapi.models.site import Site
+from upayapi.models.transaction import Transaction, TransactionKey
 
-__all__ = ["Transaction"]
+__all__ = [
+    "OutboxEvent",
+    "Site",
+    "Transaction",
+    "TransactionDailyRollup",
+    "TransactionKey",
+]
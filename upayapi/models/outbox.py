@@ -0,0 +1,78 @@
+"""Outbox event model for the uPay API."""
+
+from enum import Enum as PyEnum
+
+from sqlalchemy import JSON, Column, DateTime, Enum, Index, Integer, String, Text, text
+from sqlalchemy.sql import func
+
+from upayapi.database import Base
+
+
+class OutboxStatus(str, PyEnum):
+    """Enum for outbox event delivery states."""
+
+    PENDING = "pending"
+    DELIVERED = "delivered"
+    DEAD = "dead"
+
+
+class OutboxEvent(Base):
+    """Notification of a new transaction, waiting to be sent downstream.
+
+    Events are inserted in the same database transaction as the transactions
+    they describe, and delivered afterwards by the outbox dispatcher.
+
+    Attributes:
+        id: Primary key, also sent as the delivery's idempotency key.
+        event_type: Kind of event, for example ``transaction.created``.
+        transaction_id: ID of the transaction the event describes.
+        payload: JSON body sent to the outbox URL.
+        status: Delivery state.
+        attempts: Number of delivery attempts so far.
+        next_attempt_at: UTC time after which the event can be claimed. A
+            claim moves it forward by the lease, so an event whose dispatcher
+            died is retried.
+        last_error: Error of the last failed attempt.
+        created_at: Timestamp when the record was created.
+        delivered_at: UTC time of the successful delivery.
+    """
+
+    __tablename__ = "outbox"
+
+    id = Column(Integer, primary_key=True)
+    event_type = Column(String(64), nullable=False)
+    transaction_id = Column(Integer, nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(
+        Enum(OutboxStatus, native_enum=False, length=16),
+        nullable=False,
+        default=OutboxStatus.PENDING,
+    )
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    delivered_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Claims scan only pending events that are due
+        Index(
+            "ix_outbox_pending_next_attempt_at",
+            "next_attempt_at",
+            "id",
+            postgresql_where=text("status = 'PENDING'"),
+            sqlite_where=text("status = 'PENDING'"),
+        ),
+        Index("ix_outbox_status", "status"),
+    )
+
+    def __repr__(self) -> str:
+        """Return string representation of the outbox event.
+
+        Returns:
+            String representation of the outbox event.
+        """
+        return (
+            f"OutboxEvent(id={self.id}, event_type={self.event_type}, "
+            f"status={self.status}, attempts={self.attempts})"
+        )
@@ -0,0 +1,48 @@
+"""Daily transaction rollup model for the uPay API."""
+
+from sqlalchemy import Column, Integer, Date, Numeric, DateTime, Enum
+from sqlalchemy.sql import func
+
+from upayapi.database import Base
+from upayapi.models.schemas import PaymentStatus
+
+
+class TransactionDailyRollup(Base):
+    """Daily totals of transactions per payment date and status.
+
+    Rows are updated in the same database transaction as each transaction
+    insert, so reports can read one row per day instead of scanning the
+    transactions table.
+
+    Attributes:
+        pmt_date: Transaction processing date.
+        pmt_status: Transaction status ('success' or 'cancelled').
+        txn_count: Number of transactions.
+        total_amt: Sum of the transaction amounts.
+        min_amt: Smallest transaction amount.
+        max_amt: Largest transaction amount.
+        updated_at: Timestamp when the row was last updated.
+    """
+
+    __tablename__ = "transaction_daily_rollup"
+
+    pmt_date = Column(Date, primary_key=True)
+    pmt_status = Column(Enum(PaymentStatus), primary_key=True)
+    txn_count = Column(Integer, nullable=False)
+    total_amt = Column(Numeric(precision=14, scale=2), nullable=False)
+    min_amt = Column(Numeric(precision=10, scale=2), nullable=False)
+    max_amt = Column(Numeric(precision=10, scale=2), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self) -> str:
+        """Return string representation of the rollup row.
+
+        Returns:
+            String representation of the rollup row.
+        """
+        return (
+            f"TransactionDailyRollup(pmt_date={self.pmt_date}, "
+            f"pmt_status={self.pmt_status}, "
+            f"txn_count={self.txn_count}, "
+            f"total_amt={self.total_amt})"
+        )
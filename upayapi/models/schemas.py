@@ -3,9 +3,10 @@
 from datetime import date, datetime
 from decimal import Decimal
 from enum import Enum
-from typing import Optional
+from functools import lru_cache
+from typing import Any, List, Optional
 
-from pydantic import BaseModel, field_validator, ConfigDict
+from pydantic import BaseModel, Field, field_validator, ConfigDict
 
 
 class PaymentStatus(str, Enum):
@@ -15,16 +16,53 @@ class PaymentStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
+# Largest amount uPay can post
+MAX_PAYMENT_AMOUNT = Decimal("99999.99")
+
+
+@lru_cache(maxsize=256)
+def parse_payment_date(value: str) -> date:
+    """Parse a uPay payment date.
+
+    Accepts what ``datetime.strptime(value, "%m/%d/%Y")`` accepts, one or
+    two digit months and days and a four digit year, at a fraction of the
+    cost. Postings in a window share a few dates, so results are memoized.
+
+    Args:
+        value: Payment date in mm/dd/yyyy format.
+
+    Returns:
+        Parsed date.
+
+    Raises:
+        ValueError: If the value is not a valid mm/dd/yyyy date.
+    """
+    parts = value.split("/")
+    if (
+        len(parts) != 3
+        or not all(part.isascii() and part.isdigit() for part in parts)
+        or not 1 <= len(parts[0]) <= 2
+        or not 1 <= len(parts[1]) <= 2
+        or len(parts[2]) != 4
+    ):
+        raise ValueError(f"Invalid date: {value!r}")
+    month, day, year = parts
+    return date(int(year), int(month), int(day))
+
+
 class TransactionRequest(BaseModel):
     """Request model for transaction processing.
 
+    uPay posts every field as a string; the amount and date are parsed once
+    here and passed on as typed values.
+
     Attributes:
         posting_key: Authentication key for validating requests.
         tpg_trans_id: Transaction reference number assigned by Payment Gateway.
         session_identifier: Unique session identifier code.
         pmt_status: Transaction status ('success' or 'cancelled').
         pmt_amt: Transaction amount (max: $99,999.99).
-        pmt_date: Transaction processing date (format: mm/dd/yyyy).
+        pmt_date: Transaction processing date, posted as mm/dd/yyyy.
         name_on_acct: Name on payment account.
     """
 
@@ -32,51 +70,52 @@ class TransactionRequest(BaseModel):
     tpg_trans_id: str
     session_identifier: str
     pmt_status: PaymentStatus
-    pmt_amt: str
-    pmt_date: str
+    pmt_amt: Decimal
+    pmt_date: date
     name_on_acct: str
 
     @field_validator("pmt_amt", mode="before")
-    def validate_payment_amount(cls, v: str) -> str:
-        """Validate payment amount.
+    def validate_payment_amount(cls, v: Any) -> Decimal:
+        """Validate and parse payment amount.
 
         Args:
             v: Payment amount as string.
 
         Returns:
-            Validated payment amount string.
+            Payment amount.
 
         Raises:
             ValueError: If payment amount is invalid.
         """
         try:
             amount = Decimal(v)
-            if amount <= 0 or amount > Decimal("99999.99"):
+            if amount <= 0 or amount > MAX_PAYMENT_AMOUNT:
                 raise ValueError()
         except (ValueError, TypeError, ArithmeticError):
             raise ValueError(
                 "Invalid payment amount. Must be a positive number less than or equal to 99,999.99"
             )
-        return v
+        return amount
 
     @field_validator("pmt_date", mode="before")
-    def validate_payment_date(cls, v: str) -> str:
-        """Validate payment date format.
+    def validate_payment_date(cls, v: Any) -> date:
+        """Validate and parse payment date.
 
         Args:
             v: Payment date as string in mm/dd/yyyy format.
 
         Returns:
-            Validated payment date string.
+            Payment date.
 
         Raises:
             ValueError: If payment date format is invalid.
         """
+        if isinstance(v, date):
+            return v
         try:
-            datetime.strptime(v, "%m/%d/%Y").date()
-        except ValueError:
+            return parse_payment_date(v)
+        except (ValueError, TypeError, AttributeError):
             raise ValueError("Invalid payment date. Format must be mm/dd/yyyy")
-        return v
 
 
 class TransactionResponse(BaseModel):
@@ -86,11 +125,14 @@ class TransactionResponse(BaseModel):
         success: Whether the transaction was processed successfully.
         message: Message describing the result of the transaction processing.
         transaction_id: ID of the processed transaction.
+        created: Whether this posting stored the transaction, rather than
+            finding it already processed. Not sent in responses.
     """
 
     success: bool
     message: str
     transaction_id: int
+    created: bool = Field(default=False, exclude=True)
 
 
 class TransactionModel(BaseModel):
@@ -104,6 +146,7 @@ class TransactionModel(BaseModel):
         pmt_amt: Transaction amount.
         pmt_date: Transaction processing date.
         name_on_acct: Name on payment account.
+        site_id: uPay site whose posting key authenticated the posting.
         created_at: Timestamp when the record was created.
     """
 
@@ -114,7 +157,49 @@ class TransactionModel(BaseModel):
     pmt_amt: Decimal
     pmt_date: date
     name_on_acct: str
+    site_id: Optional[str] = None
     created_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
     """Pydantic model configuration."""
+
+
+class TransactionPage(BaseModel):
+    """Response model for a page of transactions.
+
+    Attributes:
+        items: Transactions on this page.
+        next_cursor: Cursor for the next page, or None on the last page.
+        has_more: Whether there are more transactions after this page.
+        limit: Maximum number of transactions per page.
+        total: Number of matching transactions, if requested.
+    """
+
+    items: List[TransactionModel]
+    next_cursor: Optional[str] = None
+    has_more: bool
+    limit: Optional[int] = None
+    total: Optional[int] = None
+
+
+class DailyRollupModel(BaseModel):
+    """Model representing the daily totals for one payment date and status.
+
+    Attributes:
+        pmt_date: Transaction processing date.
+        pmt_status: Transaction status ('success' or 'cancelled').
+        txn_count: Number of transactions.
+        total_amt: Sum of the transaction amounts.
+        min_amt: Smallest transaction amount.
+        max_amt: Largest transaction amount.
+    """
+
+    pmt_date: date
+    pmt_status: PaymentStatus
+    txn_count: int
+    total_amt: Decimal
+    min_amt: Decimal
+    max_amt: Decimal
+
+    model_config = ConfigDict(from_attributes=True)
+    """Pydantic model configuration."""
@@ -0,0 +1,37 @@
+"""Posting site model for the uPay API."""
+
+from sqlalchemy import Boolean, Column, DateTime, String, true
+from sqlalchemy.sql import func
+
+from upayapi.database import Base
+
+
+class Site(Base):
+    """uPay site with its own posting key.
+
+    Only the SHA-256 digest of the posting key is stored. Sites are loaded
+    into the in-memory site registry when a worker starts.
+
+    Attributes:
+        site_id: Site identifier stored with each of its transactions.
+        name: Display name of the site.
+        posting_key_sha256: Hex SHA-256 digest of the site's posting key.
+        active: Whether postings for the site are accepted.
+        created_at: Timestamp when the record was created.
+    """
+
+    __tablename__ = "sites"
+
+    site_id = Column(String(64), primary_key=True)
+    name = Column(String, nullable=False, default="")
+    posting_key_sha256 = Column(String(64), unique=True, nullable=False)
+    active = Column(Boolean, nullable=False, default=True, server_default=true())
+    created_at = Column(DateTime, server_default=func.now())
+
+    def __repr__(self) -> str:
+        """Return string representation of the site.
+
+        Returns:
+            String representation of the site.
+        """
+        return f"Site(site_id={self.site_id}, name={self.name}, active={self.active})"
@@ -1,6 +1,17 @@
 """Transaction model for the uPay API."""
 
-from sqlalchemy import Column, Integer, String, Date, Numeric, DateTime, Enum
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Date,
+    Numeric,
+    DateTime,
+    Enum,
+    Index,
+    UniqueConstraint,
+    text,
+)
 from sqlalchemy.sql import func
 
 from upayapi.database import Base
@@ -18,19 +29,46 @@ class Transaction(Base):
         pmt_amt: Transaction amount.
         pmt_date: Transaction processing date.
         name_on_acct: Name on payment account.
+        site_id: uPay site whose posting key authenticated the posting.
         created_at: Timestamp when the record was created.
     """
 
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Lookups by tpg_trans_id. Unique keys of the monthly partitions on
+        # PostgreSQL must include pmt_date; TransactionKey keeps tpg_trans_id
+        # unique across months.
+        UniqueConstraint(
+            "tpg_trans_id", "pmt_date", name="uq_transactions_tpg_trans_id_pmt_date"
+        ),
+        # Keyset pages and exports ordered by payment date
+        Index("ix_transactions_pmt_date_id", "pmt_date", "id"),
+        # The same, filtered by status
+        Index("ix_transactions_pmt_status_pmt_date_id", "pmt_status", "pmt_date", "id"),
+        # Keyset pages ordered by creation time
+        Index("ix_transactions_created_at_id", "created_at", "id"),
+        # Per-site listings and reconciliation
+        Index("ix_transactions_site_id_pmt_date", "site_id", "pmt_date"),
+        # Index-only reconciliation of successful payments on PostgreSQL
+        Index(
+            "ix_transactions_success_pmt_date",
+            "pmt_date",
+            "id",
+            postgresql_include=["pmt_amt"],
+            postgresql_where=text("pmt_status = 'SUCCESS'"),
+            info={"dialect": "postgresql"},
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    tpg_trans_id = Column(String, unique=True, index=True, nullable=False)
+    tpg_trans_id = Column(String, nullable=False)
     session_identifier = Column(String, index=True, nullable=False)
     pmt_status = Column(Enum(PaymentStatus), nullable=False)
     pmt_amt = Column(Numeric(precision=10, scale=2), nullable=False)
     pmt_date = Column(Date, nullable=False)
     name_on_acct = Column(String, nullable=False)
-    created_at = Column(DateTime, server_default=func.now())
+    site_id = Column(String(64), nullable=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
 
     def __repr__(self) -> str:
         """Return string representation of the transaction.
@@ -45,5 +83,37 @@ class Transaction(Base):
             f"pmt_status={self.pmt_status}, "
             f"pmt_amt={self.pmt_amt}, "
             f"pmt_date={self.pmt_date}, "
-            f"name_on_acct={self.name_on_acct})"
+            f"name_on_acct={self.name_on_acct}, "
+            f"site_id={self.site_id})"
         )
+
+
+class TransactionKey(Base):
+    """tpg_trans_id of every stored transaction, with the transaction's ID.
+
+    The table is never partitioned, so its unique tpg_trans_id makes postings
+    idempotent across the monthly partitions of the transactions table. A
+    posting first claims its key here, with ``ON CONFLICT DO NOTHING``, and
+    only inserts its transaction if the claim succeeded. Keys are kept when
+    their month is archived, so late retries are still recognized.
+
+    Attributes:
+        id: ID of the transaction, allocated when the key is claimed.
+        tpg_trans_id: Transaction reference number assigned by Payment Gateway.
+        created_at: Timestamp when the key was claimed, also stored as the
+            transaction's created_at.
+    """
+
+    __tablename__ = "transaction_keys"
+
+    id = Column(Integer, primary_key=True)
+    tpg_trans_id = Column(String, unique=True, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    def __repr__(self) -> str:
+        """Return string representation of the transaction key.
+
+        Returns:
+            String representation of the transaction key.
+        """
+        return f"TransactionKey(id={self.id}, tpg_trans_id={self.tpg_trans_id})"
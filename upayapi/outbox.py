@@ -0,0 +1,310 @@
+"""Delivery of outbox events to a downstream HTTP sink.
+
+Each new transaction gets an ``outbox`` row in the same database
+transaction as its insert, so a stored posting is never lost to a crash and
+a rolled-back posting is never announced. OutboxDispatcher runs in the
+background of every worker: it claims due events in batches, posts each
+one's JSON payload to ``settings.outbox_url`` with a bounded number of
+requests in flight, and records the outcome. Posting responses never wait
+for the sink.
+
+Delivery is at least once. Each request carries the event ID in an
+``Idempotency-Key`` header so the sink can discard repeats. A failed
+delivery is retried with exponential backoff and jitter, and dead-lettered
+after ``settings.outbox_max_attempts`` attempts; ``upay-outbox --requeue``
+sends dead-lettered events back to the queue.
+
+Delivery requires httpx (the ``outbox`` extra).
+"""
+
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, sessionmaker
+
+from upayapi.config import settings
+from upayapi.database import get_session_factory
+from upayapi.metrics import OUTBOX_DELIVERIES
+from upayapi.repositories.outbox import OutboxRepository, utcnow
+
+# Configure logger
+logger = logging.getLogger("upayapi.outbox")
+
+
+class OutboxDispatcher:
+    """Background dispatcher of outbox events.
+
+    Attributes:
+        session_factory: Factory of sessions on the write engine.
+        url: URL the events are posted to.
+        batch_size: Maximum number of events claimed at once.
+        claim_size: Number of events claimed at once: the batch size, capped
+            so a batch whose deliveries all time out finishes within the
+            lease.
+        concurrency: Maximum number of deliveries in flight.
+        max_attempts: Number of failed deliveries after which an event is
+            dead-lettered.
+        backoff: Delay in seconds before the first retry.
+        backoff_max: Longest delay in seconds between retries.
+        timeout: Timeout in seconds of each delivery request.
+        poll_interval: Number of seconds between claims when no events are
+            due.
+        lease: Number of seconds a claimed event is hidden from other
+            dispatchers.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker[Session],
+        url: str,
+        batch_size: int = 100,
+        concurrency: int = 10,
+        max_attempts: int = 10,
+        backoff: float = 1.0,
+        backoff_max: float = 600.0,
+        timeout: float = 10.0,
+        poll_interval: float = 1.0,
+        lease: float = 60.0,
+    ):
+        """Initialize the dispatcher.
+
+        Args:
+            session_factory: Factory of sessions on the write engine.
+            url: URL the events are posted to.
+            batch_size: Maximum number of events claimed at once.
+            concurrency: Maximum number of deliveries in flight.
+            max_attempts: Number of failed deliveries after which an event
+                is dead-lettered.
+            backoff: Delay in seconds before the first retry.
+            backoff_max: Longest delay in seconds between retries.
+            timeout: Timeout in seconds of each delivery request.
+            poll_interval: Number of seconds between claims when no events
+                are due.
+            lease: Number of seconds a claimed event is hidden from other
+                dispatchers.
+        """
+        self.session_factory = session_factory
+        self.url = url
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.lease = lease
+        # Rounds of deliveries that fit in the lease, keeping one round for
+        # the claim and the record of the outcome
+        rounds = max(1, int(lease // timeout) - 1)
+        self.claim_size = min(batch_size, concurrency * rounds)
+        if self.claim_size < batch_size:
+            logger.info(
+                "Claiming %d outbox events at once, so a batch of timed out "
+                "deliveries finishes within the %g second lease",
+                self.claim_size,
+                lease,
+            )
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def retry_delay(self, attempts: int) -> float:
+        """Get the delay before retrying a failed event.
+
+        Args:
+            attempts: Number of delivery attempts so far.
+
+        Returns:
+            Number of seconds, between half and all of the exponential
+            backoff, so events that failed together are not retried together.
+        """
+        delay = min(self.backoff_max, self.backoff * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def claim(self) -> List[Row]:
+        """Claim a batch of due events.
+
+        Blocks on the database, so call it from a worker thread.
+
+        Returns:
+            Claimed events, ordered by ID.
+        """
+        with self.session_factory() as db:
+            return OutboxRepository(db).claim(self.claim_size, self.lease)
+
+    def record(
+        self,
+        delivered: Sequence[int],
+        failed: Sequence[Tuple[int, Optional[datetime], str]],
+    ) -> None:
+        """Record the outcome of a batch of deliveries.
+
+        Blocks on the database, so call it from a worker thread.
+
+        Args:
+            delivered: IDs of the events delivered.
+            failed: ID, retry time (None to dead-letter) and error of each
+                failed event.
+        """
+        with self.session_factory() as db:
+            OutboxRepository(db).record_attempts(delivered, failed)
+
+    async def deliver(
+        self, client: Any, semaphore: asyncio.Semaphore, event: Row
+    ) -> Optional[str]:
+        """Post one event to the sink.
+
+        Args:
+            client: httpx.AsyncClient.
+            semaphore: Limit of deliveries in flight.
+            event: Claimed event.
+
+        Returns:
+            None if the sink answered with a 2xx status, the error otherwise.
+            Any exception, such as an invalid URL or a payload that cannot
+            be serialized, is an error, so the outcome of the other events
+            in the batch is still recorded.
+        """
+        async with semaphore:
+            try:
+                response = await client.post(
+                    self.url,
+                    json=event.payload,
+                    headers={"Idempotency-Key": str(event.id)},
+                )
+            except Exception as e:
+                return f"{type(e).__name__}: {e}"
+        if response.is_success:
+            return None
+        return f"HTTP {response.status_code}"
+
+    async def dispatch(self, client: Any) -> int:
+        """Claim, deliver and record one batch of events.
+
+        Args:
+            client: httpx.AsyncClient.
+
+        Returns:
+            Number of events claimed.
+        """
+        events = await run_in_threadpool(self.claim)
+        if not events:
+            return 0
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        errors = await asyncio.gather(
+            *(self.deliver(client, semaphore, event) for event in events)
+        )
+
+        now = utcnow()
+        delivered: List[int] = []
+        failed: List[Tuple[int, Optional[datetime], str]] = []
+        for event, error in zip(events, errors):
+            if error is None:
+                delivered.append(event.id)
+                OUTBOX_DELIVERIES.inc("delivered")
+            elif event.attempts >= self.max_attempts:
+                failed.append((event.id, None, error))
+                OUTBOX_DELIVERIES.inc("dead")
+                logger.warning(
+                    "Dead-lettered outbox event %d after %d attempts: %s",
+                    event.id,
+                    event.attempts,
+                    error,
+                )
+            else:
+                retry_at = now + timedelta(seconds=self.retry_delay(event.attempts))
+                failed.append((event.id, retry_at, error))
+                OUTBOX_DELIVERIES.inc("retry")
+
+        await run_in_threadpool(self.record, delivered, failed)
+        return len(events)
+
+    async def _run(self) -> None:
+        """Dispatch events until cancelled.
+
+        Full batches are followed by another claim right away; otherwise the
+        dispatcher waits ``poll_interval`` seconds.
+        """
+        import httpx
+
+        limits = httpx.Limits(max_connections=self.concurrency)
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits) as client:
+            while True:
+                try:
+                    claimed = await self.dispatch(client)
+                except Exception:
+                    logger.exception("Outbox dispatch failed")
+                    claimed = 0
+                if claimed < self.claim_size:
+                    await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> bool:
+        """Start dispatching in the background, if not already running.
+
+        Returns:
+            True if the dispatcher is running, False if httpx is missing.
+        """
+        try:
+            import httpx  # noqa: F401
+        except ImportError:
+            logger.error(
+                "The outbox dispatcher requires httpx: pip install 'upayapi[outbox]'"
+            )
+            return False
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return True
+
+    async def stop(self) -> None:
+        """Stop dispatching.
+
+        Events claimed by an interrupted batch are retried once their lease
+        expires.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_outbox_dispatcher: Optional[OutboxDispatcher] = None
+
+
+def get_outbox_dispatcher() -> OutboxDispatcher:
+    """Get the worker's outbox dispatcher, creating it on first use.
+
+    Returns:
+        Outbox dispatcher for ``settings.outbox_url`` on the write engine.
+    """
+    global _outbox_dispatcher
+
+    if _outbox_dispatcher is None:
+        _outbox_dispatcher = OutboxDispatcher(
+            get_session_factory(),
+            settings.outbox_url,
+            batch_size=settings.outbox_batch_size,
+            concurrency=settings.outbox_concurrency,
+            max_attempts=settings.outbox_max_attempts,
+            backoff=settings.outbox_backoff_seconds,
+            backoff_max=settings.outbox_backoff_max_seconds,
+            timeout=settings.outbox_timeout_seconds,
+            poll_interval=settings.outbox_poll_interval_seconds,
+            lease=settings.outbox_lease_seconds,
+        )
+    return _outbox_dispatcher
+
+
+async def shutdown_outbox_dispatcher() -> None:
+    """Stop the worker's outbox dispatcher, if created."""
+    global _outbox_dispatcher
+
+    if _outbox_dispatcher is not None:
+        await _outbox_dispatcher.stop()
+        _outbox_dispatcher = None
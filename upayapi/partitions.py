@@ -0,0 +1,228 @@
+"""Monthly partitions of the transactions table on PostgreSQL.
+
+Migration 0004 turns ``transactions`` into a table partitioned by range of
+``pmt_date``, with one partition per month and a default partition for
+dates outside them. Each partition has its own small indexes, so the indexes
+postings and recent reports use stay in memory however much history is kept,
+and old months can be archived by dropping a whole partition instead of
+deleting rows.
+
+ensure_partitions creates the partitions of the coming months ahead of time.
+It runs when a worker starts and in ``upay-archive``, which should run daily.
+On other databases, and on PostgreSQL before the migration, these functions
+find no partitioned table and do nothing.
+"""
+
+import logging
+import re
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from upayapi.config import settings
+
+# Configure logger
+logger = logging.getLogger("upayapi.partitions")
+
+# Partitioned table and the names of its monthly partitions
+PARENT_TABLE = "transactions"
+PARTITION_NAME = re.compile(r"^transactions_y(\d{4})m(\d{2})$")
+
+# Serializes partition maintenance between workers starting together
+ADVISORY_LOCK_ID = 0x75706179
+
+
+def month_start(day: date) -> date:
+    """Get the first day of a date's month.
+
+    Args:
+        day: Any date.
+
+    Returns:
+        First day of the month.
+    """
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    """Move the first day of a month by a number of months.
+
+    Args:
+        month: First day of a month.
+        months: Number of months to add, negative to go back.
+
+    Returns:
+        First day of the resulting month.
+    """
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Get the name of a month's partition.
+
+    Args:
+        month: First day of the month.
+
+    Returns:
+        Partition table name, for example ``transactions_y2025m01``.
+    """
+    return f"{PARENT_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def is_partitioned(connection: Connection) -> bool:
+    """Check whether the transactions table is partitioned.
+
+    Args:
+        connection: Database connection.
+
+    Returns:
+        True on PostgreSQL once migration 0004 has run.
+    """
+    if connection.dialect.name != "postgresql":
+        return False
+    return bool(
+        connection.execute(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p "
+                "JOIN pg_class c ON c.oid = p.partrelid "
+                "WHERE c.relname = :table AND pg_table_is_visible(c.oid))"
+            ),
+            {"table": PARENT_TABLE},
+        ).scalar_one()
+    )
+
+
+def list_partitions(connection: Connection) -> List[date]:
+    """List the monthly partitions of the transactions table.
+
+    Args:
+        connection: Connection to a database with a partitioned table.
+
+    Returns:
+        First day of each partition's month, in order. The default
+        partition is not included.
+    """
+    names = connection.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table AND pg_table_is_visible(p.oid)"
+        ),
+        {"table": PARENT_TABLE},
+    ).scalars()
+    months = []
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            months.append(date(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+
+def create_partition(connection: Connection, month: date) -> None:
+    """Create a month's partition if it does not exist.
+
+    Args:
+        connection: Connection to a database with a partitioned table.
+        month: First day of the month.
+    """
+    connection.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(month)} "
+            f"PARTITION OF {PARENT_TABLE} "
+            f"FOR VALUES FROM ('{month.isoformat()}') "
+            f"TO ('{add_months(month, 1).isoformat()}')"
+        )
+    )
+
+
+def lock_partition(connection: Connection, month: date) -> None:
+    """Keep rows from being written to a month's partition.
+
+    The lock is held until the end of the transaction. Reads go on, and
+    postings to the month wait for the lock.
+
+    Args:
+        connection: Connection to a database with a partitioned table.
+        month: First day of the month.
+    """
+    connection.execute(text(f"LOCK TABLE {partition_name(month)} IN SHARE MODE"))
+
+
+def drop_partition(connection: Connection, month: date) -> None:
+    """Detach and drop a month's partition.
+
+    Args:
+        connection: Connection to a database with a partitioned table.
+        month: First day of the month.
+    """
+    name = partition_name(month)
+    connection.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+    connection.execute(text(f"DROP TABLE {name}"))
+
+
+def ensure_partitions(
+    connection: Connection,
+    today: Optional[date] = None,
+    months_ahead: Optional[int] = None,
+) -> List[str]:
+    """Create the partitions of the current and coming months.
+
+    Workers starting at the same time take turns through an advisory lock
+    held until the end of the transaction.
+
+    Args:
+        connection: Connection to a database with a partitioned table.
+        today: Current date. If None, today's date.
+        months_ahead: Number of months after the current one to create. If
+            None, ``settings.partition_months_ahead``.
+
+    Returns:
+        Names of the partitions created.
+    """
+    today = today or date.today()
+    if months_ahead is None:
+        months_ahead = settings.partition_months_ahead
+
+    connection.execute(
+        text("SELECT pg_advisory_xact_lock(:id)"), {"id": ADVISORY_LOCK_ID}
+    )
+    existing = set(list_partitions(connection))
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(month_start(today), offset)
+        if month not in existing:
+            create_partition(connection, month)
+            created.append(partition_name(month))
+    return created
+
+
+def maintain_partitions(engine: Engine) -> List[str]:
+    """Create upcoming partitions if the transactions table is partitioned.
+
+    Errors are logged rather than raised: postings for months without a
+    partition still land in the default partition.
+
+    Args:
+        engine: Engine of the primary database.
+
+    Returns:
+        Names of the partitions created.
+    """
+    if engine.dialect.name != "postgresql":
+        return []
+    try:
+        with engine.begin() as connection:
+            if not is_partitioned(connection):
+                return []
+            created = ensure_partitions(connection)
+    except SQLAlchemyError as e:
+        logger.warning("Could not create transaction partitions: %s", e)
+        return []
+    if created:
+        logger.info("Created transaction partitions %s", created)
+    return created
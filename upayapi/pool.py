@@ -0,0 +1,265 @@
+"""Connection pool profiles and connection liveness checks for the uPay API.
+
+A pool profile holds the pool settings for one kind of deployment: an
+in-memory or file SQLite database, or a database server in the dev, test or
+prod environment. Each profile also picks a liveness mode, which decides how
+a pooled connection is checked before it is handed out:
+
+* ``none``: never check. Dead connections surface as errors on first use.
+* ``pre_ping``: ping on every checkout (SQLAlchemy's ``pool_pre_ping``).
+  This costs one extra round-trip per request.
+* ``idle``: ping only connections that sat in the pool longer than
+  ``db_liveness_idle_seconds``. Busy connections are handed out unchecked;
+  connections left idle long enough to hit a server or firewall timeout are
+  checked first.
+
+In every mode a disconnect error invalidates the connection and every other
+connection opened before it, so they are replaced on their next checkout.
+
+File SQLite databases are additionally tuned for concurrent use through
+configure_sqlite: WAL journaling, so readers never block the writer, and a
+``BEGIN IMMEDIATE`` write lane, so writers queue on the busy timeout instead
+of failing with "database is locked".
+"""
+
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import StaticPool
+
+from upayapi.config import settings
+
+# Configure logger
+logger = logging.getLogger("upayapi.pool")
+
+# Supported liveness modes
+LIVENESS_MODES = ("none", "pre_ping", "idle")
+
+# Pool settings and default liveness mode of each profile. The prod profile
+# takes its pool size and overflow from settings.
+POOL_PROFILES: Dict[str, Dict[str, Any]] = {
+    # One connection shared by every thread, so all sessions see the same
+    # in-memory database
+    "sqlite_memory": {"poolclass": StaticPool, "liveness": "none"},
+    # Local files cannot drop a connection, so they are never pinged
+    "sqlite": {
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_timeout": 30,
+        "liveness": "none",
+    },
+    # SQLite allows one writer at a time, so writes share one connection
+    # and wait for it in the pool instead of on the database lock
+    "sqlite_writer": {
+        "pool_size": 1,
+        "max_overflow": 0,
+        "pool_timeout": 30,
+        "liveness": "none",
+    },
+    # Development servers restart often and latency does not matter there
+    "dev": {
+        "pool_size": 2,
+        "max_overflow": 3,
+        "pool_timeout": 10,
+        "pool_recycle": 1800,
+        "liveness": "pre_ping",
+    },
+    "test": {
+        "pool_size": 2,
+        "max_overflow": 8,
+        "pool_timeout": 10,
+        "pool_recycle": 1800,
+        "liveness": "pre_ping",
+    },
+    "prod": {
+        "pool_timeout": 30,
+        "pool_recycle": 1800,
+        "liveness": "idle",
+    },
+}
+
+
+def get_pool_profile(database_url: str, environment: Optional[str] = None) -> str:
+    """Get the name of the pool profile for a database.
+
+    Args:
+        database_url: Database connection string.
+        environment: Current environment. If None, uses
+            ``settings.environment``.
+
+    Returns:
+        ``settings.db_pool_profile`` if set, otherwise ``sqlite_memory`` or
+        ``sqlite`` for SQLite databases and the environment name for
+        database servers.
+    """
+    if settings.db_pool_profile:
+        return settings.db_pool_profile
+
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        if url.database in (None, "", ":memory:") or url.query.get("mode") == "memory":
+            return "sqlite_memory"
+        return "sqlite"
+    return environment or settings.environment
+
+
+def get_liveness_mode(database_url: str, environment: Optional[str] = None) -> str:
+    """Get the liveness mode for a database.
+
+    Args:
+        database_url: Database connection string.
+        environment: Current environment. If None, uses
+            ``settings.environment``.
+
+    Returns:
+        ``settings.db_liveness`` if set, otherwise the default mode of the
+        database's pool profile.
+    """
+    if settings.db_liveness:
+        return settings.db_liveness
+    return POOL_PROFILES[get_pool_profile(database_url, environment)]["liveness"]
+
+
+def get_pool_args(
+    database_url: str,
+    environment: Optional[str] = None,
+    liveness: Optional[str] = None,
+    profile: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Get engine arguments for the pool of a database.
+
+    Args:
+        database_url: Database connection string.
+        environment: Current environment. If None, uses
+            ``settings.environment``.
+        liveness: Liveness mode. If None, uses get_liveness_mode.
+        profile: Pool profile. If None, uses get_pool_profile.
+
+    Returns:
+        Dictionary of pool engine arguments.
+
+    Raises:
+        ValueError: If the liveness mode is unknown.
+    """
+    profile = profile or get_pool_profile(database_url, environment)
+    liveness = liveness or get_liveness_mode(database_url, environment)
+    if liveness not in LIVENESS_MODES:
+        raise ValueError(f"Unknown liveness mode: {liveness}")
+
+    pool_args = {
+        name: value
+        for name, value in POOL_PROFILES[profile].items()
+        if name != "liveness"
+    }
+    if profile == "prod":
+        pool_args["pool_size"] = settings.connection_pool_size
+        pool_args["max_overflow"] = settings.connection_pool_max_overflow
+    pool_args["pool_pre_ping"] = liveness == "pre_ping"
+    return pool_args
+
+
+def configure_liveness(
+    engine: Engine, liveness: str, idle_seconds: Optional[float] = None
+) -> None:
+    """Install the connection liveness checks of a liveness mode.
+
+    The ``pre_ping`` mode is configured through get_pool_args when the
+    engine is created; this function adds the idle check and the handling
+    of disconnect errors.
+
+    Args:
+        engine: Engine to configure. For an ``AsyncEngine`` pass its
+            ``sync_engine``.
+        liveness: Liveness mode the engine was created with.
+        idle_seconds: Number of seconds a connection may sit in the pool
+            before it is pinged in the ``idle`` mode. If None, uses
+            ``settings.db_liveness_idle_seconds``.
+    """
+    if idle_seconds is None:
+        idle_seconds = settings.db_liveness_idle_seconds
+    dialect = engine.dialect
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        if exception_context.is_disconnect:
+            # A dropped connection usually means the server restarted or a
+            # network device reset the connections, so recycle every
+            # connection opened before this one too
+            exception_context.invalidate_pool_on_disconnect = True
+            logger.warning(
+                "Database disconnect detected, invalidating pooled connections"
+            )
+
+    if liveness != "idle":
+        return
+
+    @event.listens_for(engine, "checkin")
+    def checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        # New connections have no checkin time and need no check
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+
+        try:
+            dialect.do_ping(dbapi_connection)
+        except dialect.loaded_dbapi.Error as e:
+            if dialect.is_disconnect(e, dbapi_connection, None):
+                logger.warning("Idle database connection is dead, reconnecting")
+                # The pool invalidates the connection and checks out a new one
+                raise exc.DisconnectionError() from e
+            raise
+
+
+def configure_sqlite(
+    engine: Engine, begin_immediate: bool = False, query_only: bool = False
+) -> None:
+    """Apply the SQLite pragmas for concurrent use to every new connection.
+
+    Connections use WAL journaling with ``synchronous=NORMAL``, which only
+    syncs at checkpoints, a busy timeout, memory-mapped I/O and a larger
+    page cache, all sized by settings.
+
+    Args:
+        engine: SQLite engine to configure. For an ``AsyncEngine`` pass its
+            ``sync_engine``.
+        begin_immediate: Start every transaction with ``BEGIN IMMEDIATE``,
+            taking the write lock up front. A deferred transaction that
+            reads before it writes can fail with "database is locked"
+            without waiting for the busy timeout.
+        query_only: Reject writes on the engine's connections.
+    """
+    pragmas = [
+        "journal_mode=WAL",
+        "synchronous=NORMAL",
+        f"busy_timeout={settings.sqlite_busy_timeout_ms}",
+        f"mmap_size={settings.sqlite_mmap_size}",
+        # Negative sizes are in KiB rather than pages
+        f"cache_size=-{settings.sqlite_cache_size_kib}",
+    ]
+    if query_only:
+        pragmas.append("query_only=ON")
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(f"PRAGMA {pragma}")
+        finally:
+            cursor.close()
+        if begin_immediate:
+            # Stop the driver from emitting its own deferred BEGIN
+            dbapi_connection.isolation_level = None
+
+    if begin_immediate:
+
+        @event.listens_for(engine, "begin")
+        def begin(connection):
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
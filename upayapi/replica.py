@@ -0,0 +1,210 @@
+"""Read replica routing for the uPay API.
+
+When ``settings.replica_database_url`` is set, sessions for read-only
+requests are RoutingSessions: their queries go to the replica while it is
+reachable and its replication lag is within
+``settings.replica_max_lag_seconds``, and to the primary otherwise. Sessions
+for postings are bound to the primary, so writes and the idempotency
+lookups that decide whether a posting is new never read stale data.
+
+The replica's lag is measured by the background health prober. Connection
+errors on the replica send reads to the primary at once, until a probe
+succeeds again or ``settings.replica_retry_seconds`` have passed.
+"""
+
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from upayapi.config import settings
+
+# Configure logger
+logger = logging.getLogger("upayapi.replica")
+
+# Seconds since the last replayed transaction, or 0 when the replica has
+# replayed all the WAL it received (an idle primary sends no transactions)
+POSTGRESQL_LAG_QUERY = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    " END"
+)
+
+
+def measure_replica_lag(connection: Connection) -> float:
+    """Measure the replication lag of a replica.
+
+    Args:
+        connection: Connection to the replica.
+
+    Returns:
+        Lag in seconds. Databases without a way to measure it report 0.
+    """
+    if connection.dialect.name == "postgresql":
+        return float(connection.execute(POSTGRESQL_LAG_QUERY).scalar_one())
+    connection.execute(text("SELECT 1"))
+    return 0.0
+
+
+class ReplicaRouter:
+    """State deciding whether reads can go to the replica.
+
+    Attributes:
+        max_lag: Largest replication lag, in seconds, at which reads go to
+            the replica.
+        retry_after: Number of seconds reads go to the primary after a
+            replica error, unless a check succeeds first.
+        lag: Last measured replication lag, or None before the first check.
+        error: Last replica error, or None.
+        failed_at: Monotonic time of the last replica error, or None.
+    """
+
+    def __init__(self, max_lag: float, retry_after: float):
+        """Initialize the router.
+
+        Args:
+            max_lag: Largest replication lag, in seconds, at which reads go
+                to the replica.
+            retry_after: Number of seconds reads go to the primary after a
+                replica error.
+        """
+        self.max_lag = max_lag
+        self.retry_after = retry_after
+        self.lag: Optional[float] = None
+        self.error: Optional[str] = None
+        self.failed_at: Optional[float] = None
+
+    def available(self) -> bool:
+        """Check whether reads should go to the replica.
+
+        Returns:
+            True unless the replica failed within ``retry_after`` seconds or
+            its last measured lag exceeds ``max_lag``.
+        """
+        if self.failed_at is not None:
+            if time.monotonic() - self.failed_at < self.retry_after:
+                return False
+        return self.lag is None or self.lag <= self.max_lag
+
+    def record_failure(self, error: str) -> None:
+        """Send reads to the primary after a replica error.
+
+        Args:
+            error: Description of the error.
+        """
+        if self.failed_at is None:
+            logger.warning("Replica unavailable, reading from the primary: %s", error)
+        self.error = error
+        self.failed_at = time.monotonic()
+
+    def check(self, engine: Engine) -> Dict[str, Any]:
+        """Measure the replica's lag and update the routing state.
+
+        Blocks on the database, so call it from a worker thread.
+
+        Args:
+            engine: Replica engine.
+
+        Returns:
+            Replica status, lag and where reads are routed.
+        """
+        try:
+            with engine.connect() as connection:
+                lag = measure_replica_lag(connection)
+        except Exception as e:
+            self.record_failure(str(e))
+            return {"status": "unhealthy", "details": str(e), "routing": "primary"}
+
+        if self.failed_at is not None:
+            logger.info("Replica available again")
+        self.lag = lag
+        self.error = None
+        self.failed_at = None
+        return {
+            "status": "healthy" if lag <= self.max_lag else "lagging",
+            "lag_seconds": round(lag, 3),
+            "routing": "replica" if self.available() else "primary",
+        }
+
+
+def configure_replica(engine: Engine, router: ReplicaRouter) -> None:
+    """Report connection errors of a replica engine to a router.
+
+    Args:
+        engine: Replica engine.
+        router: Router whose reads go to the engine.
+    """
+
+    @event.listens_for(engine, "handle_error")
+    def replica_error(context) -> None:
+        if context.is_disconnect or context.connection is None:
+            router.record_failure(str(context.original_exception))
+
+
+class RoutingSession(Session):
+    """Session sending reads to a replica and writes to the primary.
+
+    Attributes:
+        replica: Replica engine.
+        primary: Primary engine for writes.
+        primary_read: Primary engine for reads while the replica is not
+            available.
+        router: Router deciding whether the replica is available.
+    """
+
+    def __init__(
+        self,
+        replica: Engine,
+        primary: Engine,
+        primary_read: Engine,
+        router: ReplicaRouter,
+        **kwargs: Any,
+    ):
+        """Initialize the session.
+
+        Args:
+            replica: Replica engine.
+            primary: Primary engine for writes.
+            primary_read: Primary engine for reads while the replica is not
+                available.
+            router: Router deciding whether the replica is available.
+            **kwargs: Session arguments.
+        """
+        super().__init__(**kwargs)
+        self.replica = replica
+        self.primary = primary
+        self.primary_read = primary_read
+        self.router = router
+
+    def get_bind(self, mapper=None, clause=None, **kwargs: Any) -> Engine:
+        """Choose the engine for a statement.
+
+        A session keeps its connection until the end of its transaction, so
+        all the reads of one transaction go to the same database.
+
+        Args:
+            mapper: Mapper of the statement's entity.
+            clause: Statement to execute.
+            **kwargs: Further arguments of Session.get_bind.
+
+        Returns:
+            The primary for flushes and DML statements, otherwise the replica
+            if available and the primary's read engine if not.
+        """
+        if self._flushing or isinstance(clause, UpdateBase):
+            return self.primary
+        if self.router.available():
+            return self.replica
+        return self.primary_read
+
+
+replica_router = ReplicaRouter(
+    max_lag=settings.replica_max_lag_seconds,
+    retry_after=settings.replica_retry_seconds,
+)
@@ -0,0 +1,318 @@
+"""Async base repository for the uPay API."""
+
+import logging
+from typing import Any, Dict, Generic, List, Optional, Type, TypeVar
+
+from sqlalchemy import asc, desc, func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from upayapi.database import Base
+from upayapi.repositories.pagination import apply_keyset, next_page
+
+# Type variable for the model
+T = TypeVar("T", bound=Base)
+
+
+class AsyncBaseRepository(Generic[T]):
+    """Async base repository with common CRUD operations.
+
+    This class mirrors :class:`upayapi.repositories.base.BaseRepository` for
+    use with an ``AsyncSession``. It should be subclassed by specific
+    repositories.
+
+    Attributes:
+        db: Async database session.
+        model: SQLAlchemy model class.
+        logger: Logger instance.
+    """
+
+    def __init__(self, db: AsyncSession, model: Type[T]):
+        """Initialize the repository with an async database session and model.
+
+        Args:
+            db: Async database session.
+            model: SQLAlchemy model class.
+        """
+        self.db = db
+        self.model = model
+        self.logger = logging.getLogger(
+            f"upayapi.repositories.{model.__name__.lower()}"
+        )
+
+    async def create(self, **kwargs) -> T:
+        """Create a new record.
+
+        Args:
+            **kwargs: Fields for the new record.
+
+        Returns:
+            The created record.
+
+        Raises:
+            SQLAlchemyError: If there's an error creating the record.
+        """
+        try:
+            record = self.model(**kwargs)
+            self.db.add(record)
+            await self.db.commit()
+            await self.db.refresh(record)
+            return record
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            self.logger.error("Error creating %s: %s", self.model.__name__, e)
+            raise
+
+    async def get_by_id(self, id: Any) -> Optional[T]:
+        """Get a record by its ID.
+
+        Args:
+            id: Record ID.
+
+        Returns:
+            The record if found, None otherwise.
+
+        Raises:
+            SQLAlchemyError: If there's an error retrieving the record.
+        """
+        try:
+            result = await self.db.execute(
+                select(self.model).where(self.model.id == id)
+            )
+            return result.scalars().first()
+        except SQLAlchemyError as e:
+            self.logger.error("Error retrieving %s by ID: %s", self.model.__name__, e)
+            raise
+
+    async def get_all(
+        self,
+        skip: int = 0,
+        limit: Optional[int] = None,
+        sort_by: Optional[str] = None,
+        sort_order: Optional[str] = "asc",
+        **filters,
+    ) -> List[T]:
+        """Get all records with pagination, sorting, and filtering.
+
+        Args:
+            skip: Number of records to skip.
+            limit: Maximum number of records to return.
+            sort_by: Field to sort by.
+            sort_order: Sort order ("asc" or "desc").
+            **filters: Field filters.
+
+        Returns:
+            List of records.
+
+        Raises:
+            SQLAlchemyError: If there's an error retrieving the records.
+            ValueError: If sort_order is invalid.
+        """
+        try:
+            query = select(self.model)
+
+            # Apply filters
+            for field, value in filters.items():
+                if hasattr(self.model, field):
+                    query = query.where(getattr(self.model, field) == value)
+
+            # Apply sorting
+            if sort_by and hasattr(self.model, sort_by):
+                if sort_order.lower() == "asc":
+                    query = query.order_by(asc(getattr(self.model, sort_by)))
+                elif sort_order.lower() == "desc":
+                    query = query.order_by(desc(getattr(self.model, sort_by)))
+                else:
+                    raise ValueError("sort_order must be 'asc' or 'desc'")
+
+            # Apply pagination
+            query = query.offset(skip)
+            if limit is not None:
+                query = query.limit(limit)
+
+            result = await self.db.execute(query)
+            return list(result.scalars().all())
+        except SQLAlchemyError as e:
+            self.logger.error("Error retrieving %s records: %s", self.model.__name__, e)
+            raise
+
+    async def count(self, **filters) -> int:
+        """Count records with filtering.
+
+        Args:
+            **filters: Field filters.
+
+        Returns:
+            Number of records.
+
+        Raises:
+            SQLAlchemyError: If there's an error counting the records.
+        """
+        try:
+            query = select(func.count(self.model.id))
+
+            # Apply filters
+            for field, value in filters.items():
+                if hasattr(self.model, field):
+                    query = query.where(getattr(self.model, field) == value)
+
+            result = await self.db.execute(query)
+            return result.scalar_one()
+        except SQLAlchemyError as e:
+            self.logger.error("Error counting %s records: %s", self.model.__name__, e)
+            raise
+
+    async def update(self, id: Any, **kwargs) -> Optional[T]:
+        """Update a record by its ID.
+
+        Args:
+            id: Record ID.
+            **kwargs: Fields to update.
+
+        Returns:
+            The updated record if found, None otherwise.
+
+        Raises:
+            SQLAlchemyError: If there's an error updating the record.
+        """
+        try:
+            record = await self.get_by_id(id)
+            if record:
+                for key, value in kwargs.items():
+                    if hasattr(record, key):
+                        setattr(record, key, value)
+                await self.db.commit()
+                await self.db.refresh(record)
+            return record
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            self.logger.error("Error updating %s: %s", self.model.__name__, e)
+            raise
+
+    async def delete(self, id: Any) -> bool:
+        """Delete a record by its ID.
+
+        Args:
+            id: Record ID.
+
+        Returns:
+            True if the record was deleted, False otherwise.
+
+        Raises:
+            SQLAlchemyError: If there's an error deleting the record.
+        """
+        try:
+            record = await self.get_by_id(id)
+            if record:
+                await self.db.delete(record)
+                await self.db.commit()
+                return True
+            return False
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            self.logger.error("Error deleting %s: %s", self.model.__name__, e)
+            raise
+
+    async def get_paginated_response(
+        self,
+        skip: int = 0,
+        limit: Optional[int] = None,
+        sort_by: Optional[str] = None,
+        sort_order: Optional[str] = "asc",
+        **filters,
+    ) -> Dict[str, Any]:
+        """Get paginated response with metadata.
+
+        Args:
+            skip: Number of records to skip.
+            limit: Maximum number of records to return.
+            sort_by: Field to sort by.
+            sort_order: Sort order ("asc" or "desc").
+            **filters: Field filters.
+
+        Returns:
+            Dictionary with items, total count, and pagination metadata.
+
+        Raises:
+            SQLAlchemyError: If there's an error retrieving the records.
+        """
+        items = await self.get_all(skip, limit, sort_by, sort_order, **filters)
+        total = await self.count(**filters)
+
+        return {
+            "items": items,
+            "total": total,
+            "skip": skip,
+            "limit": limit,
+            "has_more": total > skip + len(items) if limit is not None else False,
+        }
+
+    async def get_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        sort_order: str = "asc",
+        include_total: bool = False,
+        **filters,
+    ) -> Dict[str, Any]:
+        """Get a page of records using keyset (cursor) pagination.
+
+        Args:
+            limit: Maximum number of records to return.
+            cursor: Cursor from the previous page, or None for the first page.
+            sort_by: Column to sort by. Defaults to the ID column.
+            sort_order: Sort order ("asc" or "desc").
+            include_total: Whether to count all records matching the filters.
+            **filters: Field filters.
+
+        Returns:
+            Dictionary with items, the next page cursor and pagination metadata.
+
+        Raises:
+            SQLAlchemyError: If there's an error retrieving the records.
+            ValueError: If sort_order or the cursor is invalid.
+        """
+        try:
+            conditions = [
+                getattr(self.model, field) == value
+                for field, value in filters.items()
+                if hasattr(self.model, field)
+            ]
+            sort_column = self._sort_column(sort_by)
+            query = apply_keyset(
+                select(self.model).where(*conditions),
+                sort_column,
+                self.model.id,
+                sort_order,
+                cursor,
+            ).limit(limit + 1)
+
+            rows = (await self.db.execute(query)).scalars().all()
+            items, next_cursor = next_page(rows, limit, sort_column.key, sort_order)
+
+            page: Dict[str, Any] = {
+                "items": items,
+                "next_cursor": next_cursor,
+                "limit": limit,
+                "has_more": next_cursor is not None,
+            }
+            if include_total:
+                page["total"] = await self.count(**filters)
+            return page
+        except SQLAlchemyError as e:
+            self.logger.error("Error retrieving %s page: %s", self.model.__name__, e)
+            raise
+
+    def _sort_column(self, sort_by: Optional[str]) -> Any:
+        """Get the column to sort a keyset page by.
+
+        Args:
+            sort_by: Column name, or None.
+
+        Returns:
+            The named column if the model's table has it, otherwise the ID column.
+        """
+        if sort_by and sort_by in self.model.__table__.c:
+            return getattr(self.model, sort_by)
+        return self.model.id
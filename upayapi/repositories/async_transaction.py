@@ -0,0 +1,274 @@
+"""Async transaction repository for the uPay API."""
+
+from typing import Any, Dict, List, Optional, Sequence
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from upayapi.models.transaction import Transaction, TransactionKey
+from upayapi.repositories.async_base import AsyncBaseRepository
+from upayapi.repositories.transaction import (
+    TransactionInsertResult,
+    build_insert_results,
+    claim_transaction_keys,
+    existing_transactions_statement,
+    store_claimed_transactions,
+    transaction_filters,
+    unique_transaction_rows,
+)
+from upayapi.repositories.pagination import apply_keyset, next_page
+from upayapi.repositories.outbox import enqueue_outbox
+from upayapi.repositories.rollup import apply_rollup
+
+
+class AsyncTransactionRepository(AsyncBaseRepository[Transaction]):
+    """Async repository for transaction data operations.
+
+    This class provides the same operations as
+    :class:`upayapi.repositories.transaction.TransactionRepository` for use
+    with an ``AsyncSession``.
+    """
+
+    def __init__(self, db: AsyncSession):
+        """Initialize the repository with an async database session.
+
+        Args:
+            db: Async database session.
+        """
+        super().__init__(db, Transaction)
+
+    async def create_transaction(
+        self,
+        tpg_trans_id: str,
+        session_identifier: str,
+        pmt_status: str,
+        pmt_amt: Decimal,
+        pmt_date: date,
+        name_on_acct: str,
+        site_id: Optional[str] = None,
+    ) -> Transaction:
+        """Create a new transaction record.
+
+        The transaction's key, the daily rollup and the outbox are updated
+        in the same database transaction.
+
+        Args:
+            tpg_trans_id: Transaction reference number assigned by Payment Gateway.
+            session_identifier: Unique session identifier code.
+            pmt_status: Transaction status ('success' or 'cancelled').
+            pmt_amt: Transaction amount.
+            pmt_date: Transaction processing date.
+            name_on_acct: Name on payment account.
+            site_id: uPay site of the transaction.
+
+        Returns:
+            The created transaction.
+
+        Raises:
+            SQLAlchemyError: If there's an error creating the transaction.
+        """
+        values = {
+            "tpg_trans_id": tpg_trans_id,
+            "session_identifier": session_identifier,
+            "pmt_status": pmt_status,
+            "pmt_amt": pmt_amt,
+            "pmt_date": pmt_date,
+            "name_on_acct": name_on_acct,
+            "site_id": site_id,
+        }
+        try:
+            key = TransactionKey(tpg_trans_id=tpg_trans_id)
+            self.db.add(key)
+            await self.db.flush()
+            await self.db.refresh(key)
+            transaction = Transaction(id=key.id, created_at=key.created_at, **values)
+            self.db.add(transaction)
+            await self.db.flush()
+            await self.db.run_sync(apply_rollup, [values])
+            await self.db.run_sync(enqueue_outbox, [{**values, "id": transaction.id}])
+            await self.db.commit()
+            await self.db.refresh(transaction)
+            return transaction
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            self.logger.error("Error creating Transaction: %s", e)
+            raise
+
+    async def create_transaction_if_absent(
+        self,
+        tpg_trans_id: str,
+        session_identifier: str,
+        pmt_status: str,
+        pmt_amt: Decimal,
+        pmt_date: date,
+        name_on_acct: str,
+        site_id: Optional[str] = None,
+    ) -> TransactionInsertResult:
+        """Create a transaction record unless its tpg_trans_id already exists.
+
+        Args:
+            tpg_trans_id: Transaction reference number assigned by Payment Gateway.
+            session_identifier: Unique session identifier code.
+            pmt_status: Transaction status ('success' or 'cancelled').
+            pmt_amt: Transaction amount.
+            pmt_date: Transaction processing date.
+            name_on_acct: Name on payment account.
+            site_id: uPay site of the transaction.
+
+        Returns:
+            Insert result with the transaction ID and whether it was created.
+
+        Raises:
+            SQLAlchemyError: If there's an error creating the transaction.
+        """
+        return (
+            await self.create_transactions_if_absent(
+                [
+                    {
+                        "tpg_trans_id": tpg_trans_id,
+                        "session_identifier": session_identifier,
+                        "pmt_status": pmt_status,
+                        "pmt_amt": pmt_amt,
+                        "pmt_date": pmt_date,
+                        "name_on_acct": name_on_acct,
+                        "site_id": site_id,
+                    }
+                ]
+            )
+        )[0]
+
+    async def create_transactions_if_absent(
+        self, rows: Sequence[Dict[str, Any]]
+    ) -> List[TransactionInsertResult]:
+        """Create transaction records whose tpg_trans_ids don't exist yet.
+
+        Args:
+            rows: Column values for each transaction, as accepted by
+                create_transaction.
+
+        Returns:
+            Insert results in the same order as ``rows``.
+
+        Raises:
+            SQLAlchemyError: If there's an error creating the transactions.
+        """
+        unique = unique_transaction_rows(rows)
+        try:
+            stored = await self.db.run_sync(claim_transaction_keys, list(unique))
+            created = set(stored)
+            await self.db.run_sync(store_claimed_transactions, unique, stored)
+
+            missing = [key for key in unique if key not in stored]
+            if missing:
+                result = await self.db.execute(existing_transactions_statement(missing))
+                for row in result:
+                    stored[row.tpg_trans_id] = row
+            await self.db.commit()
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            self.logger.error("Error creating transactions: %s", e)
+            raise
+
+        return build_insert_results(rows, stored, created)
+
+    async def get_by_tpg_trans_id(self, tpg_trans_id: str) -> Optional[Transaction]:
+        """Get a transaction by its tpg_trans_id.
+
+        Args:
+            tpg_trans_id: Transaction reference number assigned by Payment Gateway.
+
+        Returns:
+            The transaction if found, None otherwise.
+
+        Raises:
+            SQLAlchemyError: If there's an error retrieving the transaction.
+        """
+        try:
+            result = await self.db.execute(
+                select(Transaction).where(Transaction.tpg_trans_id == tpg_trans_id)
+            )
+            return result.scalars().first()
+        except SQLAlchemyError as e:
+            self.logger.error("Error retrieving transaction by tpg_trans_id: %s", e)
+            raise
+
+    async def get_transactions(
+        self,
+        skip: int = 0,
+        limit: Optional[int] = None,
+        sort_by: Optional[str] = "pmt_date",
+        sort_order: Optional[str] = "desc",
+        pmt_status: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+    ) -> Dict[str, Any]:
+        """Get transactions with pagination, sorting, and filtering.
+
+        Args:
+            skip: Number of records to skip.
+            limit: Maximum number of records to return.
+            sort_by: Field to sort by.
+            sort_order: Sort order ("asc" or "desc").
+            pmt_status: Filter by payment status.
+            start_date: Filter by payment date (start).
+            end_date: Filter by payment date (end).
+            cursor: Cursor of the previous page.
+            include_total: Whether to count all matching transactions.
+
+        Returns:
+            Dictionary with transactions, total count (None unless
+            include_total), next page cursor, and pagination metadata.
+
+        Raises:
+            SQLAlchemyError: If there's an error retrieving the transactions.
+            ValueError: If sort_order or the cursor is invalid.
+        """
+        try:
+            conditions = transaction_filters(pmt_status, start_date, end_date)
+
+            # Get total count
+            total = None
+            if include_total:
+                total = (
+                    await self.db.execute(
+                        select(func.count(Transaction.id)).where(*conditions)
+                    )
+                ).scalar_one()
+
+            # Apply sorting and the cursor
+            sort_column = self._sort_column(sort_by)
+            query = apply_keyset(
+                select(Transaction).where(*conditions),
+                sort_column,
+                Transaction.id,
+                sort_order or "asc",
+                cursor,
+            )
+
+            # Apply pagination, fetching one extra row to detect a next page
+            if not cursor:
+                query = query.offset(skip)
+            if limit is not None:
+                query = query.limit(limit + 1)
+
+            rows = (await self.db.execute(query)).scalars().all()
+            items, next_cursor = next_page(
+                rows, limit, sort_column.key, sort_order or "asc"
+            )
+
+            return {
+                "items": items,
+                "total": total,
+                "skip": 0 if cursor else skip,
+                "limit": limit,
+                "has_more": next_cursor is not None,
+                "next_cursor": next_cursor,
+            }
+        except SQLAlchemyError as e:
+            self.logger.error("Error retrieving transactions: %s", e)
+            raise
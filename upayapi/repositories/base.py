@@ -2,11 +2,12 @@
 
 import logging
 from typing import Any, Dict, Generic, List, Optional, Type, TypeVar
-from sqlalchemy import asc, desc, func
+from sqlalchemy import asc, desc, func, select
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from upayapi.database import Base
+from upayapi.repositories.pagination import apply_keyset, next_page
 
 # Type variable for the model
 T = TypeVar("T", bound=Base)
@@ -60,7 +61,7 @@ class BaseRepository(Generic[T]):
             return record
         except SQLAlchemyError as e:
             self.db.rollback()
-            self.logger.error(f"Error creating {self.model.__name__}: {str(e)}")
+            self.logger.error("Error creating %s: %s", self.model.__name__, e)
             raise
 
     def get_by_id(self, id: Any) -> Optional[T]:
@@ -78,7 +79,7 @@ class BaseRepository(Generic[T]):
         try:
             return self.db.query(self.model).filter(self.model.id == id).first()
         except SQLAlchemyError as e:
-            self.logger.error(f"Error retrieving {self.model.__name__} by ID: {str(e)}")
+            self.logger.error("Error retrieving %s by ID: %s", self.model.__name__, e)
             raise
 
     def get_all(
@@ -129,9 +130,7 @@ class BaseRepository(Generic[T]):
 
             return query.all()
         except SQLAlchemyError as e:
-            self.logger.error(
-                f"Error retrieving {self.model.__name__} records: {str(e)}"
-            )
+            self.logger.error("Error retrieving %s records: %s", self.model.__name__, e)
             raise
 
     def count(self, **filters) -> int:
@@ -156,7 +155,7 @@ class BaseRepository(Generic[T]):
 
             return query.scalar()
         except SQLAlchemyError as e:
-            self.logger.error(f"Error counting {self.model.__name__} records: {str(e)}")
+            self.logger.error("Error counting %s records: %s", self.model.__name__, e)
             raise
 
     def update(self, id: Any, **kwargs) -> Optional[T]:
@@ -183,7 +182,7 @@ class BaseRepository(Generic[T]):
             return record
         except SQLAlchemyError as e:
             self.db.rollback()
-            self.logger.error(f"Error updating {self.model.__name__}: {str(e)}")
+            self.logger.error("Error updating %s: %s", self.model.__name__, e)
             raise
 
     def delete(self, id: Any) -> bool:
@@ -207,7 +206,7 @@ class BaseRepository(Generic[T]):
             return False
         except SQLAlchemyError as e:
             self.db.rollback()
-            self.logger.error(f"Error deleting {self.model.__name__}: {str(e)}")
+            self.logger.error("Error deleting %s: %s", self.model.__name__, e)
             raise
 
     def get_paginated_response(
@@ -243,3 +242,76 @@ class BaseRepository(Generic[T]):
             "limit": limit,
             "has_more": total > skip + len(items) if limit is not None else False,
         }
+
+    def get_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        sort_order: str = "asc",
+        include_total: bool = False,
+        **filters,
+    ) -> Dict[str, Any]:
+        """Get a page of records using keyset (cursor) pagination.
+
+        Unlike get_paginated_response, deep pages cost the same as the first
+        page, and the total is only counted when requested.
+
+        Args:
+            limit: Maximum number of records to return.
+            cursor: Cursor from the previous page, or None for the first page.
+            sort_by: Column to sort by. Defaults to the ID column.
+            sort_order: Sort order ("asc" or "desc").
+            include_total: Whether to count all records matching the filters.
+            **filters: Field filters.
+
+        Returns:
+            Dictionary with items, the next page cursor and pagination metadata.
+
+        Raises:
+            SQLAlchemyError: If there's an error retrieving the records.
+            ValueError: If sort_order or the cursor is invalid.
+        """
+        try:
+            conditions = [
+                getattr(self.model, field) == value
+                for field, value in filters.items()
+                if hasattr(self.model, field)
+            ]
+            sort_column = self._sort_column(sort_by)
+            query = apply_keyset(
+                select(self.model).where(*conditions),
+                sort_column,
+                self.model.id,
+                sort_order,
+                cursor,
+            ).limit(limit + 1)
+
+            rows = self.db.execute(query).scalars().all()
+            items, next_cursor = next_page(rows, limit, sort_column.key, sort_order)
+
+            page: Dict[str, Any] = {
+                "items": items,
+                "next_cursor": next_cursor,
+                "limit": limit,
+                "has_more": next_cursor is not None,
+            }
+            if include_total:
+                page["total"] = self.count(**filters)
+            return page
+        except SQLAlchemyError as e:
+            self.logger.error("Error retrieving %s page: %s", self.model.__name__, e)
+            raise
+
+    def _sort_column(self, sort_by: Optional[str]) -> Any:
+        """Get the column to sort a keyset page by.
+
+        Args:
+            sort_by: Column name, or None.
+
+        Returns:
+            The named column if the model's table has it, otherwise the ID column.
+        """
+        if sort_by and sort_by in self.model.__table__.c:
+            return getattr(self.model, sort_by)
+        return self.model.id
@@ -0,0 +1,280 @@
+"""Outbox repository for the uPay API."""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from upayapi.config import settings
+from upayapi.models.outbox import OutboxEvent, OutboxStatus
+from upayapi.repositories.base import BaseRepository
+from upayapi.serialization import json_value
+
+# Event type of a newly stored transaction
+TRANSACTION_CREATED = "transaction.created"
+
+# Transaction columns sent in event payloads, in payload order
+PAYLOAD_FIELDS = (
+    "tpg_trans_id",
+    "session_identifier",
+    "pmt_status",
+    "pmt_amt",
+    "pmt_date",
+    "name_on_acct",
+    "site_id",
+)
+
+
+def utcnow() -> datetime:
+    """Get the current UTC time as stored in outbox timestamps.
+
+    Returns:
+        Naive datetime in UTC.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def transaction_event(values: Mapping[str, Any]) -> Dict[str, Any]:
+    """Build the outbox row announcing a new transaction.
+
+    Args:
+        values: Column values of the inserted transaction, including ``id``.
+
+    Returns:
+        Column values of the outbox event.
+    """
+    payload = {"event": TRANSACTION_CREATED, "transaction_id": values["id"]}
+    for field in PAYLOAD_FIELDS:
+        payload[field] = json_value(values.get(field))
+    return {
+        "event_type": TRANSACTION_CREATED,
+        "transaction_id": values["id"],
+        "payload": payload,
+    }
+
+
+def enqueue_outbox(db: Session, rows: Iterable[Mapping[str, Any]]) -> None:
+    """Add an outbox event for each newly inserted transaction.
+
+    Runs in the caller's database transaction and does not commit, so the
+    events commit or roll back together with the inserts, like
+    apply_rollup. Nothing is written unless ``settings.outbox_url`` is set.
+
+    Args:
+        db: Database session.
+        rows: Column values of the inserted transactions, including ``id``.
+    """
+    if not settings.outbox_url:
+        return
+    events = [transaction_event(values) for values in rows]
+    if not events:
+        return
+
+    now = utcnow()
+    for event in events:
+        event["next_attempt_at"] = now
+    db.execute(insert(OutboxEvent), events)
+
+
+class OutboxRepository(BaseRepository[OutboxEvent]):
+    """Repository for outbox event delivery.
+
+    This class claims due events for a dispatcher and records the outcome
+    of their delivery.
+    """
+
+    def __init__(self, db: Session):
+        """Initialize the repository with a database session.
+
+        Args:
+            db: Database session.
+        """
+        super().__init__(db, OutboxEvent)
+
+    def claim(
+        self, limit: int, lease_seconds: float, now: Optional[datetime] = None
+    ) -> List[Row]:
+        """Claim due pending events for delivery.
+
+        Claimed events count one more attempt and are hidden from other
+        dispatchers for ``lease_seconds``. On PostgreSQL the events are
+        selected with ``FOR UPDATE SKIP LOCKED``, so concurrent dispatchers
+        claim different events instead of waiting for each other.
+
+        Args:
+            limit: Maximum number of events to claim.
+            lease_seconds: Number of seconds before an undelivered claimed
+                event can be claimed again.
+            now: Current UTC time. If None, the current time.
+
+        Returns:
+            Rows with ``id``, ``payload`` and ``attempts``, ordered by ID.
+
+        Raises:
+            SQLAlchemyError: If there's an error claiming the events.
+        """
+        now = now or utcnow()
+        due = (
+            select(OutboxEvent.id)
+            .where(
+                OutboxEvent.status == OutboxStatus.PENDING,
+                OutboxEvent.next_attempt_at <= now,
+            )
+            .order_by(OutboxEvent.next_attempt_at, OutboxEvent.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        lease = (
+            update(OutboxEvent)
+            .values(
+                attempts=OutboxEvent.attempts + 1,
+                next_attempt_at=now + timedelta(seconds=lease_seconds),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        columns = (OutboxEvent.id, OutboxEvent.payload, OutboxEvent.attempts)
+        try:
+            if self.db.get_bind().dialect.update_returning:
+                rows = self.db.execute(
+                    lease.where(OutboxEvent.id.in_(due)).returning(*columns)
+                ).all()
+            else:
+                ids = list(self.db.execute(due).scalars())
+                self.db.execute(lease.where(OutboxEvent.id.in_(ids)))
+                rows = self.db.execute(
+                    select(*columns).where(OutboxEvent.id.in_(ids))
+                ).all()
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            self.logger.error("Error claiming outbox events: %s", e)
+            raise
+        return sorted(rows, key=lambda row: row.id)
+
+    def record_attempts(
+        self,
+        delivered: Sequence[int],
+        failed: Sequence[Tuple[int, Optional[datetime], str]],
+        now: Optional[datetime] = None,
+    ) -> None:
+        """Record the outcome of delivery attempts.
+
+        Args:
+            delivered: IDs of the events delivered.
+            failed: ID, retry time and error of each failed event. Events
+                with no retry time are dead-lettered.
+            now: Current UTC time. If None, the current time.
+
+        Raises:
+            SQLAlchemyError: If there's an error updating the events.
+        """
+        now = now or utcnow()
+        try:
+            if delivered:
+                self.db.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.id.in_(delivered))
+                    .values(
+                        status=OutboxStatus.DELIVERED, delivered_at=now, last_error=None
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+            for event_id, retry_at, error in failed:
+                values: Dict[str, Any] = {"last_error": error}
+                if retry_at is None:
+                    values["status"] = OutboxStatus.DEAD
+                else:
+                    values["next_attempt_at"] = retry_at
+                self.db.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.id == event_id)
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            self.logger.error("Error recording outbox deliveries: %s", e)
+            raise
+
+    def count_by_status(self) -> Dict[str, int]:
+        """Count events per delivery state.
+
+        Returns:
+            Number of events for every state, including empty ones.
+
+        Raises:
+            SQLAlchemyError: If there's an error counting the events.
+        """
+        counts = {status.value: 0 for status in OutboxStatus}
+        try:
+            rows = self.db.execute(
+                select(OutboxEvent.status, func.count()).group_by(OutboxEvent.status)
+            )
+        except SQLAlchemyError as e:
+            self.logger.error("Error counting outbox events: %s", e)
+            raise
+        for status, count in rows:
+            counts[status.value] = count
+        return counts
+
+    def requeue_dead(self, now: Optional[datetime] = None) -> int:
+        """Send dead-lettered events back to the queue with fresh attempts.
+
+        Args:
+            now: Current UTC time. If None, the current time.
+
+        Returns:
+            Number of events requeued.
+
+        Raises:
+            SQLAlchemyError: If there's an error updating the events.
+        """
+        try:
+            result = self.db.execute(
+                update(OutboxEvent)
+                .where(OutboxEvent.status == OutboxStatus.DEAD)
+                .values(
+                    status=OutboxStatus.PENDING,
+                    attempts=0,
+                    next_attempt_at=now or utcnow(),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            self.logger.error("Error requeueing outbox events: %s", e)
+            raise
+        return result.rowcount
+
+    def delete_delivered(self, before: datetime) -> int:
+        """Delete events delivered before a time.
+
+        Args:
+            before: UTC time; events delivered earlier are deleted.
+
+        Returns:
+            Number of events deleted.
+
+        Raises:
+            SQLAlchemyError: If there's an error deleting the events.
+        """
+        try:
+            result = self.db.execute(
+                delete(OutboxEvent)
+                .where(
+                    OutboxEvent.status == OutboxStatus.DELIVERED,
+                    OutboxEvent.delivered_at < before,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            self.logger.error("Error deleting outbox events: %s", e)
+            raise
+        return result.rowcount
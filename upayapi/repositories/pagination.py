@@ -0,0 +1,214 @@
+"""Keyset (cursor) pagination helpers for the uPay API repositories.
+
+A cursor is an opaque, URL-safe token encoding the sort field and order it
+was issued for and the sort key and ``id`` of the last row on a page. The
+next page is selected with a range condition on ``(sort key, id)`` instead
+of ``OFFSET``, so every page costs the same index range scan no matter how
+deep it is. NULL sort keys of nullable columns sort before every other
+value.
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, and_, or_
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+def _encode_value(value: Any) -> Any:
+    """Convert a sort key value to a JSON-serializable value.
+
+    Args:
+        value: Sort key value.
+
+    Returns:
+        JSON-serializable value.
+    """
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if hasattr(value, "value"):
+        # Enum members
+        return value.value
+    return value
+
+
+def _decode_value(column: InstrumentedAttribute, value: Any) -> Any:
+    """Convert a JSON value back to the python type of a column.
+
+    Args:
+        column: Column the value belongs to.
+        value: JSON value from a cursor.
+
+    Returns:
+        Value of the column's python type.
+    """
+    if value is None:
+        return None
+
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is Decimal:
+        return Decimal(value)
+    return python_type(value)
+
+
+def encode_cursor(sort_field: str, sort_order: str, sort_value: Any, id: Any) -> str:
+    """Encode the sort key and ID of the last row on a page as a cursor.
+
+    Args:
+        sort_field: Name of the column the page is sorted by.
+        sort_order: Sort order ("asc" or "desc").
+        sort_value: Sort key value of the last row.
+        id: ID of the last row.
+
+    Returns:
+        Opaque URL-safe cursor.
+    """
+    payload = json.dumps(
+        [sort_field, sort_order.lower(), _encode_value(sort_value), id],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str,
+    sort_column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    sort_order: str,
+) -> Tuple[Any, Any]:
+    """Decode a cursor created by encode_cursor.
+
+    Args:
+        cursor: Opaque cursor.
+        sort_column: Column the page is sorted by.
+        id_column: ID column used as the tie-breaker.
+        sort_order: Sort order ("asc" or "desc") of the page.
+
+    Returns:
+        Sort key value and ID of the last row of the previous page.
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another
+            sort field or order.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_field, order, sort_value, id = json.loads(
+            base64.urlsafe_b64decode(padded.encode())
+        )
+        values = _decode_value(sort_column, sort_value), _decode_value(id_column, id)
+    except (binascii.Error, TypeError, ValueError, ArithmeticError):
+        raise ValueError("Invalid pagination cursor")
+
+    if sort_field != sort_column.key or order != sort_order.lower():
+        raise ValueError(
+            f"Pagination cursor was issued for sort_by={sort_field} and "
+            f"sort_order={order}"
+        )
+    return values
+
+
+def apply_keyset(
+    query: Select,
+    sort_column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    sort_order: str,
+    cursor: Optional[str],
+) -> Select:
+    """Order a query by ``(sort key, id)`` and start it after a cursor.
+
+    Args:
+        query: Query to paginate.
+        sort_column: Column to sort by.
+        id_column: ID column used as the tie-breaker.
+        sort_order: Sort order ("asc" or "desc").
+        cursor: Cursor of the previous page, or None for the first page.
+
+    Returns:
+        Ordered query restricted to rows after the cursor.
+
+    Raises:
+        ValueError: If sort_order or the cursor is invalid.
+    """
+    order = sort_order.lower()
+    if order not in ("asc", "desc"):
+        raise ValueError("sort_order must be 'asc' or 'desc'")
+    descending = order == "desc"
+    nullable = sort_column is not id_column and sort_column.nullable
+
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor, sort_column, id_column, order)
+        tie = id_column < last_id if descending else id_column > last_id
+        if sort_column is id_column:
+            query = query.where(tie)
+        elif sort_value is None:
+            # NULL sort keys come first in ascending order and last in
+            # descending order
+            if descending:
+                query = query.where(sort_column.is_(None), tie)
+            else:
+                query = query.where(or_(sort_column.is_not(None), tie))
+        else:
+            # The redundant bound on the sort column alone lets the database
+            # start an index range scan at the cursor instead of filtering
+            # every row before it
+            if descending:
+                bound = sort_column <= sort_value
+                after = or_(sort_column < sort_value, id_column < last_id)
+            else:
+                bound = sort_column >= sort_value
+                after = or_(sort_column > sort_value, id_column > last_id)
+            if nullable and descending:
+                query = query.where(or_(and_(bound, after), sort_column.is_(None)))
+            else:
+                query = query.where(and_(bound, after))
+
+    if sort_column is id_column:
+        return query.order_by(id_column.desc() if descending else id_column.asc())
+    if descending:
+        sort_key = sort_column.desc()
+        return query.order_by(
+            sort_key.nulls_last() if nullable else sort_key, id_column.desc()
+        )
+    sort_key = sort_column.asc()
+    return query.order_by(
+        sort_key.nulls_first() if nullable else sort_key, id_column.asc()
+    )
+
+
+def next_page(
+    rows: Sequence[Any],
+    limit: Optional[int],
+    sort_field: str,
+    sort_order: str,
+) -> Tuple[List[Any], Optional[str]]:
+    """Trim a page fetched with ``limit + 1`` rows and get its next cursor.
+
+    Args:
+        rows: Rows fetched with a limit of ``limit + 1``.
+        limit: Page size, or None for an unbounded page.
+        sort_field: Name of the attribute the page is sorted by.
+        sort_order: Sort order ("asc" or "desc") of the page.
+
+    Returns:
+        Rows of the page and the cursor of the next page, or None if this
+        is the last page.
+    """
+    if limit is None or len(rows) <= limit:
+        return list(rows), None
+
+    items = list(rows[:limit])
+    last = items[-1]
+    return items, encode_cursor(
+        sort_field, sort_order, getattr(last, sort_field), last.id
+    )
@@ -0,0 +1,341 @@
+"""Daily transaction rollup repository for the uPay API."""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from sqlalchemy import case, delete, func, insert, select, text, update
+from sqlalchemy.engine import Dialect
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import Insert
+
+from upayapi.archive import ArchiveReader
+from upayapi.models.rollup import TransactionDailyRollup
+from upayapi.models.schemas import PaymentStatus
+from upayapi.models.transaction import Transaction
+from upayapi.partitions import add_months
+from upayapi.repositories.base import BaseRepository
+
+
+def rollup_deltas(rows: Iterable[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    """Aggregate new transactions into rollup deltas.
+
+    Only running totals are kept per payment date and status, so the rows
+    can be streamed, for example from the archive, without holding them.
+
+    Args:
+        rows: Column values of the inserted transactions. Each needs
+            ``pmt_date``, ``pmt_status`` and ``pmt_amt``.
+
+    Returns:
+        One delta per payment date and status, sorted by that key so
+        concurrent writers lock rollup rows in the same order.
+    """
+    groups: Dict[Tuple[date, PaymentStatus], Dict[str, Any]] = {}
+    for values in rows:
+        key = (values["pmt_date"], PaymentStatus(values["pmt_status"]))
+        amount = Decimal(values["pmt_amt"])
+        group = groups.get(key)
+        if group is None:
+            groups[key] = {
+                "pmt_date": key[0],
+                "pmt_status": key[1],
+                "txn_count": 1,
+                "total_amt": amount,
+                "min_amt": amount,
+                "max_amt": amount,
+            }
+            continue
+        group["txn_count"] += 1
+        group["total_amt"] += amount
+        group["min_amt"] = min(group["min_amt"], amount)
+        group["max_amt"] = max(group["max_amt"], amount)
+
+    return [
+        groups[key] for key in sorted(groups, key=lambda key: (key[0], key[1].value))
+    ]
+
+
+def rollup_upsert_statement(dialect: Dialect) -> Optional[Insert]:
+    """Build an ``INSERT ... ON CONFLICT DO UPDATE`` statement for rollup deltas.
+
+    Like claim_keys_statement, the statement carries no values and is
+    executed with a list of deltas.
+
+    Args:
+        dialect: Dialect of the database the statement will run on.
+
+    Returns:
+        Upsert statement adding a delta to its rollup row, or None if the
+        dialect has no ``ON CONFLICT`` support.
+    """
+    if dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+
+        smallest, largest = func.least, func.greatest
+    elif dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+        # SQLite's multi-argument min() and max() are scalar functions
+        smallest, largest = func.min, func.max
+    else:
+        return None
+
+    table = TransactionDailyRollup.__table__
+    statement = dialect_insert(TransactionDailyRollup)
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.pmt_date, table.c.pmt_status],
+        set_={
+            "txn_count": table.c.txn_count + statement.excluded.txn_count,
+            "total_amt": table.c.total_amt + statement.excluded.total_amt,
+            "min_amt": smallest(table.c.min_amt, statement.excluded.min_amt),
+            "max_amt": largest(table.c.max_amt, statement.excluded.max_amt),
+            "updated_at": func.now(),
+        },
+    )
+
+
+def apply_rollup(db: Session, rows: Iterable[Mapping[str, Any]]) -> None:
+    """Add newly inserted transactions to the daily rollup.
+
+    Runs in the caller's database transaction and does not commit, so the
+    rollup changes commit or roll back together with the inserts. Async
+    repositories call this through ``AsyncSession.run_sync``.
+
+    Args:
+        db: Database session.
+        rows: Column values of the inserted transactions.
+    """
+    deltas = rollup_deltas(rows)
+    if not deltas:
+        return
+
+    statement = rollup_upsert_statement(db.get_bind().dialect)
+    if statement is not None:
+        db.execute(statement, deltas)
+        return
+
+    # Without ON CONFLICT, update the row and insert it if it did not exist
+    for delta in deltas:
+        result = db.execute(
+            update(TransactionDailyRollup)
+            .where(
+                TransactionDailyRollup.pmt_date == delta["pmt_date"],
+                TransactionDailyRollup.pmt_status == delta["pmt_status"],
+            )
+            .values(
+                txn_count=TransactionDailyRollup.txn_count + delta["txn_count"],
+                total_amt=TransactionDailyRollup.total_amt + delta["total_amt"],
+                min_amt=case(
+                    (
+                        TransactionDailyRollup.min_amt > delta["min_amt"],
+                        delta["min_amt"],
+                    ),
+                    else_=TransactionDailyRollup.min_amt,
+                ),
+                max_amt=case(
+                    (
+                        TransactionDailyRollup.max_amt < delta["max_amt"],
+                        delta["max_amt"],
+                    ),
+                    else_=TransactionDailyRollup.max_amt,
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            db.execute(insert(TransactionDailyRollup).values(**delta))
+
+
+class RollupRepository(BaseRepository[TransactionDailyRollup]):
+    """Repository for the daily transaction rollup.
+
+    This class provides methods for reading and rebuilding the rollup.
+    Rollup rows are written by the transaction repositories through
+    apply_rollup.
+
+    Attributes:
+        archive: Reader of archived months, aggregated by rebuilds.
+    """
+
+    def __init__(self, db: Session, archive: Optional[ArchiveReader] = None):
+        """Initialize the repository with a database session.
+
+        Args:
+            db: Database session.
+            archive: Reader of archived months. If None, rebuilds leave the
+                rollup rows of archived months as they are.
+        """
+        super().__init__(db, TransactionDailyRollup)
+        self.archive = archive
+
+    def get_daily(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        pmt_status: Optional[str] = None,
+    ) -> List[TransactionDailyRollup]:
+        """Get rollup rows for a range of payment dates.
+
+        Args:
+            start_date: First payment date to include.
+            end_date: Last payment date to include.
+            pmt_status: Filter by payment status.
+
+        Returns:
+            Rollup rows ordered by payment date and status.
+
+        Raises:
+            SQLAlchemyError: If there's an error retrieving the rollup.
+        """
+        try:
+            query = select(TransactionDailyRollup).where(
+                *self._date_filters(
+                    TransactionDailyRollup.pmt_date, start_date, end_date
+                )
+            )
+            if pmt_status:
+                query = query.where(TransactionDailyRollup.pmt_status == pmt_status)
+            query = query.order_by(
+                TransactionDailyRollup.pmt_date, TransactionDailyRollup.pmt_status
+            )
+            return list(self.db.execute(query).scalars().all())
+        except SQLAlchemyError as e:
+            self.logger.error("Error retrieving daily rollup: %s", e)
+            raise
+
+    def rebuild(
+        self, start_date: Optional[date] = None, end_date: Optional[date] = None
+    ) -> int:
+        """Recompute rollup rows from the transactions table and the archive.
+
+        Rows in the date range are deleted and re-aggregated in one database
+        transaction. On PostgreSQL the rollup table is locked first, so
+        postings that commit during the rebuild are counted exactly once.
+
+        Archived months are no longer in the transactions table, so they are
+        aggregated from the archive reader's Parquet files. Without a
+        reader, only the transactions table is read.
+
+        Args:
+            start_date: First payment date to rebuild. If None, from the start.
+            end_date: Last payment date to rebuild. If None, to the end.
+
+        Returns:
+            Number of rollup rows in the date range after the rebuild.
+
+        Raises:
+            ImportError: If archived months must be read and pyarrow is not
+                installed.
+            SQLAlchemyError: If there's an error rebuilding the rollup.
+        """
+        archived = self.archive.months(start_date, end_date) if self.archive else []
+        try:
+            if self.db.get_bind().dialect.name == "postgresql":
+                self.db.execute(
+                    text(
+                        f"LOCK TABLE {TransactionDailyRollup.__tablename__} "
+                        f"IN EXCLUSIVE MODE"
+                    )
+                )
+
+            self.db.execute(
+                delete(TransactionDailyRollup).where(
+                    *self._date_filters(
+                        TransactionDailyRollup.pmt_date, start_date, end_date
+                    )
+                )
+            )
+            aggregate = (
+                select(
+                    Transaction.pmt_date,
+                    Transaction.pmt_status,
+                    func.count(Transaction.id),
+                    func.sum(Transaction.pmt_amt),
+                    func.min(Transaction.pmt_amt),
+                    func.max(Transaction.pmt_amt),
+                )
+                .where(*self._date_filters(Transaction.pmt_date, start_date, end_date))
+                .group_by(Transaction.pmt_date, Transaction.pmt_status)
+            )
+            self.db.execute(
+                insert(TransactionDailyRollup).from_select(
+                    [
+                        "pmt_date",
+                        "pmt_status",
+                        "txn_count",
+                        "total_amt",
+                        "min_amt",
+                        "max_amt",
+                    ],
+                    aggregate,
+                )
+            )
+            # Postings dated in a month after it was archived are already in
+            # the rollup, so archived totals are added to theirs
+            for month in archived:
+                apply_rollup(self.db, self._read_archive(month, start_date, end_date))
+            rows = self.db.execute(
+                select(func.count())
+                .select_from(TransactionDailyRollup)
+                .where(
+                    *self._date_filters(
+                        TransactionDailyRollup.pmt_date, start_date, end_date
+                    )
+                )
+            ).scalar()
+            self.db.commit()
+            return rows
+        except (ImportError, SQLAlchemyError) as e:
+            self.db.rollback()
+            self.logger.error("Error rebuilding daily rollup: %s", e)
+            raise
+
+    def _read_archive(
+        self, month: date, start_date: Optional[date], end_date: Optional[date]
+    ) -> Iterator[Dict[str, Any]]:
+        """Read the rollup columns of an archived month.
+
+        Args:
+            month: First day of the archived month.
+            start_date: First payment date to include.
+            end_date: Last payment date to include.
+
+        Yields:
+            Payment date, status and amount of each archived transaction.
+        """
+        last_day = add_months(month, 1) - timedelta(days=1)
+        batches = self.archive.read(
+            ["pmt_date", "pmt_status", "pmt_amt"],
+            start_date=max(month, start_date or month),
+            end_date=min(last_day, end_date or last_day),
+        )
+        for batch in batches:
+            for pmt_date, pmt_status, pmt_amt in batch:
+                yield {
+                    "pmt_date": pmt_date,
+                    "pmt_status": pmt_status,
+                    "pmt_amt": pmt_amt,
+                }
+
+    @staticmethod
+    def _date_filters(
+        column: Any, start_date: Optional[date], end_date: Optional[date]
+    ) -> List[Any]:
+        """Build payment date range conditions.
+
+        Args:
+            column: Payment date column.
+            start_date: First payment date to include.
+            end_date: Last payment date to include.
+
+        Returns:
+            List of filter conditions.
+        """
+        conditions = []
+        if start_date:
+            conditions.append(column >= start_date)
+        if end_date:
+            conditions.append(column <= end_date)
+        return conditions
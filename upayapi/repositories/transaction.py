@@ -1,14 +1,278 @@
 """Transaction repository for the uPay API."""
 
-from typing import Any, Dict, Optional
-from datetime import date
+import csv
+import heapq
+import io
+from itertools import chain, islice
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Set
+from datetime import date, datetime
 from decimal import Decimal
 
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import ColumnElement, Select, func, insert, select, text
+from sqlalchemy.engine import Dialect, Row
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import Insert
 
-from upayapi.models.transaction import Transaction
+from upayapi.archive import ArchiveReader
+from upayapi.models.schemas import PaymentStatus
+from upayapi.models.transaction import Transaction, TransactionKey
 from upayapi.repositories.base import BaseRepository
+from upayapi.repositories.outbox import enqueue_outbox
+from upayapi.repositories.pagination import apply_keyset, next_page
+from upayapi.repositories.rollup import apply_rollup
+
+# PostgreSQL drivers whose raw connections support COPY FROM STDIN
+COPY_DRIVERS = ("psycopg", "psycopg2")
+
+# Columns supplied when importing transactions
+IMPORT_COLUMNS = (
+    "tpg_trans_id",
+    "session_identifier",
+    "pmt_status",
+    "pmt_amt",
+    "pmt_date",
+    "name_on_acct",
+    "site_id",
+)
+
+
+class TransactionInsertResult(NamedTuple):
+    """Result of an idempotent transaction insert.
+
+    Attributes:
+        id: ID of the new or existing transaction.
+        created_at: Timestamp when the transaction was first stored.
+        created: True if this call stored the transaction, False if it
+            already existed.
+    """
+
+    id: int
+    created_at: Optional[datetime]
+    created: bool
+
+
+# Columns included in transaction exports, in output order
+EXPORT_COLUMNS = (
+    Transaction.id,
+    Transaction.tpg_trans_id,
+    Transaction.session_identifier,
+    Transaction.pmt_status,
+    Transaction.pmt_amt,
+    Transaction.pmt_date,
+    Transaction.name_on_acct,
+    Transaction.site_id,
+    Transaction.created_at,
+)
+
+# Sort key of exported rows: payment date, then ID
+EXPORT_SORT_KEY = itemgetter(
+    *(
+        [column.key for column in EXPORT_COLUMNS].index(name)
+        for name in ("pmt_date", "id")
+    )
+)
+
+
+def claim_keys_statement(dialect: Dialect) -> Optional[Insert]:
+    """Build an ``INSERT ... ON CONFLICT DO NOTHING`` of transaction keys.
+
+    The statement carries no values: it is executed with a list of
+    ``tpg_trans_id`` rows, so SQLAlchemy compiles it once and batches the
+    rows with "insertmanyvalues". Its conflict target is the unique
+    ``tpg_trans_id`` of the unpartitioned ``transaction_keys`` table, so a
+    retry is recognized whatever its ``pmt_date``.
+
+    Args:
+        dialect: Dialect of the database the statement will run on.
+
+    Returns:
+        Insert statement returning ``id``, ``created_at`` and
+        ``tpg_trans_id`` of the keys actually claimed, or None if the
+        dialect has no ``ON CONFLICT ... RETURNING`` support.
+    """
+    if dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+
+    # SQLite only supports RETURNING from version 3.35
+    if not dialect.insert_returning:
+        return None
+
+    return (
+        insert(TransactionKey)
+        .on_conflict_do_nothing(index_elements=[TransactionKey.tpg_trans_id])
+        .returning(
+            TransactionKey.id, TransactionKey.created_at, TransactionKey.tpg_trans_id
+        )
+    )
+
+
+def claim_transaction_keys(db: Session, tpg_trans_ids: Sequence[str]) -> Dict[str, Row]:
+    """Claim the keys of new transactions.
+
+    Runs in the caller's database transaction and does not commit. A key
+    claimed by a concurrent transaction that has not committed yet makes
+    the claim wait for it. Other dialects than PostgreSQL and SQLite claim
+    each key inside a savepoint. Async repositories call this through
+    ``AsyncSession.run_sync``.
+
+    Args:
+        db: Database session.
+        tpg_trans_ids: Distinct transaction reference numbers.
+
+    Returns:
+        Claimed keys with their ``id`` and ``created_at``, keyed by
+        tpg_trans_id. Keys that were already stored are left out.
+    """
+    statement = claim_keys_statement(db.get_bind().dialect)
+    if statement is not None:
+        result = db.connection().execute(
+            statement, [{"tpg_trans_id": key} for key in tpg_trans_ids]
+        )
+        return {row.tpg_trans_id: row for row in result}
+
+    claimed: List[str] = []
+    for key in tpg_trans_ids:
+        try:
+            with db.begin_nested():
+                db.execute(insert(TransactionKey).values(tpg_trans_id=key))
+            claimed.append(key)
+        except IntegrityError:
+            pass
+    if not claimed:
+        return {}
+    return {
+        row.tpg_trans_id: row
+        for row in db.execute(existing_transactions_statement(claimed))
+    }
+
+
+def store_claimed_transactions(
+    db: Session, unique: Dict[str, Dict[str, Any]], claimed: Dict[str, Row]
+) -> List[Dict[str, Any]]:
+    """Insert the transactions whose keys were claimed.
+
+    Each transaction takes the ID and creation time of its key. The daily
+    rollup and the outbox are updated in the same database transaction.
+    Runs in the caller's database transaction and does not commit.
+
+    Args:
+        db: Database session.
+        unique: Column values of the requested transactions, keyed by
+            tpg_trans_id.
+        claimed: Keys claimed by claim_transaction_keys.
+
+    Returns:
+        Column values of the inserted transactions, including ``id``.
+    """
+    new_rows = [
+        {**unique[key], "id": claimed[key].id, "created_at": claimed[key].created_at}
+        for key in unique
+        if key in claimed
+    ]
+    if new_rows:
+        db.connection().execute(insert(Transaction), new_rows)
+    apply_rollup(db, new_rows)
+    enqueue_outbox(db, new_rows)
+    return new_rows
+
+
+def unique_transaction_rows(
+    rows: Sequence[Dict[str, Any]],
+) -> Dict[str, Dict[str, Any]]:
+    """Get the first row for each tpg_trans_id, in order.
+
+    Args:
+        rows: Column values for each new transaction.
+
+    Returns:
+        Dictionary mapping tpg_trans_id to its first row.
+    """
+    unique: Dict[str, Dict[str, Any]] = {}
+    for values in rows:
+        unique.setdefault(values["tpg_trans_id"], values)
+    return unique
+
+
+def existing_transactions_statement(tpg_trans_ids: Sequence[str]) -> Select:
+    """Build a lookup of stored transactions by tpg_trans_id.
+
+    Keys are looked up rather than transactions, so transactions of
+    archived months are found too.
+
+    Args:
+        tpg_trans_ids: Transaction reference numbers to look up.
+
+    Returns:
+        Select statement returning ``id``, ``created_at`` and ``tpg_trans_id``.
+    """
+    return select(
+        TransactionKey.id, TransactionKey.created_at, TransactionKey.tpg_trans_id
+    ).where(TransactionKey.tpg_trans_id.in_(tpg_trans_ids))
+
+
+def transaction_filters(
+    pmt_status: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> List[ColumnElement[bool]]:
+    """Build the filter conditions shared by the transaction queries.
+
+    Args:
+        pmt_status: Filter by payment status.
+        start_date: Filter by payment date (start).
+        end_date: Filter by payment date (end).
+
+    Returns:
+        List of filter conditions.
+    """
+    conditions: List[ColumnElement[bool]] = []
+    if pmt_status:
+        conditions.append(Transaction.pmt_status == pmt_status)
+    if start_date:
+        conditions.append(Transaction.pmt_date >= start_date)
+    if end_date:
+        conditions.append(Transaction.pmt_date <= end_date)
+    return conditions
+
+
+def build_insert_results(
+    rows: Sequence[Dict[str, Any]],
+    stored: Dict[str, Any],
+    created: Set[str],
+) -> List[TransactionInsertResult]:
+    """Build an insert result for each requested row.
+
+    Only the first row for a tpg_trans_id that was inserted is reported as
+    created; repeats within the same batch are reported as duplicates.
+
+    Args:
+        rows: Column values for each requested transaction.
+        stored: Stored ``(id, created_at)`` rows keyed by tpg_trans_id.
+        created: tpg_trans_ids inserted by this batch.
+
+    Returns:
+        Insert results in the same order as ``rows``.
+    """
+    results: List[TransactionInsertResult] = []
+    reported: Set[str] = set()
+    for values in rows:
+        tpg_trans_id = values["tpg_trans_id"]
+        row = stored[tpg_trans_id]
+        results.append(
+            TransactionInsertResult(
+                row.id,
+                row.created_at,
+                tpg_trans_id in created and tpg_trans_id not in reported,
+            )
+        )
+        reported.add(tpg_trans_id)
+    return results
 
 
 class TransactionRepository(BaseRepository[Transaction]):
@@ -16,15 +280,21 @@ class TransactionRepository(BaseRepository[Transaction]):
 
     This class provides methods for creating, retrieving, and querying
     transaction data in the database.
+
+    Attributes:
+        archive: Reader of archived months, merged into exports.
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, archive: Optional[ArchiveReader] = None):
         """Initialize the repository with a database session.
 
         Args:
             db: Database session.
+            archive: Reader of archived months. If None, exports only read
+                the database.
         """
         super().__init__(db, Transaction)
+        self.archive = archive
 
     def create_transaction(
         self,
@@ -34,9 +304,13 @@ class TransactionRepository(BaseRepository[Transaction]):
         pmt_amt: Decimal,
         pmt_date: date,
         name_on_acct: str,
+        site_id: Optional[str] = None,
     ) -> Transaction:
         """Create a new transaction record.
 
+        The transaction's key, the daily rollup and the outbox are updated
+        in the same database transaction.
+
         Args:
             tpg_trans_id: Transaction reference number assigned by Payment Gateway.
             session_identifier: Unique session identifier code.
@@ -44,6 +318,7 @@ class TransactionRepository(BaseRepository[Transaction]):
             pmt_amt: Transaction amount.
             pmt_date: Transaction processing date.
             name_on_acct: Name on payment account.
+            site_id: uPay site of the transaction.
 
         Returns:
             The created transaction.
@@ -51,14 +326,230 @@ class TransactionRepository(BaseRepository[Transaction]):
         Raises:
             SQLAlchemyError: If there's an error creating the transaction.
         """
-        return self.create(
-            tpg_trans_id=tpg_trans_id,
-            session_identifier=session_identifier,
-            pmt_status=pmt_status,
-            pmt_amt=pmt_amt,
-            pmt_date=pmt_date,
-            name_on_acct=name_on_acct,
+        values = {
+            "tpg_trans_id": tpg_trans_id,
+            "session_identifier": session_identifier,
+            "pmt_status": pmt_status,
+            "pmt_amt": pmt_amt,
+            "pmt_date": pmt_date,
+            "name_on_acct": name_on_acct,
+            "site_id": site_id,
+        }
+        try:
+            key = TransactionKey(tpg_trans_id=tpg_trans_id)
+            self.db.add(key)
+            self.db.flush()
+            transaction = Transaction(id=key.id, created_at=key.created_at, **values)
+            self.db.add(transaction)
+            self.db.flush()
+            apply_rollup(self.db, [values])
+            enqueue_outbox(self.db, [{**values, "id": transaction.id}])
+            self.db.commit()
+            self.db.refresh(transaction)
+            return transaction
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            self.logger.error("Error creating Transaction: %s", e)
+            raise
+
+    def create_transaction_if_absent(
+        self,
+        tpg_trans_id: str,
+        session_identifier: str,
+        pmt_status: str,
+        pmt_amt: Decimal,
+        pmt_date: date,
+        name_on_acct: str,
+        site_id: Optional[str] = None,
+    ) -> TransactionInsertResult:
+        """Create a transaction record unless its tpg_trans_id already exists.
+
+        The posting first claims its tpg_trans_id in ``transaction_keys``
+        with ``INSERT ... ON CONFLICT DO NOTHING RETURNING`` on PostgreSQL
+        and SQLite, so concurrent retries of the same posting cannot race
+        into an IntegrityError, and a retry with another pmt_date is not
+        stored in another monthly partition. Other dialects claim the key
+        inside a savepoint and fall back to a lookup on conflict.
+
+        Args:
+            tpg_trans_id: Transaction reference number assigned by Payment Gateway.
+            session_identifier: Unique session identifier code.
+            pmt_status: Transaction status ('success' or 'cancelled').
+            pmt_amt: Transaction amount.
+            pmt_date: Transaction processing date.
+            name_on_acct: Name on payment account.
+            site_id: uPay site of the transaction.
+
+        Returns:
+            Insert result with the transaction ID and whether it was created.
+
+        Raises:
+            SQLAlchemyError: If there's an error creating the transaction.
+        """
+        return self.create_transactions_if_absent(
+            [
+                {
+                    "tpg_trans_id": tpg_trans_id,
+                    "session_identifier": session_identifier,
+                    "pmt_status": pmt_status,
+                    "pmt_amt": pmt_amt,
+                    "pmt_date": pmt_date,
+                    "name_on_acct": name_on_acct,
+                    "site_id": site_id,
+                }
+            ]
+        )[0]
+
+    def create_transactions_if_absent(
+        self, rows: Sequence[Dict[str, Any]]
+    ) -> List[TransactionInsertResult]:
+        """Create transaction records whose tpg_trans_ids don't exist yet.
+
+        The keys of all rows are claimed with one statement, the claimed
+        rows are inserted with another and committed in one transaction
+        together with their daily rollup update and outbox events;
+        duplicates are then resolved with one lookup.
+
+        Args:
+            rows: Column values for each transaction, as accepted by
+                create_transaction.
+
+        Returns:
+            Insert results in the same order as ``rows``.
+
+        Raises:
+            SQLAlchemyError: If there's an error creating the transactions.
+        """
+        unique = unique_transaction_rows(rows)
+        try:
+            stored = claim_transaction_keys(self.db, list(unique))
+            created = set(stored)
+            store_claimed_transactions(self.db, unique, stored)
+
+            missing = [key for key in unique if key not in stored]
+            if missing:
+                for row in self.db.execute(existing_transactions_statement(missing)):
+                    stored[row.tpg_trans_id] = row
+            self.db.commit()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            self.logger.error("Error creating transactions: %s", e)
+            raise
+
+        return build_insert_results(rows, stored, created)
+
+    def import_transactions(self, rows: Sequence[Dict[str, Any]]) -> int:
+        """Bulk insert transaction records, skipping existing tpg_trans_ids.
+
+        Unlike create_transactions_if_absent, this does not look up the IDs
+        of existing transactions. On PostgreSQL with psycopg or psycopg2 the
+        rows are streamed with ``COPY`` into a temporary table and moved with
+        one statement that claims their keys and inserts the rows claimed.
+        The daily rollup and the outbox are updated in the same database
+        transaction.
+
+        Args:
+            rows: Column values for each transaction, as accepted by
+                create_transaction.
+
+        Returns:
+            Number of transactions inserted.
+
+        Raises:
+            SQLAlchemyError: If there's an error inserting the transactions.
+        """
+        if not rows:
+            return 0
+
+        dialect = self.db.get_bind().dialect
+        try:
+            if dialect.name == "postgresql" and dialect.driver in COPY_DRIVERS:
+                inserted = self._copy_transactions(rows)
+            else:
+                unique = unique_transaction_rows(rows)
+                claimed = claim_transaction_keys(self.db, list(unique))
+                inserted = len(store_claimed_transactions(self.db, unique, claimed))
+            self.db.commit()
+            return inserted
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            self.logger.error("Error importing transactions: %s", e)
+            raise
+
+    def _copy_transactions(self, rows: Sequence[Dict[str, Any]]) -> int:
+        """Insert transaction records through ``COPY`` on PostgreSQL.
+
+        Args:
+            rows: Column values for each transaction.
+
+        Returns:
+            Number of transactions inserted.
+        """
+        columns = ", ".join(IMPORT_COLUMNS)
+        enum_type = Transaction.__table__.c.pmt_status.type.name
+        self.db.execute(
+            text(
+                "CREATE TEMPORARY TABLE IF NOT EXISTS upay_import ("
+                "tpg_trans_id text, session_identifier text, pmt_status text, "
+                "pmt_amt numeric(10, 2), pmt_date date, name_on_acct text, site_id text"
+                ") ON COMMIT DELETE ROWS"
+            )
+        )
+
+        records = (
+            (
+                values["tpg_trans_id"],
+                values["session_identifier"],
+                PaymentStatus(values["pmt_status"]).name,
+                values["pmt_amt"],
+                values["pmt_date"],
+                values["name_on_acct"],
+                values.get("site_id"),
+            )
+            for values in rows
+        )
+        copy_sql = f"COPY upay_import ({columns}) FROM STDIN"
+        cursor = self.db.connection().connection.driver_connection.cursor()
+        try:
+            if hasattr(cursor, "copy"):
+                # psycopg 3
+                with cursor.copy(copy_sql) as copy:
+                    for record in records:
+                        copy.write_row(record)
+            else:
+                # psycopg2
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(records)
+                buffer.seek(0)
+                cursor.copy_expert(f"{copy_sql} WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+
+        # The first row of each tpg_trans_id in the file, if its key is new
+        result = self.db.execute(
+            text(
+                f"WITH claimed AS ("
+                f"INSERT INTO transaction_keys (tpg_trans_id) "
+                f"SELECT DISTINCT tpg_trans_id FROM upay_import "
+                f"ON CONFLICT (tpg_trans_id) DO NOTHING "
+                f"RETURNING id, created_at, tpg_trans_id"
+                f") "
+                f"INSERT INTO transactions (id, created_at, {columns}) "
+                f"SELECT DISTINCT ON (tpg_trans_id) claimed.id, claimed.created_at, "
+                f"tpg_trans_id, session_identifier, pmt_status::{enum_type}, "
+                f"pmt_amt, pmt_date, name_on_acct, site_id "
+                f"FROM upay_import JOIN claimed USING (tpg_trans_id) "
+                f"ORDER BY tpg_trans_id, upay_import.ctid "
+                f"RETURNING id, {columns}"
+            ).columns(
+                Transaction.id,
+                *(Transaction.__table__.c[name] for name in IMPORT_COLUMNS),
+            )
         )
+        new_rows = result.mappings().all()
+        apply_rollup(self.db, new_rows)
+        enqueue_outbox(self.db, new_rows)
+        return len(new_rows)
 
     def get_by_tpg_trans_id(self, tpg_trans_id: str) -> Optional[Transaction]:
         """Get a transaction by its tpg_trans_id.
@@ -79,7 +570,7 @@ class TransactionRepository(BaseRepository[Transaction]):
                 .first()
             )
         except SQLAlchemyError as e:
-            self.logger.error(f"Error retrieving transaction by tpg_trans_id: {str(e)}")
+            self.logger.error("Error retrieving transaction by tpg_trans_id: %s", e)
             raise
 
     def get_transactions(
@@ -91,9 +582,15 @@ class TransactionRepository(BaseRepository[Transaction]):
         pmt_status: Optional[str] = None,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
     ) -> Dict[str, Any]:
         """Get transactions with pagination, sorting, and filtering.
 
+        Results are ordered by ``(sort_by, id)``. Pass the ``next_cursor`` of
+        a page as ``cursor`` to get the following page with a keyset range
+        condition instead of ``OFFSET``; ``skip`` is ignored in that case.
+
         Args:
             skip: Number of records to skip.
             limit: Maximum number of records to return.
@@ -102,52 +599,137 @@ class TransactionRepository(BaseRepository[Transaction]):
             pmt_status: Filter by payment status.
             start_date: Filter by payment date (start).
             end_date: Filter by payment date (end).
+            cursor: Cursor of the previous page.
+            include_total: Whether to count all matching transactions.
 
         Returns:
-            Dictionary with transactions, total count, and pagination metadata.
+            Dictionary with transactions, total count (None unless
+            include_total), next page cursor, and pagination metadata.
 
         Raises:
             SQLAlchemyError: If there's an error retrieving the transactions.
+            ValueError: If sort_order or the cursor is invalid.
         """
         try:
-            query = self.db.query(Transaction)
-
-            # Apply filters
-            if pmt_status:
-                query = query.filter(Transaction.pmt_status == pmt_status)
+            conditions = transaction_filters(pmt_status, start_date, end_date)
 
-            if start_date:
-                query = query.filter(Transaction.pmt_date >= start_date)
+            # Get total count
+            total = None
+            if include_total:
+                total = self.db.execute(
+                    select(func.count(Transaction.id)).where(*conditions)
+                ).scalar_one()
 
-            if end_date:
-                query = query.filter(Transaction.pmt_date <= end_date)
+            # Apply sorting and the cursor
+            sort_column = self._sort_column(sort_by)
+            query = apply_keyset(
+                select(Transaction).where(*conditions),
+                sort_column,
+                Transaction.id,
+                sort_order or "asc",
+                cursor,
+            )
 
-            # Get total count
-            total = query.count()
-
-            # Apply sorting
-            if sort_by and hasattr(Transaction, sort_by):
-                if sort_order.lower() == "asc":
-                    query = query.order_by(getattr(Transaction, sort_by).asc())
-                elif sort_order.lower() == "desc":
-                    query = query.order_by(getattr(Transaction, sort_by).desc())
-                else:
-                    raise ValueError("sort_order must be 'asc' or 'desc'")
-
-            # Apply pagination
-            query = query.offset(skip)
+            # Apply pagination, fetching one extra row to detect a next page
+            if not cursor:
+                query = query.offset(skip)
             if limit is not None:
-                query = query.limit(limit)
+                query = query.limit(limit + 1)
 
-            items = query.all()
+            rows = self.db.execute(query).scalars().all()
+            items, next_cursor = next_page(
+                rows, limit, sort_column.key, sort_order or "asc"
+            )
 
             return {
                 "items": items,
                 "total": total,
-                "skip": skip,
+                "skip": 0 if cursor else skip,
                 "limit": limit,
-                "has_more": total > skip + len(items) if limit is not None else False,
+                "has_more": next_cursor is not None,
+                "next_cursor": next_cursor,
             }
         except SQLAlchemyError as e:
-            self.logger.error(f"Error retrieving transactions: {str(e)}")
+            self.logger.error("Error retrieving transactions: %s", e)
+            raise
+
+    def stream_transactions(
+        self,
+        pmt_status: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        batch_size: int = 1000,
+    ) -> Iterator[List[Row]]:
+        """Stream transactions in batches with a server-side cursor.
+
+        Rows are plain column tuples rather than ORM objects, and only one
+        batch is held in memory at a time regardless of the date range. If
+        archived months overlap the date range, their rows are merged in
+        order with the rows still in the database.
+
+        Args:
+            pmt_status: Filter by payment status.
+            start_date: Filter by payment date (start).
+            end_date: Filter by payment date (end).
+            batch_size: Number of rows fetched per batch.
+
+        Yields:
+            Lists of at most batch_size rows, ordered by payment date and ID.
+
+        Raises:
+            SQLAlchemyError: If there's an error retrieving the transactions.
+        """
+        batches = self._stream_stored(pmt_status, start_date, end_date, batch_size)
+        if self.archive is None or not self.archive.months(start_date, end_date):
+            yield from batches
+            return
+
+        archived = self.archive.read(
+            [column.key for column in EXPORT_COLUMNS],
+            pmt_status=pmt_status,
+            start_date=start_date,
+            end_date=end_date,
+            batch_size=batch_size,
+        )
+        rows = heapq.merge(
+            chain.from_iterable(archived),
+            chain.from_iterable(batches),
+            key=EXPORT_SORT_KEY,
+        )
+        while batch := list(islice(rows, batch_size)):
+            yield batch
+
+    def _stream_stored(
+        self,
+        pmt_status: Optional[str],
+        start_date: Optional[date],
+        end_date: Optional[date],
+        batch_size: int,
+    ) -> Iterator[List[Row]]:
+        """Stream the transactions stored in the database in batches.
+
+        Args:
+            pmt_status: Filter by payment status.
+            start_date: Filter by payment date (start).
+            end_date: Filter by payment date (end).
+            batch_size: Number of rows fetched per batch.
+
+        Yields:
+            Lists of at most batch_size rows, ordered by payment date and ID.
+
+        Raises:
+            SQLAlchemyError: If there's an error retrieving the transactions.
+        """
+        query = (
+            select(*EXPORT_COLUMNS)
+            .where(*transaction_filters(pmt_status, start_date, end_date))
+            .order_by(Transaction.pmt_date.asc(), Transaction.id.asc())
+            .execution_options(stream_results=True, yield_per=batch_size)
+        )
+        try:
+            result = self.db.execute(query)
+            for partition in result.partitions():
+                yield partition
+        except SQLAlchemyError as e:
+            self.logger.error("Error streaming transactions: %s", e)
             raise
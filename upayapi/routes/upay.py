@@ -1,67 +1,231 @@
 """uPay posting endpoint routes."""
 
-from typing import Annotated
+import hmac
+from datetime import date
+from typing import Annotated, List, Literal, Optional, Union
 
-from fastapi import APIRouter, Depends, Form
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
-from upayapi.exceptions import ValidationError
+from upayapi.admission import admit_posting, admit_reporting
+from upayapi.config import settings
+from upayapi.exceptions import AuthenticationError, ValidationError
+from upayapi.forms import POSTING_OPENAPI, get_transaction_request, verify_posting_key
+from upayapi.metrics import record_posting
 from upayapi.models.schemas import (
+    DailyRollupModel,
+    PaymentStatus,
+    TransactionPage,
     TransactionRequest,
     TransactionResponse,
 )
+from upayapi.services.async_transaction import AsyncTransactionService
+from upayapi.services.dependencies import get_reporting_service, get_transaction_service
 from upayapi.services.transaction import TransactionService
 
 router = APIRouter(prefix="/upay", tags=["upay"])
 
 
-@router.post("/posting")
+# Media types of transaction exports
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def verify_reporting_key(
+    x_reporting_key: Annotated[Optional[str], Header()] = None,
+) -> None:
+    """Verify the API key sent to a reporting endpoint.
+
+    Args:
+        x_reporting_key: Value of the X-Reporting-Key header.
+
+    Raises:
+        AuthenticationError: If reporting is disabled or the key is invalid.
+    """
+    if not settings.reporting_key or not hmac.compare_digest(
+        (x_reporting_key or "").encode(), settings.reporting_key.encode()
+    ):
+        raise AuthenticationError(detail="Invalid reporting key")
+
+
+@router.post(
+    "/posting",
+    dependencies=[Depends(verify_posting_key), Depends(admit_posting)],
+    openapi_extra=POSTING_OPENAPI,
+)
 async def upay_posting(
-    posting_key: Annotated[str, Form()],
-    tpg_trans_id: Annotated[str, Form()],
-    session_identifier: Annotated[str, Form()],
-    pmt_status: Annotated[str, Form()],
-    pmt_amt: Annotated[str, Form()],
-    pmt_date: Annotated[str, Form()],
-    name_on_acct: Annotated[str, Form()],
-    transaction_service: Annotated[TransactionService, Depends()],
+    site_id: Annotated[str, Depends(verify_posting_key)],
+    transaction_request: Annotated[
+        TransactionRequest, Depends(get_transaction_request)
+    ],
+    transaction_service: Annotated[
+        Union[TransactionService, AsyncTransactionService],
+        Depends(get_transaction_service),
+    ],
 ) -> TransactionResponse:
     """Process a uPay posting request.
 
     This endpoint receives transaction data from the TouchNet Marketplace uPay
-    payment gateway and processes it.
+    payment gateway and processes it. verify_posting_key rejects missing
+    fields and invalid posting keys first and finds the posting's site, then
+    the request is admitted by admission control and its fields are
+    validated by get_transaction_request before the handler runs.
 
     Args:
-        posting_key: Authentication key for validating requests.
-        tpg_trans_id: Transaction reference number assigned by Payment Gateway.
-        session_identifier: Unique session identifier code.
-        pmt_status: Transaction status ('success' or 'cancelled').
-        pmt_amt: Transaction amount (max: $99,999.99).
-        pmt_date: Transaction processing date (format: mm/dd/yyyy).
-        name_on_acct: Name on payment account.
+        site_id: Site whose posting key was sent.
+        transaction_request: Validated posting fields (posting_key,
+            tpg_trans_id, session_identifier, pmt_status, pmt_amt, pmt_date
+            and name_on_acct).
         transaction_service: Service for processing transactions.
 
     Returns:
         JSON response with processing result.
     """
     try:
-        # Create and validate the transaction request
-        transaction_request = TransactionRequest(
-            posting_key=posting_key,
-            tpg_trans_id=tpg_trans_id,
-            session_identifier=session_identifier,
-            pmt_status=pmt_status,
-            pmt_amt=pmt_amt,
-            pmt_date=pmt_date,
-            name_on_acct=name_on_acct,
-        )
-        result = transaction_service.process_transaction(transaction_request)
-        return result
+        if isinstance(transaction_service, AsyncTransactionService):
+            response = await transaction_service.process_transaction(
+                transaction_request, site_id
+            )
+        else:
+            # Keep the blocking database round-trips off the event loop
+            response = await run_in_threadpool(
+                transaction_service.process_transaction, transaction_request, site_id
+            )
+    except AuthenticationError:
+        record_posting("auth_fail")
+        raise
     except ValidationError:
-        # Re-raise validation errors
+        record_posting("validation_fail")
+        raise
+    except Exception:
+        # Database and unexpected errors are handled by the global handlers
+        record_posting("error")
         raise
-    except Exception as e:
-        # Log the error and convert to ValidationError
-        # Our global exception handlers will take care of other specific exceptions
-        raise ValidationError(
-            detail=f"Error validating transaction data: {str(e)}"
-        )
+
+    record_posting("new" if response.created else "duplicate")
+    return response
+
+
+@router.get(
+    "/transactions",
+    dependencies=[Depends(verify_reporting_key), Depends(admit_reporting)],
+)
+def list_transactions(
+    transaction_service: Annotated[TransactionService, Depends(get_reporting_service)],
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100,
+    cursor: Optional[str] = None,
+    sort_by: Literal["pmt_date", "created_at", "pmt_amt", "id"] = "pmt_date",
+    sort_order: Literal["asc", "desc"] = "desc",
+    pmt_status: Optional[PaymentStatus] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    include_total: bool = False,
+) -> TransactionPage:
+    """List stored transactions, one page at a time.
+
+    Pages are selected with a keyset cursor, so deep pages are as fast as the
+    first one. Pass the ``next_cursor`` of a response as ``cursor`` to get
+    the following page.
+
+    Args:
+        transaction_service: Service for processing transactions.
+        limit: Maximum number of transactions to return.
+        cursor: Cursor from the previous page.
+        sort_by: Field to sort by.
+        sort_order: Sort order ("asc" or "desc").
+        pmt_status: Filter by payment status.
+        start_date: Filter by payment date (start).
+        end_date: Filter by payment date (end).
+        include_total: Whether to count all matching transactions.
+
+    Returns:
+        Page of transactions.
+    """
+    return transaction_service.list_transactions(
+        limit=limit,
+        cursor=cursor,
+        sort_by=sort_by,
+        sort_order=sort_order,
+        pmt_status=pmt_status,
+        start_date=start_date,
+        end_date=end_date,
+        include_total=include_total,
+    )
+
+
+@router.get(
+    "/transactions/export",
+    dependencies=[Depends(verify_reporting_key), Depends(admit_reporting)],
+)
+def export_transactions(
+    transaction_service: Annotated[TransactionService, Depends(get_reporting_service)],
+    export_format: Annotated[
+        Literal["ndjson", "csv"], Query(alias="format")
+    ] = "ndjson",
+    pmt_status: Optional[PaymentStatus] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    gzip: bool = False,
+) -> StreamingResponse:
+    """Stream stored transactions as NDJSON or CSV.
+
+    Rows are read with a server-side cursor and written as they are fetched,
+    so any date range can be exported with bounded memory.
+
+    Args:
+        transaction_service: Service for processing transactions.
+        export_format: Export format ("ndjson" or "csv").
+        pmt_status: Filter by payment status.
+        start_date: Filter by payment date (start).
+        end_date: Filter by payment date (end).
+        gzip: Whether to gzip the response body.
+
+    Returns:
+        Streaming response with the exported transactions.
+    """
+    headers = {
+        "Content-Disposition": f'attachment; filename="transactions.{export_format}"'
+    }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(
+        transaction_service.export_transactions(
+            export_format=export_format,
+            pmt_status=pmt_status,
+            start_date=start_date,
+            end_date=end_date,
+            compress=gzip,
+        ),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers=headers,
+    )
+
+
+@router.get(
+    "/reports/daily",
+    dependencies=[Depends(verify_reporting_key), Depends(admit_reporting)],
+)
+def daily_report(
+    transaction_service: Annotated[TransactionService, Depends(get_reporting_service)],
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    pmt_status: Optional[PaymentStatus] = None,
+) -> List[DailyRollupModel]:
+    """Get transaction counts and amounts per payment date and status.
+
+    Totals are read from the daily rollup table, so the cost depends on the
+    number of days in the range rather than the number of transactions.
+
+    Args:
+        transaction_service: Service for processing transactions.
+        start_date: First payment date to include.
+        end_date: Last payment date to include.
+        pmt_status: Filter by payment status.
+
+    Returns:
+        Totals per payment date and status, ordered by date.
+    """
+    return transaction_service.daily_report(
+        start_date=start_date, end_date=end_date, pmt_status=pmt_status
+    )
@@ -0,0 +1,28 @@
+"""JSON representation of database values for the uPay API."""
+
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+
+
+def json_value(value: Any) -> Any:
+    """Convert a column value to its JSON representation.
+
+    Used for transaction exports and outbox event payloads, so both
+    describe a transaction the same way.
+
+    Args:
+        value: Column value.
+
+    Returns:
+        ISO 8601 string for dates, string for decimals, the value of enum
+        members, and the value itself otherwise.
+    """
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    return value
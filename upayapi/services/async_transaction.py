@@ -0,0 +1,130 @@
+"""Async transaction service for the uPay API."""
+
+import asyncio
+from typing import Optional
+
+from fastapi import Depends
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from upayapi.async_database import get_async_db
+from upayapi.batching import get_ingestion_batcher
+from upayapi.cache import idempotency_cache
+from upayapi.config import settings
+from upayapi.exceptions import AuthenticationError, DatabaseError
+from upayapi.models.schemas import (
+    TransactionRequest,
+    TransactionResponse,
+)
+from upayapi.repositories.async_transaction import AsyncTransactionRepository
+from upayapi.sites import resolve_site
+
+
+class AsyncTransactionService:
+    """Async service for handling transaction operations.
+
+    This class provides the same processing as
+    :class:`upayapi.services.transaction.TransactionService`, but awaits the
+    database instead of blocking the event loop.
+    """
+
+    def __init__(self, db: AsyncSession = Depends(get_async_db)):
+        """Initialize the service with an async database session.
+
+        Args:
+            db: Async database session.
+        """
+        self.repository = AsyncTransactionRepository(db)
+
+    def validate_posting_key(self, posting_key: str) -> bool:
+        """Validate the posting key to ensure request is authorized.
+
+        Args:
+            posting_key: Authentication key for validating requests.
+
+        Returns:
+            True if the posting key belongs to a registered site, False
+            otherwise.
+        """
+        return resolve_site(posting_key) is not None
+
+    async def process_transaction(
+        self, transaction_request: TransactionRequest, site_id: Optional[str] = None
+    ) -> TransactionResponse:
+        """Process a uPay transaction.
+
+        Args:
+            transaction_request: Validated transaction request data.
+            site_id: Site whose posting key was already verified. If None,
+                the site is resolved from the posting key.
+
+        Returns:
+            Transaction response with processing result.
+
+        Raises:
+            AuthenticationError: If the posting key is invalid.
+            DatabaseError: If there's an error with the database operation.
+        """
+        # Find the site of the posting key, unless the route already did
+        if site_id is None:
+            site_id = resolve_site(transaction_request.posting_key)
+            if site_id is None:
+                raise AuthenticationError(detail="Invalid posting key")
+
+        # Answer retries of recently processed postings without the database
+        cached_transaction_id = idempotency_cache.get(transaction_request.tpg_trans_id)
+        if cached_transaction_id is not None:
+            return TransactionResponse(
+                success=True,
+                message="Transaction already processed",
+                transaction_id=cached_transaction_id,
+            )
+
+        values = {
+            "tpg_trans_id": transaction_request.tpg_trans_id,
+            "session_identifier": transaction_request.session_identifier,
+            "pmt_status": transaction_request.pmt_status.value,
+            "pmt_amt": transaction_request.pmt_amt,
+            "pmt_date": transaction_request.pmt_date,
+            "name_on_acct": transaction_request.name_on_acct,
+            "site_id": site_id,
+        }
+
+        try:
+            if settings.ingestion_batching:
+                # Wait for the batch containing this posting to be committed.
+                # The shield keeps a timeout from cancelling the batcher's
+                # future, which the batcher resolves regardless.
+                result = await asyncio.wait_for(
+                    asyncio.shield(
+                        asyncio.wrap_future(get_ingestion_batcher().submit(values))
+                    ),
+                    settings.ingestion_batch_timeout_seconds,
+                )
+            else:
+                # Insert the transaction, or find the existing one, in one statement
+                result = await self.repository.create_transaction_if_absent(**values)
+        except SQLAlchemyError as e:
+            # Convert SQLAlchemy exceptions to our custom DatabaseError
+            raise DatabaseError(
+                detail=f"Database error while processing transaction: {str(e)}"
+            )
+        except asyncio.TimeoutError:
+            raise DatabaseError(
+                detail="Timed out waiting for the transaction to be committed"
+            )
+
+        idempotency_cache.set(transaction_request.tpg_trans_id, result.id)
+
+        # A duplicate posting is an expected condition (TouchNet retries), so
+        # it is reported as a success rather than a DuplicateError
+        return TransactionResponse(
+            success=True,
+            message=(
+                "Transaction processed successfully"
+                if result.created
+                else "Transaction already processed"
+            ),
+            transaction_id=result.id,
+            created=result.created,
+        )
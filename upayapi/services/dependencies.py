@@ -0,0 +1,46 @@
+"""Service dependencies for the uPay API routes."""
+
+from typing import Optional, Union
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from upayapi.async_database import get_optional_async_db
+from upayapi.database import get_db, get_read_db
+from upayapi.services.async_transaction import AsyncTransactionService
+from upayapi.services.transaction import TransactionService
+
+
+def get_transaction_service(
+    db: Session = Depends(get_db),
+    async_db: Optional[AsyncSession] = Depends(get_optional_async_db),
+) -> Union[TransactionService, AsyncTransactionService]:
+    """Get the transaction service selected by ``settings.use_async_database``.
+
+    Sessions do not check out a pooled connection until their first
+    statement, so the unused session costs nothing at the database level.
+
+    Args:
+        db: Database session.
+        async_db: Async database session, or None if the async path is disabled.
+
+    Returns:
+        Async transaction service if an async session is available, otherwise
+        the synchronous transaction service.
+    """
+    if async_db is not None:
+        return AsyncTransactionService(async_db)
+    return TransactionService(db)
+
+
+def get_reporting_service(db: Session = Depends(get_read_db)) -> TransactionService:
+    """Get the transaction service for read-only reporting requests.
+
+    Args:
+        db: Read database session.
+
+    Returns:
+        Transaction service reading through the read engine.
+    """
+    return TransactionService(db)
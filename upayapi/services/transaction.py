@@ -1,20 +1,75 @@
 """Transaction service for the uPay API."""
 
-from datetime import datetime
-from decimal import Decimal
+import csv
+import io
+import json
+import zlib
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import date
+from typing import Any, Iterator, List, Optional, Sequence
 
 from fastapi import Depends, status
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
+from upayapi.archive import get_archive_reader
+from upayapi.batching import get_ingestion_batcher
+from upayapi.cache import idempotency_cache
 from upayapi.config import settings
 from upayapi.database import get_db
-from upayapi.exceptions import AuthenticationError, DatabaseError, DuplicateError
+from upayapi.exceptions import (
+    AuthenticationError,
+    DatabaseError,
+    DuplicateError,
+    ValidationError,
+)
 from upayapi.models.schemas import (
+    DailyRollupModel,
+    PaymentStatus,
+    TransactionModel,
+    TransactionPage,
     TransactionRequest,
     TransactionResponse,
 )
-from upayapi.repositories.transaction import TransactionRepository
+from upayapi.repositories.rollup import RollupRepository
+from upayapi.repositories.transaction import EXPORT_COLUMNS, TransactionRepository
+from upayapi.serialization import json_value
+from upayapi.sites import resolve_site
+
+# Field names of exported transactions, in output order
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+
+def ndjson_lines(rows: Sequence[Sequence[Any]]) -> str:
+    """Format a batch of exported rows as NDJSON.
+
+    Args:
+        rows: Rows with values in EXPORT_FIELDS order.
+
+    Returns:
+        One JSON object per row, each terminated by a newline.
+    """
+    return "".join(
+        json.dumps(
+            dict(zip(EXPORT_FIELDS, map(json_value, row))), separators=(",", ":")
+        )
+        + "\n"
+        for row in rows
+    )
+
+
+def csv_lines(rows: Sequence[Sequence[Any]]) -> str:
+    """Format a batch of exported rows as CSV.
+
+    Args:
+        rows: Rows with values in EXPORT_FIELDS order.
+
+    Returns:
+        One CSV record per row.
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([json_value(value) for value in row] for row in rows)
+    return buffer.getvalue()
 
 
 class TransactionService:
@@ -30,7 +85,8 @@ class TransactionService:
         Args:
             db: Database session.
         """
-        self.repository = TransactionRepository(db)
+        self.repository = TransactionRepository(db, archive=get_archive_reader())
+        self.rollup_repository = RollupRepository(db)
 
     def validate_posting_key(self, posting_key: str) -> bool:
         """Validate the posting key to ensure request is authorized.
@@ -39,17 +95,20 @@ class TransactionService:
             posting_key: Authentication key for validating requests.
 
         Returns:
-            True if the posting key is valid, False otherwise.
+            True if the posting key belongs to a registered site, False
+            otherwise.
         """
-        return posting_key == settings.posting_key
+        return resolve_site(posting_key) is not None
 
     def process_transaction(
-        self, transaction_request: TransactionRequest
+        self, transaction_request: TransactionRequest, site_id: Optional[str] = None
     ) -> TransactionResponse:
         """Process a uPay transaction.
 
         Args:
             transaction_request: Validated transaction request data.
+            site_id: Site whose posting key was already verified. If None,
+                the site is resolved from the posting key.
 
         Returns:
             Transaction response with processing result.
@@ -59,48 +118,199 @@ class TransactionService:
             DatabaseError: If there's an error with the database operation.
             DuplicateError: If the transaction has already been processed.
         """
-        # Validate posting key
-        if not self.validate_posting_key(transaction_request.posting_key):
-            raise AuthenticationError(
-                detail="Invalid posting key"
+        # Find the site of the posting key, unless the route already did
+        if site_id is None:
+            site_id = resolve_site(transaction_request.posting_key)
+            if site_id is None:
+                raise AuthenticationError(detail="Invalid posting key")
+
+        # Answer retries of recently processed postings without the database
+        cached_transaction_id = idempotency_cache.get(transaction_request.tpg_trans_id)
+        if cached_transaction_id is not None:
+            return TransactionResponse(
+                success=True,
+                message="Transaction already processed",
+                transaction_id=cached_transaction_id,
             )
 
-        # Convert validated data to appropriate types
-        pmt_status = transaction_request.pmt_status.value
-        pmt_amt = Decimal(transaction_request.pmt_amt)
-        pmt_date = datetime.strptime(transaction_request.pmt_date, "%m/%d/%Y").date()
+        values = {
+            "tpg_trans_id": transaction_request.tpg_trans_id,
+            "session_identifier": transaction_request.session_identifier,
+            "pmt_status": transaction_request.pmt_status.value,
+            "pmt_amt": transaction_request.pmt_amt,
+            "pmt_date": transaction_request.pmt_date,
+            "name_on_acct": transaction_request.name_on_acct,
+            "site_id": site_id,
+        }
 
         try:
-            # Check if transaction already exists
-            existing_transaction = self.repository.get_by_tpg_trans_id(
-                transaction_request.tpg_trans_id
-            )
-            if existing_transaction:
-                # Use DuplicateError for consistent error handling, but return success response
-                # since this is an expected condition
-                return TransactionResponse(
-                    success=True,
-                    message="Transaction already processed",
-                    transaction_id=existing_transaction.id,
+            if settings.ingestion_batching:
+                # Wait for the batch containing this posting to be committed
+                result = (
+                    get_ingestion_batcher()
+                    .submit(values)
+                    .result(timeout=settings.ingestion_batch_timeout_seconds)
                 )
-
-            # Create transaction
-            transaction = self.repository.create_transaction(
-                tpg_trans_id=transaction_request.tpg_trans_id,
-                session_identifier=transaction_request.session_identifier,
-                pmt_status=pmt_status,
-                pmt_amt=pmt_amt,
-                pmt_date=pmt_date,
-                name_on_acct=transaction_request.name_on_acct,
-            )
+            else:
+                # Insert the transaction, or find the existing one, in one statement
+                result = self.repository.create_transaction_if_absent(**values)
         except SQLAlchemyError as e:
             # Convert SQLAlchemy exceptions to our custom DatabaseError
             raise DatabaseError(
                 detail=f"Database error while processing transaction: {str(e)}"
             )
+        except FutureTimeoutError:
+            raise DatabaseError(
+                detail="Timed out waiting for the transaction to be committed"
+            )
+
+        idempotency_cache.set(transaction_request.tpg_trans_id, result.id)
 
+        # A duplicate posting is an expected condition (TouchNet retries), so
+        # it is reported as a success rather than a DuplicateError
         return TransactionResponse(
             success=True,
-            message="Transaction processed successfully",
-            transaction_id=transaction.id,
+            message=(
+                "Transaction processed successfully"
+                if result.created
+                else "Transaction already processed"
+            ),
+            transaction_id=result.id,
+            created=result.created,
         )
+
+    def list_transactions(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        sort_by: str = "pmt_date",
+        sort_order: str = "desc",
+        pmt_status: Optional[PaymentStatus] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        include_total: bool = False,
+    ) -> TransactionPage:
+        """Get a page of transactions using keyset pagination.
+
+        Args:
+            limit: Maximum number of transactions to return.
+            cursor: Cursor from the previous page, or None for the first page.
+            sort_by: Field to sort by.
+            sort_order: Sort order ("asc" or "desc").
+            pmt_status: Filter by payment status.
+            start_date: Filter by payment date (start).
+            end_date: Filter by payment date (end).
+            include_total: Whether to count all matching transactions.
+
+        Returns:
+            Page of transactions with the cursor for the next page.
+
+        Raises:
+            ValidationError: If the cursor or sort order is invalid.
+        """
+        try:
+            page = self.repository.get_transactions(
+                limit=limit,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                pmt_status=pmt_status.value if pmt_status else None,
+                start_date=start_date,
+                end_date=end_date,
+                cursor=cursor,
+                include_total=include_total,
+            )
+        except ValueError as e:
+            raise ValidationError(detail=str(e))
+
+        return TransactionPage(
+            items=[TransactionModel.model_validate(item) for item in page["items"]],
+            next_cursor=page["next_cursor"],
+            has_more=page["has_more"],
+            limit=page["limit"],
+            total=page["total"],
+        )
+
+    def daily_report(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        pmt_status: Optional[PaymentStatus] = None,
+    ) -> List[DailyRollupModel]:
+        """Get daily transaction totals from the rollup table.
+
+        Args:
+            start_date: First payment date to include.
+            end_date: Last payment date to include.
+            pmt_status: Filter by payment status.
+
+        Returns:
+            Totals per payment date and status, ordered by date.
+        """
+        rows = self.rollup_repository.get_daily(
+            start_date=start_date,
+            end_date=end_date,
+            pmt_status=pmt_status.value if pmt_status else None,
+        )
+        return [DailyRollupModel.model_validate(row) for row in rows]
+
+    def export_transactions(
+        self,
+        export_format: str = "ndjson",
+        pmt_status: Optional[PaymentStatus] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        compress: bool = False,
+        batch_size: int = 1000,
+    ) -> Iterator[bytes]:
+        """Export transactions as a stream of NDJSON or CSV chunks.
+
+        Each chunk holds one batch of rows from a server-side cursor, so
+        memory use is bounded by the batch size rather than the date range.
+        Compressed chunks are flushed after every batch so clients can
+        decompress the stream as it arrives.
+
+        Args:
+            export_format: "ndjson" or "csv".
+            pmt_status: Filter by payment status.
+            start_date: Filter by payment date (start).
+            end_date: Filter by payment date (end).
+            compress: Whether to gzip the stream.
+            batch_size: Number of rows fetched and written per chunk.
+
+        Yields:
+            Encoded chunks of the export.
+
+        Raises:
+            ValueError: If export_format is not "ndjson" or "csv".
+        """
+        if export_format == "ndjson":
+            format_rows = ndjson_lines
+            header: List[str] = []
+        elif export_format == "csv":
+            format_rows = csv_lines
+            header = [",".join(EXPORT_FIELDS) + "\r\n"]
+        else:
+            raise ValueError("export_format must be 'ndjson' or 'csv'")
+
+        compressor = zlib.compressobj(wbits=31) if compress else None
+
+        def encode(text: str) -> bytes:
+            data = text.encode("utf-8")
+            if compressor is None:
+                return data
+            return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+        for text in header:
+            yield encode(text)
+
+        batches = self.repository.stream_transactions(
+            pmt_status=pmt_status.value if pmt_status else None,
+            start_date=start_date,
+            end_date=end_date,
+            batch_size=batch_size,
+        )
+        for rows in batches:
+            yield encode(format_rows(rows))
+
+        if compressor is not None:
+            yield compressor.flush()
@@ -0,0 +1,213 @@
+"""Registry of uPay sites and their posting keys.
+
+One deployment serves every uPay site of the campus. Each site posts with
+its own posting key, and each stored transaction records the site whose key
+authenticated it. The registry maps the SHA-256 digest of each posting key
+to its site in a dictionary, so a posting is matched to its site with one
+hash and one lookup whatever the number of sites. Only digests are kept in
+memory and in the ``sites`` table.
+
+Looking up a digest takes time that depends on the digest of the key that
+was sent, not on how much of a valid key it matches, so the lookup does not
+leak keys through timing the way a plain string comparison would.
+
+Sites come from ``settings.posting_sites`` and the active rows of the
+``sites`` table, loaded when a worker starts. A site may have several keys,
+which allows rotating a key without downtime. ``settings.posting_key``
+remains valid for ``settings.default_site_id``.
+"""
+
+import hashlib
+import hmac
+import logging
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from upayapi.config import settings
+
+# Configure logger
+logger = logging.getLogger("upayapi.sites")
+
+# Prefix of configured posting keys given as a hex SHA-256 digest
+DIGEST_PREFIX = "sha256:"
+
+
+def hash_posting_key(posting_key: str) -> bytes:
+    """Hash a posting key.
+
+    Args:
+        posting_key: Posting key.
+
+    Returns:
+        SHA-256 digest of the key.
+    """
+    return hashlib.sha256(posting_key.encode()).digest()
+
+
+def parse_key_digest(value: str) -> bytes:
+    """Get the digest of a configured posting key.
+
+    Args:
+        value: Posting key, or ``sha256:`` followed by its hex SHA-256 digest.
+
+    Returns:
+        SHA-256 digest of the key.
+
+    Raises:
+        ValueError: If the value is empty or not a valid hex digest.
+    """
+    if value.startswith(DIGEST_PREFIX):
+        digest = bytes.fromhex(value[len(DIGEST_PREFIX) :])
+        if len(digest) != hashlib.sha256().digest_size:
+            raise ValueError("A SHA-256 digest has 64 hex digits")
+        return digest
+    if not value:
+        raise ValueError("Posting keys must not be empty")
+    return hash_posting_key(value)
+
+
+class SiteRegistry:
+    """In-memory map of posting key digests to site IDs.
+
+    Attributes:
+        sites: Site ID for each posting key digest.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self.sites: Dict[bytes, str] = {}
+
+    def load(self, keys: Iterable[Tuple[str, bytes]]) -> None:
+        """Replace the registered sites.
+
+        The new map is built before it replaces the old one, so lookups
+        running meanwhile see either the old or the new sites.
+
+        Args:
+            keys: Site ID and posting key digest pairs.
+
+        Raises:
+            ValueError: If two sites share a posting key.
+        """
+        sites: Dict[bytes, str] = {}
+        for site_id, digest in keys:
+            if sites.setdefault(digest, site_id) != site_id:
+                raise ValueError(
+                    f"Sites {sites[digest]!r} and {site_id!r} share a posting key"
+                )
+        self.sites = sites
+
+    def lookup(self, posting_key: str) -> Optional[str]:
+        """Find the site of a posting key.
+
+        Args:
+            posting_key: Posting key sent with a posting.
+
+        Returns:
+            Site ID, or None if no site has this key.
+        """
+        return self.sites.get(hash_posting_key(posting_key))
+
+    def __len__(self) -> int:
+        """Return the number of registered posting keys.
+
+        Returns:
+            Number of registered posting keys.
+        """
+        return len(self.sites)
+
+
+def configured_site_keys(posting_sites: Mapping[str, str]) -> List[Tuple[str, bytes]]:
+    """Get the posting key digests of the configured sites.
+
+    Args:
+        posting_sites: Posting key or ``sha256:`` digest by site ID.
+
+    Returns:
+        Site ID and posting key digest pairs.
+
+    Raises:
+        ValueError: If a configured key is empty or not a valid digest.
+    """
+    return [
+        (site_id, parse_key_digest(value)) for site_id, value in posting_sites.items()
+    ]
+
+
+def stored_site_keys(db: Session) -> List[Tuple[str, bytes]]:
+    """Get the posting key digests of the active sites in the sites table.
+
+    Args:
+        db: Database session.
+
+    Returns:
+        Site ID and posting key digest pairs.
+
+    Raises:
+        SQLAlchemyError: If the sites table cannot be read.
+    """
+    from upayapi.models.site import Site
+
+    rows = db.execute(
+        select(Site.site_id, Site.posting_key_sha256).where(Site.active.is_(True))
+    )
+    return [(site_id, bytes.fromhex(digest)) for site_id, digest in rows]
+
+
+def load_site_registry(
+    session_factory: Optional[Callable[[], Session]] = None,
+) -> int:
+    """Load the configured and stored sites into the site registry.
+
+    A sites table that cannot be read, for example before the database is
+    migrated, is logged and skipped, so the configured sites still work.
+
+    Args:
+        session_factory: Factory for database sessions. If None, the write
+            engine's session factory.
+
+    Returns:
+        Number of registered posting keys.
+
+    Raises:
+        ValueError: If a configured key is invalid or two sites share a key.
+    """
+    keys = configured_site_keys(settings.posting_sites)
+
+    if session_factory is None:
+        from upayapi.database import get_session_factory
+
+        session_factory = get_session_factory()
+    try:
+        with session_factory() as db:
+            keys.extend(stored_site_keys(db))
+    except SQLAlchemyError as e:
+        logger.warning("Could not load sites from the database: %s", e)
+
+    site_registry.load(keys)
+    return len(site_registry)
+
+
+def resolve_site(posting_key: str) -> Optional[str]:
+    """Find the site a posting key belongs to.
+
+    Args:
+        posting_key: Posting key sent with a posting.
+
+    Returns:
+        Site ID, or None if the key is not valid for any site.
+    """
+    site_id = site_registry.lookup(posting_key)
+    if site_id is not None:
+        return site_id
+    if settings.posting_key and hmac.compare_digest(
+        posting_key.encode(), settings.posting_key.encode()
+    ):
+        return settings.default_site_id
+    return None
+
+
+site_registry = SiteRegistry()